@@ -30,7 +30,15 @@ if __package__:
     from .overlay_plugin.lifecycle import LifecycleTracker
     from .overlay_plugin.overlay_watchdog import OverlayWatchdog
     from .overlay_plugin.overlay_socket_server import WebSocketBroadcaster
+    from .overlay_plugin.payload_codec import (
+        SUPPORTED_FEATURES,
+        SUPPORTED_FRAMINGS,
+        EncodedPayload,
+        as_encoded_payload,
+    )
     from .overlay_plugin.logging_utils import build_rotating_payload_handler
+    from .overlay_plugin.payload_log_sink import PayloadLogSink
+    from .overlay_plugin.payload_capture import CAPTURE_FILE_NAME, PayloadCaptureWriter
     from .overlay_plugin.runtime_services import start_runtime_services, stop_runtime_services
     from .overlay_plugin.controller_services import (
         controller_launch_sequence,
@@ -57,6 +65,7 @@ if __package__:
     )
     from .overlay_plugin.version_helper import VersionStatus, evaluate_version_status
     from .overlay_plugin.legacy_tcp_server import LegacyOverlayTCPServer
+    from .overlay_plugin.config_watcher import ConfigWatch, shared_config_watcher
     from .overlay_plugin.overlay_api import (
         register_grouping_store,
         register_publisher,
@@ -73,7 +82,15 @@ else:  # pragma: no cover - EDMC loads as top-level module
     from overlay_plugin.lifecycle import LifecycleTracker
     from overlay_plugin.overlay_watchdog import OverlayWatchdog
     from overlay_plugin.overlay_socket_server import WebSocketBroadcaster
+    from overlay_plugin.payload_codec import (
+        SUPPORTED_FEATURES,
+        SUPPORTED_FRAMINGS,
+        EncodedPayload,
+        as_encoded_payload,
+    )
     from overlay_plugin.logging_utils import build_rotating_payload_handler
+    from overlay_plugin.payload_log_sink import PayloadLogSink
+    from overlay_plugin.payload_capture import CAPTURE_FILE_NAME, PayloadCaptureWriter
     from overlay_plugin.runtime_services import start_runtime_services, stop_runtime_services
     from overlay_plugin.controller_services import (
         controller_launch_sequence,
@@ -100,6 +117,7 @@ else:  # pragma: no cover - EDMC loads as top-level module
     )
     from overlay_plugin.version_helper import VersionStatus, evaluate_version_status
     from overlay_plugin.legacy_tcp_server import LegacyOverlayTCPServer
+    from overlay_plugin.config_watcher import ConfigWatch, shared_config_watcher
     from overlay_plugin.overlay_api import (
         register_grouping_store,
         register_publisher,
@@ -364,13 +382,20 @@ PAYLOAD_LOGGER_NAME = f"{LOGGER_NAME}.payloads"
 PAYLOAD_LOG_FILE_NAME = "overlay-payloads.log"
 PAYLOAD_LOG_DIR_NAME = PLUGIN_NAME
 PAYLOAD_LOG_MAX_BYTES = 512 * 1024
+PAYLOAD_CAPTURE_MAX_BYTES = 4 * 1024 * 1024
 CONNECTION_LOG_INTERVAL_SECONDS = 5.0
+PUBLISH_COALESCE_WINDOW_SECONDS = 1.0 / 60.0
+# Compact provenance tag broadcast in place of the raw payload copies.
+PAYLOAD_VIA_KEY = "via"
+PAYLOAD_VIA_API = "api"
+PAYLOAD_VIA_LEGACY_TCP = "legacy_tcp"
 
 DEFAULT_DEBUG_CONFIG: Dict[str, Any] = {
     "capture_client_stderrout": True,
     "overlay_logs_to_keep": 5,
     "payload_logging": {
         "overlay_payload_log_enabled": True,
+        "overlay_payload_capture_enabled": False,
         "exclude_plugins": [],
     },
 }
@@ -429,6 +454,7 @@ class _PluginRuntime:
             log=_log,
             log_debug=_log_debug,
             connection_log_interval=CONNECTION_LOG_INTERVAL_SECONDS,
+            coalesce_window=PUBLISH_COALESCE_WINDOW_SECONDS,
             ingest_callback=self._handle_cli_payload,
         )
         self.watchdog: Optional[OverlayWatchdog] = None
@@ -457,12 +483,23 @@ class _PluginRuntime:
         self._payload_logger.setLevel(logging.DEBUG)
         self._payload_logger.propagate = False
         self._payload_log_handler: Optional[logging.Handler] = None
+        self._payload_log_sink = PayloadLogSink(
+            self._write_payload_log, self._lifecycle, LOGGER, on_stop=self._close_payload_capture
+        )
+        self._payload_capture_enabled: bool = False
+        self._payload_logs_dir: Optional[Path] = None
+        # Owned by the payload log writer thread, which also closes it when the sink stops.
+        self._payload_capture: Optional[PayloadCaptureWriter] = None
+        self._payload_capture_target: Optional[Tuple[Path, int]] = None
         self._log_retention_override: Optional[int] = None
         self._plugin_prefix_map: Dict[str, str] = self._load_plugin_prefix_map()
         self._payload_filter_path = self.plugin_dir / "debug.json"
         self._dev_settings_path = self.plugin_dir / "dev_settings.json"
         self._payload_filter_mtime: Optional[float] = None
         self._dev_settings_mtime: Optional[float] = None
+        self._config_watch: Optional[ConfigWatch] = None
+        self._open_config_watch()
+        self._debug_config_pref_logging: Optional[bool] = None
         self._payload_filter_excludes: Set[str] = set()
         self._payload_logging_enabled: bool = False
         self._trace_enabled: bool = False
@@ -528,10 +565,15 @@ class _PluginRuntime:
         if not self._running:
             return PLUGIN_NAME
 
+        if self._open_config_watch():
+            # debug.json/dev_settings.json were unwatched while stopped; re-read them.
+            self._load_payload_debug_config(force=True)
+            self._load_dev_settings(force=True)
+        self._payload_log_sink.reopen()
         self._start_prefs_worker()
         self._start_force_render_monitor_if_needed()
         self._start_version_status_check()
-        register_publisher(self._publish_external)
+        register_publisher(self._publish_external, self._publish_external_batch)
         self._start_legacy_tcp_server()
         self._send_overlay_config(rebroadcast=True)
         self._maybe_emit_version_update_notice()
@@ -550,7 +592,11 @@ class _PluginRuntime:
         self._cancel_config_timers()
         self._cancel_version_notice_timers()
         self._stop_legacy_tcp_server()
+        if self._config_watch is not None:
+            self._config_watch.close()
+            self._config_watch = None
         stop_runtime_services(self, LOGGER, self._lifecycle.untrack_handle)
+        self._payload_log_sink.stop()
         if self._payload_log_handler is not None:
             self._payload_logger.removeHandler(self._payload_log_handler)
             try:
@@ -718,6 +764,8 @@ class _PluginRuntime:
             "port": self.broadcaster.port,
             "version": PLUGIN_VERSION,
             "log_level": self._build_log_level_payload(),
+            "framing": list(SUPPORTED_FRAMINGS),
+            "features": list(SUPPORTED_FEATURES),
         }
         if self._flatpak_context.get("is_flatpak"):
             data["flatpak"] = True
@@ -736,6 +784,7 @@ class _PluginRuntime:
         retention = self._resolve_client_log_retention()
         backup_count = max(0, retention - 1)
         log_dir = self._resolve_payload_logs_dir()
+        self._payload_logs_dir = log_dir
         log_path = log_dir / PAYLOAD_LOG_FILE_NAME
         formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s", "%Y-%m-%d %H:%M:%S")
         try:
@@ -916,8 +965,31 @@ class _PluginRuntime:
         LOGGER.info("Created default dev_settings.json at %s for dev-mode helpers.", self._dev_settings_path)
         return True
 
+    def _open_config_watch(self) -> bool:
+        """Watch debug.json and dev_settings.json; return True if a new watch was opened."""
+
+        if self._config_watch is not None:
+            return False
+        config_watcher = shared_config_watcher()
+        if config_watcher is None:
+            return False
+        self._config_watch = config_watcher.watch((self._payload_filter_path, self._dev_settings_path))
+        return True
+
     def _load_payload_debug_config(self, *, force: bool = False) -> None:
         pref_logging_enabled = bool(getattr(self._preferences, "log_payloads", False)) if self._preferences else False
+        watch = self._config_watch
+        if (
+            not force
+            and watch is not None
+            and not watch.poll()
+            and pref_logging_enabled == self._debug_config_pref_logging
+            and (self._payload_filter_mtime is not None or not _diagnostic_logging_enabled())
+        ):
+            # Neither debug.json nor dev_settings.json changed; a missing debug.json is
+            # only re-checked while diagnostics would seed a default one.
+            return
+        self._debug_config_pref_logging = pref_logging_enabled
         stat: Optional[os.stat_result]
         try:
             stat = self._payload_filter_path.stat()
@@ -936,6 +1008,7 @@ class _PluginRuntime:
                 if force or self._payload_filter_excludes or self._payload_logging_enabled:
                     self._payload_filter_excludes = set()
                     self._payload_logging_enabled = pref_logging_enabled
+                    self._payload_capture_enabled = False
                     self._payload_filter_mtime = None
                     self._apply_capture_override(False)
                 if retention_cleared:
@@ -945,6 +1018,7 @@ class _PluginRuntime:
         if stat is None:
             self._payload_filter_excludes = set()
             self._payload_logging_enabled = pref_logging_enabled
+            self._payload_capture_enabled = False
             self._payload_filter_mtime = None
             self._apply_capture_override(False)
             retention_cleared = self._set_log_retention_override(None)
@@ -961,6 +1035,7 @@ class _PluginRuntime:
         except (OSError, json.JSONDecodeError):
             self._payload_filter_excludes = set()
             self._payload_logging_enabled = pref_logging_enabled
+            self._payload_capture_enabled = False
             self._apply_capture_override(False)
             retention_cleared = self._set_log_retention_override(None)
             if retention_cleared:
@@ -996,6 +1071,7 @@ class _PluginRuntime:
                 needs_write = True
 
         logging_override: Optional[bool] = None
+        capture_enabled = False
         capture_client_stderrout = False
         log_retention_override: Optional[int] = None
 
@@ -1017,6 +1093,7 @@ class _PluginRuntime:
             override = logging_section.get("overlay_payload_log_enabled")
             if override is not None:
                 logging_override = bool(override)
+            capture_enabled = bool(logging_section.get("overlay_payload_capture_enabled", False))
             exclude_value = logging_section.get("exclude_plugins")
             if isinstance(exclude_value, (list, tuple, set)):
                 excludes = {
@@ -1032,6 +1109,7 @@ class _PluginRuntime:
         log_retention_override = _coerce_log_retention(data.get("overlay_logs_to_keep"))
 
         self._payload_filter_excludes = excludes
+        self._payload_capture_enabled = capture_enabled
         effective_logging = pref_logging_enabled if logging_override is None else logging_override
         self._payload_logging_enabled = effective_logging
         self._apply_capture_override(capture_client_stderrout)
@@ -2013,21 +2091,64 @@ class _PluginRuntime:
         if broadcast:
             self._send_overlay_config()
 
-    def _publish_external(self, payload: Mapping[str, Any]) -> bool:
+    def _publish_external(
+        self,
+        payload: Mapping[str, Any],
+        *,
+        legacy_raw: Optional[Mapping[str, Any]] = None,
+        via: str = PAYLOAD_VIA_API,
+    ) -> bool:
         if not self._running:
             return False
-        original_payload = dict(payload)
-        self._trace_payload_event("ingest:external_raw", original_payload)
-        message = dict(original_payload)
-        message.setdefault("cmdr", self._state.get("cmdr", ""))
-        message.setdefault("system", self._state.get("system", ""))
-        message.setdefault("station", self._state.get("station", ""))
-        message.setdefault("docked", self._state.get("docked", False))
-        message.setdefault("raw", original_payload)
-        self._trace_payload_event("publish:prepared", message, {"source": "external"})
+        message = self._prepare_external(payload, legacy_raw=legacy_raw, via=via)
+        if message is None:
+            return False
         self._publish_payload(message)
         return True
 
+    def _publish_external_batch(self, payloads: Sequence[Mapping[str, Any]]) -> bool:
+        if not self._running:
+            return False
+        messages = []
+        for payload in payloads:
+            message = self._prepare_external(payload)
+            if message is None:
+                return False
+            messages.append(message)
+        self._publish_batch(messages)
+        return True
+
+    def _prepare_external(
+        self,
+        payload: Mapping[str, Any],
+        *,
+        legacy_raw: Optional[Mapping[str, Any]] = None,
+        via: str = PAYLOAD_VIA_API,
+    ) -> Optional[EncodedPayload]:
+        original = as_encoded_payload(payload)
+        self._trace_payload_event("ingest:external_raw", original)
+        defaults = {
+            "cmdr": self._state.get("cmdr", ""),
+            "system": self._state.get("system", ""),
+            "station": self._state.get("station", ""),
+            "docked": self._state.get("docked", False),
+            PAYLOAD_VIA_KEY: via,
+        }
+        # The raw forms only feed payload logging; the client gets the slim payload.
+        embedded_legacy = original.get("legacy_raw")
+        raw_forms: Dict[str, Mapping[str, Any]] = {"raw": original}
+        if legacy_raw is None and isinstance(embedded_legacy, Mapping):
+            legacy_raw = embedded_legacy
+        if legacy_raw is not None:
+            raw_forms["legacy_raw"] = legacy_raw
+        try:
+            message = original.without("legacy_raw").merged(defaults).with_raw(raw_forms)
+        except (TypeError, ValueError) as exc:
+            _log(f"Failed to encode payload to JSON: {exc}")
+            return None
+        self._trace_payload_event("publish:prepared", message, {"source": "external"})
+        return message
+
     def _start_legacy_tcp_server(self) -> None:
         if self._legacy_tcp_server is not None:
             return
@@ -2091,7 +2212,6 @@ class _PluginRuntime:
         message: Dict[str, Any] = {
             "event": "LegacyOverlay",
             **normalised,
-            "legacy_raw": raw_payload,
         }
         message.setdefault("timestamp", datetime.now(UTC).isoformat())
         self._trace_payload_event(
@@ -2102,7 +2222,7 @@ class _PluginRuntime:
                 "raw_type": raw_payload.get("type"),
             },
         )
-        return self._publish_external(message)
+        return self._publish_external(message, legacy_raw=raw_payload, via=PAYLOAD_VIA_LEGACY_TCP)
 
     def _handle_cli_payload(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         try:
@@ -2336,12 +2456,21 @@ class _PluginRuntime:
             self._schedule_config_rebroadcasts()
 
     def _publish_payload(self, payload: Mapping[str, Any]) -> None:
-        message = dict(payload)
+        message = as_encoded_payload(payload)
         self._trace_payload_event("publish:dispatch", message)
         self._log_payload(message)
-        self.broadcaster.publish(dict(message))
+        self.broadcaster.publish(message)
         self._trace_payload_event("publish:sent", message)
 
+    def _publish_batch(self, payloads: Sequence[Mapping[str, Any]]) -> None:
+        messages = [as_encoded_payload(payload) for payload in payloads]
+        for message in messages:
+            self._trace_payload_event("publish:dispatch", message, {"batch": len(messages)})
+            self._log_payload(message)
+        self.broadcaster.publish_batch(messages)
+        for message in messages:
+            self._trace_payload_event("publish:sent", message, {"batch": len(messages)})
+
     def _load_plugin_prefix_map(self) -> Dict[str, str]:
         config_path = self.plugin_dir / "overlay_groupings.json"
         try:
@@ -2504,22 +2633,56 @@ class _PluginRuntime:
         )
 
     def _log_payload(self, payload: Mapping[str, Any]) -> None:
+        self._load_payload_debug_config()
+        if not self._payload_logging_enabled or not _diagnostic_logging_enabled():
+            return
+        # Name resolution, the exclusion filter and the capture target read config and
+        # preferences that the EDMC thread reloads, so they run here; serialisation
+        # and file I/O happen on the payload log writer thread.
+        plugin_name, payload_id = self._plugin_name_for_payload(payload)
+        excludes = self._payload_filter_excludes
+        if excludes and plugin_name and plugin_name.lower() in excludes:
+            return
+        legacy_raw = None
+        if isinstance(payload, EncodedPayload):
+            legacy_raw = payload.raw.get("legacy_raw")
+        if legacy_raw is None and isinstance(payload, Mapping):
+            legacy_raw = payload.get("legacy_raw")
+        legacy_plugin = None
+        if legacy_raw is not None:
+            legacy_plugin, _ = self._plugin_name_for_payload(legacy_raw)
+        capture_target: Optional[Tuple[Path, int]] = None
+        if self._payload_capture_enabled:
+            logs_dir = self._payload_logs_dir
+            if logs_dir is None:
+                logs_dir = self._payload_logs_dir = self._resolve_payload_logs_dir()
+            capture_target = (logs_dir / CAPTURE_FILE_NAME, self._resolve_client_log_retention())
+        self._payload_log_sink.submit(
+            (payload, plugin_name, payload_id, legacy_raw, legacy_plugin or plugin_name, capture_target)
+        )
+
+    def _write_payload_log(self, entry: Tuple[Any, ...]) -> None:
+        payload, plugin_name, payload_id, legacy_raw, legacy_plugin, capture_target = entry
         event: Optional[str] = None
         if isinstance(payload, Mapping):
             raw_event = payload.get("event")
             if isinstance(raw_event, str) and raw_event:
                 event = raw_event
+        logger = self._payload_logger if self._payload_log_handler is not None else LOGGER
+        is_json = True
         try:
-            serialised = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+            if isinstance(payload, EncodedPayload):
+                serialised = payload.log_text()
+            else:
+                serialised = json.dumps(payload, ensure_ascii=False, sort_keys=True)
         except (TypeError, ValueError):
             serialised = repr(payload)
-        logger = self._payload_logger if self._payload_log_handler is not None else LOGGER
-        self._load_payload_debug_config()
-        if not self._payload_logging_enabled or not _diagnostic_logging_enabled():
-            return
-        plugin_name, payload_id = self._plugin_name_for_payload(payload)
-        if self._payload_filter_excludes and plugin_name and plugin_name.lower() in self._payload_filter_excludes:
-            return
+            is_json = False
+        if capture_target is not None:
+            if is_json:
+                self._append_payload_capture(capture_target, plugin_name, payload_id, serialised)
+        elif self._payload_capture is not None:
+            self._close_payload_capture()
         log_method = logger.debug
         if event:
             if plugin_name:
@@ -2531,22 +2694,45 @@ class _PluginRuntime:
                 log_method("Overlay payload plugin=%s: %s", plugin_name, serialised)
             else:
                 log_method("Overlay payload: %s", serialised)
-        legacy_raw = None
-        if isinstance(payload, Mapping):
-            legacy_raw = payload.get("legacy_raw")
         if legacy_raw is not None:
             try:
                 legacy_serialised = json.dumps(legacy_raw, ensure_ascii=False, sort_keys=True)
             except (TypeError, ValueError):
                 legacy_serialised = repr(legacy_raw)
-            legacy_plugin, _ = self._plugin_name_for_payload(legacy_raw)
-            if not legacy_plugin:
-                legacy_plugin = plugin_name
             if legacy_plugin:
                 log_method("Overlay legacy_raw plugin=%s: %s", legacy_plugin, legacy_serialised)
             else:
                 log_method("Overlay legacy_raw: %s", legacy_serialised)
 
+    def _append_payload_capture(
+        self,
+        target: Tuple[Path, int],
+        plugin_name: Optional[str],
+        payload_id: Optional[str],
+        serialised: str,
+    ) -> None:
+        if self._payload_capture is None or self._payload_capture_target != target:
+            self._close_payload_capture()
+            path, retention = target
+            self._payload_capture = PayloadCaptureWriter(
+                path,
+                max_bytes=PAYLOAD_CAPTURE_MAX_BYTES,
+                backup_count=max(0, retention - 1),
+            )
+            self._payload_capture_target = target
+        try:
+            self._payload_capture.append(plugin_name, payload_id, serialised.encode("utf-8"))
+        except OSError as exc:
+            LOGGER.warning("Failed to write payload capture %s: %s", self._payload_capture.path, exc)
+            self._close_payload_capture()
+
+    def _close_payload_capture(self) -> None:
+        capture = self._payload_capture
+        self._payload_capture = None
+        self._payload_capture_target = None
+        if capture is not None:
+            capture.close()
+
     def _locate_overlay_python(self, overlay_env: Optional[Dict[str, str]] = None) -> Optional[List[str]]:
         env_override = os.getenv("EDMC_OVERLAY_PYTHON")
         if env_override:
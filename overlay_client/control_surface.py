@@ -5,7 +5,8 @@ import logging
 import math
 import sys
 import time
-from typing import Any, Dict, List, Mapping, Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, Optional
 
 from PyQt6.QtGui import QGuiApplication, QPainter
 
@@ -25,6 +26,8 @@ _CLIENT_LOGGER = logging.getLogger("EDMC.ModernOverlay.Client")
 
 DEFAULT_WINDOW_BASE_HEIGHT = 960
 DEFAULT_WINDOW_BASE_WIDTH = 1280
+# Repaint reasons caused only by legacy payload changes; these can be limited to the changed groups.
+_REGION_REPAINT_REASONS = frozenset({"ingest", "purge"})
 
 
 class ControlSurfaceMixin:
@@ -573,6 +576,8 @@ class ControlSurfaceMixin:
 
     def _request_repaint(self, reason: str, *, immediate: bool = False) -> None:
         self._record_repaint_event(reason)
+        if reason not in _REGION_REPAINT_REASONS:
+            self._repaint_full_pending = True
         debounce_enabled = bool(getattr(self, "_repaint_debounce_enabled", True))
         timer = getattr(self, "_repaint_timer", None)
         effective_immediate = immediate or not debounce_enabled or timer is None
@@ -598,13 +603,29 @@ class ControlSurfaceMixin:
         if effective_immediate:
             if timer is not None and timer.isActive():
                 timer.stop()
-            self.update()
+            self._flush_repaint()
             return
         if not timer.isActive():
             timer.start()
 
     def _trigger_debounced_repaint(self) -> None:
-        self.update()
+        self._flush_repaint()
+
+    def _flush_repaint(self, plan: bool = True) -> None:
+        """Repaint only the areas payload changes touched; anything else repaints the whole window.
+
+        With the frame planner running, changed payloads are laid out off the GUI
+        thread first and the finished plan flushes again (``plan=False``).
+        """
+        if plan and self._submit_frame_plan():
+            return
+        full = self._repaint_full_pending
+        self._repaint_full_pending = False
+        region = None if full else self._legacy_dirty_region()
+        if region is None:
+            self.update()
+        elif not region.isEmpty():
+            self.update(region)
 
     @staticmethod
     def _should_bypass_debounce(payload: Mapping[str, Any]) -> bool:
@@ -649,18 +670,27 @@ class ControlSurfaceMixin:
             total_total,
         )
         measure_stats = getattr(self, "_measure_stats", {})
-        if isinstance(measure_stats, dict) and measure_stats.get("calls"):
+        cache_stats = getattr(self, "_text_cache_stats", None) or {}
+        if isinstance(measure_stats, dict) and (measure_stats.get("calls") or cache_stats.get("evict")):
+            # hits/misses/evictions cover both LRU caches (message metrics and group text blocks).
+            caches = [getattr(self, "_text_cache", None), getattr(self, "_text_block_cache", None)]
             _CLIENT_LOGGER.debug(
-                "Text measure stats: calls=%d hits=%d misses=%d resets=%d (window=5s)",
+                "Text measure stats: calls=%d hits=%d misses=%d evictions=%d resets=%d entries=%d bytes=%d "
+                "(window=5s)",
                 measure_stats.get("calls", 0),
-                measure_stats.get("cache_hit", 0),
-                measure_stats.get("cache_miss", 0),
+                cache_stats.get("hit", 0),
+                cache_stats.get("miss", 0),
+                cache_stats.get("evict", 0),
                 measure_stats.get("cache_reset", 0),
+                sum(len(cache) for cache in caches if cache is not None),
+                sum(getattr(cache, "bytes_used", 0) for cache in caches),
             )
             measure_stats["calls"] = 0
             measure_stats["cache_hit"] = 0
             measure_stats["cache_miss"] = 0
             measure_stats["cache_reset"] = 0
+            for counter in cache_stats:
+                cache_stats[counter] = 0
 
     def set_background_opacity(self, opacity: float) -> None:
         try:
@@ -762,6 +792,20 @@ class ControlSurfaceMixin:
     def handle_legacy_payload(self, payload: Dict[str, Any]) -> None:
         self._handle_legacy(payload)
 
+    @contextmanager
+    def legacy_ingest_batch(self) -> Iterator[None]:
+        """Ingest every legacy payload of a batch before marking dirty and repainting once."""
+        self._legacy_batch_depth += 1
+        try:
+            yield
+        finally:
+            self._legacy_batch_depth -= 1
+            if not self._legacy_batch_depth and self._legacy_batch_changed:
+                immediate = self._legacy_batch_immediate
+                self._legacy_batch_changed = False
+                self._legacy_batch_immediate = False
+                self._finish_legacy_ingest(immediate)
+
     def handle_override_reload(self, payload: Optional[Mapping[str, Any]] = None) -> None:
         nonce = parse_reload_nonce(payload)
         if nonce and nonce == getattr(self, "_last_override_reload_nonce", None):
@@ -6,12 +6,23 @@ import json
 import logging
 import queue
 import threading
+import time
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, Mapping, Optional
+from typing import Any, Deque, Dict, List, Mapping, Optional
 
 from PyQt6.QtCore import QObject, pyqtSignal
 
 from overlay_client.debug_config import DEBUG_CONFIG_ENABLED
+from overlay_plugin.payload_codec import (
+    FRAME_LENGTH,
+    FRAMING_ACK_EVENT,
+    FRAMING_LP1,
+    FRAMING_NDJSON,
+    MAX_FRAME_BYTES,
+    SUPPORTED_FEATURES,
+    decode_frame_body,
+)
 
 try:  # pragma: no cover - defensive fallback when running standalone
     from version import __version__ as MODERN_OVERLAY_VERSION
@@ -39,11 +50,19 @@ _LOGGER.setLevel(logging.DEBUG if DEBUG_CONFIG_ENABLED else logging.INFO)
 _LOGGER.propagate = True
 _LOGGER.addFilter(_ReleaseLogLevelFilter(release_mode=not DEBUG_CONFIG_ENABLED))
 
+# Upper bound on how often a payload batch is handed to the Qt thread.
+_MAX_EMIT_INTERVAL = 1.0 / 120.0
+
 
 class OverlayDataClient(QObject):
-    """Async TCP client that forwards messages to the Qt thread."""
+    """Async TCP client that forwards messages to the Qt thread.
+
+    Decoded payloads are buffered on the asyncio thread and emitted as one list per
+    event-loop tick (at most every ``_MAX_EMIT_INTERVAL`` seconds), so a burst costs
+    a single queued Qt event instead of one per payload.
+    """
 
-    message_received = pyqtSignal(dict)
+    messages_received = pyqtSignal(list)
     status_changed = pyqtSignal(str)
 
     def __init__(self, port_file: Path, loop_sleep: float = 1.0) -> None:
@@ -56,6 +75,9 @@ class OverlayDataClient(QObject):
         self._last_metadata: Dict[str, Any] = {}
         self._outgoing: Optional[asyncio.Queue[Optional[Dict[str, Any]]]] = None
         self._pending: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=32)
+        self._inbox: Deque[Dict[str, Any]] = deque()
+        self._inbox_flush: Optional[asyncio.Handle] = None
+        self._last_emit = 0.0
 
     def start(self) -> None:
         if self._thread and self._thread.is_alive():
@@ -141,6 +163,23 @@ class OverlayDataClient(QObject):
             backoff = 1.0
             outgoing_queue: asyncio.Queue[Optional[Dict[str, Any]]] = asyncio.Queue()
             self._outgoing = outgoing_queue
+            framing = FRAMING_NDJSON
+            advertised = metadata.get("framing")
+            advertised_features = metadata.get("features")
+            requested_framing = (
+                FRAMING_LP1 if isinstance(advertised, list) and FRAMING_LP1 in advertised else FRAMING_NDJSON
+            )
+            requested_features = [
+                name
+                for name in SUPPORTED_FEATURES
+                if isinstance(advertised_features, list) and name in advertised_features
+            ]
+            if requested_framing != FRAMING_NDJSON or requested_features:
+                # Ask for length-prefixed frames/features; NDJSON continues until the server acknowledges.
+                handshake: Dict[str, Any] = {"cli": "framing", "framing": requested_framing}
+                if requested_features:
+                    handshake["features"] = requested_features
+                outgoing_queue.put_nowait(handshake)
             while not self._pending.empty():
                 try:
                     pending_payload = self._pending.get_nowait()
@@ -153,24 +192,36 @@ class OverlayDataClient(QObject):
             sender_task = asyncio.create_task(self._flush_outgoing(writer, outgoing_queue))
             try:
                 while not self._stop_event.is_set():
-                    line = await reader.readline()
-                    if not line:
-                        raise ConnectionError("Server closed the connection")
-                    try:
-                        payload = json.loads(line.decode("utf-8"))
-                    except UnicodeDecodeError as exc:
-                        _LOGGER.warning("Failed to decode payload bytes from server: %s", exc)
-                        continue
-                    except json.JSONDecodeError as exc:
-                        _LOGGER.debug("Dropped invalid JSON payload from server: %s", exc)
-                        continue
-                    self.message_received.emit(payload)
+                    if framing == FRAMING_LP1:
+                        payload = await self._read_frame(reader)
+                        if payload is None:
+                            continue
+                    else:
+                        line = await reader.readline()
+                        if not line:
+                            raise ConnectionError("Server closed the connection")
+                        try:
+                            payload = json.loads(line.decode("utf-8"))
+                        except UnicodeDecodeError as exc:
+                            _LOGGER.warning("Failed to decode payload bytes from server: %s", exc)
+                            continue
+                        except json.JSONDecodeError as exc:
+                            _LOGGER.debug("Dropped invalid JSON payload from server: %s", exc)
+                            continue
+                        if isinstance(payload, dict) and payload.get("event") == FRAMING_ACK_EVENT:
+                            framing = FRAMING_LP1 if payload.get("framing") == FRAMING_LP1 else FRAMING_NDJSON
+                            _LOGGER.debug(
+                                "Server acknowledged %s framing (features=%s)", framing, payload.get("features") or []
+                            )
+                            continue
+                    self._deliver(payload)
             except asyncio.CancelledError:
                 raise
             except (ConnectionError, asyncio.IncompleteReadError, OSError) as exc:
                 self.status_changed.emit(f"Disconnected: {exc}")
                 _LOGGER.warning("Disconnected from overlay server: %s", exc)
             finally:
+                self._flush_inbox()
                 self._outgoing = None
                 try:
                     outgoing_queue.put_nowait(None)
@@ -192,6 +243,49 @@ class OverlayDataClient(QObject):
             await asyncio.sleep(backoff)
             backoff = min(backoff * 1.5, 10.0)
 
+    def _deliver(self, payload: Dict[str, Any]) -> None:
+        """Buffer ``payload`` for the Qt thread; runs on the asyncio thread."""
+        self._inbox.append(payload)
+        if self._inbox_flush is not None:
+            return
+        loop = asyncio.get_running_loop()
+        delay = self._last_emit + _MAX_EMIT_INTERVAL - time.monotonic()
+        if delay > 0:
+            self._inbox_flush = loop.call_later(delay, self._flush_inbox)
+        else:
+            # Runs once the reader has consumed everything already buffered this tick.
+            self._inbox_flush = loop.call_soon(self._flush_inbox)
+
+    def _flush_inbox(self) -> None:
+        handle = self._inbox_flush
+        self._inbox_flush = None
+        if handle is not None:
+            handle.cancel()
+        inbox = self._inbox
+        if not inbox:
+            return
+        batch: List[Dict[str, Any]] = list(inbox)
+        inbox.clear()
+        self._last_emit = time.monotonic()
+        self.messages_received.emit(batch)
+
+    @staticmethod
+    async def _read_frame(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+        header = await reader.readexactly(FRAME_LENGTH.size)
+        (length,) = FRAME_LENGTH.unpack(header)
+        if length > MAX_FRAME_BYTES:
+            raise ConnectionError(f"Frame of {length} bytes exceeds limit")
+        body = await reader.readexactly(length)
+        try:
+            payload = decode_frame_body(body)
+        except ValueError as exc:
+            # Covers JSON/unicode errors too; the frame boundary is intact so the stream can continue.
+            _LOGGER.debug("Dropped invalid frame from server: %s", exc)
+            return None
+        if not isinstance(payload, dict):
+            return None
+        return payload
+
     async def _flush_outgoing(
         self,
         writer: asyncio.StreamWriter,
@@ -8,6 +8,7 @@ from PyQt6.QtCore import Qt, QRect, QPoint
 from PyQt6.QtGui import QColor, QFont, QPainter, QPen
 
 from overlay_client.group_transform import GroupTransform  # type: ignore
+from overlay_client.legacy_store import MessageFields, RectFields, VectorFields  # type: ignore
 from overlay_client.viewport_transform import LegacyMapper, ViewportState, legacy_scale_components  # type: ignore
 
 
@@ -451,6 +452,14 @@ class CycleOverlayView:
         plugin_line = f"Plugin name: {plugin_name}"
         center_line = f"Center: {anchor[0]}, {anchor[1]}" if anchor is not None else "Center: -, -"
         data = current_item.data if current_item is not None else {}
+        # Coordinates, sizes and vector points live on the typed fields.
+        fields = getattr(current_item, "fields", None)
+        if isinstance(fields, MessageFields):
+            geometry: Mapping[str, object] = {"x": fields.x, "y": fields.y, "size": fields.size}
+        elif isinstance(fields, RectFields):
+            geometry = {"x": fields.x, "y": fields.y, "w": fields.w, "h": fields.h}
+        else:
+            geometry = data if isinstance(data, Mapping) else {}
         info_lines: List[str] = []
         if current_item is not None:
             if current_item.expiry is None:
@@ -468,18 +477,20 @@ class CycleOverlayView:
                 info_lines.append(f"last seen: {updated_iso}")
         kind_label = current_item.kind if current_item is not None else None
         if kind_label == "message":
-            size_label = str(data.get("size", "unknown"))
+            size_label = str(geometry.get("size", "unknown"))
             info_lines.append(f"type: message (size={size_label})")
         elif kind_label == "rect":
-            w_val = data.get("w")
-            h_val = data.get("h")
+            w_val = geometry.get("w")
+            h_val = geometry.get("h")
             if isinstance(w_val, (int, float)) and isinstance(h_val, (int, float)):
                 info_lines.append(f"type: rect (w={w_val}, h={h_val})")
             else:
                 info_lines.append("type: rect")
         elif kind_label == "vector":
             points_data = data.get("points")
-            if isinstance(points_data, list):
+            if isinstance(fields, VectorFields):
+                info_lines.append(f"type: vector (points={len(fields)})")
+            elif isinstance(points_data, list):
                 info_lines.append(f"type: vector (points={len(points_data)})")
             else:
                 info_lines.append("type: vector")
@@ -497,14 +508,14 @@ class CycleOverlayView:
             if isinstance(original, Mapping):
                 raw_x_fmt = _fmt_number(original.get("x"))
                 raw_y_fmt = _fmt_number(original.get("y"))
-                trans_x_fmt = _fmt_number(data.get("x"))
-                trans_y_fmt = _fmt_number(data.get("y"))
+                trans_x_fmt = _fmt_number(geometry.get("x"))
+                trans_y_fmt = _fmt_number(geometry.get("y"))
                 if raw_x_fmt is not None and raw_y_fmt is not None and trans_x_fmt is not None and trans_y_fmt is not None:
                     info_lines.append(f"coords: ({raw_x_fmt},{raw_y_fmt}) → ({trans_x_fmt},{trans_y_fmt})")
                 raw_w_fmt = _fmt_number(original.get("w"))
                 raw_h_fmt = _fmt_number(original.get("h"))
-                trans_w_fmt = _fmt_number(data.get("w"))
-                trans_h_fmt = _fmt_number(data.get("h"))
+                trans_w_fmt = _fmt_number(geometry.get("w"))
+                trans_h_fmt = _fmt_number(geometry.get("h"))
                 if (
                     raw_w_fmt is not None
                     and raw_h_fmt is not None
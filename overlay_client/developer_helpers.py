@@ -7,6 +7,7 @@ from typing import Any, Dict, Optional, TYPE_CHECKING
 
 from overlay_client.client_config import DeveloperHelperConfig, InitialClientSettings
 from overlay_client.logging_utils import build_rotating_file_handler, resolve_logs_dir
+from overlay_plugin.payload_codec import VECTOR_DELTA_KEY
 
 if TYPE_CHECKING:
     from overlay_client import OverlayWindow
@@ -108,7 +109,7 @@ class DeveloperHelperController:
         window.set_log_retention(self._current_log_retention)
 
     def handle_legacy_payload(self, window: "OverlayWindow", payload: Dict[str, Any]) -> None:
-        if payload.get("type") == "shape" and payload.get("shape") == "vect":
+        if payload.get("type") == "shape" and payload.get("shape") == "vect" and VECTOR_DELTA_KEY not in payload:
             points = payload.get("vector")
             if not isinstance(points, list) or not points:
                 self._logger.warning("Vector payload ignored: requires at least two points (%s)", points)
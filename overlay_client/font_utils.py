@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import logging
-from typing import Sequence
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from PyQt6.QtGui import QFont
+from PyQt6.QtGui import QFont, QFontMetrics
 
 _LOGGER = logging.getLogger("EDMC.ModernOverlay.Fonts")
 
@@ -49,3 +50,109 @@ def apply_font_fallbacks(font: QFont, fallback_families: Sequence[str] | None) -
             set_fallback(fallback_only)
         except Exception as exc:  # pragma: no cover - defensive guard
             _LOGGER.warning("Failed to set fallback font families: %s", exc)
+
+
+def font_line_spacing(metrics: QFontMetrics) -> int:
+    """Distance between baselines of consecutive lines, never below ascent plus descent."""
+    line_spacing = max(metrics.lineSpacing(), metrics.height(), 0)
+    if line_spacing <= 0:
+        line_spacing = metrics.ascent() + metrics.descent()
+    return line_spacing
+
+
+def text_block_metrics(metrics: QFontMetrics, text: str) -> Tuple[int, int, int, int]:
+    """Return ``(width, ascent, descent, line_spacing)`` for ``text``.
+
+    Multi-line text is as wide as its widest line and stacks at the line spacing;
+    ``descent`` then reaches the bottom of the last line.
+    """
+    line_spacing = font_line_spacing(metrics)
+    if "\n" not in text and "\r" not in text:
+        return metrics.horizontalAdvance(text), metrics.ascent(), metrics.descent(), line_spacing
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    max_width = 0
+    for line in lines:
+        try:
+            advance = metrics.horizontalAdvance(line)
+        except Exception:
+            advance = 0
+        if advance > max_width:
+            max_width = advance
+    ascent = metrics.ascent()
+    total_height = line_spacing * max(1, len(lines))
+    return max(0, max_width), ascent, max(0, int(total_height - ascent)), line_spacing
+
+
+FontKey = Tuple[str, Tuple[str, ...], float, Any, float]
+
+
+class FontPool:
+    """Prepared ``QFont``/``QFontMetrics`` pairs keyed by (family, fallbacks, point size, weight, DPR).
+
+    Least recently used entries are evicted once ``max_entries`` is reached.
+    Handed-out fonts are shared: callers pass them to ``QPainter.setFont`` or read
+    metrics from them but must not modify them. GUI thread only; the owner clears
+    the pool whenever its text caches are invalidated.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self._max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[FontKey, List[Any]]" = OrderedDict()
+        self.stats: Dict[str, int] = {"hit": 0, "miss": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def font(
+        self,
+        family: str,
+        fallbacks: Sequence[str],
+        point_size: float,
+        weight: Optional[QFont.Weight] = None,
+        device_ratio: float = 1.0,
+    ) -> QFont:
+        return self._entry(family, fallbacks, point_size, weight, device_ratio)[0]
+
+    def metrics(
+        self,
+        family: str,
+        fallbacks: Sequence[str],
+        point_size: float,
+        weight: Optional[QFont.Weight] = None,
+        device_ratio: float = 1.0,
+    ) -> QFontMetrics:
+        entry = self._entry(family, fallbacks, point_size, weight, device_ratio)
+        if entry[1] is None:
+            entry[1] = QFontMetrics(entry[0])
+        return entry[1]
+
+    def _entry(
+        self,
+        family: str,
+        fallbacks: Sequence[str],
+        point_size: float,
+        weight: Optional[QFont.Weight],
+        device_ratio: float,
+    ) -> List[Any]:
+        if weight is None:
+            weight = QFont.Weight.Normal
+        key = (family, tuple(fallbacks), float(point_size), weight, round(device_ratio, 3))
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.stats["hit"] += 1
+            return entry
+        self.stats["miss"] += 1
+        font = QFont(family)
+        apply_font_fallbacks(font, fallbacks)
+        font.setPointSizeF(point_size)
+        font.setWeight(weight)
+        if len(self._entries) >= self._max_entries:
+            self._entries.popitem(last=False)
+        # [font, metrics]; metrics are built on first request.
+        entry = [font, None]
+        self._entries[key] = entry
+        return entry
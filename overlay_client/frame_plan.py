@@ -0,0 +1,722 @@
+"""Qt-free layout core for legacy payloads, and the worker thread that runs it.
+
+The GUI thread copies the payload groups that need laying out into a
+:class:`FrameSnapshot`. The snapshot holds plain values for every item, the viewport
+mapper and state, and each group's transform. It also carries the font to measure
+text with, preset point sizes and QRgb values for named colours. :func:`plan_frame`
+lays the snapshot out the way the paint command builders do. It measures message
+text through the ``measure`` callable it is given, runs both layout passes and
+works out screen positions, text baselines, colours and group bounds, then returns
+an immutable :class:`FramePlan`. ``LegacyRenderPipeline`` turns the plan into paint
+commands on the GUI thread, and paint replays them.
+
+Nothing in this module touches a Qt object, so :class:`FramePlanner` can run
+:func:`plan_frame` on a worker thread. The ``measure`` callable the owner supplies
+uses QFont/QFontMetrics, which are safe to use off the GUI thread. The geometry
+helpers are shared with the synchronous builders in ``render_surface`` so both
+paths place items identically.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from overlay_client.group_transform import GroupBounds, GroupKey, GroupTransform  # type: ignore
+from overlay_client.legacy_store import LegacyItem, MessageFields, RectFields, VectorFields, parse_color_rgba  # type: ignore
+from overlay_client.payload_builders import (  # type: ignore
+    build_group_context,
+    group_anchor_point,
+    group_base_point,
+    group_offsets,
+)
+from overlay_client.transform_helpers import (  # type: ignore
+    compute_message_transform,
+    compute_rect_transform,
+    compute_vector_transform,
+)
+from overlay_client.viewport_transform import FillViewport, LegacyMapper, ViewportState  # type: ignore
+
+_LOGGER = logging.getLogger("EDMC.ModernOverlay.Client")
+
+GroupTuple = Tuple[str, Optional[str]]
+Rect = Tuple[float, float, float, float]
+ScreenRect = Tuple[int, int, int, int]
+# (spec, rgba parsed at ingest) -> QRgb, or None when QColor would reject the spec.
+ColorResolver = Callable[[str, Optional[int]], Optional[int]]
+
+
+class TextMetrics(NamedTuple):
+    """Pixel metrics for one text at one point size, as ``RenderSurfaceMixin._measure_text`` reports them."""
+
+    width: int
+    ascent: int
+    descent: int
+    line_spacing: int
+
+
+@dataclass(frozen=True)
+class FontSpec:
+    """The font message text is measured with; ``generation`` moves whenever cached metrics go stale."""
+
+    family: str
+    fallbacks: Tuple[str, ...] = ()
+    device_ratio: float = 1.0
+    generation: int = 0
+
+
+# (font, text, point size) -> metrics; called on the planner thread.
+TextMeasurer = Callable[[FontSpec, str, float], TextMetrics]
+
+
+@dataclass(frozen=True)
+class ItemSnapshot:
+    """Plain copy of one ``LegacyItem`` at one store revision.
+
+    Messages use ``x``/``y``/``size``/``text``/``color``; rects use
+    ``x``/``y``/``w``/``h`` plus ``color`` (border) and ``fill``; vectors use
+    ``base_color``, ``points`` and ``packed_xy``, copied since vector deltas patch
+    the stored points in place; with ``packed_xy`` the point mappings carry only
+    colour/marker/text. ``transform_meta`` is shared with the store; it is
+    replaced on ingest, never modified.
+    """
+
+    item_id: str
+    kind: str
+    plugin: Optional[str]
+    revision: int
+    x: float = 0.0
+    y: float = 0.0
+    w: float = 0.0
+    h: float = 0.0
+    size: str = "normal"
+    text: str = ""
+    color: str = "white"
+    color_rgba: Optional[int] = None
+    fill: str = "#00000000"
+    fill_rgba: Optional[int] = None
+    base_color: Any = None
+    points: Tuple[Mapping[str, Any], ...] = ()
+    packed_xy: Optional[Tuple[int, ...]] = None
+    transform_meta: Any = None
+
+    def color_specs(self) -> Tuple[Tuple[str, Optional[int]], ...]:
+        """Colour specs the layout resolves, each with its ingest-parsed QRgb."""
+
+        if self.kind == "message":
+            return ((self.color, self.color_rgba),)
+        if self.kind == "rect":
+            return ((self.color, self.color_rgba), (self.fill, self.fill_rgba))
+        return ()
+
+
+def snapshot_item(legacy_item: LegacyItem, revision: int) -> Optional[ItemSnapshot]:
+    """Copy the values the layout reads from ``legacy_item``; None for kinds that are not drawn."""
+
+    item = legacy_item.data
+    fields = legacy_item.fields
+    kind = legacy_item.kind
+    common = {
+        "item_id": legacy_item.item_id,
+        "kind": kind,
+        "plugin": legacy_item.plugin,
+        "revision": revision,
+        "transform_meta": item.get("__mo_transform__"),
+    }
+    if kind == "message":
+        if isinstance(fields, MessageFields):
+            geometry = {"color_rgba": fields.color_rgba, "size": fields.size, "x": float(fields.x), "y": float(fields.y)}
+        else:
+            geometry = {
+                "size": str(item.get("size", "normal")).lower(),
+                "x": float(item.get("x", 0)),
+                "y": float(item.get("y", 0)),
+            }
+        return ItemSnapshot(text=str(item.get("text", "")), color=str(item.get("color", "white")), **geometry, **common)
+    if kind == "rect":
+        if isinstance(fields, RectFields):
+            geometry = {
+                "color_rgba": fields.border_rgba,
+                "fill_rgba": fields.fill_rgba,
+                "x": float(fields.x),
+                "y": float(fields.y),
+                "w": float(fields.w),
+                "h": float(fields.h),
+            }
+        else:
+            geometry = {
+                "x": float(item.get("x", 0)),
+                "y": float(item.get("y", 0)),
+                "w": float(item.get("w", 0)),
+                "h": float(item.get("h", 0)),
+            }
+        return ItemSnapshot(
+            color=str(item.get("color", "white")),
+            fill=str(item.get("fill", "#00000000")),
+            **geometry,
+            **common,
+        )
+    if kind == "vector":
+        if isinstance(fields, VectorFields):
+            # Deltas replace per-point extras rather than mutating them, so sharing them is safe.
+            points = tuple(fields.point_extras())
+            packed_xy: Optional[Tuple[int, ...]] = tuple(fields.xy)
+        else:
+            points = tuple(dict(point) if isinstance(point, Mapping) else point for point in item.get("points") or [])
+            packed_xy = None
+        return ItemSnapshot(base_color=item.get("base_color"), points=points, packed_xy=packed_xy, **common)
+    return None
+
+
+@dataclass(frozen=True)
+class PlanEntry:
+    group_key: GroupKey
+    group_transform: Optional[GroupTransform]
+    item: ItemSnapshot
+
+
+@dataclass(frozen=True)
+class FrameSnapshot:
+    """Everything :func:`plan_frame` reads, captured on the GUI thread."""
+
+    serial: int
+    mapper: LegacyMapper
+    state: ViewportState
+    entries: Tuple[PlanEntry, ...]
+    point_sizes: Mapping[str, float]
+    font: FontSpec
+    named_colors: Mapping[str, Optional[int]]
+
+    def resolve_color(self, spec: str, rgba: Optional[int] = None) -> Optional[int]:
+        if rgba is not None:
+            return rgba
+        parsed = parse_color_rgba(spec)
+        if parsed is not None:
+            return parsed
+        return self.named_colors.get(spec)
+
+
+@dataclass(frozen=True)
+class ItemLayout:
+    """Laid-out item: what the GUI thread builds one paint command from."""
+
+    item_id: str
+    group_key: GroupKey
+    group_transform: Optional[GroupTransform]
+    bounds: Optional[ScreenRect]
+    overlay_bounds: Optional[Rect]
+    base_overlay_bounds: Optional[Rect]
+    effective_anchor: Optional[Tuple[float, float]]
+    cycle_anchor: Optional[Tuple[int, int]]
+    debug_vertices: Tuple[Tuple[int, int], ...]
+    raw_min_x: Optional[float]
+    right_just_multiplier: int
+
+
+@dataclass(frozen=True)
+class MessageLayout(ItemLayout):
+    text: str = ""
+    color_rgba: Optional[int] = None
+    point_size: float = 0.0
+    x: int = 0
+    baseline: int = 0
+    text_width: int = 0
+    ascent: int = 0
+    descent: int = 0
+    line_spacing: int = 0
+
+
+@dataclass(frozen=True)
+class RectLayout(ItemLayout):
+    pen_rgba: Optional[int] = None
+    brush_rgba: Optional[int] = None
+    x: int = 0
+    y: int = 0
+    width: int = 0
+    height: int = 0
+    reference_overlay_bounds: Optional[Rect] = None
+
+
+@dataclass(frozen=True)
+class VectorLayout(ItemLayout):
+    vector_payload: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    scale: float = 1.0
+    base_offset_x: float = 0.0
+    base_offset_y: float = 0.0
+
+
+@dataclass(frozen=True)
+class FramePlan:
+    """Immutable layout for one :class:`FrameSnapshot`.
+
+    The group maps are keyed like ``LegacyRenderPipeline``'s per-pass results.
+    ``complete`` is False when planning failed, and the GUI thread then lays the
+    frame out itself.
+    """
+
+    serial: int
+    items: Tuple[ItemLayout, ...] = ()
+    bounds_by_group: Mapping[GroupTuple, Rect] = field(default_factory=lambda: MappingProxyType({}))
+    overlay_bounds_by_group: Mapping[GroupTuple, Rect] = field(default_factory=lambda: MappingProxyType({}))
+    effective_anchor_by_group: Mapping[GroupTuple, Tuple[float, float]] = field(default_factory=lambda: MappingProxyType({}))
+    transform_by_group: Mapping[GroupTuple, Optional[GroupTransform]] = field(default_factory=lambda: MappingProxyType({}))
+    complete: bool = True
+
+
+# Geometry shared with the synchronous command builders ----------------------
+
+
+@dataclass(frozen=True)
+class MessageGeometry:
+    x: int
+    payload_point_y: int
+    baseline: int
+    bounds: ScreenRect
+    overlay_bounds: Optional[Rect]
+    base_overlay_bounds: Optional[Rect]
+    cycle_anchor: Tuple[int, int]
+
+
+def message_geometry(
+    fill: FillViewport,
+    scale: float,
+    base_offset_x: float,
+    base_offset_y: float,
+    adjusted_left: float,
+    adjusted_top: float,
+    base_left_logical: float,
+    base_top_logical: float,
+    text_width: int,
+    ascent: int,
+    descent: int,
+) -> MessageGeometry:
+    x = int(round(fill.screen_x(adjusted_left)))
+    payload_point_y = int(round(fill.screen_y(adjusted_top)))
+    baseline = int(round(payload_point_y + ascent))
+    center_x = x + text_width // 2
+    top = baseline - ascent
+    bottom = baseline + descent
+    center_y = int(round((top + bottom) / 2.0))
+    bounds = (x, top, x + text_width, bottom)
+    overlay_bounds: Optional[Rect] = None
+    base_overlay_bounds: Optional[Rect] = None
+    if scale > 0.0:
+        overlay_bounds = (
+            (bounds[0] - base_offset_x) / scale,
+            (bounds[1] - base_offset_y) / scale,
+            (bounds[2] - base_offset_x) / scale,
+            (bounds[3] - base_offset_y) / scale,
+        )
+        base_x = int(round(fill.screen_x(base_left_logical)))
+        base_base_y = int(round(fill.screen_y(base_top_logical)))
+        base_baseline = int(round(base_base_y + ascent))
+        base_top = base_baseline - ascent
+        base_bottom = base_baseline + descent
+        base_overlay_bounds = (
+            (base_x - base_offset_x) / scale,
+            (base_top - base_offset_y) / scale,
+            (base_x + text_width - base_offset_x) / scale,
+            (base_bottom - base_offset_y) / scale,
+        )
+    return MessageGeometry(
+        x=x,
+        payload_point_y=payload_point_y,
+        baseline=baseline,
+        bounds=bounds,
+        overlay_bounds=overlay_bounds,
+        base_overlay_bounds=base_overlay_bounds,
+        cycle_anchor=(center_x, center_y),
+    )
+
+
+@dataclass(frozen=True)
+class RectGeometry:
+    x: int
+    y: int
+    width: int
+    height: int
+    bounds: ScreenRect
+    overlay_bounds: Rect
+    base_overlay_bounds: Optional[Rect]
+    cycle_anchor: Tuple[int, int]
+
+
+def rect_geometry(
+    fill: FillViewport,
+    scale: float,
+    transformed_overlay: Sequence[Tuple[float, float]],
+    base_overlay_points: Sequence[Tuple[float, float]],
+) -> RectGeometry:
+    xs_overlay = [pt[0] for pt in transformed_overlay]
+    ys_overlay = [pt[1] for pt in transformed_overlay]
+    min_x_overlay = min(xs_overlay)
+    max_x_overlay = max(xs_overlay)
+    min_y_overlay = min(ys_overlay)
+    max_y_overlay = max(ys_overlay)
+    x = int(round(fill.screen_x(min_x_overlay)))
+    y = int(round(fill.screen_y(min_y_overlay)))
+    w = max(1, int(round(max(0.0, max_x_overlay - min_x_overlay) * scale)))
+    h = max(1, int(round(max(0.0, max_y_overlay - min_y_overlay) * scale)))
+    base_overlay_bounds: Optional[Rect] = None
+    if base_overlay_points:
+        base_xs = [pt[0] for pt in base_overlay_points]
+        base_ys = [pt[1] for pt in base_overlay_points]
+        base_overlay_bounds = (min(base_xs), min(base_ys), max(base_xs), max(base_ys))
+    return RectGeometry(
+        x=x,
+        y=y,
+        width=w,
+        height=h,
+        bounds=(x, y, x + w, y + h),
+        overlay_bounds=(min_x_overlay, min_y_overlay, max_x_overlay, max_y_overlay),
+        base_overlay_bounds=base_overlay_bounds,
+        cycle_anchor=(x + w // 2, y + h // 2),
+    )
+
+
+def rect_colors(
+    border_spec: str,
+    border_rgba: Optional[int],
+    fill_spec: str,
+    fill_rgba: Optional[int],
+    resolve: ColorResolver,
+) -> Tuple[Optional[int], Optional[int]]:
+    """Pen and brush QRgb for a rect; None means no pen/brush. An unparseable fill is transparent."""
+
+    pen: Optional[int] = None
+    if border_spec and border_spec.lower() != "none":
+        pen = resolve(border_spec, border_rgba)
+    brush: Optional[int] = None
+    if fill_spec and fill_spec.lower() != "none":
+        brush = resolve(fill_spec, fill_rgba)
+        if brush is None:
+            brush = 0
+    return pen, brush
+
+
+def vector_screen_bounds(
+    screen_points: Sequence[Tuple[int, int]],
+) -> Tuple[Optional[ScreenRect], Optional[Tuple[int, int]]]:
+    if not screen_points:
+        return None, None
+    xs = [pt[0] for pt in screen_points]
+    ys = [pt[1] for pt in screen_points]
+    bounds = (min(xs), min(ys), max(xs), max(ys))
+    cycle_anchor = (
+        int(round((bounds[0] + bounds[2]) / 2.0)),
+        int(round((bounds[1] + bounds[3]) / 2.0)),
+    )
+    return bounds, cycle_anchor
+
+
+# Layout ----------------------------------------------------------------------
+
+
+def layout_item(
+    entry: PlanEntry,
+    frame: FrameSnapshot,
+    overlay_bounds_hint: Optional[GroupBounds],
+    measure: TextMeasurer,
+    collect_only: bool = False,
+) -> Optional[ItemLayout]:
+    item = entry.item
+    group_transform = entry.group_transform
+    offset_x, offset_y = group_offsets(group_transform)
+    group_ctx = build_group_context(
+        frame.mapper,
+        frame.state,
+        group_transform,
+        overlay_bounds_hint,
+        offset_x,
+        offset_y,
+        group_anchor_point=group_anchor_point,
+        group_base_point=group_base_point,
+    )
+    common = {"item_id": item.item_id, "group_key": entry.group_key, "group_transform": group_transform}
+    plugin_name = item.plugin or ""
+    if item.kind == "message":
+        point_size = frame.point_sizes.get(item.size)
+        if point_size is None:
+            return None
+        metrics = measure(frame.font, item.text, point_size)
+        adjusted_left, adjusted_top, base_left, base_top, effective_anchor, _dx, _dy = compute_message_transform(
+            plugin_name,
+            item.item_id,
+            group_ctx.fill,
+            group_ctx.transform_context,
+            item.transform_meta,
+            frame.mapper,
+            group_transform,
+            overlay_bounds_hint,
+            item.x,
+            item.y,
+            offset_x,
+            offset_y,
+            group_ctx.selected_anchor,
+            group_ctx.base_anchor_point,
+            group_ctx.anchor_for_transform,
+            group_ctx.base_translation_dx,
+            group_ctx.base_translation_dy,
+            None,
+            collect_only,
+        )
+        geometry = message_geometry(
+            group_ctx.fill,
+            group_ctx.scale,
+            group_ctx.base_offset_x,
+            group_ctx.base_offset_y,
+            adjusted_left,
+            adjusted_top,
+            base_left,
+            base_top,
+            metrics.width,
+            metrics.ascent,
+            metrics.descent,
+        )
+        return MessageLayout(
+            bounds=geometry.bounds,
+            overlay_bounds=geometry.overlay_bounds,
+            base_overlay_bounds=geometry.base_overlay_bounds,
+            effective_anchor=effective_anchor,
+            cycle_anchor=geometry.cycle_anchor,
+            debug_vertices=((geometry.x, geometry.payload_point_y),),
+            raw_min_x=item.x,
+            right_just_multiplier=2,
+            text=item.text,
+            color_rgba=frame.resolve_color(item.color, item.color_rgba),
+            point_size=point_size,
+            x=geometry.x,
+            baseline=geometry.baseline,
+            text_width=metrics.width,
+            ascent=metrics.ascent,
+            descent=metrics.descent,
+            line_spacing=metrics.line_spacing,
+            **common,
+        )
+    if item.kind == "rect":
+        transformed_overlay, base_overlay_points, reference_overlay_bounds, effective_anchor = compute_rect_transform(
+            plugin_name,
+            item.item_id,
+            group_ctx.fill,
+            group_ctx.transform_context,
+            item.transform_meta,
+            frame.mapper,
+            group_transform,
+            item.x,
+            item.y,
+            item.w,
+            item.h,
+            offset_x,
+            offset_y,
+            group_ctx.selected_anchor,
+            group_ctx.base_anchor_point,
+            group_ctx.anchor_for_transform,
+            group_ctx.base_translation_dx,
+            group_ctx.base_translation_dy,
+            None,
+            collect_only,
+        )
+        geometry = rect_geometry(group_ctx.fill, group_ctx.scale, transformed_overlay, base_overlay_points)
+        pen_rgba, brush_rgba = rect_colors(item.color, item.color_rgba, item.fill, item.fill_rgba, frame.resolve_color)
+        return RectLayout(
+            bounds=geometry.bounds,
+            overlay_bounds=geometry.overlay_bounds,
+            base_overlay_bounds=geometry.base_overlay_bounds,
+            effective_anchor=effective_anchor,
+            cycle_anchor=geometry.cycle_anchor,
+            debug_vertices=(
+                (geometry.x, geometry.y),
+                (geometry.x + geometry.width, geometry.y),
+                (geometry.x, geometry.y + geometry.height),
+                (geometry.x + geometry.width, geometry.y + geometry.height),
+            ),
+            raw_min_x=item.x,
+            right_just_multiplier=2,
+            pen_rgba=pen_rgba,
+            brush_rgba=brush_rgba,
+            x=geometry.x,
+            y=geometry.y,
+            width=geometry.width,
+            height=geometry.height,
+            reference_overlay_bounds=reference_overlay_bounds,
+            **common,
+        )
+    if item.kind == "vector":
+        (
+            vector_payload,
+            screen_points,
+            overlay_bounds,
+            base_overlay_bounds,
+            effective_anchor,
+            raw_min_x,
+            _trace_fn,
+        ) = compute_vector_transform(
+            plugin_name,
+            item.item_id,
+            group_ctx.fill,
+            group_ctx.transform_context,
+            item.transform_meta,
+            frame.mapper,
+            group_transform,
+            {"base_color": item.base_color},
+            item.points,
+            offset_x,
+            offset_y,
+            group_ctx.selected_anchor,
+            group_ctx.base_anchor_point,
+            group_ctx.anchor_for_transform,
+            group_ctx.base_translation_dx,
+            group_ctx.base_translation_dy,
+            None,
+            collect_only,
+            packed_xy=item.packed_xy,
+        )
+        if vector_payload is None:
+            return None
+        bounds, cycle_anchor = vector_screen_bounds(screen_points)
+        return VectorLayout(
+            bounds=bounds,
+            overlay_bounds=overlay_bounds,
+            base_overlay_bounds=base_overlay_bounds,
+            effective_anchor=effective_anchor,
+            cycle_anchor=cycle_anchor,
+            debug_vertices=tuple(screen_points),
+            raw_min_x=raw_min_x,
+            right_just_multiplier=2 if raw_min_x is not None else 0,
+            vector_payload=MappingProxyType(dict(vector_payload)),
+            scale=group_ctx.scale,
+            base_offset_x=group_ctx.fill.base_offset_x,
+            base_offset_y=group_ctx.fill.base_offset_y,
+            **common,
+        )
+    return None
+
+
+def _rect_of(bounds: GroupBounds) -> Rect:
+    return (bounds.min_x, bounds.min_y, bounds.max_x, bounds.max_y)
+
+
+def plan_frame(snapshot: FrameSnapshot, measure: TextMeasurer) -> FramePlan:
+    """Lay out every entry with the builders' two passes.
+
+    The first pass only collects each group's overlay bounds; the second lays items
+    out against them, unless the group carries an explicit offset. Message text is
+    measured through ``measure``.
+    """
+
+    entries = snapshot.entries
+    overlay_hint: Optional[Dict[GroupTuple, GroupBounds]] = None
+    layouts: List[ItemLayout] = []
+    bounds_by_group: Dict[GroupTuple, GroupBounds] = {}
+    overlay_bounds_by_group: Dict[GroupTuple, GroupBounds] = {}
+    effective_anchor_by_group: Dict[GroupTuple, Tuple[float, float]] = {}
+    transform_by_group: Dict[GroupTuple, Optional[GroupTransform]] = {}
+    passes = 2 if entries else 1
+    for pass_index in range(passes):
+        collect_only = pass_index == 0 and passes > 1
+        layouts = []
+        bounds_by_group = {}
+        overlay_bounds_by_group = {}
+        effective_anchor_by_group = {}
+        transform_by_group = {}
+        for entry in entries:
+            key = entry.group_key.as_tuple()
+            group_transform = entry.group_transform
+            transform_by_group[key] = group_transform
+            has_explicit_offset = group_transform is not None and (bool(group_transform.dx) or bool(group_transform.dy))
+            hint = overlay_hint.get(key) if overlay_hint and not has_explicit_offset else None
+            layout = layout_item(entry, snapshot, hint, measure, collect_only)
+            if layout is None:
+                continue
+            if not collect_only:
+                layouts.append(layout)
+                if layout.bounds:
+                    bounds_by_group.setdefault(key, GroupBounds()).update_rect(*layout.bounds)
+                if layout.effective_anchor is not None:
+                    effective_anchor_by_group[key] = layout.effective_anchor
+            if layout.overlay_bounds:
+                overlay_bounds_by_group.setdefault(key, GroupBounds()).update_rect(*layout.overlay_bounds)
+        overlay_hint = overlay_bounds_by_group
+    return FramePlan(
+        serial=snapshot.serial,
+        items=tuple(layouts),
+        bounds_by_group=MappingProxyType({key: _rect_of(bounds) for key, bounds in bounds_by_group.items()}),
+        overlay_bounds_by_group=MappingProxyType(
+            {key: _rect_of(bounds) for key, bounds in overlay_bounds_by_group.items()}
+        ),
+        effective_anchor_by_group=MappingProxyType(effective_anchor_by_group),
+        transform_by_group=MappingProxyType(transform_by_group),
+    )
+
+
+class FramePlanner:
+    """Background worker that turns frame snapshots into frame plans.
+
+    Only the newest snapshot matters: one submitted while the worker is busy
+    replaces any snapshot still waiting. ``deliver`` and ``measure`` are called on
+    the worker thread; callers marshal plans to their own thread.
+    """
+
+    def __init__(self, deliver: Callable[[FramePlan], None], measure: TextMeasurer) -> None:
+        self._deliver = deliver
+        self._measure = measure
+        self._condition = threading.Condition()
+        self._pending: Optional[FrameSnapshot] = None
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        with self._condition:
+            self._stopping = False
+        thread = threading.Thread(target=self._run, name="EDMCOverlay-FramePlanner", daemon=True)
+        self._thread = thread
+        thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        with self._condition:
+            self._stopping = True
+            self._pending = None
+            self._condition.notify_all()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=timeout)
+        self._thread = None
+
+    def submit(self, snapshot: FrameSnapshot) -> bool:
+        """Queue ``snapshot`` for planning; returns False when the worker is not running."""
+
+        if not self.running:
+            return False
+        with self._condition:
+            self._pending = snapshot
+            self._condition.notify()
+        return True
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                snapshot = self._pending
+                self._pending = None
+            try:
+                plan = plan_frame(snapshot, self._measure)
+            except Exception as exc:
+                _LOGGER.warning("Frame planner failed; the GUI thread will lay this frame out: %s", exc, exc_info=exc)
+                plan = FramePlan(serial=snapshot.serial, complete=False)
+            try:
+                self._deliver(plan)
+            except Exception as exc:
+                _LOGGER.debug("Frame plan delivery failed: %s", exc)
+
@@ -74,3 +74,6 @@ class GroupTransformCache:
 
     def set(self, key: GroupKey, transform: GroupTransform) -> None:
         self._transforms[key.as_tuple()] = transform
+
+    def discard(self, key: Tuple[str, Optional[str]]) -> None:
+        self._transforms.pop(key, None)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, Optional, Tuple
+from typing import AbstractSet, Any, Dict, Iterable, Optional, Sequence, Tuple
 
 from overlay_client.grouping_helper import FillGroupingHelper  # type: ignore
 from overlay_client.group_transform import GroupKey, GroupTransform  # type: ignore
@@ -20,8 +20,8 @@ class GroupingAdapter:
         except Exception:
             pass
 
-    def prepare(self, mapper: Any) -> None:
-        self._helper.prepare(mapper)
+    def prepare(self, mapper: Any, group_keys: Optional[AbstractSet[Tuple[str, Optional[str]]]] = None) -> None:
+        self._helper.prepare(mapper, group_keys)
 
     def reset(self) -> None:
         self._helper.reset()
@@ -42,10 +42,12 @@ class GroupingAdapter:
         overlay_bounds_hint: Optional[Dict[Tuple[str, Optional[str]], Any]],
         *,
         collect_only: bool = False,
+        items: Optional[Sequence[Tuple[str, Any]]] = None,
     ):
         """Delegate command construction to the owner for now."""
         return self._owner._build_legacy_commands_for_pass(  # type: ignore[attr-defined]
             mapper,
             overlay_bounds_hint,
             collect_only=collect_only,
+            items=items,
         )
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import math
-from typing import Any, Dict, Optional, Tuple, TYPE_CHECKING
+from typing import AbstractSet, Any, Dict, Optional, Tuple, TYPE_CHECKING
 
 from overlay_client.debug_config import DebugConfig
 from overlay_client.group_transform import GroupBounds, GroupKey, GroupTransform, GroupTransformCache
@@ -38,8 +38,18 @@ class FillGroupingHelper:
     def set_render_settings(self, settings: RenderSettings) -> None:
         self._render_settings = settings
 
-    def prepare(self, mapper: "_LegacyMapper") -> None:
-        self._cache.reset()
+    def prepare(
+        self,
+        mapper: "_LegacyMapper",
+        group_keys: Optional[AbstractSet[Tuple[str, Optional[str]]]] = None,
+    ) -> None:
+        """Compute fill-mode transforms; ``group_keys`` limits the refresh to those groups."""
+
+        if group_keys is None:
+            self._cache.reset()
+        else:
+            for key_tuple in group_keys:
+                self._cache.discard(key_tuple)
         if mapper.transform.mode is not ScaleMode.FILL:
             return
         # Fill mode keeps grouped geometry at the original logical size by
@@ -61,6 +71,7 @@ class FillGroupingHelper:
         group_bounds: Dict[Tuple[str, Optional[str]], GroupBounds] = {}
         text_block_cache = getattr(self._owner, "_text_block_cache", None)
         cache_generation = getattr(self._owner, "_text_cache_generation", 0)
+        font_pool = getattr(self._owner, "_font_pool", None)
         try:
             device_ratio = float(self._owner.devicePixelRatioF())
         except Exception:
@@ -70,6 +81,8 @@ class FillGroupingHelper:
         for item_id, legacy_item in store.items():
             group_key = self.group_key_for(item_id, legacy_item.plugin)
             key_tuple = group_key.as_tuple()
+            if group_keys is not None and key_tuple not in group_keys:
+                continue
             bounds = group_bounds.setdefault(key_tuple, GroupBounds())
             accumulate_group_bounds(
                 bounds,
@@ -81,6 +94,7 @@ class FillGroupingHelper:
                 text_block_cache=text_block_cache,
                 cache_generation=cache_generation,
                 device_ratio=device_ratio,
+                font_pool=font_pool,
             )
 
         base_width = BASE_WIDTH if BASE_WIDTH > 0.0 else 1.0
@@ -4,7 +4,7 @@ import argparse
 import os
 import sys
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import json
 import logging
@@ -17,6 +17,7 @@ from overlay_client.debug_config import DEBUG_CONFIG_ENABLED, load_dev_settings,
 from overlay_client.developer_helpers import DeveloperHelperController
 from overlay_client.overlay_client import CLIENT_DIR, DEV_MODE_ENV_VAR, OverlayWindow, _CLIENT_LOGGER, apply_log_level_hint
 from overlay_client.window_tracking import create_elite_window_tracker
+from overlay_plugin.payload_codec import BATCH_EVENT
 
 
 def resolve_port_file(args_port: Optional[str]) -> Path:
@@ -129,6 +130,14 @@ def _build_payload_handler(helper: DeveloperHelperController, window: OverlayWin
                 window.handle_controller_active_signal()
             helper.handle_legacy_payload(window, payload)
             return
+        if event == BATCH_EVENT:
+            messages = payload.get("messages")
+            if isinstance(messages, list):
+                with window.legacy_ingest_batch():
+                    for message in messages:
+                        if isinstance(message, dict):
+                            _handle_payload(message)
+            return
         if event == "OverlayCycle":
             action = payload.get("action")
             if isinstance(action, str):
@@ -145,6 +154,24 @@ def _build_payload_handler(helper: DeveloperHelperController, window: OverlayWin
     return _handle_payload
 
 
+def _build_batch_handler(helper: DeveloperHelperController, window: OverlayWindow):
+    handle_payload = _build_payload_handler(helper, window)
+
+    def _handle_batch(payloads: List[Dict[str, Any]]) -> None:
+        if len(payloads) == 1:
+            handle_payload(payloads[0])
+            return
+        # One tick's worth of payloads: ingest them all, then repaint once.
+        with window.legacy_ingest_batch():
+            for payload in payloads:
+                try:
+                    handle_payload(payload)
+                except Exception:
+                    _CLIENT_LOGGER.exception("Failed to handle payload event=%s", payload.get("event"))
+
+    return _handle_batch
+
+
 def main(argv: Optional[list[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="EDMC Modern Overlay client")
     parser.add_argument("--port-file", help="Path to port.json emitted by the plugin")
@@ -209,13 +236,16 @@ def main(argv: Optional[list[str]] = None) -> int:
         window.format_scale_debug(),
     )
 
-    data_client.message_received.connect(_build_payload_handler(helper, window))
+    data_client.messages_received.connect(_build_batch_handler(helper, window))
     data_client.status_changed.connect(window.set_status_text)
 
     window.show()
+    if window.start_frame_planner():
+        _CLIENT_LOGGER.debug("Payload layout runs on the frame planner thread")
     data_client.start()
 
     exit_code = app.exec()
     data_client.stop()
+    window.stop_frame_planner()
     _CLIENT_LOGGER.info("Overlay client exiting with code %s", exit_code)
     return int(exit_code)
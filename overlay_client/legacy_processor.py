@@ -2,12 +2,23 @@ from __future__ import annotations
 
 import logging
 import time
+from array import array
 from datetime import datetime, timezone
 from collections.abc import Iterable, Sequence
 from typing import Any, Callable, Mapping, MutableMapping, Optional
 import json
 
-from overlay_client.legacy_store import LegacyItem, LegacyItemStore
+from overlay_client.legacy_store import (
+    LegacyItem,
+    LegacyItemStore,
+    MessageFields,
+    RectFields,
+    VectorFields,
+    parse_color_rgba,
+    point_extras,
+    vector_points,
+)
+from overlay_plugin.payload_codec import VECTOR_DELTA_KEY, VECTOR_GEN_KEY
 
 LOGGER = logging.getLogger("EDMC.ModernOverlay.LegacyProcessor")
 
@@ -61,6 +72,8 @@ def _hashable_payload_snapshot(item_type: str, payload: Mapping[str, Any]) -> tu
 
 
 TraceCallback = Callable[[str, Mapping[str, Any], Mapping[str, Any]], None]
+# Called with (item_id, delta generation, item still held) when a vector delta is dropped.
+VectorResyncCallback = Callable[[str, Any, bool], None]
 
 
 def _extract_plugin(payload: Mapping[str, Any]) -> Optional[str]:
@@ -83,6 +96,178 @@ def _extract_plugin(payload: Mapping[str, Any]) -> Optional[str]:
     return None
 
 
+def _normalise_vector_point(entry: Any) -> Optional[dict]:
+    if not isinstance(entry, Mapping):
+        return None
+    try:
+        x_val = int(entry.get("x", 0))
+        y_val = int(entry.get("y", 0))
+    except (TypeError, ValueError):
+        return None
+    point = {
+        "x": x_val,
+        "y": y_val,
+    }
+    if entry.get("color"):
+        point["color"] = str(entry["color"])
+    if entry.get("marker"):
+        point["marker"] = str(entry["marker"]).lower()
+    if entry.get("text"):
+        point["text"] = str(entry["text"])
+    return point
+
+
+def _vector_fields(points: Sequence[Mapping[str, Any]]) -> Optional[VectorFields]:
+    try:
+        return VectorFields.from_points(points)
+    except OverflowError:
+        # Coordinates beyond a C int; the item keeps its point dicts in data instead.
+        return None
+
+
+def _stamp_vector_generation(data: MutableMapping[str, Any], payload: Mapping[str, Any]) -> None:
+    """Record the delta baseline a full ``vect`` payload starts, if it carries one."""
+    generation = payload.get(VECTOR_GEN_KEY)
+    if type(generation) is int:
+        data["__mo_vector_gen__"] = generation
+        data["__mo_vector_seq__"] = 0
+    else:
+        data.pop("__mo_vector_gen__", None)
+        data.pop("__mo_vector_seq__", None)
+
+
+def _apply_vector_delta(
+    store: LegacyItemStore,
+    payload: Mapping[str, Any],
+    item_id: str,
+    ttl: int,
+    expiry: Optional[float],
+    plugin_name: Optional[str],
+    now_iso: str,
+    trace_fn: Optional[TraceCallback],
+    resync_fn: Optional[VectorResyncCallback],
+) -> bool:
+    """Patch the stored points of ``item_id`` in place from a ``vector_delta`` payload.
+
+    The delta is validated completely before the stored points are touched. It applies
+    only to the baseline generation the stored item came from, in sequence, and
+    with a matching ``base`` point count; anything else is dropped and reported
+    through ``resync_fn`` so the broadcaster sends the item in full again.
+    """
+    existing = store.get(item_id)
+    data = existing.data if existing is not None and existing.kind == "vector" else None
+    fields = existing.fields if data is not None else None
+    stored_count: Optional[int] = None
+    if isinstance(fields, VectorFields):
+        stored_count = len(fields)
+    elif data is not None and isinstance(data.get("points"), list):
+        stored_count = len(data["points"])
+    patch = payload.get(VECTOR_DELTA_KEY)
+
+    def _drop(reason: str) -> bool:
+        if trace_fn:
+            trace_fn(
+                "legacy_processor:vector_delta_drop",
+                payload,
+                {"plugin": plugin_name, "item_id": item_id, "reason": reason},
+            )
+        LOGGER.debug("Dropping vect delta (%s): id=%s", reason, item_id)
+        if resync_fn is not None:
+            generation = patch.get("gen") if isinstance(patch, Mapping) else None
+            try:
+                resync_fn(item_id, generation, stored_count is not None)
+            except Exception as exc:
+                LOGGER.debug("Vector resync request failed for id=%s: %s", item_id, exc)
+        return False
+
+    if data is None or stored_count is None:
+        return _drop("missing_item")
+    if not isinstance(patch, Mapping):
+        return _drop("malformed")
+    if data.get("__mo_vector_gen__") is None or patch.get("gen") != data.get("__mo_vector_gen__"):
+        return _drop("generation_mismatch")
+    if patch.get("seq") != data.get("__mo_vector_seq__", 0) + 1:
+        return _drop("sequence_mismatch")
+    if patch.get("base") != stored_count:
+        return _drop("base_mismatch")
+    try:
+        count = int(patch.get("count"))
+        updates = sorted(
+            ((int(index), _normalise_vector_point(entry)) for index, entry in patch.get("set") or []),
+            key=lambda update: update[0],
+        )
+    except (TypeError, ValueError):
+        return _drop("malformed")
+    kept = min(stored_count, count)
+    appended = [index for index, _point in updates if index >= kept]
+    if count < 2 or appended != list(range(kept, count)) or any(point is None or index < 0 for index, point in updates):
+        return _drop("malformed")
+
+    base_color = payload.get("color", "white")
+    transform_meta = payload.get("__mo_transform__")
+    if isinstance(transform_meta, Mapping):
+        transform_meta = dict(transform_meta)
+    else:
+        transform_meta = None
+    changed = (
+        bool(updates)
+        or count != stored_count
+        or data.get("base_color") != base_color
+        or data.get("__mo_transform__") != transform_meta
+    )
+    packed: Optional[array] = None
+    if isinstance(fields, VectorFields):
+        try:
+            packed = array("i", [value for _index, point in updates for value in (point["x"], point["y"])])
+        except OverflowError:
+            # Patched coordinates beyond a C int; rebuild the item from point dicts below.
+            packed = None
+    if isinstance(fields, VectorFields) and packed is not None:
+        xy = fields.xy
+        extras = fields.extras
+        del xy[2 * count :]
+        del extras[count:]
+        for position, (index, point) in enumerate(updates):
+            if index < len(extras):
+                xy[2 * index] = packed[2 * position]
+                xy[2 * index + 1] = packed[2 * position + 1]
+                extras[index] = point_extras(point)
+            else:
+                xy.extend(packed[2 * position : 2 * position + 2])
+                extras.append(point_extras(point))
+    else:
+        points = vector_points(existing)
+        del points[count:]
+        for index, point in updates:
+            if index < len(points):
+                points[index] = point
+            else:
+                points.append(point)
+        existing.fields = _vector_fields(points)
+        if existing.fields is None:
+            data["points"] = points
+        else:
+            data.pop("points", None)
+    data["base_color"] = base_color
+    data["__mo_ttl__"] = ttl
+    if transform_meta is not None:
+        data["__mo_transform__"] = transform_meta
+    else:
+        data.pop("__mo_transform__", None)
+    data["__mo_updated__"] = now_iso
+    data["__mo_vector_seq__"] = patch["seq"]
+    existing.expiry = expiry
+    existing.plugin = plugin_name
+    if trace_fn:
+        trace_fn(
+            "legacy_processor:vector_delta_applied",
+            payload,
+            {"plugin": plugin_name, "item_id": item_id, "updated": len(updates), "points": count},
+        )
+    store.set(item_id, existing)
+    return changed
+
+
 def _point_has_marker_or_text(point: Mapping[str, Any]) -> bool:
     marker = point.get("marker")
     if marker:
@@ -142,10 +327,12 @@ def process_legacy_payload(
     store: LegacyItemStore,
     payload: Mapping[str, Any],
     trace_fn: Optional[TraceCallback] = None,
+    resync_fn: Optional[VectorResyncCallback] = None,
 ) -> bool:
     """Process a legacy payload and update the store.
 
-    Returns True when the caller should trigger a repaint.
+    Returns True when the caller should trigger a repaint. ``resync_fn`` is told
+    about vector deltas that could not be applied.
     """
 
     item_type = payload.get("type")
@@ -179,12 +366,18 @@ def process_legacy_payload(
                 payload,
                 {"item_id": item_id, "plugin": plugin_name, "snapshot": snapshot},
             )
+        color = payload.get("color", "white")
+        # Coordinates and size live only on the typed fields; ``data`` keeps the text,
+        # the colour spec (named colours still go through QColor) and metadata.
+        fields = MessageFields(
+            color_rgba=parse_color_rgba(color),
+            x=int(payload.get("x", 0)),
+            y=int(payload.get("y", 0)),
+            size=str(payload.get("size", "normal")).lower(),
+        )
         data = {
             "text": text,
-            "color": payload.get("color", "white"),
-            "x": int(payload.get("x", 0)),
-            "y": int(payload.get("y", 0)),
-            "size": payload.get("size", "normal"),
+            "color": color,
         }
         data["__mo_ttl__"] = ttl
         transform_meta = payload.get("__mo_transform__")
@@ -201,7 +394,10 @@ def process_legacy_payload(
                     raw_copy = transform_meta
                 raw_payload.setdefault("__mo_transform__", {}).update(raw_copy if isinstance(raw_copy, Mapping) else {})
         data["__mo_updated__"] = now_iso
-        store.set(item_id, LegacyItem(item_id=item_id, kind="message", data=data, expiry=expiry, plugin=plugin_name))
+        store.set(
+            item_id,
+            LegacyItem(item_id=item_id, kind="message", data=data, expiry=expiry, plugin=plugin_name, fields=fields),
+        )
         return True
 
     if item_type == "shape":
@@ -211,11 +407,15 @@ def process_legacy_payload(
             data = {
                 "color": message.get("color", "white"),
                 "fill": message.get("fill") or "#00000000",
-                "x": int(message.get("x", 0)),
-                "y": int(message.get("y", 0)),
-                "w": int(message.get("w", 0)),
-                "h": int(message.get("h", 0)),
             }
+            fields = RectFields(
+                border_rgba=parse_color_rgba(data["color"]),
+                fill_rgba=parse_color_rgba(data["fill"]),
+                x=int(message.get("x", 0)),
+                y=int(message.get("y", 0)),
+                w=int(message.get("w", 0)),
+                h=int(message.get("h", 0)),
+            )
             data["__mo_ttl__"] = ttl
             if trace_fn:
                 snapshot = _hashable_payload_snapshot("shape", payload)
@@ -235,10 +435,14 @@ def process_legacy_payload(
             data["__mo_updated__"] = now_iso
             store.set(
                 item_id,
-                LegacyItem(item_id=item_id, kind="rect", data=data, expiry=expiry, plugin=plugin_name),
+                LegacyItem(item_id=item_id, kind="rect", data=data, expiry=expiry, plugin=plugin_name, fields=fields),
             )
             return True
         if shape_name == "vect":
+            if VECTOR_DELTA_KEY in message:
+                return _apply_vector_delta(
+                    store, message, item_id, ttl, expiry, plugin_name, now_iso, trace_fn, resync_fn
+                )
             vector = message.get("vector")
             if not isinstance(vector, list):
                 if trace_fn:
@@ -255,24 +459,9 @@ def process_legacy_payload(
                 return False
             points = []
             for entry in vector:
-                if not isinstance(entry, Mapping):
-                    continue
-                try:
-                    x_val = int(entry.get("x", 0))
-                    y_val = int(entry.get("y", 0))
-                except (TypeError, ValueError):
-                    continue
-                point = {
-                    "x": x_val,
-                    "y": y_val,
-                }
-                if entry.get("color"):
-                    point["color"] = str(entry["color"])
-                if entry.get("marker"):
-                    point["marker"] = str(entry["marker"]).lower()
-                if entry.get("text"):
-                    point["text"] = str(entry["text"])
-                points.append(point)
+                point = _normalise_vector_point(entry)
+                if point is not None:
+                    points.append(point)
             if not points:
                 if trace_fn:
                     trace_fn(
@@ -299,11 +488,12 @@ def process_legacy_payload(
                     )
                 LOGGER.warning("Dropping vect payload with insufficient points: id=%s vector=%s", item_id, vector)
                 return False
-            data = {
-                "base_color": message.get("color", "white"),
-                "points": points,
-            }
+            fields = _vector_fields(points)
+            data = {"base_color": message.get("color", "white")}
+            if fields is None:
+                data["points"] = points
             data["__mo_ttl__"] = ttl
+            _stamp_vector_generation(data, message)
             if trace_fn:
                 snapshot = _hashable_payload_snapshot("shape", payload)
                 trace_fn(
@@ -339,6 +529,7 @@ def process_legacy_payload(
                     data=data,
                     expiry=expiry,
                     plugin=plugin_name,
+                    fields=fields,
                 ),
             )
             return True
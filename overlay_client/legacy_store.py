@@ -1,34 +1,238 @@
 from __future__ import annotations
 
+import heapq
+from array import array
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
 
-@dataclass
+
+def parse_color_rgba(value: Any) -> Optional[int]:
+    """Parse a ``#rgb``/``#rrggbb``/``#aarrggbb`` colour into a QRgb int (0xAARRGGBB).
+
+    Follows ``QColor``'s reading of the hex forms. Anything else (named colours,
+    ``none``, malformed input) returns None so callers fall back to ``QColor(spec)``.
+    """
+    if not isinstance(value, str) or not value.startswith("#"):
+        return None
+    digits = value[1:]
+    if not digits or not _HEX_DIGITS.issuperset(digits):
+        return None
+    if len(digits) == 3:
+        red, green, blue = (int(ch, 16) * 17 for ch in digits)
+        return 0xFF000000 | (red << 16) | (green << 8) | blue
+    if len(digits) == 6:
+        return 0xFF000000 | int(digits, 16)
+    if len(digits) == 8:
+        return int(digits, 16)
+    return None
+
+
+@dataclass(slots=True)
+class MessageFields:
+    """Message fields coerced once at ingest."""
+
+    color_rgba: Optional[int]
+    x: int
+    y: int
+    size: str
+
+
+@dataclass(slots=True)
+class RectFields:
+    """Rect fields coerced once at ingest."""
+
+    border_rgba: Optional[int]
+    fill_rgba: Optional[int]
+    x: int
+    y: int
+    w: int
+    h: int
+
+
+_NO_POINT_EXTRAS: Mapping[str, str] = MappingProxyType({})
+
+
+@dataclass(slots=True)
+class VectorFields:
+    """Vector points coerced once at ingest.
+
+    Coordinates are packed as ``x0, y0, x1, y1, ...``; ``extras`` holds each point's
+    ``color``/``marker``/``text`` keys, or None for a bare point. Colours stay as
+    strings: ``render_vector`` takes colour specs, which the paint adapter resolves
+    through ``paint_commands.qcolor_from_spec``.
+    """
+
+    xy: "array[int]"
+    extras: List[Optional[Dict[str, str]]]
+
+    @classmethod
+    def from_points(cls, points: Sequence[Mapping[str, Any]]) -> "VectorFields":
+        xy = array("i")
+        extras: List[Optional[Dict[str, str]]] = []
+        for point in points:
+            xy.append(point["x"])
+            xy.append(point["y"])
+            extras.append(point_extras(point))
+        return cls(xy, extras)
+
+    def __len__(self) -> int:
+        return len(self.extras)
+
+    def point_extras(self) -> List[Mapping[str, str]]:
+        """Per-point metadata without coordinates, aligned with ``xy``."""
+        return [extra or _NO_POINT_EXTRAS for extra in self.extras]
+
+    def points(self) -> List[Dict[str, Any]]:
+        """Rebuild the point dicts, for tracing and tooling rather than the paint path."""
+        xy = self.xy
+        points: List[Dict[str, Any]] = []
+        for index, extra in enumerate(self.extras):
+            point: Dict[str, Any] = {"x": xy[2 * index], "y": xy[2 * index + 1]}
+            if extra:
+                point.update(extra)
+            points.append(point)
+        return points
+
+
+def point_extras(point: Mapping[str, Any]) -> Optional[Dict[str, str]]:
+    """Return the non-coordinate keys of a normalised vector point, or None if it has none."""
+    if len(point) <= 2:
+        return None
+    return {key: value for key, value in point.items() if key not in ("x", "y")}
+
+
+ItemFields = Union[MessageFields, RectFields, VectorFields]
+
+
+@dataclass(slots=True)
 class LegacyItem:
+    """One stored legacy payload.
+
+    ``fields`` holds the typed values parsed once by ``process_legacy_payload``.
+    Coordinates, sizes and vector points live only there; ``data`` keeps the
+    remaining payload (text, colour specs) and the ``__mo_*`` metadata read by
+    transforms, tracing and the debug tooling. ``fields`` is None for items built
+    elsewhere (or vectors whose coordinates overflow a C int), in which case
+    consumers read everything from ``data``.
+    """
+
     item_id: str
     kind: str
     data: Dict[str, Any]
     expiry: Optional[float] = None
     plugin: Optional[str] = None
+    fields: Optional[ItemFields] = None
+
+
+def vector_points(item: LegacyItem) -> List[Mapping[str, Any]]:
+    """Return a vector item's points as dicts, from ``fields`` or the ``data`` fallback."""
+    fields = item.fields
+    if isinstance(fields, VectorFields):
+        return fields.points()
+    points = item.data.get("points") if isinstance(item.data, Mapping) else None
+    return points if isinstance(points, list) else []
 
 
 class LegacyItemStore:
-    """Container for LegacyOverlay items with TTL handling."""
+    """Container for LegacyOverlay items with TTL handling.
+
+    ``revision`` increases on every change to the store and ``item_revision``
+    records the revision at which each item was last set, so render caches can
+    key off content changes instead of relying on explicit invalidation.
+
+    Expiries are scheduled on a min-heap of ``(expiry, item_id)`` entries. Entries
+    are never removed eagerly: a refreshed, replaced or removed item leaves its old
+    entry behind and it is discarded when it reaches the top, so purging costs
+    O(expired) instead of a scan of every item. Change an item's expiry through
+    ``set`` or ``refresh_expiry``; a direct ``item.expiry`` assignment is only
+    noticed when the previously scheduled expiry comes due.
+
+    Item counts, overall and per plugin and group, are maintained as items come and
+    go so callers polling the store never copy it. The plugin is read on ``set``;
+    the group label is assigned separately through ``set_group``.
+    """
 
     def __init__(self) -> None:
         self._items: Dict[str, LegacyItem] = {}
+        self._item_revisions: Dict[str, int] = {}
+        self._revision = 0
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._scheduled_expiry: Dict[str, float] = {}
+        self._item_plugins: Dict[str, Optional[str]] = {}
+        self._item_groups: Dict[str, Optional[str]] = {}
+        self._plugin_counts: Dict[Optional[str], int] = {}
+        self._group_counts: Dict[Optional[str], int] = {}
+
+    @property
+    def revision(self) -> int:
+        return self._revision
+
+    def item_revision(self, item_id: str) -> int:
+        return self._item_revisions.get(item_id, 0)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def plugin_counts(self) -> Mapping[Optional[str], int]:
+        """Live read-only view of item counts per plugin (``None`` for unattributed items)."""
+        return MappingProxyType(self._plugin_counts)
+
+    def group_counts(self) -> Mapping[Optional[str], int]:
+        """Live read-only view of item counts per group label (``None`` for ungrouped items)."""
+        return MappingProxyType(self._group_counts)
+
+    def set_group(self, item_id: str, label: Optional[str]) -> None:
+        """Record the group label an item is counted under; a no-op for unknown ids."""
+        if item_id not in self._items:
+            return
+        previous = self._item_groups.get(item_id)
+        if previous == label:
+            return
+        _decrement(self._group_counts, previous)
+        self._item_groups[item_id] = label
+        _increment(self._group_counts, label)
 
     def clear(self) -> None:
+        if self._items:
+            self._revision += 1
         self._items.clear()
+        self._item_revisions.clear()
+        self._expiry_heap.clear()
+        self._scheduled_expiry.clear()
+        self._item_plugins.clear()
+        self._item_groups.clear()
+        self._plugin_counts.clear()
+        self._group_counts.clear()
 
     def remove(self, item_id: str) -> None:
-        self._items.pop(item_id, None)
+        if self._items.pop(item_id, None) is not None:
+            self._forget(item_id)
+            self._revision += 1
 
     def set(self, item_id: str, item: LegacyItem) -> None:
         if item.item_id != item_id:
             item.item_id = item_id
+        if item_id in self._items:
+            # Compare with the plugin recorded at the last set; the item may have been mutated since.
+            previous_plugin = self._item_plugins.get(item_id)
+            if previous_plugin != item.plugin:
+                _decrement(self._plugin_counts, previous_plugin)
+                _increment(self._plugin_counts, item.plugin)
+        else:
+            _increment(self._plugin_counts, item.plugin)
+            _increment(self._group_counts, None)
+            self._item_groups[item_id] = None
+        self._item_plugins[item_id] = item.plugin
         self._items[item_id] = item
+        self._revision += 1
+        self._item_revisions[item_id] = self._revision
+        if item.expiry is not None:
+            self._schedule_expiry(item.expiry, item_id)
+        else:
+            self._scheduled_expiry.pop(item_id, None)
         trace_cb = getattr(self, "_trace_callback", None)
         if callable(trace_cb):
             try:
@@ -45,11 +249,84 @@ class LegacyItemStore:
     def values(self) -> Iterable[LegacyItem]:
         return self._items.values()
 
+    def refresh_expiry(self, item_id: str, expiry: Optional[float]) -> None:
+        """Move an item's expiry without changing its content (no revision bump)."""
+        item = self._items.get(item_id)
+        if item is None:
+            return
+        item.expiry = expiry
+        if expiry is not None:
+            self._schedule_expiry(expiry, item_id)
+
+    def next_expiry(self) -> Optional[float]:
+        """Earliest pending expiry, discarding stale heap entries on the way."""
+        heap = self._expiry_heap
+        while heap:
+            expiry, item_id = heap[0]
+            if self._scheduled_expiry.get(item_id) == expiry:
+                item = self._items.get(item_id)
+                if item is not None and item.expiry == expiry:
+                    return expiry
+            heapq.heappop(heap)
+            self._live_entry(expiry, item_id)  # reschedules a directly changed expiry
+        return None
+
+    def pop_expired(self, now: float) -> List[str]:
+        """Remove items whose expiry is before ``now`` and return their ids."""
+        heap = self._expiry_heap
+        expired: List[str] = []
+        while heap and heap[0][0] < now:
+            expiry, item_id = heapq.heappop(heap)
+            if not self._live_entry(expiry, item_id):
+                continue
+            del self._items[item_id]
+            self._forget(item_id)
+            expired.append(item_id)
+        if expired:
+            self._revision += 1
+        return expired
+
     def purge_expired(self, now: float) -> bool:
-        expired = [
-            key for key, item in self._items.items()
-            if item.expiry is not None and item.expiry < now
-        ]
-        for key in expired:
-            self._items.pop(key, None)
-        return bool(expired)
+        return bool(self.pop_expired(now))
+
+    def _forget(self, item_id: str) -> None:
+        self._item_revisions.pop(item_id, None)
+        self._scheduled_expiry.pop(item_id, None)
+        _decrement(self._plugin_counts, self._item_plugins.pop(item_id, None))
+        _decrement(self._group_counts, self._item_groups.pop(item_id, None))
+
+    def _live_entry(self, expiry: float, item_id: str) -> bool:
+        if self._scheduled_expiry.get(item_id) != expiry:
+            return False  # Superseded by a later entry, or the item is gone.
+        item = self._items.get(item_id)
+        if item is None:
+            self._scheduled_expiry.pop(item_id, None)
+            return False
+        if item.expiry == expiry:
+            return True
+        # The expiry attribute was changed without telling the store; follow it.
+        self._scheduled_expiry.pop(item_id, None)
+        if item.expiry is not None:
+            self._schedule_expiry(item.expiry, item_id)
+        return False
+
+    def _schedule_expiry(self, expiry: float, item_id: str) -> None:
+        self._scheduled_expiry[item_id] = expiry
+        heap = self._expiry_heap
+        heapq.heappush(heap, (expiry, item_id))
+        if len(heap) > 2 * len(self._scheduled_expiry) + 64:
+            # Mostly stale entries (frequent refreshes); rebuild from the live schedule.
+            heap[:] = [(value, key) for key, value in self._scheduled_expiry.items()]
+            heapq.heapify(heap)
+
+
+def _increment(counts: Dict[Optional[str], int], key: Optional[str]) -> None:
+    counts[key] = counts.get(key, 0) + 1
+
+
+def _decrement(counts: Dict[Optional[str], int], key: Optional[str]) -> None:
+    remaining = counts.get(key, 0) - 1
+    if remaining > 0:
+        counts[key] = remaining
+    else:
+        counts.pop(key, None)
@@ -26,21 +26,25 @@ except Exception:  # pragma: no cover - fallback when module unavailable
     DEV_MODE_ENV_VAR = "MODERN_OVERLAY_DEV_MODE"
 
 from overlay_client.data_client import OverlayDataClient  # type: ignore  # noqa: E402
+from overlay_plugin.payload_codec import VECTOR_RESYNC_CLI  # type: ignore  # noqa: E402
 from overlay_client.client_config import InitialClientSettings  # type: ignore  # noqa: E402
 from overlay_client.platform_integration import MonitorSnapshot  # type: ignore  # noqa: E402
 from overlay_client.window_tracking import WindowTracker  # type: ignore  # noqa: E402
 from overlay_client.debug_config import DEBUG_CONFIG_ENABLED, DebugConfig  # type: ignore  # noqa: E402
 from overlay_client.group_transform import GroupTransform  # type: ignore  # noqa: E402
-from overlay_client.payload_transform import (
-    PayloadTransformContext,
-    remap_axis_value,
-)  # type: ignore  # noqa: E402
+from overlay_client.payload_transform import PayloadTransformContext  # type: ignore  # noqa: E402
 from overlay_client.viewport_helper import BASE_HEIGHT, BASE_WIDTH  # type: ignore  # noqa: E402
 from overlay_client.fonts import (  # type: ignore  # noqa: E402
     _apply_font_fallbacks,
     _resolve_emoji_font_families,
     _resolve_font_family,
 )
+from overlay_client.payload_builders import (  # type: ignore  # noqa: E402
+    group_anchor_point as util_group_anchor_point,
+    group_base_point as util_group_base_point,
+    group_offsets as util_group_offsets,
+    map_anchor_to_overlay_bounds as util_map_anchor_to_overlay_bounds,
+)
 from overlay_client.transform_helpers import (  # type: ignore  # noqa: E402
     apply_inverse_group_scale as util_apply_inverse_group_scale,
     compute_message_transform as util_compute_message_transform,
@@ -58,7 +62,6 @@ from overlay_client.viewport_transform import (  # type: ignore  # noqa: E402
     LegacyMapper,
     ViewportState,
     build_viewport,
-    map_anchor_axis,
     legacy_scale_components,
     scaled_point_size as viewport_scaled_point_size,
 )
@@ -189,7 +192,8 @@ class OverlayWindow(SetupSurfaceMixin, InteractionSurfaceMixin, QWidget, RenderS
     _WM_OVERRIDE_TTL = 1.25  # seconds
     _REPAINT_DEBOUNCE_MS = 33  # coalesce ingest/purge repaint storms
     _TEXT_CACHE_MAX = 512
-    _TEXT_BLOCK_CACHE_MAX = 256
+    _TEXT_BLOCK_CACHE_MAX = 512
+    _TEXT_CACHE_MAX_BYTES = 1024 * 1024  # per cache
 
     def __init__(self, initial: InitialClientSettings, debug_config: DebugConfig) -> None:
         QWidget.__init__(self)
@@ -250,24 +254,7 @@ class OverlayWindow(SetupSurfaceMixin, InteractionSurfaceMixin, QWidget, RenderS
         overlay_bounds: Optional[_OverlayBounds] = None,
         use_overlay_bounds_x: bool = False,
     ) -> Optional[Tuple[float, float]]:
-        if transform is None or context is None:
-            return None
-        anchor_override = overlay_bounds if (use_overlay_bounds_x and overlay_bounds is not None and overlay_bounds.is_valid()) else None
-        anchor_x = transform.band_anchor_x * BASE_WIDTH
-        anchor_y = transform.band_anchor_y * BASE_HEIGHT
-        anchor_x = remap_axis_value(anchor_x, context.axis_x)
-        anchor_y = remap_axis_value(anchor_y, context.axis_y)
-        if anchor_override is not None:
-            mapped = cls._map_anchor_to_overlay_bounds(transform, anchor_override)
-            if mapped is not None:
-                anchor_x = mapped[0]
-        if not (math.isfinite(anchor_x) and math.isfinite(anchor_y)):
-            return None
-        offset_x, offset_y = cls._group_offsets(transform)
-        if anchor_override is None:
-            anchor_x += offset_x
-        anchor_y += offset_y
-        return anchor_x, anchor_y
+        return util_group_anchor_point(transform, context, overlay_bounds, use_overlay_bounds_x)
 
     @classmethod
     def _group_base_point(
@@ -277,36 +264,11 @@ class OverlayWindow(SetupSurfaceMixin, InteractionSurfaceMixin, QWidget, RenderS
         overlay_bounds: Optional[_OverlayBounds] = None,
         use_overlay_bounds_x: bool = False,
     ) -> Optional[Tuple[float, float]]:
-        if transform is None or context is None:
-            return None
-        if use_overlay_bounds_x and overlay_bounds is not None and overlay_bounds.is_valid():
-            base_x = overlay_bounds.min_x
-        else:
-            base_x = remap_axis_value(transform.bounds_min_x, context.axis_x)
-        base_y = remap_axis_value(transform.bounds_min_y, context.axis_y)
-        if not (math.isfinite(base_x) and math.isfinite(base_y)):
-            return None
-        offset_x, offset_y = cls._group_offsets(transform)
-        if not (use_overlay_bounds_x and overlay_bounds is not None and overlay_bounds.is_valid()):
-            base_x += offset_x
-        base_y += offset_y
-        return base_x, base_y
+        return util_group_base_point(transform, context, overlay_bounds, use_overlay_bounds_x)
 
     @staticmethod
     def _group_offsets(transform: Optional[GroupTransform]) -> Tuple[float, float]:
-        if transform is None:
-            return 0.0, 0.0
-        offset_x = getattr(transform, "dx", 0.0) or 0.0
-        offset_y = getattr(transform, "dy", 0.0) or 0.0
-        try:
-            offset_x = float(offset_x)
-        except (TypeError, ValueError):
-            offset_x = 0.0
-        try:
-            offset_y = float(offset_y)
-        except (TypeError, ValueError):
-            offset_y = 0.0
-        return offset_x, offset_y
+        return util_group_offsets(transform)
 
     @classmethod
     def _map_anchor_to_overlay_bounds(
@@ -314,24 +276,7 @@ class OverlayWindow(SetupSurfaceMixin, InteractionSurfaceMixin, QWidget, RenderS
         transform: GroupTransform,
         bounds: _OverlayBounds,
     ) -> Optional[Tuple[float, float]]:
-        if not bounds.is_valid():
-            return None
-        try:
-            anchor_x = map_anchor_axis(
-                transform.band_anchor_x,
-                transform.band_min_x,
-                transform.band_max_x,
-                bounds.min_x,
-                bounds.max_x,
-                anchor_token=getattr(transform, "anchor_token", None),
-                axis="x",
-            )
-        except Exception:
-            return None
-        anchor_y = transform.band_anchor_y * BASE_HEIGHT
-        if not (math.isfinite(anchor_x) and math.isfinite(anchor_y)):
-            return None
-        return anchor_x, anchor_y
+        return util_map_anchor_to_overlay_bounds(transform, bounds)
 
 
     @staticmethod
@@ -471,6 +416,8 @@ class OverlayWindow(SetupSurfaceMixin, InteractionSurfaceMixin, QWidget, RenderS
         base_translation_dy: float,
         trace_enabled: bool,
         collect_only: bool,
+        *,
+        packed_xy: Optional[Sequence[int]] = None,
     ) -> Tuple[
         Optional[Mapping[str, Any]],
         List[Tuple[int, int]],
@@ -505,6 +452,7 @@ class OverlayWindow(SetupSurfaceMixin, InteractionSurfaceMixin, QWidget, RenderS
             base_translation_dy,
             trace_fn,
             collect_only,
+            packed_xy=packed_xy,
         )
 
     def _update_message_font(self) -> None:
@@ -538,6 +486,7 @@ class OverlayWindow(SetupSurfaceMixin, InteractionSurfaceMixin, QWidget, RenderS
         for item_id, item in list(self._payload_model.store.items()):
             self._payload_model.set(item_id, item)
         self._mark_legacy_cache_dirty()
+        self._schedule_legacy_purge()
 
     def _notify_font_bounds_changed(self) -> None:
         current = (self._font_min_point, self._font_max_point)
@@ -585,6 +534,12 @@ class OverlayWindow(SetupSurfaceMixin, InteractionSurfaceMixin, QWidget, RenderS
         }
         client.send_cli_payload(payload)
 
+    def _request_vector_resync(self, item_id: str, generation: Any, held: bool) -> None:
+        client = self._data_client
+        if client is None:
+            return
+        client.send_cli_payload({"cli": VECTOR_RESYNC_CLI, "id": item_id, "gen": generation, "held": held})
+
     def format_scale_debug(self) -> str:
         width_px, height_px = self._current_physical_size()
         mapper = self._compute_legacy_mapper()
@@ -619,6 +574,7 @@ class OverlayWindow(SetupSurfaceMixin, InteractionSurfaceMixin, QWidget, RenderS
 
     def set_data_client(self, client: OverlayDataClient) -> None:
         self._data_client = client
+        self._payload_model.set_vector_resync_callback(self._request_vector_resync)
         self._publish_metrics()
         if self._window_tracker and hasattr(self._window_tracker, "set_monitor_provider"):
             try:
@@ -30,17 +30,19 @@ def force_reload_overrides(
             payload["plugin"] = item.plugin
         try:
             inferred = override_manager.infer_plugin_name(payload)
+            group_label = override_manager.grouping_label_for_id(item_id)
         except Exception as exc:
             log_fn("Override reload: inference failed for %s: %s", item_id, exc)
             continue
         if inferred and inferred != item.plugin:
             item.plugin = inferred
             store.set(item_id, item)
+        store.set_group(item_id, group_label)
 
     log_fn(
         "Override reload applied: generation=%d items=%d",
         getattr(override_manager, "generation", -1),
-        len(list(store.items())),
+        len(store),
     )
 
 
@@ -2,19 +2,58 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, Callable, Mapping, Optional, Sequence, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Mapping, Optional, Sequence, Tuple
 
 from PyQt6.QtCore import QPoint, Qt
-from PyQt6.QtGui import QColor, QBrush, QFont, QFontMetrics, QPainter, QPen
+from PyQt6.QtGui import QColor, QBrush, QPainter, QPen, QPicture
 
 from overlay_client.group_transform import GroupTransform  # type: ignore
 from overlay_client.grouping_adapter import GroupKey  # type: ignore
-from overlay_client.legacy_store import LegacyItem  # type: ignore
+from overlay_client.legacy_store import LegacyItem, parse_color_rgba  # type: ignore
 from overlay_client.vector_renderer import render_vector, VectorPainterAdapter  # type: ignore
 
 if TYPE_CHECKING:
     from overlay_client.overlay_client import OverlayWindow  # type: ignore
 
+_SPEC_COLOR_CACHE_MAX = 256
+# Colour spec -> QRgb, or None when QColor rejects the spec.
+_spec_colors: Dict[str, Optional[int]] = {}
+
+
+def spec_rgba(spec: str, rgba: Optional[int] = None) -> Optional[int]:
+    """Return the QRgb value ``QColor(spec)`` would produce, or None when Qt rejects the spec.
+
+    ``rgba`` is the value pre-parsed at ingest, when there is one. Other specs
+    (named colours) are resolved by Qt once and remembered.
+    """
+
+    if rgba is not None:
+        return rgba
+    try:
+        return _spec_colors[spec]
+    except KeyError:
+        pass
+    cached = parse_color_rgba(spec)
+    if cached is None:
+        color = QColor(spec)
+        cached = color.rgba() if color.isValid() else None
+    if len(_spec_colors) >= _SPEC_COLOR_CACHE_MAX:
+        _spec_colors.clear()
+    _spec_colors[spec] = cached
+    return cached
+
+
+def qcolor_from_spec(spec: str, rgba: Optional[int] = None) -> QColor:
+    """Return a new ``QColor`` for a legacy colour string, like ``QColor(spec)``."""
+
+    return qcolor_from_rgba(spec_rgba(spec, rgba))
+
+
+def qcolor_from_rgba(rgba: Optional[int]) -> QColor:
+    """``QColor`` for a resolved QRgb value; None gives an invalid colour, as a rejected spec does."""
+
+    return QColor.fromRgba(rgba) if rgba is not None else QColor()
+
 
 @dataclass
 class _LegacyPaintCommand:
@@ -51,11 +90,7 @@ class _MessagePaintCommand(_LegacyPaintCommand):
     trace_fn: Optional[Callable[[str, Mapping[str, Any]], None]] = None
 
     def paint(self, window: "OverlayWindow", painter: QPainter, offset_x: int, offset_y: int) -> None:
-        font = QFont(window._font_family)
-        window._apply_font_fallbacks(font)
-        font.setPointSizeF(self.point_size)
-        font.setWeight(QFont.Weight.Normal)
-        painter.setFont(font)
+        painter.setFont(window._pooled_font(self.point_size))
         painter.setPen(window._apply_payload_opacity_color(self.color))
         draw_x = int(round(self.x + offset_x))
         draw_baseline = int(round(self.baseline + offset_y))
@@ -144,23 +179,121 @@ class _VectorPaintCommand(_LegacyPaintCommand):
             window._register_cycle_anchor(self.legacy_item.item_id, anchor_x, anchor_y)
 
 
+GroupDraw = Tuple[_LegacyPaintCommand, float, float]
+
+
+@dataclass
+class _GroupLayer:
+    key: Tuple[Any, ...]
+    commands: Tuple[_LegacyPaintCommand, ...]
+    picture: QPicture
+    anchors: Tuple[Tuple[str, int, int], ...]
+
+
+class GroupLayerCache:
+    """Retained per-group paint layers.
+
+    Each run of consecutive draws from one group is recorded into a ``QPicture``
+    and replayed on later frames while the layer key (group revision, opacity,
+    font generation, draw offsets and the target's DPI and pixel ratio) and the
+    command objects are unchanged. Callers give every run its own layer id, so
+    replayed layers keep the per-payload paint order. Cycle anchors are
+    re-registered on replay.
+
+    ``drawPicture`` rescales by the target's logical DPI over the picture's, which
+    moves text away from the bounds measured for it. Targets whose logical DPI
+    differs from the picture's are therefore painted directly.
+    """
+
+    def __init__(self) -> None:
+        self._layers: Dict[Any, _GroupLayer] = {}
+        self._picture_dpi: Optional[Tuple[int, int]] = None
+        self.stats: Dict[str, int] = {"replayed": 0, "recorded": 0, "direct": 0}
+
+    def __len__(self) -> int:
+        return len(self._layers)
+
+    def clear(self) -> None:
+        self._layers.clear()
+
+    def prune(self, active_keys: Iterable[Any]) -> None:
+        active = set(active_keys)
+        for key in [key for key in self._layers if key not in active]:
+            del self._layers[key]
+
+    def _recording_dpi(self) -> Tuple[int, int]:
+        if self._picture_dpi is None:
+            picture = QPicture()
+            self._picture_dpi = (picture.logicalDpiX(), picture.logicalDpiY())
+        return self._picture_dpi
+
+    def paint_group(
+        self,
+        window: "OverlayWindow",
+        painter: QPainter,
+        layer_id: Any,
+        layer_key: Tuple[Any, ...],
+        draws: Sequence[GroupDraw],
+    ) -> bool:
+        """Paint ``draws`` for one layer; returns True when a cached layer was replayed."""
+
+        device = painter.device()
+        device_dpi = (device.logicalDpiX(), device.logicalDpiY()) if device is not None else None
+        if device_dpi != self._recording_dpi():
+            self._layers.pop(layer_id, None)
+            for command, offset_x, offset_y in draws:
+                command.paint(window, painter, offset_x, offset_y)
+            self.stats["direct"] += 1
+            return False
+        layer_key = layer_key + (device_dpi, device.devicePixelRatioF())
+        commands = tuple(command for command, _offset_x, _offset_y in draws)
+        layer = self._layers.get(layer_id)
+        if (
+            layer is not None
+            and layer.key == layer_key
+            and len(layer.commands) == len(commands)
+            and all(cached is current for cached, current in zip(layer.commands, commands))
+        ):
+            painter.drawPicture(0, 0, layer.picture)
+            for item_id, anchor_x, anchor_y in layer.anchors:
+                window._register_cycle_anchor(item_id, anchor_x, anchor_y)
+            self.stats["replayed"] += 1
+            return True
+        picture = QPicture()
+        recorder = QPainter(picture)
+        try:
+            recorder.setRenderHints(painter.renderHints())
+            for command, offset_x, offset_y in draws:
+                command.paint(window, recorder, offset_x, offset_y)
+        finally:
+            recorder.end()
+        anchors = tuple(
+            (
+                command.legacy_item.item_id,
+                int(round(command.cycle_anchor[0] + offset_x)),
+                int(round(command.cycle_anchor[1] + offset_y)),
+            )
+            for command, offset_x, offset_y in draws
+            if getattr(command, "cycle_anchor", None)
+        )
+        self._layers[layer_id] = _GroupLayer(layer_key, commands, picture, anchors)
+        self.stats["recorded"] += 1
+        painter.drawPicture(0, 0, picture)
+        return False
+
+
 class _QtVectorPainterAdapter(VectorPainterAdapter):
     def __init__(self, window: "OverlayWindow", painter: QPainter) -> None:
         self._window = window
         self._painter = painter
 
-    def _text_font(self) -> QFont:
-        font = QFont(self._window._font_family)
-        self._window._apply_font_fallbacks(font)
+    def _text_point_size(self) -> float:
         mapper = self._window._compute_legacy_mapper()
         state = self._window._viewport_state()
-        font.setPointSizeF(self._window._legacy_preset_point_size("small", state, mapper))
-        font.setWeight(QFont.Weight.Normal)
-        return font
+        return self._window._legacy_preset_point_size("small", state, mapper)
 
     def measure_text_block(self, text: str) -> tuple[int, int]:
-        font = self._text_font()
-        metrics = QFontMetrics(font)
+        metrics = self._window._pooled_font_metrics(self._text_point_size())
         normalised = str(text).replace("\r\n", "\n").replace("\r", "\n")
         lines = normalised.split("\n") or [""]
         max_width = 0
@@ -176,7 +309,7 @@ class _QtVectorPainterAdapter(VectorPainterAdapter):
         return max(0, max_width), max(0, total_height)
 
     def set_pen(self, color: str, *, width: Optional[int] = None) -> None:
-        q_color = QColor(color)
+        q_color = qcolor_from_spec(color)
         if not q_color.isValid():
             q_color = QColor("white")
         q_color = self._window._apply_payload_opacity_color(q_color)
@@ -190,7 +323,7 @@ class _QtVectorPainterAdapter(VectorPainterAdapter):
         self._painter.drawLine(x1, y1, x2, y2)
 
     def draw_circle_marker(self, x: int, y: int, radius: int, color: str) -> None:
-        q_color = QColor(color)
+        q_color = qcolor_from_spec(color)
         if not q_color.isValid():
             q_color = QColor("white")
         q_color = self._window._apply_payload_opacity_color(q_color)
@@ -206,15 +339,15 @@ class _QtVectorPainterAdapter(VectorPainterAdapter):
         self._painter.drawLine(x - size, y + size, x + size, y - size)
 
     def draw_text(self, x: int, y: int, text: str, color: str) -> None:
-        q_color = QColor(color)
+        q_color = qcolor_from_spec(color)
         if not q_color.isValid():
             q_color = QColor("white")
         q_color = self._window._apply_payload_opacity_color(q_color)
         pen = QPen(q_color)
         self._painter.setPen(pen)
-        font = self._text_font()
-        self._painter.setFont(font)
-        metrics = QFontMetrics(font)
+        point_size = self._text_point_size()
+        self._painter.setFont(self._window._pooled_font(point_size))
+        metrics = self._window._pooled_font_metrics(point_size)
         normalised = str(text).replace("\r\n", "\n").replace("\r", "\n")
         lines = normalised.split("\n") or [""]
         baseline = int(round(y + metrics.ascent()))
@@ -1,6 +1,7 @@
 """Payload builder helpers for overlay calculations (pure math/state)."""
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
 from typing import Callable, Optional, Tuple, TYPE_CHECKING
 
@@ -8,9 +9,16 @@ from overlay_client.group_transform import GroupTransform  # type: ignore
 from overlay_client.payload_transform import (  # type: ignore
     PayloadTransformContext,
     build_payload_transform_context,
+    remap_axis_value,
 )
 from overlay_client.viewport_helper import BASE_HEIGHT, BASE_WIDTH, ScaleMode  # type: ignore
-from overlay_client.viewport_transform import LegacyMapper, FillViewport, build_viewport, compute_proportional_translation  # type: ignore
+from overlay_client.viewport_transform import (  # type: ignore
+    LegacyMapper,
+    FillViewport,
+    build_viewport,
+    compute_proportional_translation,
+    map_anchor_axis,
+)
 
 if TYPE_CHECKING:
     from overlay_client.overlay_client import _OverlayBounds  # type: ignore
@@ -109,3 +117,91 @@ def build_group_context(
         base_translation_dx=base_translation_dx,
         base_translation_dy=base_translation_dy,
     )
+
+
+def group_offsets(transform: Optional[GroupTransform]) -> Tuple[float, float]:
+    if transform is None:
+        return 0.0, 0.0
+    offset_x = getattr(transform, "dx", 0.0) or 0.0
+    offset_y = getattr(transform, "dy", 0.0) or 0.0
+    try:
+        offset_x = float(offset_x)
+    except (TypeError, ValueError):
+        offset_x = 0.0
+    try:
+        offset_y = float(offset_y)
+    except (TypeError, ValueError):
+        offset_y = 0.0
+    return offset_x, offset_y
+
+
+def map_anchor_to_overlay_bounds(
+    transform: GroupTransform,
+    bounds: "_OverlayBounds",
+) -> Optional[Tuple[float, float]]:
+    if not bounds.is_valid():
+        return None
+    try:
+        anchor_x = map_anchor_axis(
+            transform.band_anchor_x,
+            transform.band_min_x,
+            transform.band_max_x,
+            bounds.min_x,
+            bounds.max_x,
+            anchor_token=getattr(transform, "anchor_token", None),
+            axis="x",
+        )
+    except Exception:
+        return None
+    anchor_y = transform.band_anchor_y * BASE_HEIGHT
+    if not (math.isfinite(anchor_x) and math.isfinite(anchor_y)):
+        return None
+    return anchor_x, anchor_y
+
+
+def group_anchor_point(
+    transform: Optional[GroupTransform],
+    context: Optional[PayloadTransformContext],
+    overlay_bounds: Optional["_OverlayBounds"] = None,
+    use_overlay_bounds_x: bool = False,
+) -> Optional[Tuple[float, float]]:
+    if transform is None or context is None:
+        return None
+    anchor_override = overlay_bounds if (use_overlay_bounds_x and overlay_bounds is not None and overlay_bounds.is_valid()) else None
+    anchor_x = transform.band_anchor_x * BASE_WIDTH
+    anchor_y = transform.band_anchor_y * BASE_HEIGHT
+    anchor_x = remap_axis_value(anchor_x, context.axis_x)
+    anchor_y = remap_axis_value(anchor_y, context.axis_y)
+    if anchor_override is not None:
+        mapped = map_anchor_to_overlay_bounds(transform, anchor_override)
+        if mapped is not None:
+            anchor_x = mapped[0]
+    if not (math.isfinite(anchor_x) and math.isfinite(anchor_y)):
+        return None
+    offset_x, offset_y = group_offsets(transform)
+    if anchor_override is None:
+        anchor_x += offset_x
+    anchor_y += offset_y
+    return anchor_x, anchor_y
+
+
+def group_base_point(
+    transform: Optional[GroupTransform],
+    context: Optional[PayloadTransformContext],
+    overlay_bounds: Optional["_OverlayBounds"] = None,
+    use_overlay_bounds_x: bool = False,
+) -> Optional[Tuple[float, float]]:
+    if transform is None or context is None:
+        return None
+    if use_overlay_bounds_x and overlay_bounds is not None and overlay_bounds.is_valid():
+        base_x = overlay_bounds.min_x
+    else:
+        base_x = remap_axis_value(transform.bounds_min_x, context.axis_x)
+    base_y = remap_axis_value(transform.bounds_min_y, context.axis_y)
+    if not (math.isfinite(base_x) and math.isfinite(base_y)):
+        return None
+    offset_x, offset_y = group_offsets(transform)
+    if not (use_overlay_bounds_x and overlay_bounds is not None and overlay_bounds.is_valid()):
+        base_x += offset_x
+    base_y += offset_y
+    return base_x, base_y
@@ -7,11 +7,14 @@ from typing import Callable, Dict, Mapping, Optional, Tuple, Any
 
 from overlay_client.legacy_processor import (
     TraceCallback,
+    VectorResyncCallback,
     process_legacy_payload,
     _hashable_payload_snapshot,
     _extract_plugin,
+    _stamp_vector_generation,
 )  # type: ignore
 from overlay_client.legacy_store import LegacyItem, LegacyItemStore  # type: ignore
+from overlay_plugin.payload_codec import VECTOR_DELTA_KEY, VECTOR_GEN_KEY
 
 
 class PayloadModel:
@@ -31,11 +34,23 @@ class PayloadModel:
         self._dedupe_log_state: Dict[str, Dict[str, float | int]] = {}
         dedupe_env = (os.getenv("EDMC_OVERLAY_INGEST_DEDUPE") or "1").strip().lower()
         self._dedupe_enabled = dedupe_env not in {"0", "false", "no", "off"}
+        self._vector_resync: Optional[VectorResyncCallback] = None
 
     @property
     def store(self) -> LegacyItemStore:
         return self._store
 
+    def set_vector_resync_callback(self, callback: Optional[VectorResyncCallback]) -> None:
+        """Register where to report vector deltas that could not be applied."""
+
+        self._vector_resync = callback
+
+    @property
+    def revision(self) -> int:
+        """Monotonic counter that changes whenever stored items change."""
+
+        return self._store.revision
+
     def ingest(
         self,
         payload: Dict[str, object],
@@ -49,6 +64,11 @@ class PayloadModel:
         item_id = payload.get("id")
         item_type = payload.get("type")
         snapshot: Optional[Tuple[Any, ...]] = None
+        if VECTOR_DELTA_KEY in payload:
+            # A delta patches the stored points, so the last full snapshot no longer describes the item.
+            if isinstance(item_id, str):
+                self._last_snapshots.pop(item_id, None)
+            return process_legacy_payload(self._store, payload, trace_fn=trace_fn, resync_fn=self._vector_resync)
         if self._dedupe_enabled and isinstance(item_id, str) and isinstance(item_type, str):
             try:
                 snapshot = _hashable_payload_snapshot(item_type, payload)
@@ -65,7 +85,10 @@ class PayloadModel:
                     expiry = None if ttl <= 0 else time.monotonic() + ttl
                     existing = self._store.get(item_id)
                     if existing is not None:
-                        existing.expiry = expiry
+                        self._store.refresh_expiry(item_id, expiry)
+                        if VECTOR_GEN_KEY in payload and existing.kind == "vector":
+                            # Same points, but later deltas build on the baseline this send started.
+                            _stamp_vector_generation(existing.data, payload)
                         plugin_name = _extract_plugin(payload) or "unknown"
                         item_id_token = item_id.casefold()
                         reason = (
@@ -109,21 +132,24 @@ class PayloadModel:
                         return False
 
         changed = process_legacy_payload(self._store, payload, trace_fn=trace_fn)
-        if changed and snapshot is not None and isinstance(item_id, str):
-            self._last_snapshots[item_id] = (snapshot, override_generation)
+        if changed and isinstance(item_id, str):
+            self._store.set_group(item_id, group_label)
+            if snapshot is not None:
+                self._last_snapshots[item_id] = (snapshot, override_generation)
         return changed
 
     def purge_expired(self, now: Optional[float] = None) -> bool:
         """Purge expired items; returns True if any were removed."""
 
-        before_ids = {item_id for item_id, _ in self._store.items()}
-        changed = self._store.purge_expired(now or time.monotonic())
-        after_ids = {item_id for item_id, _ in self._store.items()}
-        removed = before_ids - after_ids
-        if removed:
-            for item_id in removed:
-                self._last_snapshots.pop(item_id, None)
-        return changed
+        removed = self._store.pop_expired(now or time.monotonic())
+        for item_id in removed:
+            self._last_snapshots.pop(item_id, None)
+        return bool(removed)
+
+    def next_expiry(self) -> Optional[float]:
+        """Monotonic time of the earliest pending expiry, or None when nothing expires."""
+
+        return self._store.next_expiry()
 
     # Convenience wrappers to match previous direct store access ----------------
 
@@ -139,5 +165,11 @@ class PayloadModel:
     def __iter__(self):
         return iter(self._store.items())
 
-    def __len__(self):
-        return len(list(self._store.items()))
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def plugin_counts(self) -> Mapping[Optional[str], int]:
+        return self._store.plugin_counts()
+
+    def group_counts(self) -> Mapping[Optional[str], int]:
+        return self._store.group_counts()
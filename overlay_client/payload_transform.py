@@ -2,17 +2,18 @@
 from __future__ import annotations
 
 import math
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+from typing import TYPE_CHECKING, Any, Callable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
 
-from PyQt6.QtGui import QFont, QFontMetrics
-
-from overlay_client.font_utils import apply_font_fallbacks
-
-from overlay_client.legacy_store import LegacyItem
+from overlay_client.legacy_store import LegacyItem, MessageFields, RectFields, VectorFields
 from overlay_client.viewport_helper import BASE_HEIGHT, BASE_WIDTH
 
+TextBlockKey = Tuple[str, float, str, Tuple[str, ...], float, int]
+
 if TYPE_CHECKING:  # pragma: no cover
+    from PyQt6.QtGui import QFontMetrics
+
     from overlay_client import FillViewport
+    from overlay_client.font_utils import FontPool
     from overlay_client.group_transform import GroupBounds
 
 
@@ -221,11 +222,28 @@ def remap_vector_points(
     transform_meta: Optional[Mapping[str, Any]],
     points: Sequence[Mapping[str, Any]],
     context: Optional[PayloadTransformContext] = None,
+    *,
+    packed_xy: Optional[Sequence[int]] = None,
 ) -> List[Tuple[float, float, Mapping[str, Any]]]:
+    """Map vector points into overlay space.
+
+    ``packed_xy`` is the ingest-time ``VectorFields.xy`` for ``points``; when it
+    lines up with them the coordinates are read from it, and the point mappings
+    only carry colour/marker/text.
+    """
     pivot_x, pivot_y, scale_x_meta, scale_y_meta, offset_x_meta, offset_y_meta = transform_components(transform_meta)
     mapper_x = fill.overlay_mapper_x(pivot_x, scale_x_meta, offset_x_meta)
     mapper_y = fill.overlay_mapper_y(pivot_y, scale_y_meta, offset_y_meta)
     resolved: List[Tuple[float, float, Mapping[str, Any]]] = []
+    if packed_xy is not None and len(packed_xy) == 2 * len(points):
+        for index, point in enumerate(points):
+            mapped_x = mapper_x(float(packed_xy[2 * index]))
+            mapped_y = mapper_y(float(packed_xy[2 * index + 1]))
+            if context is not None:
+                mapped_x = _clamp_axis(mapped_x, context.axis_x)
+                mapped_y = _clamp_axis(mapped_y, context.axis_y)
+            resolved.append((mapped_x, mapped_y, point))
+        return resolved
     for point in points:
         if not isinstance(point, Mapping):
             continue
@@ -278,9 +296,10 @@ def accumulate_group_bounds(
     preset_point_size: Callable[[str], float],
     font_fallbacks: Optional[Sequence[str]] = None,
     *,
-    text_block_cache: Optional[Dict[Tuple[str, float, str, Tuple[str, ...], float, int], Tuple[int, int]]] = None,
+    text_block_cache: Optional[MutableMapping[TextBlockKey, Tuple[int, int]]] = None,
     cache_generation: int = 0,
     device_ratio: float = 1.0,
+    font_pool: Optional[FontPool] = None,
 ) -> None:
     from overlay_client.group_transform import GroupBounds  # local import to avoid cycles
 
@@ -298,10 +317,15 @@ def accumulate_group_bounds(
     if pixels_per_overlay_unit <= 0.0 or not math.isfinite(pixels_per_overlay_unit):
         pixels_per_overlay_unit = 1.0
     try:
+        fields = item.fields
         if kind == "message":
-            x_val = float(logical.get("x", data.get("x", 0.0)))
-            y_val = float(logical.get("y", data.get("y", 0.0)))
-            size_label = str(data.get("size", "normal")) if isinstance(data, Mapping) else "normal"
+            if isinstance(fields, MessageFields):
+                stored_x, stored_y, size_label = fields.x, fields.y, fields.size
+            else:
+                stored_x, stored_y = data.get("x", 0.0), data.get("y", 0.0)
+                size_label = str(data.get("size", "normal"))
+            x_val = float(logical.get("x", stored_x))
+            y_val = float(logical.get("y", stored_y))
             point_size = preset_point_size(size_label)
             normalised_text = (
                 str(data.get("text", ""))
@@ -321,26 +345,33 @@ def accumulate_group_bounds(
                     int(cache_generation or 0),
                 )
                 cached_block = text_block_cache.get(cache_key)
-            font = QFont(font_family)
-            apply_font_fallbacks(font, font_fallbacks)
-            font.setPointSizeF(point_size)
-            metrics = QFontMetrics(font)
             text_value = normalised_text
             if cached_block is not None:
+                # Cached blocks already include the fallbacks below; skip building fonts.
                 text_width_px, block_height_px = cached_block
             else:
+                if font_pool is not None:
+                    metrics = font_pool.metrics(font_family, fallback_tuple, point_size, device_ratio=device_ratio)
+                else:
+                    # Imported here so the layout helpers stay importable without Qt (frame_plan).
+                    from PyQt6.QtGui import QFont, QFontMetrics
+
+                    from overlay_client.font_utils import apply_font_fallbacks
+
+                    font = QFont(font_family)
+                    apply_font_fallbacks(font, font_fallbacks)
+                    font.setPointSizeF(point_size)
+                    metrics = QFontMetrics(font)
                 text_width_px, block_height_px = _measure_text_block(metrics, text_value)
-            if text_width_px <= 0 and text_value:
-                try:
-                    text_width_px = max(metrics.averageCharWidth() * len(text_value), 0)
-                except Exception:
-                    text_width_px = 0
-            if block_height_px <= 0 and text_value:
-                block_height_px = metrics.height()
+                if text_width_px <= 0 and text_value:
+                    try:
+                        text_width_px = max(metrics.averageCharWidth() * len(text_value), 0)
+                    except Exception:
+                        text_width_px = 0
+                if block_height_px <= 0 and text_value:
+                    block_height_px = metrics.height()
             if cached_block is None and cache_key is not None and text_block_cache is not None:
                 text_block_cache[cache_key] = (text_width_px, block_height_px)
-                if len(text_block_cache) > 512:
-                    text_block_cache.pop(next(iter(text_block_cache)))
             width_logical = max(0.0, text_width_px / pixels_per_overlay_unit)
             height_logical = max(0.0, block_height_px / pixels_per_overlay_unit)
             adj_x, adj_y = transform_point(x_val, y_val)
@@ -351,10 +382,14 @@ def accumulate_group_bounds(
                 adj_y + height_logical,
             )
         elif kind == "rect":
-            x_val = float(logical.get("x", data.get("x", 0.0)))
-            y_val = float(logical.get("y", data.get("y", 0.0)))
-            w_val = float(logical.get("w", data.get("w", 0.0)))
-            h_val = float(logical.get("h", data.get("h", 0.0)))
+            if isinstance(fields, RectFields):
+                stored: Tuple[Any, ...] = (fields.x, fields.y, fields.w, fields.h)
+            else:
+                stored = (data.get("x", 0.0), data.get("y", 0.0), data.get("w", 0.0), data.get("h", 0.0))
+            x_val = float(logical.get("x", stored[0]))
+            y_val = float(logical.get("y", stored[1]))
+            w_val = float(logical.get("w", stored[2]))
+            h_val = float(logical.get("h", stored[3]))
             corners = [
                 transform_point(x_val, y_val),
                 transform_point(x_val + w_val, y_val),
@@ -365,7 +400,14 @@ def accumulate_group_bounds(
             ys = [pt[1] for pt in corners]
             bounds.update_rect(min(xs), min(ys), max(xs), max(ys))
         elif kind == "vector":
-            points = logical.get("points") if isinstance(logical, Mapping) else None
+            points = logical.get("points") if logical is not data and isinstance(logical, Mapping) else None
+            if not isinstance(points, list) and isinstance(fields, VectorFields):
+                # Coordinates were packed as ints at ingest; skip re-coercing point dicts.
+                xy = fields.xy
+                for index in range(0, len(xy), 2):
+                    adj_x, adj_y = transform_point(float(xy[index]), float(xy[index + 1]))
+                    bounds.update_point(adj_x, adj_y)
+                return
             if not isinstance(points, list):
                 points = data.get("points") if isinstance(data, Mapping) else None
             if isinstance(points, list):
@@ -399,6 +441,11 @@ def determine_group_anchor(item: LegacyItem) -> Tuple[float, float]:
         if kind == "vector":
             points = logical.get("points") if isinstance(logical, Mapping) else None
             if not isinstance(points, list) or not points:
+                fields = item.fields
+                if isinstance(fields, VectorFields):
+                    if not fields.xy:
+                        return 0.0, 0.0
+                    return apply_transform_meta_to_point(transform_meta, float(fields.xy[0]), float(fields.xy[1]))
                 points = data.get("points") if isinstance(data, Mapping) else None
             if isinstance(points, list):
                 for point in points:
@@ -408,13 +455,14 @@ def determine_group_anchor(item: LegacyItem) -> Tuple[float, float]:
                     py = _safe_float(point.get("y"), 0.0)
                     return apply_transform_meta_to_point(transform_meta, px, py)
             return 0.0, 0.0
-        if kind == "rect":
-            px = _safe_float(logical.get("x", data.get("x", 0.0)), 0.0)
-            py = _safe_float(logical.get("y", data.get("y", 0.0)), 0.0)
-            return apply_transform_meta_to_point(transform_meta, px, py)
-        if kind == "message":
-            px = _safe_float(logical.get("x", data.get("x", 0.0)), 0.0)
-            py = _safe_float(logical.get("y", data.get("y", 0.0)), 0.0)
+        if kind in ("rect", "message"):
+            fields = item.fields
+            if isinstance(fields, (RectFields, MessageFields)):
+                stored_x, stored_y = fields.x, fields.y
+            else:
+                stored_x, stored_y = data.get("x", 0.0), data.get("y", 0.0)
+            px = _safe_float(logical.get("x", stored_x), 0.0)
+            py = _safe_float(logical.get("y", stored_y), 0.0)
             return apply_transform_meta_to_point(transform_meta, px, py)
     except (TypeError, ValueError):
         return 0.0, 0.0
@@ -5,12 +5,14 @@ from __future__ import annotations
 
 import json
 import math
+import re
 import time
-from dataclasses import dataclass
-from fnmatch import fnmatchcase
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from fnmatch import translate as fnmatch_translate
 from pathlib import Path
 import sys
-from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Pattern, Sequence, Tuple
 
 OVERLAY_ROOT = Path(__file__).resolve().parents[1]
 if str(OVERLAY_ROOT) not in sys.path:
@@ -19,6 +21,8 @@ if str(OVERLAY_ROOT) not in sys.path:
 from prefix_entries import PrefixEntry, parse_prefix_entries
 
 from overlay_client.debug_config import DebugConfig
+from overlay_client.prefix_trie import PrefixTrie
+from overlay_plugin.config_watcher import ConfigWatch, ConfigWatcher
 from overlay_plugin.overlay_api import PluginGroupingError, _normalise_background_color, _normalise_border_width
 
 
@@ -31,6 +35,7 @@ _MARKER_LABEL_POSITION_CHOICES = {"below", "above", "centered"}
 _DEFAULT_MARKER_LABEL_POSITION = "below"
 _CONTROLLER_PREVIEW_BOX_MODE_CHOICES = {"last", "max"}
 _DEFAULT_CONTROLLER_PREVIEW_BOX_MODE = "last"
+_RESOLUTION_CACHE_MAX = 4096
 
 
 @dataclass
@@ -48,6 +53,14 @@ class _GroupSpec:
     background_border_width: Optional[int] = None
 
 
+def _compile_globs(patterns: Sequence[str]) -> Optional[Pattern[str]]:
+    """Compile glob patterns into one regex whose matching group names the first pattern (``p<index>``)."""
+
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?P<p{index}>{fnmatch_translate(pattern)})" for index, pattern in enumerate(patterns)))
+
+
 @dataclass
 class _PluginConfig:
     name: str
@@ -56,6 +69,36 @@ class _PluginConfig:
     overrides: List[Tuple[str, JsonDict]]
     plugin_defaults: Optional[JsonDict]
     group_specs: Tuple[_GroupSpec, ...]
+    # Compiled from the fields above once per config load.
+    group_trie: PrefixTrie[Tuple[int, PrefixEntry]] = field(init=False, repr=False)
+    override_glob: Optional[Pattern[str]] = field(init=False, repr=False)
+    override_glob_cf: Optional[Pattern[str]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.group_trie = PrefixTrie()
+        for order, spec in enumerate(self.group_specs):
+            for entry in spec.prefixes:
+                self.group_trie.add(entry.value_cf, (order, entry))
+        patterns = [pattern for pattern, _spec in self.overrides]
+        self.override_glob = _compile_globs(patterns)
+        self.override_glob_cf = _compile_globs([pattern.casefold() for pattern in patterns])
+
+
+@dataclass(frozen=True)
+class GroupingResolution:
+    """Everything the override lookups derive from one (plugin hint, payload id) pair.
+
+    ``plugin`` is the canonical plugin ``apply``/``infer_plugin_name`` use (the hint
+    wins, else the id prefixes). ``group_key`` and ``group_spec`` follow
+    ``grouping_key_for``, which falls back to the id when the hint names no configured
+    plugin. ``group_label`` follows ``grouping_label_for_id`` and ignores the hint.
+    """
+
+    plugin: Optional[str]
+    group_key: Optional[Tuple[str, Optional[str]]]
+    group_spec: Optional[_GroupSpec]
+    group_label: Optional[str]
+    override: Optional[Tuple[str, JsonDict]]
 
 
 class PluginOverrideManager:
@@ -67,12 +110,17 @@ class PluginOverrideManager:
         logger,
         debug_config: Optional[DebugConfig] = None,
         groupings_loader: Optional[Any] = None,
+        config_watcher: Optional[ConfigWatcher] = None,
     ) -> None:
         self._path = config_path
         self._logger = logger
         self._groupings_loader = groupings_loader
         self._mtime: Optional[float] = None
         self._plugins: Dict[str, _PluginConfig] = {}
+        # Every plugin's id prefixes -> position of the plugin in ``_plugin_order``.
+        self._id_prefix_trie: PrefixTrie[int] = PrefixTrie()
+        self._plugin_order: List[_PluginConfig] = []
+        self._resolutions: "OrderedDict[Tuple[Optional[str], str, int], GroupingResolution]" = OrderedDict()
         self._debug_config = debug_config or DebugConfig()
         self._diagnostic_spans: Dict[Tuple[str, str], Tuple[float, float, float]] = {}
         self._generation: int = 0
@@ -82,6 +130,11 @@ class PluginOverrideManager:
         self._controller_active_nonce_ts: float = 0.0
         self._loaded_override_nonce: str = ""
         self._last_reload_ts: float = 0.0
+        # Registered before the first load so edits made while loading are not missed.
+        self._config_watch: Optional[ConfigWatch] = None
+        if config_watcher is not None:
+            paths = groupings_loader.paths().values() if groupings_loader is not None else (config_path,)
+            self._config_watch = config_watcher.watch(paths)
         self._load_config()
 
     def apply_override_payload(self, payload: Optional[Mapping[str, Any]], nonce: str) -> None:
@@ -118,15 +171,15 @@ class PluginOverrideManager:
 
         self._reload_if_needed()
 
-        plugin_name = self._determine_plugin_name(payload)
-        if plugin_name is None:
+        message_id = str(payload.get("id") or "")
+        resolution = self.resolve(self._plugin_hint(payload), message_id)
+        if resolution.plugin is None:
             return
 
-        config = self._plugins.get(plugin_name)
+        config = self._plugins.get(resolution.plugin)
         if config is None:
             return
 
-        message_id = str(payload.get("id") or "")
         display_name = config.name
 
         if config.plugin_defaults:
@@ -144,7 +197,7 @@ class PluginOverrideManager:
             if trace_defaults:
                 self._log_trace(display_name, message_id, "after_defaults", payload)
 
-        group_defaults = self._group_defaults_for(config, message_id)
+        group_defaults = self._group_defaults_for(resolution.group_spec, message_id)
         if group_defaults is not None:
             label, defaults = group_defaults
             trace_group = self._should_trace(display_name, message_id)
@@ -164,7 +217,7 @@ class PluginOverrideManager:
         if not message_id:
             return
 
-        selected = self._select_override(config, message_id)
+        selected = resolution.override
         if selected is None:
             return
 
@@ -211,6 +264,9 @@ class PluginOverrideManager:
     # Internal helpers
 
     def _reload_if_needed(self) -> None:
+        watch = self._config_watch
+        if watch is not None and not watch.poll() and (self._groupings_loader is None or self._loader_loaded):
+            return
         if self._groupings_loader is not None:
             try:
                 if not self._loader_loaded:
@@ -233,7 +289,7 @@ class PluginOverrideManager:
             if self._mtime is not None:
                 self._logger.info("Plugin override file %s no longer present; disabling overrides.", self._path)
             self._mtime = None
-            self._plugins.clear()
+            self._install_plugins({})
             return
 
         if self._mtime is not None and stat.st_mtime <= self._mtime:
@@ -245,7 +301,7 @@ class PluginOverrideManager:
         try:
             raw = json.loads(self._path.read_text(encoding="utf-8"))
         except FileNotFoundError:
-            self._plugins.clear()
+            self._install_plugins({})
             self._mtime = None
             self._logger.debug("Plugin override file %s not found; continuing without overrides.", self._path)
             return
@@ -569,7 +625,7 @@ class PluginOverrideManager:
                 group_specs=tuple(grouping_specs),
             )
 
-        self._plugins = plugins
+        self._install_plugins(plugins)
         self._diagnostic_spans.clear()
         self._mtime = mtime if mtime is not None else (self._path.stat().st_mtime if self._path.exists() else None)
         if controller_nonce:
@@ -587,6 +643,17 @@ class PluginOverrideManager:
         )
         self._generation += 1
 
+    def _install_plugins(self, plugins: Dict[str, _PluginConfig]) -> None:
+        self._plugins = plugins
+        id_prefix_trie: PrefixTrie[int] = PrefixTrie()
+        plugin_order = list(plugins.values())
+        for index, config in enumerate(plugin_order):
+            for prefix in config.match_id_prefixes:
+                id_prefix_trie.add(prefix, index)
+        self._id_prefix_trie = id_prefix_trie
+        self._plugin_order = plugin_order
+        self._resolutions.clear()
+
     @property
     def generation(self) -> int:
         return self._generation
@@ -601,6 +668,13 @@ class PluginOverrideManager:
     def override_generation_timestamp(self) -> float:
         return float(self._last_reload_ts or 0.0)
 
+    def close(self) -> None:
+        """Stop watching the override files; later lookups fall back to stat checks."""
+        watch = self._config_watch
+        self._config_watch = None
+        if watch is not None:
+            watch.close()
+
     def force_reload(self) -> None:
         """Forcefully reload the override configuration from disk."""
         self._mtime = None
@@ -612,38 +686,68 @@ class PluginOverrideManager:
         if not isinstance(payload, Mapping):
             return None
         self._reload_if_needed()
-        canonical = self._determine_plugin_name(payload)
+        canonical = self.resolve(self._plugin_hint(payload), str(payload.get("id") or "")).plugin
         if canonical is None:
             return None
         config = self._plugins.get(canonical)
         return config.name if config else canonical
 
-    def _config_for_payload_id(self, payload_id: str) -> Optional[_PluginConfig]:
-        if not isinstance(payload_id, str) or not payload_id:
-            return None
-        payload_cf = payload_id.casefold()
-        for config in self._plugins.values():
-            if not config.match_id_prefixes:
-                continue
-            if any(payload_cf.startswith(prefix) for prefix in config.match_id_prefixes):
-                return config
-        return None
+    def _config_for_id_cf(self, payload_cf: str) -> Optional[_PluginConfig]:
+        # The first configured plugin with any matching prefix wins.
+        first = min((index for _depth, index in self._id_prefix_trie.matches(payload_cf)), default=None)
+        return None if first is None else self._plugin_order[first]
 
     def grouping_label_for_id(self, payload_id: str) -> Optional[str]:
         """Return the first matching grouping label for a payload id, if any."""
 
-        config = self._config_for_payload_id(payload_id)
-        if config is None:
-            return None
-        payload_cf = payload_id.casefold()
-        for spec in config.group_specs:
-            for entry in spec.prefixes:
-                prefix = entry.value.casefold()
-                if payload_cf.startswith(prefix):
-                    return spec.label
-        return None
+        return self.resolve(None, payload_id).group_label
+
+    def resolve(self, plugin: Optional[str], payload_id: Optional[str]) -> GroupingResolution:
+        """Resolve plugin, group and override for a payload id, memoised per override generation."""
+
+        hint = self._canonical_plugin_name(plugin)
+        item_id = payload_id if isinstance(payload_id, str) else ""
+        key = (hint, item_id, self._generation)
+        cache = self._resolutions
+        resolution = cache.get(key)
+        if resolution is not None:
+            cache.move_to_end(key)
+            return resolution
+        resolution = self._compute_resolution(hint, item_id)
+        cache[key] = resolution
+        if len(cache) > _RESOLUTION_CACHE_MAX:
+            cache.popitem(last=False)
+        return resolution
+
+    def _compute_resolution(self, hint: Optional[str], item_id: str) -> GroupingResolution:
+        id_config = self._config_for_id_cf(item_id.casefold()) if item_id else None
+        plugin = hint if hint is not None else (id_config.canonical_name if id_config is not None else None)
+        config = self._plugins.get(plugin) if plugin is not None else None
+        group_config = config if config is not None else id_config
+
+        group_key: Optional[Tuple[str, Optional[str]]] = None
+        group_spec: Optional[_GroupSpec] = None
+        if group_config is not None and group_config.group_specs:
+            group_spec = self._select_group_spec(group_config, item_id)
+            label: Optional[str] = None
+            if group_spec is not None:
+                label = group_spec.label or (group_spec.prefixes[0].value if group_spec.prefixes else None)
+            group_key = (group_config.name, label)
+
+        group_label: Optional[str] = None
+        if id_config is not None:
+            # Every prefix entry counts as a prefix here, whatever its match mode.
+            matches = id_config.group_trie.matches(item_id.casefold())
+            first = min((order for _depth, (order, _entry) in matches), default=None)
+            if first is not None:
+                group_label = id_config.group_specs[first].label
+
+        override = self._select_override(config, item_id) if config is not None and item_id else None
+        return GroupingResolution(plugin, group_key, group_spec, group_label, override)
+
+    def _plugin_hint(self, payload: Mapping[str, Any]) -> Optional[str]:
+        """Canonical plugin named by the payload itself; ``resolve`` falls back to the id."""
 
-    def _determine_plugin_name(self, payload: Mapping[str, Any]) -> Optional[str]:
         for key in ("plugin", "plugin_name", "source_plugin"):
             value = payload.get(key)
             canonical = self._canonical_plugin_name(value)
@@ -663,102 +767,50 @@ class PluginOverrideManager:
                 canonical = self._canonical_plugin_name(raw.get(key))
                 if canonical:
                     return canonical
-
-        item_id = str(payload.get("id") or "")
-        if not item_id:
-            return None
-
-        item_id_cf = item_id.casefold()
-
-        for name, config in self._plugins.items():
-            if not config.match_id_prefixes:
-                continue
-            if any(item_id_cf.startswith(prefix) for prefix in config.match_id_prefixes):
-                return name
-
         return None
 
     def _select_override(self, config: _PluginConfig, message_id: str) -> Optional[Tuple[str, JsonDict]]:
-        message_id_cf = message_id.casefold()
-        for pattern, spec in config.overrides:
-            if fnmatchcase(message_id, pattern):
-                return pattern, spec
-            if fnmatchcase(message_id_cf, pattern.casefold()):
-                return pattern, spec
-        return None
-
-    def _group_defaults_for(self, config: _PluginConfig, message_id: str) -> Optional[Tuple[str, JsonDict]]:
-        if not config.group_specs:
+        # First pattern matching the id as sent, or casefolded against the casefolded pattern.
+        if config.override_glob is None or config.override_glob_cf is None:
             return None
-        if not message_id:
+        indices = []
+        for regex, candidate in ((config.override_glob, message_id), (config.override_glob_cf, message_id.casefold())):
+            match = regex.match(candidate)
+            if match is not None and match.lastgroup is not None:
+                indices.append(int(match.lastgroup[1:]))
+        if not indices:
             return None
-        spec = self._select_group_spec(config, message_id)
-        if spec is None:
+        return config.overrides[min(indices)]
+
+    @staticmethod
+    def _group_defaults_for(spec: Optional[_GroupSpec], message_id: str) -> Optional[Tuple[str, JsonDict]]:
+        if spec is None or not message_id:
             return None
         label_value = spec.label or (spec.prefixes[0].value if spec.prefixes else "")
         if spec.defaults:
             return label_value, dict(spec.defaults)
         return None
 
-    @staticmethod
-    def _match_prefix_score(prefixes: Sequence[PrefixEntry], payload_cf: str) -> Optional[Tuple[int, int]]:
-        best: Optional[Tuple[int, int]] = None
-        for entry in prefixes:
-            if entry.match_mode == "exact":
-                if payload_cf != entry.value_cf:
-                    continue
-                score = (2, len(entry.value))
-            else:
-                if not payload_cf.startswith(entry.value_cf):
-                    continue
-                score = (1, len(entry.value))
-            if best is None or score > best:
-                best = score
-        return best
-
     def _select_group_spec(self, config: _PluginConfig, payload_id: str) -> Optional[_GroupSpec]:
+        # Exact matches beat prefixes, longer entries beat shorter ones, earlier specs break ties.
         if not config.group_specs or not payload_id:
             return None
         payload_cf = payload_id.casefold()
         best: Optional[Tuple[int, int, int]] = None
-        selected: Optional[_GroupSpec] = None
-        for order, spec in enumerate(config.group_specs):
-            score = self._match_prefix_score(spec.prefixes, payload_cf)
-            if score is None:
-                continue
-            candidate = (score[0], score[1], -order)
+        for depth, (order, entry) in config.group_trie.matches(payload_cf):
+            if entry.match_mode == "exact":
+                if depth != len(payload_cf):
+                    continue
+                candidate = (2, len(entry.value), -order)
+            else:
+                candidate = (1, len(entry.value), -order)
             if best is None or candidate > best:
                 best = candidate
-                selected = spec
-        return selected
+        return None if best is None else config.group_specs[-best[2]]
 
     def grouping_key_for(self, plugin: Optional[str], payload_id: Optional[str]) -> Optional[Tuple[str, Optional[str]]]:
         self._reload_if_needed()
-        config: Optional[_PluginConfig] = None
-        plugin_label: Optional[str] = None
-
-        canonical = self._canonical_plugin_name(plugin)
-        if canonical is not None:
-            config = self._plugins.get(canonical)
-            if config is not None:
-                plugin_label = config.name
-
-        if config is None and isinstance(payload_id, str) and payload_id:
-            config = self._config_for_payload_id(payload_id)
-            if config is not None:
-                plugin_label = config.name
-
-        if config is None or plugin_label is None or not config.group_specs:
-            return None
-
-        if not isinstance(payload_id, str) or not payload_id:
-            return plugin_label, None
-
-        spec = self._select_group_spec(config, payload_id)
-        if spec is None:
-            return plugin_label, None
-        label_value = spec.label or (spec.prefixes[0].value if spec.prefixes else None)
-        return plugin_label, label_value
+        return self.resolve(plugin, payload_id).group_key
 
     def group_is_configured(self, plugin: Optional[str], suffix: Optional[str]) -> bool:
         self._reload_if_needed()
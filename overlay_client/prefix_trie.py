@@ -0,0 +1,59 @@
+"""Casefolded prefix trie used to resolve payload ids against configured prefixes."""
+from __future__ import annotations
+
+from typing import Dict, Generic, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Node(Generic[T]):
+    __slots__ = ("children", "values")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_Node[T]"] = {}
+        self.values: List[T] = []
+
+
+class PrefixTrie(Generic[T]):
+    """Map casefolded prefixes to values; a lookup walks the id once.
+
+    Lookup cost depends on the id length, not on how many prefixes are stored, so
+    resolving an id stays flat as more plugins and groups are configured.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self) -> None:
+        self._root: _Node[T] = _Node()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, prefix: str, value: T) -> None:
+        node = self._root
+        for char in prefix.casefold():
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+            node = child
+        node.values.append(value)
+        self._size += 1
+
+    def matches(self, text_cf: str) -> Iterator[Tuple[int, T]]:
+        """Yield ``(prefix_length, value)`` for every stored prefix of ``text_cf``, shortest first.
+
+        ``text_cf`` must already be casefolded. ``prefix_length == len(text_cf)`` marks
+        entries that match the whole id.
+        """
+        node = self._root
+        depth = 0
+        while True:
+            for value in node.values:
+                yield depth, value
+            if depth == len(text_cf):
+                return
+            node = node.children.get(text_cf[depth])
+            if node is None:
+                return
+            depth += 1
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Optional, Set, Tuple, List, Callable
+import math
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set, Tuple, List, Callable
 
 from PyQt6.QtGui import QPainter
 
 from overlay_client.viewport_helper import ScaleMode  # type: ignore
 from overlay_client.group_transform import GroupTransform  # type: ignore
 
+if TYPE_CHECKING:
+    from overlay_client.frame_plan import FramePlan, FrameSnapshot
+
 
 @dataclass(frozen=True)
 class RenderContext:
@@ -24,10 +29,79 @@ class RenderContext:
 @dataclass(frozen=True)
 class PayloadSnapshot:
     items_count: int
+    revision: int = 0
+
+
+GroupTuple = Tuple[str, Optional[str]]
+ScreenRect = Tuple[int, int, int, int]
+
+# Slack around group bounds for glyph overhang, pen width and antialiasing.
+_DIRTY_RECT_MARGIN_PX = 8
+# Past this many rectangles a full-window update is cheaper than a complex region.
+_MAX_DIRTY_RECTS = 32
+
+# How long paint keeps showing the previous frame while a frame plan is outstanding.
+_PLAN_WAIT_S = 0.25
+
+
+@dataclass
+class _GroupRenderCache:
+    """Layout output for one payload group, reused until the group's items change."""
+
+    members: Tuple[Tuple[str, int], ...]
+    revision: int = 0
+    commands: Dict[str, Any] = field(default_factory=dict)
+    bounds: Any = None
+    overlay_bounds: Any = None
+    transform: Optional[GroupTransform] = None
+    has_transform: bool = False
+    anchor_translation: Optional[Tuple[float, float]] = None
+    translated_bounds: Any = None
+
+
+@dataclass
+class _DirtyState:
+    """Which groups a rebuild has to lay out, worked out without touching the caches."""
+
+    full_rebuild: bool
+    revision: int
+    ordered: List[Tuple[str, GroupTuple]]
+    members_by_group: Dict[GroupTuple, List[Tuple[str, Any]]]
+    dirty_groups: Set[GroupTuple]
+    removed_groups: List[GroupTuple]
+
+
+@dataclass(frozen=True)
+class _PendingPlan:
+    """A frame snapshot handed to the frame planner, and the cache state it was taken against.
+
+    ``submitted_at`` is carried over from the plan this one replaced, so the wait
+    runs from the oldest snapshot whose layout has not landed yet.
+    """
+
+    serial: int
+    signature: Tuple[Any, ...]
+    epoch: int
+    state: _DirtyState
+    prepared_groups: Set[GroupTuple]
+    submitted_at: float
 
 
 class LegacyRenderPipeline:
-    """Encapsulates legacy render command construction and caching."""
+    """Encapsulates legacy render command construction and caching.
+
+    The cache is keyed on the payload store revision: repaints that do not change
+    items reuse it as-is. When the revision moves, only groups whose member
+    revisions changed are rebuilt; ``mark_dirty()`` (fonts, overrides) or a
+    viewport/debug signature change rebuilds everything. Each rebuild records the
+    screen rectangles of changed groups so repaints can be limited to them.
+
+    With a frame planner running, the owner hands the changed groups to
+    ``frame_snapshot`` instead and lays them out off the GUI thread; ``apply_plan``
+    then fills the group caches from the finished plan, reusing the dirty state
+    worked out at submit time. Paint keeps showing the previous frame while a plan
+    for the current state is outstanding, for at most ``_PLAN_WAIT_S``.
+    """
 
     def __init__(self, owner: Any) -> None:
         self._owner = owner
@@ -35,12 +109,33 @@ class LegacyRenderPipeline:
         self._legacy_cache_signature: Optional[Tuple[Any, ...]] = None
         self._legacy_render_cache: Optional[Dict[str, Any]] = None
         self._last_payload_results: Optional[Dict[str, Any]] = None
+        self._group_caches: Dict[GroupTuple, _GroupRenderCache] = {}
+        self._cached_revision: Optional[int] = None
+        self._last_rebuilt_groups: Set[GroupTuple] = set()
+        self._group_screen_rects: Dict[GroupTuple, Optional[ScreenRect]] = {}
+        self._pending_dirty_rects: Optional[List[ScreenRect]] = []
+        self._dirty_epoch = 0
+        self._plan_serial = 0
+        self._pending_plan: Optional[_PendingPlan] = None
 
     def mark_dirty(self) -> None:
         self._legacy_cache_dirty = True
         self._legacy_cache_signature = None
+        self._dirty_epoch += 1
+
+    @property
+    def plan_pending(self) -> bool:
+        return self._pending_plan is not None
+
+    def cancel_plan(self) -> None:
+        self._pending_plan = None
+
+    def group_revision(self, key: GroupTuple) -> Optional[int]:
+        cached = self._group_caches.get(key)
+        return None if cached is None else cached.revision
 
     def _legacy_render_signature(self, context: RenderContext, snapshot: PayloadSnapshot) -> Tuple[Any, ...]:
+        # Item changes are tracked through the store revision, not the signature.
         transform = context.mapper.transform
         return (
             context.width,
@@ -50,74 +145,253 @@ class LegacyRenderPipeline:
             getattr(transform, "offset", None),
             getattr(transform, "overflow_x", None),
             getattr(transform, "overflow_y", None),
-            snapshot.items_count,
             context.dev_mode,
             context.debug_bounds,
             context.debug_vertices,
         )
 
+    def take_dirty_rects(self, context: RenderContext, snapshot: PayloadSnapshot) -> Optional[List[ScreenRect]]:
+        """Bring the cache up to date and return the screen areas changed since the last call.
+
+        Each changed group contributes its old and new rectangle. ``None`` means the
+        change cannot be bounded (full rebuild, or a group without screen bounds)
+        and the whole window needs repainting.
+        """
+        self._ensure_legacy_render_cache(context, snapshot)
+        rects = self._pending_dirty_rects
+        self._pending_dirty_rects = []
+        return rects
+
+    def _cache_current(self, snapshot: PayloadSnapshot, signature: Tuple[Any, ...]) -> bool:
+        return (
+            self._legacy_render_cache is not None
+            and not self._legacy_cache_dirty
+            and snapshot.revision == self._cached_revision
+            and signature == self._legacy_cache_signature
+        )
+
+    def _ensure_legacy_render_cache(
+        self, context: RenderContext, snapshot: PayloadSnapshot
+    ) -> Optional[Dict[str, Any]]:
+        signature = self._legacy_render_signature(context, snapshot)
+        cache = self._legacy_render_cache
+        if not self._cache_current(snapshot, signature):
+            if cache is not None and self._plan_outstanding(signature):
+                return cache
+            cache = self._rebuild_legacy_render_cache(context.mapper, signature, context.settings, context.grouping)
+        return cache
+
+    def _plan_outstanding(self, signature: Tuple[Any, ...]) -> bool:
+        pending = self._pending_plan
+        return (
+            pending is not None
+            and pending.signature == signature
+            and pending.epoch == self._dirty_epoch
+            and time.monotonic() - pending.submitted_at < _PLAN_WAIT_S
+        )
+
+    def awaiting_plan(self, context: RenderContext, snapshot: PayloadSnapshot) -> bool:
+        """True when the outstanding frame plan already covers the current payloads and viewport."""
+
+        pending = self._pending_plan
+        return (
+            pending is not None
+            and pending.state.revision == snapshot.revision
+            and self._plan_outstanding(self._legacy_render_signature(context, snapshot))
+        )
+
+    def frame_snapshot(self, context: RenderContext, snapshot: PayloadSnapshot) -> Optional["FrameSnapshot"]:
+        """Capture the groups that need laying out for the frame planner.
+
+        Returns None when there is nothing to lay out; the caller then repaints as
+        usual (a removal-only change needs no layout). Fill-mode group transforms
+        are refreshed here, on the GUI thread, so the snapshot carries final values.
+        """
+
+        signature = self._legacy_render_signature(context, snapshot)
+        if self._cache_current(snapshot, signature):
+            return None
+        mapper = context.mapper
+        grouping_helper = self._grouping_helper(context.settings, context.grouping)
+        store = getattr(self._owner, "_payload_model").store
+        state = self._dirty_state(store, grouping_helper, signature)
+        if not state.dirty_groups:
+            return None
+        prepared_groups = self._prepare_groups(grouping_helper, mapper, state)
+        self._plan_serial += 1
+        members = [
+            (item_id, legacy_item, key)
+            for key in state.dirty_groups
+            for item_id, legacy_item in state.members_by_group[key]
+        ]
+        frame = self._owner._frame_snapshot(self._plan_serial, mapper, members)
+        previous = self._pending_plan
+        self._pending_plan = _PendingPlan(
+            serial=self._plan_serial,
+            signature=signature,
+            epoch=self._dirty_epoch,
+            state=state,
+            prepared_groups=prepared_groups,
+            submitted_at=previous.submitted_at if previous is not None else time.monotonic(),
+        )
+        return frame
+
+    def apply_plan(self, plan: "FramePlan", context: RenderContext, snapshot: PayloadSnapshot) -> bool:
+        """Rebuild the cache from a finished frame plan; False when the plan no longer matches the payloads.
+
+        The payloads must still be at the store revision the snapshot was taken at,
+        so the dirty state recorded then still holds and is not worked out again.
+        """
+
+        pending = self._pending_plan
+        if pending is None or plan.serial != pending.serial:
+            return False
+        self._pending_plan = None
+        signature = self._legacy_render_signature(context, snapshot)
+        if (
+            not plan.complete
+            or signature != pending.signature
+            or self._dirty_epoch != pending.epoch
+            or snapshot.revision != pending.state.revision
+            or self._cache_current(snapshot, signature)
+        ):
+            return False
+        cache = self._rebuild_legacy_render_cache(
+            context.mapper, signature, context.settings, context.grouping, plan=plan, pending=pending
+        )
+        return cache is not None
+
+    def _grouping_helper(self, settings: RenderSettings, grouping: Any) -> Any:
+        grouping_helper = grouping or getattr(self._owner, "_grouping_helper")
+        try:
+            if hasattr(grouping_helper, "set_render_settings"):
+                grouping_helper.set_render_settings(settings)
+        except Exception:
+            pass
+        return grouping_helper
+
+    def _dirty_state(self, legacy_items: Any, grouping_helper: Any, signature: Tuple[Any, ...]) -> _DirtyState:
+        full_rebuild = (
+            self._legacy_cache_dirty
+            or self._legacy_render_cache is None
+            or signature != self._legacy_cache_signature
+        )
+        ordered: List[Tuple[str, GroupTuple]] = []
+        members_by_group: Dict[GroupTuple, List[Tuple[str, Any]]] = {}
+        for item_id, legacy_item in legacy_items.items():
+            key = grouping_helper.group_key_for(item_id, legacy_item.plugin).as_tuple()
+            ordered.append((item_id, key))
+            members_by_group.setdefault(key, []).append((item_id, legacy_item))
+
+        caches = self._group_caches
+        removed_groups: List[GroupTuple] = []
+        if full_rebuild:
+            dirty_groups: Set[GroupTuple] = set(members_by_group)
+        else:
+            dirty_groups = set()
+            for key, members in members_by_group.items():
+                cached = caches.get(key)
+                if cached is None or cached.members != self._group_members(legacy_items, members):
+                    dirty_groups.add(key)
+            removed_groups = [key for key in caches if key not in members_by_group]
+        return _DirtyState(
+            full_rebuild=full_rebuild,
+            revision=legacy_items.revision,
+            ordered=ordered,
+            members_by_group=members_by_group,
+            dirty_groups=dirty_groups,
+            removed_groups=removed_groups,
+        )
+
+    @staticmethod
+    def _prepare_groups(
+        grouping_helper: Any,
+        mapper: Any,
+        state: _DirtyState,
+        skip: Optional[Set[GroupTuple]] = None,
+    ) -> Set[GroupTuple]:
+        """Refresh fill-mode transforms for the changed groups and return the keys refreshed."""
+
+        fill_mode = mapper.transform.mode is ScaleMode.FILL
+        if state.full_rebuild:
+            if fill_mode:
+                grouping_helper.prepare(mapper)
+            else:
+                grouping_helper.reset()
+            return set(state.members_by_group)
+        group_keys = state.dirty_groups.union(state.removed_groups)
+        if skip:
+            group_keys -= skip
+        if fill_mode and group_keys:
+            grouping_helper.prepare(mapper, group_keys)
+        return group_keys
+
     def _rebuild_legacy_render_cache(
         self,
         mapper: Any,
         signature: Tuple[Any, ...],
         settings: RenderSettings,
         grouping: Any,
+        plan: Optional["FramePlan"] = None,
+        pending: Optional[_PendingPlan] = None,
     ) -> Optional[Dict[str, Any]]:
         owner = self._owner
-        grouping_helper = grouping or getattr(self._owner, "_grouping_helper")
-        try:
-            if hasattr(grouping_helper, "set_render_settings"):
-                grouping_helper.set_render_settings(settings)
-        except Exception:
-            pass
-        if mapper.transform.mode is ScaleMode.FILL:
-            grouping_helper.prepare(mapper)
+        grouping_helper = self._grouping_helper(settings, grouping)
+        if pending is not None:
+            state = pending.state
+        else:
+            state = self._dirty_state(getattr(owner, "_payload_model").store, grouping_helper, signature)
+        full_rebuild = state.full_rebuild
+        revision = state.revision
+        ordered = state.ordered
+        members_by_group = state.members_by_group
+        dirty_groups = state.dirty_groups
+
+        caches = self._group_caches
+        if full_rebuild:
+            caches.clear()
         else:
-            grouping_helper.reset()
-        overlay_bounds_hint: Optional[Dict[Tuple[str, Optional[str]], Any]] = None
+            for key in state.removed_groups:
+                del caches[key]
+
+        if pending is None:
+            self._prepare_groups(grouping_helper, mapper, state)
+        elif not full_rebuild:
+            # The transforms the plan was laid out with were refreshed when the snapshot was taken.
+            self._prepare_groups(
+                grouping_helper,
+                mapper,
+                _DirtyState(False, revision, ordered, members_by_group, set(), state.removed_groups),
+                skip=pending.prepared_groups,
+            )
+
+        if dirty_groups:
+            self._build_group_caches(owner, grouping_helper, mapper, dirty_groups, members_by_group, plan=plan)
+        self._last_rebuilt_groups = dirty_groups
+
         commands: List[Any] = []
-        bounds_by_group: Dict[Tuple[str, Optional[str]], Any] = {}
-        overlay_bounds_by_group: Dict[Tuple[str, Optional[str]], Any] = {}
-        effective_anchor_by_group: Dict[Tuple[str, Optional[str]], Tuple[float, float]] = {}
-        transform_by_group: Dict[Tuple[str, Optional[str]], Optional[GroupTransform]] = {}
-        legacy_items = getattr(owner, "_payload_model").store
-        passes = 2 if legacy_items else 1
-        for pass_index in range(passes):
-            if hasattr(grouping_helper, "build_commands_for_pass"):
-                (
-                    commands,
-                    bounds_by_group,
-                    overlay_bounds_by_group,
-                    effective_anchor_by_group,
-                    transform_by_group,
-                ) = grouping_helper.build_commands_for_pass(
-                    mapper,
-                    overlay_bounds_hint,
-                    collect_only=(pass_index == 0 and passes > 1),
-                )
-            else:
-                (
-                    commands,
-                    bounds_by_group,
-                    overlay_bounds_by_group,
-                    effective_anchor_by_group,
-                    transform_by_group,
-                ) = owner._build_legacy_commands_for_pass(  # type: ignore[attr-defined]
-                    mapper,
-                    overlay_bounds_hint,
-                    collect_only=(pass_index == 0 and passes > 1),
-                )
-            overlay_bounds_hint = overlay_bounds_by_group
-            if not legacy_items:
-                break
+        for item_id, key in ordered:
+            command = caches[key].commands.get(item_id)
+            if command is not None:
+                commands.append(command)
+        bounds_by_group: Dict[GroupTuple, Any] = {}
+        overlay_bounds_by_group: Dict[GroupTuple, Any] = {}
+        transform_by_group: Dict[GroupTuple, Optional[GroupTransform]] = {}
+        anchor_translation_by_group: Dict[GroupTuple, Tuple[float, float]] = {}
+        translated_bounds_by_group: Dict[GroupTuple, Any] = {}
+        for key, cached in caches.items():
+            if cached.bounds is not None:
+                bounds_by_group[key] = cached.bounds
+            if cached.overlay_bounds is not None:
+                overlay_bounds_by_group[key] = cached.overlay_bounds
+            if cached.has_transform:
+                transform_by_group[key] = cached.transform
+            if cached.anchor_translation is not None:
+                anchor_translation_by_group[key] = cached.anchor_translation
+            if cached.translated_bounds is not None:
+                translated_bounds_by_group[key] = cached.translated_bounds
+        self._cached_revision = revision
 
-        anchor_translation_by_group, translated_bounds_by_group = owner._prepare_anchor_translations(
-            mapper,
-            bounds_by_group,
-            overlay_bounds_by_group,
-            effective_anchor_by_group,
-            transform_by_group,
-        )
         overlay_bounds_base = owner._collect_base_overlay_bounds(commands)
         transform_candidates: Dict[Tuple[str, Optional[str]], Tuple[str, Optional[str]]] = {}
         latest_base_payload: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
@@ -262,18 +536,168 @@ class LegacyRenderPipeline:
             "report_overlay_bounds": report_overlay_bounds,
             "transform_by_group": transform_by_group,
         }
+        self._note_dirty_rects(
+            self._screen_rects_by_group(commands, translated_bounds_by_group, translations, transform_by_group),
+            dirty_groups,
+            full_rebuild,
+        )
         self._legacy_cache_signature = signature
         self._legacy_cache_dirty = False
         return self._legacy_render_cache
 
+    @staticmethod
+    def _screen_rects_by_group(
+        commands: List[Any],
+        translated_bounds_by_group: Dict[GroupTuple, Any],
+        translations: Dict[GroupTuple, Tuple[int, int]],
+        transform_by_group: Dict[GroupTuple, Optional[GroupTransform]],
+    ) -> Dict[GroupTuple, Optional[ScreenRect]]:
+        """Final on-screen rectangle per drawn group (after justification, nudges and background border)."""
+
+        rects: Dict[GroupTuple, Optional[ScreenRect]] = {}
+        for command in commands:
+            key = command.group_key.as_tuple()
+            if key in rects:
+                continue
+            bounds = translated_bounds_by_group.get(key)
+            if bounds is None or not bounds.is_valid():
+                rects[key] = None
+                continue
+            nudge_x, nudge_y = translations.get(key, (0, 0))
+            try:
+                border = max(0, int(getattr(transform_by_group.get(key), "background_border_width", 0) or 0))
+            except (TypeError, ValueError):
+                border = 0
+            margin = _DIRTY_RECT_MARGIN_PX + border
+            edges = (bounds.min_x + nudge_x, bounds.min_y + nudge_y, bounds.max_x + nudge_x, bounds.max_y + nudge_y)
+            if not all(math.isfinite(edge) for edge in edges):
+                rects[key] = None
+                continue
+            left = math.floor(edges[0]) - margin
+            top = math.floor(edges[1]) - margin
+            right = math.ceil(edges[2]) + margin
+            bottom = math.ceil(edges[3]) + margin
+            rects[key] = (left, top, right - left, bottom - top)
+        return rects
+
+    def _note_dirty_rects(
+        self,
+        screen_rects: Dict[GroupTuple, Optional[ScreenRect]],
+        changed_groups: Set[GroupTuple],
+        full_rebuild: bool,
+    ) -> None:
+        previous = self._group_screen_rects
+        self._group_screen_rects = screen_rects
+        pending = self._pending_dirty_rects
+        if pending is None:
+            return
+        if full_rebuild:
+            self._pending_dirty_rects = None
+            return
+        # Nudges and justification can move groups whose items did not change, so compare every rectangle.
+        for key in previous.keys() | screen_rects.keys():
+            unchanged = key in previous and key in screen_rects and previous[key] == screen_rects[key]
+            if unchanged and key not in changed_groups:
+                continue
+            for rects in (previous, screen_rects):
+                if key not in rects:
+                    continue
+                rect = rects[key]
+                if rect is None:
+                    self._pending_dirty_rects = None
+                    return
+                if not pending or pending[-1] != rect:
+                    pending.append(rect)
+        if len(pending) > _MAX_DIRTY_RECTS:
+            self._pending_dirty_rects = None
+
+    @staticmethod
+    def _group_members(store: Any, members: List[Tuple[str, Any]]) -> Tuple[Tuple[str, int], ...]:
+        # Member ids plus the store revision each was last set at; any add, update or removal changes it.
+        return tuple((item_id, store.item_revision(item_id)) for item_id, _legacy_item in members)
+
+    def _build_group_caches(
+        self,
+        owner: Any,
+        grouping_helper: Any,
+        mapper: Any,
+        dirty_groups: Set[GroupTuple],
+        members_by_group: Dict[GroupTuple, List[Tuple[str, Any]]],
+        plan: Optional["FramePlan"] = None,
+    ) -> None:
+        """Run the two layout passes for ``dirty_groups`` (or take them from ``plan``) and store the per-group results."""
+
+        items = [member for key in dirty_groups for member in members_by_group.get(key, ())]
+        overlay_bounds_hint: Optional[Dict[GroupTuple, Any]] = None
+        commands: List[Any] = []
+        bounds_by_group: Dict[GroupTuple, Any] = {}
+        overlay_bounds_by_group: Dict[GroupTuple, Any] = {}
+        effective_anchor_by_group: Dict[GroupTuple, Tuple[float, float]] = {}
+        transform_by_group: Dict[GroupTuple, Optional[GroupTransform]] = {}
+        passes = 0 if plan is not None else 2 if items else 1
+        if plan is not None:
+            (
+                commands,
+                bounds_by_group,
+                overlay_bounds_by_group,
+                effective_anchor_by_group,
+                transform_by_group,
+            ) = owner._commands_from_frame_plan(plan, items)
+        for pass_index in range(passes):
+            if hasattr(grouping_helper, "build_commands_for_pass"):
+                build = grouping_helper.build_commands_for_pass
+            else:
+                build = owner._build_legacy_commands_for_pass  # type: ignore[attr-defined]
+            (
+                commands,
+                bounds_by_group,
+                overlay_bounds_by_group,
+                effective_anchor_by_group,
+                transform_by_group,
+            ) = build(
+                mapper,
+                overlay_bounds_hint,
+                collect_only=(pass_index == 0 and passes > 1),
+                items=items,
+            )
+            overlay_bounds_hint = overlay_bounds_by_group
+            if not items:
+                break
+
+        anchor_translation_by_group, translated_bounds_by_group = owner._prepare_anchor_translations(
+            mapper,
+            bounds_by_group,
+            overlay_bounds_by_group,
+            effective_anchor_by_group,
+            transform_by_group,
+        )
+        store = getattr(owner, "_payload_model").store
+        caches = self._group_caches
+        for key in dirty_groups:
+            members = members_by_group.get(key)
+            if members is None:
+                caches.pop(key, None)
+                continue
+            fingerprint = self._group_members(store, members)
+            caches[key] = _GroupRenderCache(
+                members=fingerprint,
+                revision=max(member_revision for _item_id, member_revision in fingerprint),
+                bounds=bounds_by_group.get(key),
+                overlay_bounds=overlay_bounds_by_group.get(key),
+                transform=transform_by_group.get(key),
+                has_transform=key in transform_by_group,
+                anchor_translation=anchor_translation_by_group.get(key),
+                translated_bounds=translated_bounds_by_group.get(key),
+            )
+        for command in commands:
+            cached = caches.get(command.group_key.as_tuple())
+            if cached is not None:
+                cached.commands[command.legacy_item.item_id] = command
+
     def paint(self, painter: QPainter, context: RenderContext, snapshot: PayloadSnapshot) -> None:
         owner = self._owner
         owner._cycle_anchor_points = {}
-        mapper = context.mapper
-        signature = self._legacy_render_signature(context, snapshot)
-        cache = self._legacy_render_cache
-        if cache is None or self._legacy_cache_dirty or signature != self._legacy_cache_signature:
-            cache = self._rebuild_legacy_render_cache(mapper, signature, context.settings, context.grouping)
+        cache = self._ensure_legacy_render_cache(context, snapshot)
         if cache is None:
             return
         # Rendering is handled by the owner; pipeline only prepares data and caches.
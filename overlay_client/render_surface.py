@@ -2,28 +2,61 @@
 from __future__ import annotations
 
 import logging
+import os
 import sys
 import math
 import time
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, MutableMapping, Optional, Sequence, Set, Tuple
 
-from PyQt6.QtCore import QPoint, QRect, Qt
-from PyQt6.QtGui import QBrush, QColor, QFont, QFontMetrics, QPainter, QPen
+from PyQt6.QtCore import QObject, QPoint, QRect, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QBrush, QColor, QFont, QFontMetrics, QPainter, QPen, QRegion
 
 from overlay_client.anchor_helpers import CommandContext, build_baseline_bounds, compute_justification_offsets
+from overlay_client.frame_plan import (
+    FontSpec,
+    FramePlan,
+    FramePlanner,
+    FrameSnapshot,
+    ItemLayout,
+    MessageLayout,
+    PlanEntry,
+    RectLayout,
+    TextMetrics,
+    VectorLayout,
+    message_geometry,
+    rect_colors,
+    rect_geometry,
+    snapshot_item,
+    vector_screen_bounds,
+)
+from overlay_client.font_utils import FontPool, font_line_spacing, text_block_metrics
 from overlay_client.group_transform import GroupKey, GroupTransform
 from overlay_client.legacy_processor import TraceCallback
-from overlay_client.legacy_store import LegacyItem
+from overlay_client.legacy_store import (
+    LegacyItem,
+    MessageFields,
+    RectFields,
+    VectorFields,
+    parse_color_rgba,
+    vector_points,
+)
 from overlay_client.offscreen_logger import log_offscreen_payload
 from overlay_client.paint_commands import (
+    GroupDraw,
+    GroupLayerCache,
     _LegacyPaintCommand,
     _MessagePaintCommand,
     _RectPaintCommand,
     _VectorPaintCommand,
+    qcolor_from_rgba,
+    qcolor_from_spec,
+    spec_rgba,
 )
 from overlay_client.payload_builders import build_group_context
-from overlay_client.render_pipeline import PayloadSnapshot, RenderContext, RenderSettings
+from overlay_client.render_pipeline import _PLAN_WAIT_S, PayloadSnapshot, RenderContext, RenderSettings
+from overlay_client.text_cache import LRUTextCache
 from overlay_client.viewport_transform import (
     LegacyMapper,
     ViewportState,
@@ -105,6 +138,38 @@ class _MeasuredText:
     descent: int
 
 
+class _FramePlanBridge(QObject):
+    """Hands finished frame plans from the planner thread to the GUI thread."""
+
+    plan_ready = pyqtSignal(object)
+
+
+class _PlannerTextMeasurer:
+    """Measures message text for the frame planner, on the planner thread.
+
+    The window's font pool and text caches are GUI-thread only, so this keeps its
+    own. Both are dropped when the font generation moves (font, fallback or DPI
+    change).
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self._fonts = FontPool()
+        self._cache = LRUTextCache(max_entries, max_bytes)
+        self._generation: Optional[int] = None
+
+    def __call__(self, font: FontSpec, text: str, point_size: float) -> TextMetrics:
+        if font.generation != self._generation:
+            self._fonts.clear()
+            self._cache.clear()
+            self._generation = font.generation
+        key = (text, point_size, font.family, font.fallbacks, font.device_ratio)
+        cached = self._cache.get(key)
+        if cached is None:
+            metrics = self._fonts.metrics(font.family, font.fallbacks, point_size, device_ratio=font.device_ratio)
+            cached = TextMetrics(*text_block_metrics(metrics, text))
+            self._cache[key] = cached
+        return cached
+
 
 _LINE_WIDTH_DEFAULTS_FALLBACK: Dict[str, int] = {
     "grid": 1,
@@ -251,7 +316,7 @@ class RenderSurfaceMixin:
     def _trace_legacy_store_event(self, stage: str, item: LegacyItem) -> None:
         details: Dict[str, Any] = {"kind": item.kind}
         if item.kind == "vector":
-            details["points"] = item.data.get("points")
+            details["points"] = vector_points(item)
         self._log_legacy_trace(item.plugin, item.item_id, stage, details)
 
     def _current_override_nonce(self) -> str:
@@ -312,10 +377,23 @@ class RenderSurfaceMixin:
             override_generation=self._override_manager.generation,
             group_label=group_label,
         ):
-            if self._cycle_payload_enabled:
-                self._sync_cycle_items()
-            self._mark_legacy_cache_dirty()
-            self._request_repaint("ingest", immediate=self._should_bypass_debounce(payload))
+            immediate = self._should_bypass_debounce(payload)
+            if self._legacy_batch_depth:
+                # Part of an OverlayBatch: mark dirty and repaint once the whole batch is in.
+                self._legacy_batch_changed = True
+                self._legacy_batch_immediate = self._legacy_batch_immediate or immediate
+                return
+            self._finish_legacy_ingest(immediate)
+        else:
+            # Deduped repeats only push the expiry out; re-arm the purge timer for it.
+            self._schedule_legacy_purge()
+
+    def _finish_legacy_ingest(self, immediate: bool) -> None:
+        if self._cycle_payload_enabled:
+            self._sync_cycle_items()
+        # The store revision already tells the render cache which groups changed.
+        self._request_repaint("ingest", immediate=immediate)
+        self._schedule_legacy_purge()
 
     def _purge_legacy(self) -> None:
         now = time.monotonic()
@@ -323,7 +401,6 @@ class RenderSurfaceMixin:
         if self._payload_model.purge_expired(now):
             if self._cycle_payload_enabled:
                 self._sync_cycle_items()
-            self._mark_legacy_cache_dirty()
             expired_count = max(0, previous_count - len(self._payload_model))
             if expired_count and self._repaint_metrics.get("enabled"):
                 _CLIENT_LOGGER.debug(
@@ -332,14 +409,31 @@ class RenderSurfaceMixin:
                     getattr(self, "_repaint_timer", None).isActive() if getattr(self, "_repaint_timer", None) else False,
                 )
             self._request_repaint("purge")
-        if not len(self._payload_model):
-            self._group_log_pending_base.clear()
-            self._group_log_pending_transform.clear()
-            self._group_log_next_allowed.clear()
-            self._logged_group_bounds.clear()
-            self._logged_group_transforms.clear()
+        self._schedule_legacy_purge()
 
-    def _paint_legacy(self, painter: QPainter) -> None:
+    def _schedule_legacy_purge(self) -> None:
+        """Arm the single-shot purge timer for the earliest expiry; idle overlays keep it stopped."""
+
+        timer = getattr(self, "_legacy_timer", None)
+        if timer is None:
+            return
+        next_expiry = self._payload_model.next_expiry()
+        if next_expiry is None:
+            timer.stop()
+            if not len(self._payload_model):
+                self._group_log_pending_base.clear()
+                self._group_log_pending_transform.clear()
+                self._group_log_next_allowed.clear()
+                self._logged_group_bounds.clear()
+                self._logged_group_transforms.clear()
+            return
+        # Items expire once ``now`` passes their expiry, so fire just after it.
+        delay_ms = max(0, int(math.ceil((next_expiry - time.monotonic()) * 1000.0)) + 1)
+        if timer.isActive() and timer.remainingTime() <= delay_ms:
+            return
+        timer.start(delay_ms)
+
+    def _legacy_render_inputs(self) -> Tuple[LegacyMapper, RenderContext, PayloadSnapshot]:
         mapper = self._compute_legacy_mapper()
         state = self._viewport_state()
         context = RenderContext(
@@ -356,7 +450,107 @@ class RenderSurfaceMixin:
             ),
             grouping=self._grouping_adapter,
         )
-        snapshot = PayloadSnapshot(items_count=len(list(self._payload_model.store.items())))
+        snapshot = PayloadSnapshot(items_count=len(self._payload_model), revision=self._payload_model.revision)
+        return mapper, context, snapshot
+
+    def _legacy_dirty_region(self) -> Optional[QRegion]:
+        """Screen region touched by payload changes since the last call, or None to repaint everything."""
+        if not self._dirty_region_repaint:
+            return None
+        if self._dev_mode_enabled or self._show_debug_overlay or self._cycle_payload_enabled:
+            # Debug helpers and the cycle overlay draw outside group bounds.
+            return None
+        if getattr(self, "_controller_active_group", None):
+            return None
+        _mapper, context, snapshot = self._legacy_render_inputs()
+        rects = self._render_pipeline.take_dirty_rects(context, snapshot)
+        if rects is None:
+            return None
+        region = QRegion()
+        for left, top, width, height in rects:
+            region = region.united(QRect(left, top, width, height))
+        return region.intersected(self.rect())
+
+    def start_frame_planner(self) -> bool:
+        """Lay out payload changes on a background thread from now on.
+
+        Set ``EDMC_OVERLAY_FRAME_PLANNER=0`` to keep layout on the GUI thread.
+        """
+        planner_env = (os.getenv("EDMC_OVERLAY_FRAME_PLANNER") or "1").strip().lower()
+        if planner_env in {"0", "false", "no", "off"}:
+            return False
+        if self._frame_planner is None:
+            bridge = _FramePlanBridge(self)
+            bridge.plan_ready.connect(self._apply_frame_plan)
+            self._frame_plan_bridge = bridge
+            self._frame_planner = FramePlanner(
+                bridge.plan_ready.emit,
+                _PlannerTextMeasurer(self._TEXT_CACHE_MAX, self._TEXT_CACHE_MAX_BYTES),
+            )
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.setInterval(int(_PLAN_WAIT_S * 1000))
+            timer.timeout.connect(self._frame_plan_overdue)
+            self._frame_plan_timer = timer
+        self._frame_planner.start()
+        return True
+
+    def stop_frame_planner(self) -> None:
+        planner = self._frame_planner
+        if planner is not None:
+            planner.stop()
+        if self._frame_plan_timer is not None:
+            self._frame_plan_timer.stop()
+        self._render_pipeline.cancel_plan()
+
+    def _submit_frame_plan(self) -> bool:
+        """Hand changed payload groups to the frame planner; True when a plan will trigger the repaint."""
+        planner = self._frame_planner
+        if planner is None or not planner.running:
+            return False
+        if self._debug_config.trace_enabled or self._text_measurer is not None:
+            # Payload tracing logs from inside the builders, and an injected measurer is a
+            # GUI-thread hook; keep those frames on the GUI thread.
+            return False
+        _mapper, context, snapshot = self._legacy_render_inputs()
+        pipeline = self._render_pipeline
+        if pipeline.awaiting_plan(context, snapshot):
+            return True
+        frame = pipeline.frame_snapshot(context, snapshot)
+        if frame is None:
+            return False
+        if not planner.submit(frame):
+            pipeline.cancel_plan()
+            return False
+        timer = self._frame_plan_timer
+        if timer is not None and not timer.isActive():
+            # Measured from the first plan still unapplied, so a steady stream of
+            # superseding snapshots cannot hold the previous frame on screen.
+            timer.start()
+        return True
+
+    def _apply_frame_plan(self, plan: FramePlan) -> None:
+        pipeline = self._render_pipeline
+        _mapper, context, snapshot = self._legacy_render_inputs()
+        applied = pipeline.apply_plan(plan, context, snapshot)
+        if applied or not pipeline.plan_pending:
+            if self._frame_plan_timer is not None:
+                self._frame_plan_timer.stop()
+            # A rejected plan (payloads moved on meanwhile) falls back to laying the frame out here.
+            self._flush_repaint(plan=False)
+        else:
+            # Superseded by a newer snapshot; paint keeps the previous frame until that plan lands.
+            self.update()
+
+    def _frame_plan_overdue(self) -> None:
+        """Lay the frame out here when the planner has not delivered a plan in time."""
+        if not self._render_pipeline.plan_pending:
+            return
+        self._render_pipeline.cancel_plan()
+        self._flush_repaint(plan=False)
+
+    def _paint_legacy(self, painter: QPainter) -> None:
+        mapper, context, snapshot = self._legacy_render_inputs()
         self._render_pipeline.paint(painter, context, snapshot)
         payload_results = getattr(self._render_pipeline, "_last_payload_results", None)
         if payload_results:
@@ -565,6 +759,8 @@ class RenderSurfaceMixin:
             translations,
         )
         vertex_points: List[Tuple[int, int]] = []
+        layer_cache = self._group_layer_cache
+        runs: List[Tuple[Tuple[str, Optional[str]], List[GroupDraw]]] = []
         for command in commands:
             key_tuple = command.group_key.as_tuple()
             translation_x, translation_y = anchor_translation_by_group.get(key_tuple, (0.0, 0.0))
@@ -581,7 +777,12 @@ class RenderSurfaceMixin:
                 offscreen_payloads=self._offscreen_payloads,
                 log_fn=_CLIENT_LOGGER.warning,
             )
-            command.paint(self, painter, payload_offset_x, payload_offset_y)
+            if layer_cache is None:
+                command.paint(self, painter, payload_offset_x, payload_offset_y)
+            elif runs and runs[-1][0] == key_tuple:
+                runs[-1][1].append((command, payload_offset_x, payload_offset_y))
+            else:
+                runs.append((key_tuple, [(command, payload_offset_x, payload_offset_y)]))
             if draw_vertex_markers and command.bounds:
                 left, top, right, bottom = command.bounds
                 group_corners = [
@@ -609,11 +810,45 @@ class RenderSurfaceMixin:
                                 "payload_kind": getattr(command.legacy_item, "kind", "unknown"),
                             },
                         )
+        if layer_cache is not None:
+            self._paint_group_layers(painter, layer_cache, runs)
         if draw_vertex_markers and vertex_points:
             self._draw_payload_vertex_markers(painter, vertex_points)
         if collect_debug_helpers:
             self._draw_group_debug_helpers(painter, mapper)
 
+    def _paint_group_layers(
+        self,
+        painter: QPainter,
+        layer_cache: GroupLayerCache,
+        runs: Sequence[Tuple[Tuple[str, Optional[str]], Sequence[GroupDraw]]],
+    ) -> None:
+        """Composite retained layers in paint order, re-recording only layers whose key changed.
+
+        Each run of consecutive commands from one group is its own layer, so another
+        group's command drawn in between still lands between them.
+        """
+        style = (self._payload_opacity_percent(), self._text_cache_generation, self._font_family)
+        run_counts: Dict[Tuple[str, Optional[str]], int] = {}
+        layer_ids: List[Tuple[Tuple[str, Optional[str]], int]] = []
+        for key, draws in runs:
+            run_index = run_counts.get(key, 0)
+            run_counts[key] = run_index + 1
+            layer_id = (key, run_index)
+            layer_ids.append(layer_id)
+            if any(getattr(command, "trace_fn", None) for command, _offset_x, _offset_y in draws):
+                # Traced payloads log from their paint calls, so they are drawn directly every frame.
+                for command, offset_x, offset_y in draws:
+                    command.paint(self, painter, offset_x, offset_y)
+                continue
+            layer_key = (
+                self._render_pipeline.group_revision(key),
+                style,
+                tuple((offset_x, offset_y) for _command, offset_x, offset_y in draws),
+            )
+            layer_cache.paint_group(self, painter, layer_id, layer_key, draws)
+        layer_cache.prune(layer_ids)
+
     def _paint_group_backgrounds(
         self,
         painter: QPainter,
@@ -684,6 +919,7 @@ class RenderSurfaceMixin:
         mapper: LegacyMapper,
         overlay_bounds_hint: Optional[Dict[Tuple[str, Optional[str]], _OverlayBounds]],
         collect_only: bool = False,
+        items: Optional[Sequence[Tuple[str, LegacyItem]]] = None,
     ) -> Tuple[
         List[_LegacyPaintCommand],
         Dict[Tuple[str, Optional[str]], _ScreenBounds],
@@ -696,7 +932,8 @@ class RenderSurfaceMixin:
         overlay_bounds_by_group: Dict[Tuple[str, Optional[str]], _OverlayBounds] = {}
         effective_anchor_by_group: Dict[Tuple[str, Optional[str]], Tuple[float, float]] = {}
         transform_by_group: Dict[Tuple[str, Optional[str]], Optional[GroupTransform]] = {}
-        for item_id, legacy_item in self._payload_model.store.items():
+        source = self._payload_model.store.items() if items is None else items
+        for item_id, legacy_item in source:
             group_key = self._group_coordinator.resolve_group_key(
                 item_id,
                 legacy_item.plugin,
@@ -1024,16 +1261,43 @@ class RenderSurfaceMixin:
     def _invalidate_text_cache(self, reason: Optional[str] = None) -> None:
         cache = getattr(self, "_text_cache", None)
         block_cache = getattr(self, "_text_block_cache", None)
-        if isinstance(cache, dict):
+        if isinstance(cache, MutableMapping):
             cache.clear()
-        if isinstance(block_cache, dict):
+        if isinstance(block_cache, MutableMapping):
             block_cache.clear()
+        spacing_cache = getattr(self, "_line_spacing_cache", None)
+        if isinstance(spacing_cache, MutableMapping):
+            spacing_cache.clear()
+        font_pool = getattr(self, "_font_pool", None)
+        if font_pool is not None:
+            font_pool.clear()
         self._text_cache_generation += 1
         if isinstance(self._measure_stats, dict):
             self._measure_stats["cache_reset"] = self._measure_stats.get("cache_reset", 0) + 1
         if reason and self._dev_mode_enabled:
             _CLIENT_LOGGER.debug("Text cache invalidated (%s)", reason)
 
+    def _pooled_font(self, point_size: float, family: Optional[str] = None) -> QFont:
+        """Shared prepared font for ``point_size``; do not modify the returned instance."""
+        return self._font_pool.font(
+            family or self._font_family,
+            self._font_fallbacks,
+            point_size,
+            device_ratio=self._text_device_ratio(),
+        )
+
+    def _pooled_font_metrics(self, point_size: float, family: Optional[str] = None) -> QFontMetrics:
+        return self._font_pool.metrics(
+            family or self._font_family,
+            self._font_fallbacks,
+            point_size,
+            device_ratio=self._text_device_ratio(),
+        )
+
+    def _text_device_ratio(self) -> float:
+        context = getattr(self, "_text_cache_context", None)
+        return context[2] if context else 1.0
+
     def _ensure_text_cache_context(self, family: str) -> None:
         fallback_tuple: Tuple[str, ...] = tuple(getattr(self, "_font_fallbacks", ()))
         try:
@@ -1076,58 +1340,187 @@ class RenderSurfaceMixin:
                 line_height = 0
                 ascent = 0
                 for idx, line in enumerate(lines):
-                    measured = self._text_measurer(line, point_size, font_family or self._font_family)
+                    measured_line = self._text_measurer(line, point_size, family)
                     if idx == 0:
-                        ascent = max(0, int(measured.ascent))
-                    line_width = max(0, int(measured.width))
+                        ascent = max(0, int(measured_line.ascent))
+                    line_width = max(0, int(measured_line.width))
                     if line_width > max_width:
                         max_width = line_width
-                    line_height = max(line_height, int(measured.ascent + measured.descent))
+                    line_height = max(line_height, int(measured_line.ascent + measured_line.descent))
                 total_height = line_height * max(1, len(lines))
                 descent = max(0, total_height - ascent)
-                measured_tuple = (max_width, ascent, descent)
-                if cache is not None:
-                    stats["cache_miss"] = stats.get("cache_miss", 0) + 1 if isinstance(stats, dict) else 0
-                    cache[key] = measured_tuple
-                    if len(cache) > self._TEXT_CACHE_MAX:
-                        cache.pop(next(iter(cache)))
-                return measured_tuple
-            measured = self._text_measurer(text, point_size, font_family or self._font_family)
-            return measured.width, measured.ascent, measured.descent
-        metrics_font = QFont(family)
-        self._apply_font_fallbacks(metrics_font)
-        metrics_font.setPointSizeF(point_size)
-        metrics_font.setWeight(QFont.Weight.Normal)
-        metrics = QFontMetrics(metrics_font)
-        if has_newline:
-            lines = normalised.split("\n") or [""]
-            max_width = 0
-            for line in lines:
-                try:
-                    advance = metrics.horizontalAdvance(line)
-                except Exception:
-                    advance = 0
-                if advance > max_width:
-                    max_width = advance
-            line_spacing = max(metrics.lineSpacing(), metrics.height(), 0)
-            if line_spacing <= 0:
-                line_spacing = metrics.ascent() + metrics.descent()
-            total_height = line_spacing * max(1, len(lines))
-            ascent = metrics.ascent()
-            descent = max(0, int(total_height - ascent))
-            measured = (max(0, max_width), ascent, descent)
+                measured = (max_width, ascent, descent)
+            else:
+                measured_text = self._text_measurer(text, point_size, family)
+                measured = (measured_text.width, measured_text.ascent, measured_text.descent)
         else:
-            measured = (metrics.horizontalAdvance(text), metrics.ascent(), metrics.descent())
+            metrics = self._pooled_font_metrics(point_size, family)
+            width, ascent, descent, _line_spacing = text_block_metrics(metrics, normalised)
+            measured = (width, ascent, descent)
         if cache is not None:
+            # The LRU bounds itself (entries and bytes); see overlay_client/text_cache.py.
             stats["cache_miss"] = stats.get("cache_miss", 0) + 1 if isinstance(stats, dict) else 0
             cache[key] = measured
-            if len(cache) > self._TEXT_CACHE_MAX:
-                cache.pop(next(iter(cache)))
         return measured
 
     def set_text_measurer(self, measurer: Optional[Callable[[str, float, str], _MeasuredText]]) -> None:
         self._text_measurer = measurer
 
+    def _line_spacing(self, point_size: float) -> int:
+        key = (point_size, self._font_family)
+        cached = self._line_spacing_cache.get(key)
+        if cached is not None:
+            return cached
+        line_spacing = font_line_spacing(self._pooled_font_metrics(point_size))
+        self._line_spacing_cache[key] = line_spacing
+        return line_spacing
+
+    def _frame_snapshot(
+        self,
+        serial: int,
+        mapper: LegacyMapper,
+        members: Sequence[Tuple[str, LegacyItem, Tuple[str, Optional[str]]]],
+    ) -> FrameSnapshot:
+        """Copy ``members`` (with the group keys the pipeline resolved) and the font and colour data the planner needs.
+
+        Text is measured on the planner thread; only preset point sizes and named
+        colour lookups happen here.
+        """
+        self._ensure_text_cache_context(self._font_family)
+        state = self._viewport_state()
+        store = self._payload_model.store
+        entries: List[PlanEntry] = []
+        point_sizes: Dict[str, float] = {}
+        named_colors: Dict[str, Optional[int]] = {}
+        for item_id, legacy_item, key in members:
+            item = snapshot_item(legacy_item, store.item_revision(item_id))
+            if item is None:
+                continue
+            group_key = GroupKey(*key)
+            group_transform = self._grouping_helper.get_transform(group_key)
+            entries.append(
+                PlanEntry(
+                    group_key=group_key,
+                    group_transform=replace(group_transform) if group_transform is not None else None,
+                    item=item,
+                )
+            )
+            if item.kind == "message" and item.size not in point_sizes:
+                point_sizes[item.size] = self._legacy_preset_point_size(item.size, state, mapper)
+            for spec, rgba in item.color_specs():
+                if rgba is None and spec not in named_colors and parse_color_rgba(spec) is None:
+                    named_colors[spec] = spec_rgba(spec)
+        return FrameSnapshot(
+            serial=serial,
+            mapper=mapper,
+            state=state,
+            entries=tuple(entries),
+            point_sizes=MappingProxyType(point_sizes),
+            font=FontSpec(
+                family=self._font_family,
+                fallbacks=tuple(self._font_fallbacks),
+                device_ratio=self._text_device_ratio(),
+                generation=self._text_cache_generation,
+            ),
+            named_colors=MappingProxyType(named_colors),
+        )
+
+    def _commands_from_frame_plan(
+        self,
+        plan: FramePlan,
+        items: Sequence[Tuple[str, LegacyItem]],
+    ) -> Tuple[
+        List[_LegacyPaintCommand],
+        Dict[Tuple[str, Optional[str]], _ScreenBounds],
+        Dict[Tuple[str, Optional[str]], _OverlayBounds],
+        Dict[Tuple[str, Optional[str]], Tuple[float, float]],
+        Dict[Tuple[str, Optional[str]], Optional[GroupTransform]],
+    ]:
+        """Paint commands for ``items`` from a finished plan, shaped like ``_build_legacy_commands_for_pass``."""
+        legacy_items = dict(items)
+        commands: List[_LegacyPaintCommand] = []
+        for layout in plan.items:
+            legacy_item = legacy_items.get(layout.item_id)
+            if legacy_item is None:
+                continue
+            command = self._command_from_layout(layout, legacy_item)
+            if command is not None:
+                commands.append(command)
+        bounds_by_group = {key: _ScreenBounds(*rect) for key, rect in plan.bounds_by_group.items()}
+        overlay_bounds_by_group = {key: _OverlayBounds(*rect) for key, rect in plan.overlay_bounds_by_group.items()}
+        return (
+            commands,
+            bounds_by_group,
+            overlay_bounds_by_group,
+            dict(plan.effective_anchor_by_group),
+            dict(plan.transform_by_group),
+        )
+
+    def _command_from_layout(self, layout: ItemLayout, legacy_item: LegacyItem) -> Optional[_LegacyPaintCommand]:
+        common: Dict[str, Any] = {
+            "group_key": layout.group_key,
+            "group_transform": layout.group_transform,
+            "legacy_item": legacy_item,
+            "bounds": layout.bounds,
+            "overlay_bounds": layout.overlay_bounds,
+            "effective_anchor": layout.effective_anchor,
+            "debug_log": None,
+            "cycle_anchor": layout.cycle_anchor,
+            "base_overlay_bounds": layout.base_overlay_bounds,
+            "raw_min_x": layout.raw_min_x,
+            "right_just_multiplier": layout.right_just_multiplier,
+        }
+        if isinstance(layout, MessageLayout):
+            self._debug_legacy_point_size = layout.point_size
+            return _MessagePaintCommand(
+                text=layout.text,
+                color=qcolor_from_rgba(layout.color_rgba),
+                point_size=layout.point_size,
+                x=layout.x,
+                baseline=layout.baseline,
+                text_width=layout.text_width,
+                ascent=layout.ascent,
+                descent=layout.descent,
+                line_spacing=layout.line_spacing,
+                debug_vertices=list(layout.debug_vertices),
+                **common,
+            )
+        if isinstance(layout, RectLayout):
+            pen, brush = self._rect_pen_brush(layout.pen_rgba, layout.brush_rgba)
+            return _RectPaintCommand(
+                pen=pen,
+                brush=brush,
+                x=layout.x,
+                y=layout.y,
+                width=layout.width,
+                height=layout.height,
+                reference_overlay_bounds=layout.reference_overlay_bounds,
+                debug_vertices=list(layout.debug_vertices),
+                **common,
+            )
+        if isinstance(layout, VectorLayout):
+            return _VectorPaintCommand(
+                vector_payload=dict(layout.vector_payload),
+                scale=layout.scale,
+                base_offset_x=layout.base_offset_x,
+                base_offset_y=layout.base_offset_y,
+                debug_vertices=layout.debug_vertices,
+                **common,
+            )
+        return None
+
+    def _rect_pen_brush(self, pen_rgba: Optional[int], brush_rgba: Optional[int]) -> Tuple[QPen, QBrush]:
+        if pen_rgba is None:
+            pen = QPen(Qt.PenStyle.NoPen)
+        else:
+            pen = QPen(qcolor_from_rgba(pen_rgba))
+            pen.setWidth(self._line_width("legacy_rect"))
+        if brush_rgba is None:
+            brush = QBrush(Qt.BrushStyle.NoBrush)
+        else:
+            brush = QBrush(qcolor_from_rgba(brush_rgba))
+        return pen, brush
+
     def _build_message_command(
         self,
         legacy_item: LegacyItem,
@@ -1141,8 +1534,17 @@ class RenderSurfaceMixin:
         item_id = legacy_item.item_id
         plugin_name = legacy_item.plugin
         trace_enabled = self._should_trace_payload(plugin_name, item_id)
-        color = QColor(str(item.get("color", "white")))
-        size = str(item.get("size", "normal")).lower()
+        fields = legacy_item.fields
+        if isinstance(fields, MessageFields):
+            color = qcolor_from_spec(str(item.get("color", "white")), fields.color_rgba)
+            size = fields.size
+            raw_left = float(fields.x)
+            raw_top = float(fields.y)
+        else:
+            color = qcolor_from_spec(str(item.get("color", "white")))
+            size = str(item.get("size", "normal")).lower()
+            raw_left = float(item.get("x", 0))
+            raw_top = float(item.get("y", 0))
         state = self._viewport_state()
         scaled_point_size = self._legacy_preset_point_size(size, state, mapper)
         offset_x, offset_y = self._group_offsets(group_transform)
@@ -1168,8 +1570,6 @@ class RenderSurfaceMixin:
         base_translation_dy = group_ctx.base_translation_dy
         transform_meta = item.get("__mo_transform__")
         self._debug_legacy_point_size = scaled_point_size
-        raw_left = float(item.get("x", 0))
-        raw_top = float(item.get("y", 0))
         (
             adjusted_left,
             adjusted_top,
@@ -1201,46 +1601,22 @@ class RenderSurfaceMixin:
         )
         text = str(item.get("text", ""))
         text_width, ascent, descent = self._measure_text(text, scaled_point_size, self._font_family)
-        metrics_font = QFont(self._font_family)
-        self._apply_font_fallbacks(metrics_font)
-        metrics_font.setPointSizeF(scaled_point_size)
-        metrics_font.setWeight(QFont.Weight.Normal)
-        metrics = QFontMetrics(metrics_font)
-        line_spacing = max(metrics.lineSpacing(), metrics.height(), 0)
-        if line_spacing <= 0:
-            line_spacing = ascent + descent
-        x = int(round(fill.screen_x(adjusted_left)))
-        payload_point_y = int(round(fill.screen_y(adjusted_top)))
-        baseline = int(round(payload_point_y + ascent))
-        center_x = x + text_width // 2
-        top = baseline - ascent
-        bottom = baseline + descent
-        center_y = int(round((top + bottom) / 2.0))
-        bounds = (x, top, x + text_width, bottom)
-        overlay_bounds: Optional[Tuple[float, float, float, float]] = None
-        base_overlay_bounds: Optional[Tuple[float, float, float, float]] = None
-        if scale > 0.0:
-            overlay_left = (bounds[0] - base_offset_x) / scale
-            overlay_top = (bounds[1] - base_offset_y) / scale
-            overlay_right = (bounds[2] - base_offset_x) / scale
-            overlay_bottom = (bounds[3] - base_offset_y) / scale
-            overlay_bounds = (overlay_left, overlay_top, overlay_right, overlay_bottom)
-            base_x = int(round(fill.screen_x(base_left_logical)))
-            base_base_y = int(round(fill.screen_y(base_top_logical)))
-            base_baseline = int(round(base_base_y + ascent))
-            base_top = base_baseline - ascent
-            base_bottom = base_baseline + descent
-            base_bounds = (base_x, base_top, base_x + text_width, base_bottom)
-            base_overlay_left = (base_bounds[0] - base_offset_x) / scale
-            base_overlay_top = (base_bounds[1] - base_offset_y) / scale
-            base_overlay_right = (base_bounds[2] - base_offset_x) / scale
-            base_overlay_bottom = (base_bounds[3] - base_offset_y) / scale
-            base_overlay_bounds = (
-                base_overlay_left,
-                base_overlay_top,
-                base_overlay_right,
-                base_overlay_bottom,
-            )
+        line_spacing = self._line_spacing(scaled_point_size)
+        geometry = message_geometry(
+            fill,
+            scale,
+            base_offset_x,
+            base_offset_y,
+            adjusted_left,
+            adjusted_top,
+            base_left_logical,
+            base_top_logical,
+            text_width,
+            ascent,
+            descent,
+        )
+        x = geometry.x
+        baseline = geometry.baseline
         if trace_enabled and not collect_only:
             self._log_legacy_trace(
                 plugin_name,
@@ -1264,8 +1640,8 @@ class RenderSurfaceMixin:
             group_key=group_key,
             group_transform=group_transform,
             legacy_item=legacy_item,
-            bounds=bounds,
-            overlay_bounds=overlay_bounds,
+            bounds=geometry.bounds,
+            overlay_bounds=geometry.overlay_bounds,
             effective_anchor=effective_anchor,
             debug_log=None,
             text=text,
@@ -1277,10 +1653,10 @@ class RenderSurfaceMixin:
             ascent=ascent,
             descent=descent,
             line_spacing=line_spacing,
-            cycle_anchor=(center_x, center_y),
+            cycle_anchor=geometry.cycle_anchor,
             trace_fn=trace_fn,
-            base_overlay_bounds=base_overlay_bounds,
-            debug_vertices=[(x, payload_point_y)],
+            base_overlay_bounds=geometry.base_overlay_bounds,
+            debug_vertices=[(x, geometry.payload_point_y)],
             raw_min_x=raw_left,
             right_just_multiplier=2,
         )
@@ -1300,24 +1676,21 @@ class RenderSurfaceMixin:
         plugin_name = legacy_item.plugin
         border_spec = str(item.get("color", "white"))
         fill_spec = str(item.get("fill", "#00000000"))
-
-        if not border_spec or border_spec.lower() == "none":
-            pen = QPen(Qt.PenStyle.NoPen)
+        fields = legacy_item.fields
+        border_rgba: Optional[int] = None
+        fill_rgba: Optional[int] = None
+        if isinstance(fields, RectFields):
+            border_rgba, fill_rgba = fields.border_rgba, fields.fill_rgba
+            raw_x, raw_y = float(fields.x), float(fields.y)
+            raw_w, raw_h = float(fields.w), float(fields.h)
         else:
-            border_color = QColor(border_spec)
-            if not border_color.isValid():
-                pen = QPen(Qt.PenStyle.NoPen)
-            else:
-                pen = QPen(border_color)
-                pen.setWidth(self._line_width("legacy_rect"))
+            raw_x = float(item.get("x", 0))
+            raw_y = float(item.get("y", 0))
+            raw_w = float(item.get("w", 0))
+            raw_h = float(item.get("h", 0))
 
-        if not fill_spec or fill_spec.lower() == "none":
-            brush = QBrush(Qt.BrushStyle.NoBrush)
-        else:
-            fill_color = QColor(fill_spec)
-            if not fill_color.isValid():
-                fill_color = QColor("#00000000")
-            brush = QBrush(fill_color)
+        pen_rgba, brush_rgba = rect_colors(border_spec, border_rgba, fill_spec, fill_rgba, spec_rgba)
+        pen, brush = self._rect_pen_brush(pen_rgba, brush_rgba)
 
         state = self._viewport_state()
         offset_x, offset_y = self._group_offsets(group_transform)
@@ -1341,10 +1714,6 @@ class RenderSurfaceMixin:
         base_translation_dy = group_ctx.base_translation_dy
         transform_meta = item.get("__mo_transform__")
         trace_enabled = self._should_trace_payload(plugin_name, item_id)
-        raw_x = float(item.get("x", 0))
-        raw_y = float(item.get("y", 0))
-        raw_w = float(item.get("w", 0))
-        raw_h = float(item.get("h", 0))
         transformed_overlay, base_overlay_points, reference_overlay_bounds, effective_anchor = self._compute_rect_transform(
             plugin_name,
             item_id,
@@ -1367,35 +1736,14 @@ class RenderSurfaceMixin:
             trace_enabled,
             collect_only,
         )
-        xs_overlay = [pt[0] for pt in transformed_overlay]
-        ys_overlay = [pt[1] for pt in transformed_overlay]
-        min_x_overlay = min(xs_overlay)
-        max_x_overlay = max(xs_overlay)
-        min_y_overlay = min(ys_overlay)
-        max_y_overlay = max(ys_overlay)
-        x = int(round(fill.screen_x(min_x_overlay)))
-        y = int(round(fill.screen_y(min_y_overlay)))
-        w = max(1, int(round(max(0.0, max_x_overlay - min_x_overlay) * scale)))
-        h = max(1, int(round(max(0.0, max_y_overlay - min_y_overlay) * scale)))
-        center_x = x + w // 2
-        center_y = y + h // 2
-        bounds = (x, y, x + w, y + h)
-        overlay_bounds = (min_x_overlay, min_y_overlay, max_x_overlay, max_y_overlay)
-        base_overlay_bounds: Optional[Tuple[float, float, float, float]] = None
-        if base_overlay_points:
-            base_xs = [pt[0] for pt in base_overlay_points]
-            base_ys = [pt[1] for pt in base_overlay_points]
-            base_min_x = min(base_xs)
-            base_max_x = max(base_xs)
-            base_min_y = min(base_ys)
-            base_max_y = max(base_ys)
-            base_overlay_bounds = (base_min_x, base_min_y, base_max_x, base_max_y)
+        geometry = rect_geometry(fill, scale, transformed_overlay, base_overlay_points)
+        x, y, w, h = geometry.x, geometry.y, geometry.width, geometry.height
         command = _RectPaintCommand(
             group_key=group_key,
             group_transform=group_transform,
             legacy_item=legacy_item,
-            bounds=bounds,
-            overlay_bounds=overlay_bounds,
+            bounds=geometry.bounds,
+            overlay_bounds=geometry.overlay_bounds,
             effective_anchor=effective_anchor,
             debug_log=None,
             pen=pen,
@@ -1404,8 +1752,8 @@ class RenderSurfaceMixin:
             y=y,
             width=w,
             height=h,
-            cycle_anchor=(center_x, center_y),
-            base_overlay_bounds=base_overlay_bounds,
+            cycle_anchor=geometry.cycle_anchor,
+            base_overlay_bounds=geometry.base_overlay_bounds,
             reference_overlay_bounds=reference_overlay_bounds,
             debug_vertices=[
                 (x, y),
@@ -1422,10 +1770,10 @@ class RenderSurfaceMixin:
                 item_id,
                 "paint:rect_output",
                 {
-                    "adjusted_x": min_x_overlay,
-                    "adjusted_y": min_y_overlay,
-                    "adjusted_w": max_x_overlay - min_x_overlay,
-                    "adjusted_h": max_y_overlay - min_y_overlay,
+                    "adjusted_x": geometry.overlay_bounds[0],
+                    "adjusted_y": geometry.overlay_bounds[1],
+                    "adjusted_w": geometry.overlay_bounds[2] - geometry.overlay_bounds[0],
+                    "adjusted_h": geometry.overlay_bounds[3] - geometry.overlay_bounds[1],
                     "pixel_x": x,
                     "pixel_y": y,
                     "pixel_w": w,
@@ -1468,7 +1816,13 @@ class RenderSurfaceMixin:
         anchor_for_transform = group_ctx.anchor_for_transform
         base_translation_dx = group_ctx.base_translation_dx
         base_translation_dy = group_ctx.base_translation_dy
-        raw_points = item.get("points") or []
+        fields = legacy_item.fields
+        if isinstance(fields, VectorFields):
+            raw_points: Sequence[Mapping[str, Any]] = fields.point_extras()
+            packed_xy: Optional[Sequence[int]] = fields.xy
+        else:
+            raw_points = item.get("points") or []
+            packed_xy = None
         transform_meta = item.get("__mo_transform__")
         (
             vector_payload,
@@ -1497,22 +1851,11 @@ class RenderSurfaceMixin:
             base_translation_dy,
             trace_enabled,
             collect_only,
+            packed_xy=packed_xy,
         )
         if vector_payload is None:
             return None
-        bounds: Optional[Tuple[int, int, int, int]]
-        cycle_anchor: Optional[Tuple[int, int]]
-        if screen_points:
-            xs = [pt[0] for pt in screen_points]
-            ys = [pt[1] for pt in screen_points]
-            bounds = (min(xs), min(ys), max(xs), max(ys))
-            cycle_anchor = (
-                int(round((min(xs) + max(xs)) / 2.0)),
-                int(round((min(ys) + max(ys)) / 2.0)),
-            )
-        else:
-            bounds = None
-            cycle_anchor = None
+        bounds, cycle_anchor = vector_screen_bounds(screen_points)
         command = _VectorPaintCommand(
             group_key=group_key,
             group_transform=group_transform,
@@ -2045,15 +2388,21 @@ class RenderSurfaceMixin:
                 return False
             return True
         if isinstance(command, _RectPaintCommand):
-            item = command.legacy_item.data
-            width = self._safe_float(item.get("w"), default=0.0)
-            height = self._safe_float(item.get("h"), default=0.0)
+            fields = command.legacy_item.fields
+            if isinstance(fields, RectFields):
+                width, height = float(fields.w), float(fields.h)
+            else:
+                item = command.legacy_item.data
+                width = self._safe_float(item.get("w"), default=0.0)
+                height = self._safe_float(item.get("h"), default=0.0)
             if width <= 0.0 or height <= 0.0:
                 return False
             return True
         if isinstance(command, _VectorPaintCommand):
-            points = command.legacy_item.data.get("points")
-            return bool(points)
+            fields = command.legacy_item.fields
+            if isinstance(fields, VectorFields):
+                return len(fields) > 0
+            return bool(command.legacy_item.data.get("points"))
         return True
 
     @staticmethod
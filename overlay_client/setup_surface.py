@@ -20,20 +20,25 @@ from overlay_client.data_client import OverlayDataClient
 from overlay_client.debug_config import DEBUG_CONFIG_ENABLED, DebugConfig
 from overlay_client.debug_cycle_overlay import CycleOverlayView, DebugOverlayView
 from overlay_client.follow_controller import FollowController
+from overlay_client.font_utils import FontPool
+from overlay_client.frame_plan import FramePlanner
 from overlay_client.group_coordinator import GroupCoordinator
 from overlay_client.grouping_adapter import GroupingAdapter
 from overlay_client.grouping_helper import FillGroupingHelper
+from overlay_client.paint_commands import GroupLayerCache
 from overlay_client.platform_context import _initial_platform_context
 from overlay_client.platform_integration import PlatformController
 from overlay_client.plugin_overrides import PluginOverrideManager
 from overlay_client.render_pipeline import LegacyRenderPipeline
-from overlay_client.render_surface import _GroupDebugState, _OverlayBounds
+from overlay_client.render_surface import _FramePlanBridge, _GroupDebugState, _OverlayBounds
 from overlay_client.status_presenter import StatusPresenter
+from overlay_client.text_cache import LRUTextCache, new_cache_stats
 from overlay_client.visibility_helper import VisibilityHelper
 from overlay_client.interaction_controller import InteractionController
 from overlay_client.window_controller import WindowController
 from overlay_client.window_tracking import WindowState, WindowTracker
 from overlay_client.viewport_helper import BASE_HEIGHT, BASE_WIDTH
+from overlay_plugin.config_watcher import shared_config_watcher
 from overlay_plugin.groupings_loader import GroupingsLoader
 
 _CLIENT_LOGGER = logging.getLogger("EDMC.ModernOverlay.Client")
@@ -206,6 +211,12 @@ class SetupSurfaceMixin:
             self._repaint_debounce_enabled = bool(debug_config.repaint_debounce_enabled)
         self._repaint_debounce_log: bool = bool(getattr(debug_config, "log_repaint_debounce", False))
         self._repaint_log_last: Optional[Dict[str, Any]] = None
+        self._legacy_batch_depth: int = 0
+        self._legacy_batch_changed: bool = False
+        self._legacy_batch_immediate: bool = False
+        self._repaint_full_pending: bool = False
+        dirty_region_env = (os.getenv("EDMC_OVERLAY_DIRTY_REGIONS") or "1").strip().lower()
+        self._dirty_region_repaint: bool = dirty_region_env not in {"0", "false", "no", "off"}
         self._repaint_timer = QTimer(self)
         self._repaint_timer.setSingleShot(True)
         self._repaint_timer.setInterval(self._REPAINT_DEBOUNCE_MS)
@@ -218,10 +229,17 @@ class SetupSurfaceMixin:
         self._paint_stats = {"paint_count": 0}
         self._paint_log_state = {"last_ingest": 0, "last_purge": 0, "last_total": 0}
         self._measure_stats = {"calls": 0}
-        self._text_cache: Dict[Tuple[str, float, str], Tuple[int, int, int]] = {}
-        self._text_block_cache: Dict[Tuple[str, float, str, Tuple[str, ...], float, int], Tuple[int, int]] = {}
+        self._text_cache_stats = new_cache_stats()
+        self._text_cache = LRUTextCache(self._TEXT_CACHE_MAX, self._TEXT_CACHE_MAX_BYTES, self._text_cache_stats)
+        self._text_block_cache = LRUTextCache(
+            self._TEXT_BLOCK_CACHE_MAX,
+            self._TEXT_CACHE_MAX_BYTES,
+            self._text_cache_stats,
+        )
         self._text_cache_generation = 0
         self._text_cache_context: Optional[Tuple[str, Tuple[str, ...], float]] = None
+        self._line_spacing_cache: Dict[Tuple[float, str], int] = {}
+        self._font_pool = FontPool()
         _CLIENT_LOGGER.debug(
             "Debug config loaded: dev_mode_enabled=%s group_bounds_outline=%s overlay_outline=%s payload_vertex_markers=%s (DEBUG_CONFIG_ENABLED=%s)",
             self._dev_mode_enabled,
@@ -265,11 +283,19 @@ class SetupSurfaceMixin:
         self._mode_profile.log_profile("inactive", self._current_mode_profile, "initial")
         self._group_coordinator = GroupCoordinator(cache=self._group_cache, logger=_CLIENT_LOGGER)
         self._render_pipeline = LegacyRenderPipeline(self)
-
+        self._group_layer_cache: Optional[GroupLayerCache] = None
+        layer_cache_env = (os.getenv("EDMC_OVERLAY_LAYER_CACHE") or "1").strip().lower()
+        if layer_cache_env not in {"0", "false", "no", "off"}:
+            self._group_layer_cache = GroupLayerCache()
+        # Started by the launcher once the window is up; see start_frame_planner.
+        self._frame_planner: Optional[FramePlanner] = None
+        self._frame_plan_bridge: Optional[_FramePlanBridge] = None
+        self._frame_plan_timer: Optional[QTimer] = None
+
+        # Armed by _schedule_legacy_purge for the next item expiry instead of polling.
         self._legacy_timer = QTimer(self)
-        self._legacy_timer.setInterval(250)
+        self._legacy_timer.setSingleShot(True)
         self._legacy_timer.timeout.connect(self._purge_legacy)
-        self._legacy_timer.start()
 
         self._modifier_timer = QTimer(self)
         self._modifier_timer.setInterval(100)
@@ -345,6 +371,7 @@ class SetupSurfaceMixin:
             _CLIENT_LOGGER,
             debug_config=self._debug_config,
             groupings_loader=self._groupings_loader,
+            config_watcher=shared_config_watcher(),
         )
         self._grouping_helper = FillGroupingHelper(
             self,
@@ -125,3 +125,17 @@ def test_flush_outgoing_logs_write_failure(qt_app):
     log_records = asyncio.run(_run())
 
     assert any("Failed to write outgoing payload" in record.getMessage() for record in log_records)
+
+
+def test_deliver_emits_one_batch_per_loop_tick(qt_app):
+    client = OverlayDataClient(Path("dummy_port.json"))
+    batches = []
+    client.messages_received.connect(batches.append)
+
+    async def _burst():
+        for idx in range(5):
+            client._deliver({"event": "TestEvent", "seq": idx})  # type: ignore[attr-defined]
+        await asyncio.sleep(0.05)
+
+    asyncio.run(_burst())
+    assert batches == [[{"event": "TestEvent", "seq": idx} for idx in range(5)]]
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import sys
+import threading
+from pathlib import Path
+from types import MappingProxyType
+
+OVERLAY_ROOT = Path(__file__).resolve().parents[1]
+if str(OVERLAY_ROOT) not in sys.path:
+    sys.path.append(str(OVERLAY_ROOT))
+
+from overlay_client.frame_plan import (  # noqa: E402
+    FontSpec,
+    FramePlanner,
+    FrameSnapshot,
+    MessageLayout,
+    PlanEntry,
+    RectLayout,
+    TextMetrics,
+    VectorLayout,
+    plan_frame,
+    snapshot_item,
+)
+from overlay_client.group_transform import GroupKey  # noqa: E402
+from overlay_client.legacy_processor import process_legacy_payload  # noqa: E402
+from overlay_client.legacy_store import LegacyItemStore  # noqa: E402
+from overlay_client.viewport_helper import BASE_HEIGHT, BASE_WIDTH  # noqa: E402
+from overlay_client.window_utils import compute_legacy_mapper, viewport_state  # noqa: E402
+
+
+def _store() -> LegacyItemStore:
+    store = LegacyItemStore()
+    payloads = [
+        {"type": "message", "id": "msg", "text": "hello", "color": "red", "x": 100, "y": 50, "ttl": 0},
+        {
+            "type": "shape",
+            "shape": "rect",
+            "id": "box",
+            "color": "#abcdef",
+            "fill": "none",
+            "x": 10,
+            "y": 20,
+            "w": 40,
+            "h": 20,
+            "ttl": 0,
+        },
+        {
+            "type": "shape",
+            "shape": "vect",
+            "id": "route",
+            "color": "#00ff00",
+            "vector": [{"x": 200, "y": 300}, {"x": 260, "y": 340}],
+            "vector_gen": 1,
+            "ttl": 0,
+        },
+    ]
+    for payload in payloads:
+        assert process_legacy_payload(store, payload)
+    return store
+
+
+def _measure(font: FontSpec, text: str, point_size: float) -> TextMetrics:
+    assert (font.family, point_size) == ("Test", 10.0)
+    return TextMetrics(width=10 * len(text), ascent=10, descent=3, line_spacing=14)
+
+
+def _frame(store: LegacyItemStore, serial: int = 1) -> FrameSnapshot:
+    mapper = compute_legacy_mapper("fit", BASE_WIDTH, BASE_HEIGHT)
+    entries = []
+    for item_id, legacy_item in store.items():
+        item = snapshot_item(legacy_item, store.item_revision(item_id))
+        entries.append(PlanEntry(GroupKey("tester", f"item:{item_id}"), None, item))
+    return FrameSnapshot(
+        serial=serial,
+        mapper=mapper,
+        state=viewport_state(BASE_WIDTH, BASE_HEIGHT, 1.0),
+        entries=tuple(entries),
+        point_sizes=MappingProxyType({"normal": 10.0}),
+        font=FontSpec("Test"),
+        named_colors=MappingProxyType({"red": 0xFFFF0000}),
+    )
+
+
+def test_plan_frame_lays_out_each_kind_off_the_calling_thread():
+    frame = _frame(_store(), serial=7)
+    result = {}
+    worker = threading.Thread(target=lambda: result.setdefault("plan", plan_frame(frame, _measure)))
+    worker.start()
+    worker.join(timeout=5)
+    plan = result["plan"]
+
+    assert plan.serial == 7 and plan.complete
+    layouts = {layout.item_id: layout for layout in plan.items}
+    message = layouts["msg"]
+    assert isinstance(message, MessageLayout)
+    assert (message.x, message.baseline) == (100, 60)
+    assert message.bounds == (100, 50, 150, 63)
+    assert message.color_rgba == 0xFFFF0000
+    assert message.line_spacing == 14
+
+    rect = layouts["box"]
+    assert isinstance(rect, RectLayout)
+    assert rect.bounds == (10, 20, 50, 40)
+    assert (rect.pen_rgba, rect.brush_rgba) == (0xFFABCDEF, None)
+
+    vector = layouts["route"]
+    assert isinstance(vector, VectorLayout)
+    assert vector.bounds == (200, 300, 260, 340)
+    assert vector.cycle_anchor == (230, 320)
+
+    assert plan.bounds_by_group[("tester", "item:msg")] == (100, 50, 150, 63)
+    assert plan.overlay_bounds_by_group[("tester", "item:box")] == (10.0, 20.0, 50.0, 40.0)
+
+
+def test_plan_skips_messages_without_a_point_size():
+    store = LegacyItemStore()
+    process_legacy_payload(store, {"type": "message", "id": "msg", "text": "unsized", "size": "huge", "ttl": 0})
+    plan = plan_frame(_frame(store), _measure)
+    assert plan.items == ()
+
+
+def test_snapshot_does_not_follow_later_store_changes():
+    store = _store()
+    frame = _frame(store)
+    delta = {"base": 2, "count": 2, "set": [[1, {"x": 400, "y": 400}]], "gen": 1, "seq": 1}
+    process_legacy_payload(
+        store, {"type": "shape", "shape": "vect", "id": "route", "color": "#00ff00", "vector_delta": delta, "ttl": 0}
+    )
+    assert store.get("route").fields.xy[2] == 400
+
+    layouts = {layout.item_id: layout for layout in plan_frame(frame, _measure).items}
+    assert layouts["route"].bounds == (200, 300, 260, 340)
+
+
+def test_frame_planner_delivers_plans_from_its_thread():
+    delivered = []
+    done = threading.Event()
+
+    def deliver(plan):
+        delivered.append((plan.serial, threading.current_thread().name))
+        done.set()
+
+    measured = []
+
+    def measure(font, text, point_size):
+        measured.append(threading.current_thread().name)
+        return _measure(font, text, point_size)
+
+    planner = FramePlanner(deliver, measure)
+    assert planner.submit(_frame(_store())) is False  # not started yet
+    planner.start()
+    try:
+        assert planner.submit(_frame(_store(), serial=3))
+        assert done.wait(timeout=5)
+    finally:
+        planner.stop()
+    assert delivered == [(3, "EDMCOverlay-FramePlanner")]
+    assert measured and set(measured) == {"EDMCOverlay-FramePlanner"}
+    assert not planner.running
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from overlay_client.text_cache import LRUTextCache, approximate_entry_bytes, new_cache_stats
+
+
+def test_hits_refresh_recency_so_hot_strings_survive_chatter():
+    cache = LRUTextCache(max_entries=3, max_bytes=1 << 20)
+    cache[("HUD", 10.0, "Font")] = (1, 2, 3)
+    for index in range(5):
+        assert cache.get(("HUD", 10.0, "Font")) == (1, 2, 3)
+        cache[(f"chatter-{index}", 10.0, "Font")] = (index, 0, 0)
+    assert ("HUD", 10.0, "Font") in cache
+    assert len(cache) == 3
+    assert cache.stats == {"hit": 5, "miss": 0, "evict": 3}
+
+
+def test_byte_budget_evicts_oldest_entries():
+    key_size = approximate_entry_bytes(("x" * 100, 10.0, "Font"), (1, 2, 3))
+    cache = LRUTextCache(max_entries=100, max_bytes=key_size * 2)
+    for index in range(4):
+        cache[("x" * 99 + str(index), 10.0, "Font")] = (index, 0, 0)
+    assert [key[0][-1] for key in cache] == ["2", "3"]
+    assert cache.bytes_used <= key_size * 2
+    del cache[("x" * 99 + "2", 10.0, "Font")]
+    cache.clear()
+    assert cache.bytes_used == 0 and cache == {}
+
+
+def test_caches_share_counters_and_membership_does_not_count():
+    stats = new_cache_stats()
+    text_cache = LRUTextCache(4, 1 << 20, stats)
+    block_cache = LRUTextCache(4, 1 << 20, stats)
+    text_cache["a"] = 1
+    block_cache.setdefault("b", 2)
+    assert "a" in text_cache and "missing" not in block_cache
+    assert text_cache.get("a") == 1
+    assert block_cache.get("missing") is None
+    assert stats == {"hit": 1, "miss": 1, "evict": 0}
+    assert text_cache.items() == [("a", 1)] and block_cache == {"b": 2}
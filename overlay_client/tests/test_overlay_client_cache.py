@@ -12,14 +12,18 @@ if str(OVERLAY_ROOT) not in sys.path:
 # PyQt-dependent tests are guarded by the pyqt_required marker (see tests/conftest.py).
 try:
     from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QElapsedTimer, QPoint
     from PyQt6.QtGui import QPainter, QPixmap
 except Exception:  # pragma: no cover - import guard for environments without PyQt6
     pytest.skip("PyQt6 not available", allow_module_level=True)
 
 from overlay_client.client_config import InitialClientSettings  # noqa: E402
 from overlay_client.debug_config import DebugConfig  # noqa: E402
+from overlay_client.frame_plan import plan_frame  # noqa: E402
+from overlay_client.legacy_processor import process_legacy_payload  # noqa: E402
 from overlay_client.legacy_store import LegacyItem  # noqa: E402
 from overlay_client.overlay_client import OverlayWindow  # noqa: E402
+from overlay_client.render_surface import _PlannerTextMeasurer  # noqa: E402
 
 
 @pytest.fixture
@@ -85,3 +89,246 @@ def test_legacy_render_cache_reuse_and_invalidate(monkeypatch, qt_app):
     assert rebuilds == 2  # cache rebuilt after dirty flag
 
     painter.end()
+
+
+@pytest.mark.pyqt_required
+def test_legacy_render_cache_rebuilds_only_changed_groups(monkeypatch, qt_app):
+    window = OverlayWindow(InitialClientSettings(), DebugConfig())
+    window.resize(200, 200)
+    window._payload_model.set("edr-1", LegacyItem("edr-1", "message", {"text": "route"}, plugin="EDR"))
+    window._payload_model.set("bgs-1", LegacyItem("bgs-1", "message", {"text": "tick"}, plugin="BGS-Tally"))
+
+    pixmap = QPixmap(200, 200)
+    painter = QPainter(pixmap)
+    built_items = []
+    original = window._build_legacy_commands_for_pass
+
+    def _wrapper(mapper, overlay_bounds_hint, collect_only=False, items=None):
+        built_items.append([item_id for item_id, _ in items])
+        return original(mapper, overlay_bounds_hint, collect_only=collect_only, items=items)
+
+    monkeypatch.setattr(window, "_build_legacy_commands_for_pass", _wrapper)
+
+    window._paint_legacy(painter)
+    assert sorted(built_items[-1]) == ["bgs-1", "edr-1"]
+    first_commands = window._render_pipeline._last_payload_results["commands"]
+    edr_command = next(cmd for cmd in first_commands if cmd.legacy_item.item_id == "edr-1")
+
+    built_items.clear()
+    window._payload_model.set("bgs-1", LegacyItem("bgs-1", "message", {"text": "tick 2"}, plugin="BGS-Tally"))
+    window._paint_legacy(painter)
+    assert built_items == [["bgs-1"], ["bgs-1"]]  # collect pass + build pass for the changed group only
+    commands = window._render_pipeline._last_payload_results["commands"]
+    assert [cmd.legacy_item.item_id for cmd in commands] == ["edr-1", "bgs-1"]
+    assert commands[0] is edr_command
+
+    built_items.clear()
+    window._payload_model.store.remove("bgs-1")
+    window._paint_legacy(painter)
+    assert built_items == []
+    assert [cmd.legacy_item.item_id for cmd in window._render_pipeline._last_payload_results["commands"]] == ["edr-1"]
+
+    painter.end()
+
+
+@pytest.mark.pyqt_required
+def test_payload_repaint_updates_only_changed_group_region(monkeypatch, qt_app):
+    window = OverlayWindow(InitialClientSettings(), DebugConfig())
+    window.resize(1280, 960)
+    window._payload_model.set(
+        "edr-1", LegacyItem("edr-1", "message", {"text": "route", "x": 20, "y": 20}, plugin="EDR")
+    )
+    window._payload_model.set(
+        "bgs-1", LegacyItem("bgs-1", "message", {"text": "tick", "x": 900, "y": 700}, plugin="BGS-Tally")
+    )
+    updates = []
+    monkeypatch.setattr(window, "update", lambda *args: updates.append(args))
+
+    pixmap = QPixmap(1280, 960)
+    painter = QPainter(pixmap)
+    window._paint_legacy(painter)
+    painter.end()
+    window._flush_repaint()
+    assert updates == [()]  # the initial full rebuild cannot be bounded
+
+    updates.clear()
+    window._payload_model.set(
+        "bgs-1", LegacyItem("bgs-1", "message", {"text": "tick 2", "x": 900, "y": 700}, plugin="BGS-Tally")
+    )
+    window._request_repaint("ingest", immediate=True)
+    assert len(updates) == 1 and len(updates[0]) == 1
+    region = updates[0][0]
+    bgs_bounds = window._render_pipeline._group_screen_rects[("BGS-Tally", None)]
+    assert region.contains(QPoint(bgs_bounds[0] + bgs_bounds[2] // 2, bgs_bounds[1] + bgs_bounds[3] // 2))
+    assert not region.contains(QPoint(25, 25))
+
+    updates.clear()
+    window._request_repaint("override_reload", immediate=True)
+    assert updates == [()]
+
+
+def _ingest_sample_payloads(window):
+    store = window._payload_model.store
+    for payload in (
+        {"type": "message", "id": "msg", "text": "hello", "color": "yellow", "x": 100, "y": 50, "ttl": 0},
+        {"type": "message", "id": "big", "text": "large", "size": "large", "x": 300, "y": 80, "ttl": 0},
+        {"type": "shape", "shape": "rect", "id": "box", "color": "red", "fill": "#40112233",
+         "x": 10, "y": 20, "w": 40, "h": 20, "ttl": 0},
+        {"type": "shape", "shape": "vect", "id": "route", "color": "#00ff00",
+         "vector": [{"x": 200, "y": 300}, {"x": 260, "y": 340, "marker": "circle"}], "ttl": 0},
+    ):
+        assert process_legacy_payload(store, payload)
+
+
+@pytest.mark.pyqt_required
+def test_frame_plan_commands_match_synchronous_builders(qt_app):
+    window = OverlayWindow(InitialClientSettings(), DebugConfig())
+    window.resize(1280, 960)
+    _ingest_sample_payloads(window)
+    pixmap = QPixmap(1280, 960)
+    painter = QPainter(pixmap)
+    window._paint_legacy(painter)
+    painter.end()
+    expected = {cmd.legacy_item.item_id: cmd for cmd in window._render_pipeline._last_payload_results["commands"]}
+
+    items = list(window._payload_model.store.items())
+    members = [
+        (item_id, item, window._grouping_helper.group_key_for(item_id, item.plugin).as_tuple())
+        for item_id, item in items
+    ]
+    frame = window._frame_snapshot(1, window._compute_legacy_mapper(), members)
+    plan = plan_frame(frame, _PlannerTextMeasurer(64, 1 << 20))
+    commands, bounds, overlay_bounds, _anchors, _transforms = window._commands_from_frame_plan(plan, items)
+
+    assert sorted(cmd.legacy_item.item_id for cmd in commands) == sorted(expected)
+    for command in commands:
+        reference = expected[command.legacy_item.item_id]
+        assert type(command) is type(reference)
+        assert command.bounds == reference.bounds
+        assert command.overlay_bounds == reference.overlay_bounds
+        assert command.cycle_anchor == reference.cycle_anchor
+    message = next(cmd for cmd in commands if cmd.legacy_item.item_id == "big")
+    reference = expected["big"]
+    assert (message.x, message.baseline, message.point_size) == (reference.x, reference.baseline, reference.point_size)
+    assert message.color.rgba() == reference.color.rgba()
+    rect = next(cmd for cmd in commands if cmd.legacy_item.item_id == "box")
+    assert rect.pen.color().rgba() == expected["box"].pen.color().rgba()
+    assert rect.pen.width() == expected["box"].pen.width()
+    assert rect.brush.color().rgba() == expected["box"].brush.color().rgba()
+    for command in commands:
+        key = command.group_key.as_tuple()
+        assert bounds[key].is_valid() and overlay_bounds[key].is_valid()
+
+
+@pytest.mark.pyqt_required
+def test_ingest_with_frame_planner_lays_out_off_the_gui_thread(monkeypatch, qt_app):
+    monkeypatch.delenv("EDMC_OVERLAY_FRAME_PLANNER", raising=False)
+    window = OverlayWindow(InitialClientSettings(), DebugConfig())
+    window.resize(1280, 960)
+    pixmap = QPixmap(1280, 960)
+    painter = QPainter(pixmap)
+    window._paint_legacy(painter)
+    assert window.start_frame_planner()
+    try:
+        built = []
+        original = window._build_legacy_commands_for_pass
+
+        def _wrapper(mapper, overlay_bounds_hint, collect_only=False, items=None):
+            built.append([item_id for item_id, _ in items])
+            return original(mapper, overlay_bounds_hint, collect_only=collect_only, items=items)
+
+        monkeypatch.setattr(window, "_build_legacy_commands_for_pass", _wrapper)
+        updates = []
+        monkeypatch.setattr(window, "update", lambda *args: updates.append(args))
+
+        _ingest_sample_payloads(window)
+        window._request_repaint("ingest", immediate=True)
+        assert updates == []  # the repaint waits for the plan
+        assert window._render_pipeline.plan_pending
+
+        window._paint_legacy(painter)  # an unrelated paint shows the previous frame meanwhile
+        assert built == []
+
+        timer = QElapsedTimer()
+        timer.start()
+        while not updates and timer.elapsed() < 5000:
+            qt_app.processEvents()
+        assert updates
+        assert not window._render_pipeline.plan_pending
+
+        window._paint_legacy(painter)
+        assert built == []
+        commands = window._render_pipeline._last_payload_results["commands"]
+        assert sorted(cmd.legacy_item.item_id for cmd in commands) == ["big", "box", "msg", "route"]
+    finally:
+        painter.end()
+        window.stop_frame_planner()
+
+
+@pytest.mark.pyqt_required
+def test_frame_planner_can_be_disabled(monkeypatch, qt_app):
+    monkeypatch.setenv("EDMC_OVERLAY_FRAME_PLANNER", "0")
+    window = OverlayWindow(InitialClientSettings(), DebugConfig())
+    assert window.start_frame_planner() is False
+    assert window._submit_frame_plan() is False
+
+
+@pytest.mark.pyqt_required
+def test_overdue_frame_plan_is_cancelled_and_repainted(monkeypatch, qt_app):
+    monkeypatch.delenv("EDMC_OVERLAY_FRAME_PLANNER", raising=False)
+    window = OverlayWindow(InitialClientSettings(), DebugConfig())
+    window.resize(1280, 960)
+    pixmap = QPixmap(1280, 960)
+    painter = QPainter(pixmap)
+    window._paint_legacy(painter)
+    painter.end()
+    assert window.start_frame_planner()
+    try:
+        monkeypatch.setattr(window._frame_planner, "submit", lambda snapshot: True)  # the plan never arrives
+        updates = []
+        monkeypatch.setattr(window, "update", lambda *args: updates.append(args))
+
+        _ingest_sample_payloads(window)
+        window._request_repaint("ingest", immediate=True)
+        assert updates == []
+        assert window._frame_plan_timer.isActive()
+
+        timer = QElapsedTimer()
+        timer.start()
+        while not updates and timer.elapsed() < 5000:
+            qt_app.processEvents()
+        assert updates  # the overdue timer repaints without the plan
+        assert not window._render_pipeline.plan_pending
+        assert not window._frame_plan_timer.isActive()
+    finally:
+        window.stop_frame_planner()
+
+
+@pytest.mark.pyqt_required
+def test_superseded_frame_plan_still_schedules_a_paint(monkeypatch, qt_app):
+    monkeypatch.delenv("EDMC_OVERLAY_FRAME_PLANNER", raising=False)
+    window = OverlayWindow(InitialClientSettings(), DebugConfig())
+    window.resize(1280, 960)
+    pixmap = QPixmap(1280, 960)
+    painter = QPainter(pixmap)
+    window._paint_legacy(painter)
+    painter.end()
+    assert window.start_frame_planner()
+    try:
+        plans = []
+        monkeypatch.setattr(window._frame_planner, "submit", lambda snapshot: plans.append(snapshot) or True)
+        updates = []
+        monkeypatch.setattr(window, "update", lambda *args: updates.append(args))
+
+        _ingest_sample_payloads(window)
+        window._request_repaint("ingest", immediate=True)
+        stale = plans[-1]
+        window._payload_model.set("late", LegacyItem("late", "message", {"text": "late"}, plugin="tester"))
+        window._request_repaint("ingest", immediate=True)
+        assert len(plans) == 2 and updates == []
+
+        window._apply_frame_plan(plan_frame(stale, _PlannerTextMeasurer(64, 1 << 20)))
+        assert updates == [()]  # rejected, but the paint falls back instead of waiting
+        assert window._render_pipeline.plan_pending
+    finally:
+        window.stop_frame_planner()
@@ -199,6 +199,35 @@ def test_exact_match_takes_priority_over_prefix(override_file: Path) -> None:
     assert manager.grouping_key_for("Example", "example.alert.normal") == ("Example", "alerts")
 
 
+def test_longest_prefix_and_first_plugin_win(override_file: Path) -> None:
+    override_file.write_text(
+        json.dumps(
+            {
+                "First": {
+                    "matchingPrefixes": ["shared-"],
+                    "idPrefixGroups": {
+                        "broad": {"idPrefixes": ["shared-"]},
+                        "narrow": {"idPrefixes": ["Shared-Route-"]},
+                        "exact-prefix": {"idPrefixes": [{"value": "shared-route-x", "matchMode": "exact"}]},
+                    },
+                },
+                "Second": {"matchingPrefixes": ["shared-route-", "other-"]},
+            }
+        ),
+        encoding="utf-8",
+    )
+    manager = _make_manager(override_file)
+
+    assert manager.infer_plugin_name({"id": "SHARED-ROUTE-1"}) == "First"
+    assert manager.infer_plugin_name({"id": "other-1"}) == "Second"
+    assert manager.infer_plugin_name({"id": "unknown"}) is None
+    assert manager.grouping_key_for(None, "shared-route-1") == ("First", "narrow")
+    assert manager.grouping_key_for(None, "shared-route-x") == ("First", "exact-prefix")
+    assert manager.grouping_key_for(None, "shared-routex") == ("First", "broad")
+    # grouping_label_for_id keeps its first-listed-spec rule.
+    assert manager.grouping_label_for_id("shared-route-1") == "broad"
+
+
 def test_group_anchor_selection(override_file: Path) -> None:
     override_file.write_text(
         json.dumps(
@@ -367,3 +396,28 @@ def test_legacy_preserve_anchor_mapping(override_file: Path) -> None:
     )
     manager = _make_manager(override_file)
     assert manager.group_preserve_fill_aspect("Legacy", "payload") == (True, "center")
+
+
+def test_resolution_is_memoised_until_generation_changes(override_file: Path) -> None:
+    override_file.write_text(
+        json.dumps({"Example": {"idPrefixGroups": {"alerts": {"idPrefixes": ["example.alert."]}}}}),
+        encoding="utf-8",
+    )
+    manager = _make_manager(override_file)
+
+    first = manager.resolve("Example", "example.alert.red")
+    assert first.plugin == "example"
+    assert first.group_key == ("Example", "alerts")
+    assert first.group_label == "alerts"
+    assert manager.resolve("EXAMPLE ", "example.alert.red") is first
+
+    generation = manager.generation
+    override_file.write_text(
+        json.dumps({"Example": {"idPrefixGroups": {"warnings": {"idPrefixes": ["example.alert."]}}}}),
+        encoding="utf-8",
+    )
+    manager.force_reload()
+    assert manager.generation == generation + 1
+    second = manager.resolve("Example", "example.alert.red")
+    assert second is not first
+    assert second.group_key == ("Example", "warnings")
@@ -24,6 +24,9 @@ def test_force_reload_overrides_resets_state_and_updates_plugins():
                 return "new-plugin"
             return payload.get("plugin")
 
+        def grouping_label_for_id(self, payload_id):
+            return "Alerts" if payload_id == "item-a" else None
+
     class DummyGroupingHelper:
         def __init__(self):
             self.reset_called = False
@@ -45,6 +48,9 @@ def test_force_reload_overrides_resets_state_and_updates_plugins():
     assert not model._last_snapshots  # type: ignore[attr-defined]
     assert model.store.get("item-a").plugin == "new-plugin"
     assert model.store.get("item-b").plugin == "stay"
+    assert dict(model.plugin_counts()) == {"new-plugin": 1, "stay": 1}
+    assert dict(model.group_counts()) == {"Alerts": 1, None: 1}
+    assert len(model) == 2
     assert any("Override reload applied" in entry for entry in logs)
 
 
@@ -1,8 +1,9 @@
 from typing import Any, Dict, Tuple
 
-from PyQt6.QtGui import QColor
+from PyQt6.QtGui import QColor, QFont, QFontMetrics, QImage, QPainter
 
 from overlay_client.paint_commands import (
+    GroupLayerCache,
     _MessagePaintCommand,
     _RectPaintCommand,
     _VectorPaintCommand,
@@ -30,6 +31,14 @@ class _StubWindow:
     def _apply_font_fallbacks(self, font) -> None:  # noqa: ANN001
         return None
 
+    def _pooled_font(self, point_size: float, family=None) -> QFont:  # noqa: ANN001
+        font = QFont(family or self._font_family)
+        font.setPointSizeF(point_size)
+        return font
+
+    def _pooled_font_metrics(self, point_size: float, family=None) -> QFontMetrics:  # noqa: ANN001
+        return QFontMetrics(self._pooled_font(point_size, family))
+
     def _compute_legacy_mapper(self):  # noqa: D401
         return object()
 
@@ -183,8 +192,8 @@ def test_vector_adapter_draw_text_multiline_splits_lines(monkeypatch):
         def descent(self) -> int:
             return 3
 
-    monkeypatch.setattr("overlay_client.paint_commands.QFontMetrics", _FakeMetrics)
     window = _StubWindow()
+    monkeypatch.setattr(window, "_pooled_font_metrics", lambda point_size, family=None: _FakeMetrics())
     painter = _RecordingPainter()
     adapter = _QtVectorPainterAdapter(window, painter)
 
@@ -221,3 +230,76 @@ def test_message_paint_draws_multiline_text():
         ("drawText", 10, 100, "Hello"),
         ("drawText", 10, 105, "World"),
     ]
+
+
+def _counted_rect(item_id: str, counts: Dict[str, int]) -> _RectPaintCommand:
+    cmd = _RectPaintCommand(
+        group_key=("g", None),
+        group_transform=None,
+        legacy_item=_StubLegacyItem(item_id),
+        bounds=None,
+        x=1,
+        y=2,
+        width=3,
+        height=4,
+        cycle_anchor=(1, 1),
+    )
+    original = cmd.paint
+
+    def paint(window, painter, offset_x, offset_y):  # noqa: ANN001
+        counts[item_id] = counts.get(item_id, 0) + 1
+        original(window, painter, offset_x, offset_y)
+
+    cmd.paint = paint  # type: ignore[method-assign]
+    return cmd
+
+
+def test_group_layer_cache_replays_until_key_or_commands_change():
+    window = _StubWindow()
+    image = QImage(32, 32, QImage.Format.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    counts: Dict[str, int] = {}
+    cache = GroupLayerCache()
+    first = _counted_rect("a", counts)
+    second = _counted_rect("b", counts)
+    draws = [(first, 5.0, 6.0), (second, 0.0, 0.0)]
+    try:
+        assert cache.paint_group(window, painter, ("g", None), (1, (100,)), draws) is False
+        window._registered.clear()
+        assert cache.paint_group(window, painter, ("g", None), (1, (100,)), draws) is True
+        assert counts == {"a": 1, "b": 1}
+        assert window._registered == {"a": (6, 7), "b": (1, 1)}
+
+        assert cache.paint_group(window, painter, ("g", None), (1, (50,)), draws) is False
+        replacement = _counted_rect("b", counts)
+        rebuilt = [(first, 5.0, 6.0), (replacement, 0.0, 0.0)]
+        assert cache.paint_group(window, painter, ("g", None), (1, (50,)), rebuilt) is False
+        assert counts == {"a": 3, "b": 3}
+    finally:
+        painter.end()
+    assert cache.stats == {"replayed": 1, "recorded": 3, "direct": 0}
+    cache.prune([("other", None)])
+    assert len(cache) == 0
+
+
+def test_group_layer_cache_paints_directly_when_target_dpi_differs():
+    window = _StubWindow()
+    cache = GroupLayerCache()
+    image = QImage(32, 32, QImage.Format.Format_ARGB32_Premultiplied)
+    picture_dpi = cache._recording_dpi()
+    # 120 DPI expressed in dots per metre, chosen to differ from the picture's DPI.
+    dots_per_metre = 4724 if picture_dpi[0] != 120 else 5669
+    image.setDotsPerMeterX(dots_per_metre)
+    image.setDotsPerMeterY(dots_per_metre)
+    assert (image.logicalDpiX(), image.logicalDpiY()) != picture_dpi
+    painter = QPainter(image)
+    counts: Dict[str, int] = {}
+    draws = [(_counted_rect("a", counts), 0.0, 0.0)]
+    try:
+        assert cache.paint_group(window, painter, ("g", None), (1,), draws) is False
+        assert cache.paint_group(window, painter, ("g", None), (1,), draws) is False
+    finally:
+        painter.end()
+    assert counts == {"a": 2}
+    assert cache.stats == {"replayed": 0, "recorded": 0, "direct": 2}
+    assert len(cache) == 0
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import Mapping
 
+from overlay_client.legacy_store import vector_points
 from overlay_client.payload_model import PayloadModel
 
 
@@ -74,3 +75,61 @@ def test_override_generation_busts_dedupe() -> None:
     assert model.ingest(payload.copy(), override_generation=1, group_label="group-a") is True
     # Same payload but new override generation should not dedupe.
     assert model.ingest(payload.copy(), override_generation=2, group_label="group-a") is True
+
+
+def test_vector_delta_resets_dedupe_snapshot() -> None:
+    model = PayloadModel(_trace_logger)
+    full = {
+        "id": "route",
+        "type": "shape",
+        "shape": "vect",
+        "color": "white",
+        "vector": [{"x": 0, "y": 0}, {"x": 10, "y": 10}],
+        "vector_gen": 1,
+    }
+    assert model.ingest(dict(full), override_generation=1) is True
+    delta = {key: value for key, value in full.items() if key not in {"vector", "vector_gen"}}
+    delta["vector_delta"] = {"base": 2, "count": 2, "set": [[1, {"x": 20, "y": 20}]], "gen": 1, "seq": 1}
+    assert model.ingest(delta, override_generation=1) is True
+    assert vector_points(model.get("route"))[1] == {"x": 20, "y": 20}
+    # The original full payload now differs from what the store holds, so it must not be deduped.
+    assert model.ingest(dict(full), override_generation=1) is True
+    assert vector_points(model.get("route"))[1] == {"x": 10, "y": 10}
+
+
+def test_deduped_full_vector_still_moves_delta_baseline() -> None:
+    model = PayloadModel(_trace_logger)
+    resyncs = []
+    model.set_vector_resync_callback(lambda item_id, generation, held: resyncs.append((item_id, generation, held)))
+    full = {
+        "id": "route",
+        "type": "shape",
+        "shape": "vect",
+        "color": "white",
+        "vector": [{"x": 0, "y": 0}, {"x": 10, "y": 10}],
+    }
+    assert model.ingest({**full, "vector_gen": 1}, override_generation=1) is True
+    # A reconnect re-sends identical points under a new generation; dedupe skips the store update.
+    assert model.ingest({**full, "vector_gen": 2}, override_generation=1) is False
+    delta = {key: value for key, value in full.items() if key != "vector"}
+    delta["vector_delta"] = {"base": 2, "count": 2, "set": [[1, {"x": 5, "y": 5}]], "gen": 2, "seq": 1}
+    assert model.ingest(delta, override_generation=1) is True
+    stale = dict(delta, vector_delta=dict(delta["vector_delta"], gen=1))
+    assert model.ingest(stale, override_generation=1) is False
+    assert resyncs == [("route", 1, True)]
+
+
+def test_counts_follow_ingest_and_purge() -> None:
+    model = PayloadModel(_trace_logger)
+    base = {"type": "message", "text": "hi", "color": "white", "x": 0, "y": 0, "size": "normal", "ttl": 1}
+    model.ingest({**base, "id": "a", "plugin": "EDR"}, group_label="alerts")
+    model.ingest({**base, "id": "b", "plugin": "EDR"}, group_label=None)
+    model.ingest({**base, "id": "c", "plugin": "BGS", "ttl": 0}, group_label="alerts")
+    assert len(model) == 3
+    assert dict(model.plugin_counts()) == {"EDR": 2, "BGS": 1}
+    assert dict(model.group_counts()) == {"alerts": 2, None: 1}
+
+    assert model.purge_expired(model.next_expiry() + 1.0) is True
+    assert len(model) == 1
+    assert dict(model.plugin_counts()) == {"BGS": 1}
+    assert dict(model.group_counts()) == {"alerts": 1}
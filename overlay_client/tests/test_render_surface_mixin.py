@@ -4,11 +4,11 @@ from typing import Any, Optional, Tuple
 
 import pytest
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QColor
+from PyQt6.QtGui import QBrush, QColor, QImage, QPainter, QPen
 
 from overlay_client.group_transform import GroupKey
 from overlay_client.legacy_store import LegacyItem
-from overlay_client.paint_commands import _MessagePaintCommand, _RectPaintCommand
+from overlay_client.paint_commands import GroupLayerCache, _MessagePaintCommand, _RectPaintCommand
 from overlay_client.render_surface import RenderSurfaceMixin, _MeasuredText, _OverlayBounds
 
 
@@ -347,3 +347,50 @@ def test_rect_command_valid_border_color_uses_pen(monkeypatch: pytest.MonkeyPatc
     assert cmd.pen.style() == Qt.PenStyle.SolidLine
     assert cmd.pen.color().name() == QColor("#ff00ff").name()
     assert cmd.pen.width() == surface._line_width("legacy_rect")
+
+
+class _LayerSurface(_StubSurface):
+    def __init__(self) -> None:
+        super().__init__()
+        self._render_pipeline = SimpleNamespace(group_revision=lambda key: 1)
+
+    def _payload_opacity_percent(self) -> int:
+        return 100
+
+
+def _filled_rect(group: str, color: str) -> _RectPaintCommand:
+    return _RectPaintCommand(
+        group_key=GroupKey("plugin", group),
+        group_transform=None,
+        legacy_item=LegacyItem(item_id=f"{group}-{color}", kind="rect", data={}, plugin="plugin"),
+        bounds=None,
+        pen=QPen(Qt.PenStyle.NoPen),
+        brush=QBrush(QColor(color)),
+        x=0,
+        y=0,
+        width=4,
+        height=4,
+    )
+
+
+def test_group_layers_keep_command_order_across_interleaved_groups() -> None:
+    surface = _LayerSurface()
+    cache = GroupLayerCache()
+    first = _filled_rect("a", "red")
+    middle = _filled_rect("b", "blue")
+    last = _filled_rect("a", "lime")
+    runs = [
+        (("plugin", "a"), [(first, 0.0, 0.0)]),
+        (("plugin", "b"), [(middle, 0.0, 0.0)]),
+        (("plugin", "a"), [(last, 0.0, 0.0)]),
+    ]
+    for _frame in range(2):
+        image = QImage(8, 8, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(image)
+        try:
+            surface._paint_group_layers(painter, cache, runs)
+        finally:
+            painter.end()
+        assert image.pixelColor(1, 1) == QColor("lime")
+    assert len(cache) == 3
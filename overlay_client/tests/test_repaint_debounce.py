@@ -82,3 +82,21 @@ def test_request_repaint_disables_debounce_when_configured(window: OverlayWindow
     window._request_repaint("ingest", immediate=False)
     assert window._updated is True
     assert timer.started == 0
+
+
+def test_legacy_ingest_batch_repaints_once(window: OverlayWindow, monkeypatch):
+    marks = []
+    monkeypatch.setattr(window, "_mark_legacy_cache_dirty", lambda: marks.append(True))
+    timer = window._repaint_timer
+    revision = window._payload_model.revision
+    with window.legacy_ingest_batch():
+        for idx in range(3):
+            window.handle_legacy_payload(
+                {"event": "LegacyOverlay", "type": "message", "id": f"batch-{idx}", "text": "hi", "x": idx, "y": 0}
+            )
+        assert marks == []
+        assert timer.started == 0
+    assert marks == []  # the store revision invalidates the render cache
+    assert window._payload_model.revision > revision
+    assert timer.started == 1
+    assert len(window._payload_model) == 3
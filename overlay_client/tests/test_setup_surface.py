@@ -26,7 +26,8 @@ def test_setup_surface_initialises_defaults(qt_app):
         assert window._text_cache == {}
         assert window._text_cache_generation == 0
         assert window._repaint_timer.interval() == window._REPAINT_DEBOUNCE_MS
-        assert window._legacy_timer.isActive()
+        assert window._legacy_timer.isSingleShot()
+        assert not window._legacy_timer.isActive()
     finally:
         window._legacy_timer.stop()
         window._modifier_timer.stop()
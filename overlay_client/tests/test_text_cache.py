@@ -5,7 +5,9 @@ import os
 import pytest
 from PyQt6.QtWidgets import QApplication
 
+from overlay_client.font_utils import FontPool
 from overlay_client.overlay_client import OverlayWindow
+from overlay_client.text_cache import LRUTextCache
 
 if not os.getenv("PYQT_TESTS"):
     pytest.skip("PYQT_TESTS not set; skipping PyQt-dependent test", allow_module_level=True)
@@ -23,8 +25,9 @@ class _DummyWindow:
     _TEXT_CACHE_MAX = 512
 
     def __init__(self, ratio: float = 1.0, fallbacks: tuple[str, ...] = ()) -> None:
-        self._text_cache = {}
-        self._text_block_cache = {}
+        self._text_cache = LRUTextCache(self._TEXT_CACHE_MAX, 1 << 20)
+        self._text_block_cache = LRUTextCache(self._TEXT_CACHE_MAX, 1 << 20)
+        self._line_spacing_cache = {}
         self._text_cache_generation = 0
         self._text_cache_context = None
         self._text_measurer = None
@@ -32,6 +35,7 @@ class _DummyWindow:
         self._font_fallbacks = tuple(fallbacks)
         self._measure_stats = {"calls": 0}
         self._dev_mode_enabled = False
+        self._font_pool = FontPool()
         self._ratio = ratio
 
     def devicePixelRatioF(self) -> float:  # noqa: N802 - Qt compatibility
@@ -49,6 +53,12 @@ class _DummyWindow:
     def _apply_font_fallbacks(self, *_args, **_kwargs) -> None:
         return None
 
+    def _pooled_font_metrics(self, point_size, family=None):  # noqa: ANN001 - signature match
+        return OverlayWindow._pooled_font_metrics(self, point_size, family)
+
+    def _text_device_ratio(self):
+        return OverlayWindow._text_device_ratio(self)
+
 
 def test_text_cache_hits_and_misses(app) -> None:  # noqa: ARG001 - fixture required
     window = _DummyWindow()
@@ -76,7 +86,7 @@ def test_text_cache_invalidated_on_font_change(app) -> None:  # noqa: ARG001 - f
     assert window._measure_stats.get("cache_reset", 0) == resets_before + 1
     assert window._text_cache_generation == generation_before + 1
     assert ("hello", 10.0, "NewFont") in window._text_cache
-    assert window._text_block_cache == {}
+    assert len(window._text_block_cache) == 0
 
 
 def test_text_cache_invalidated_on_ratio_change(app) -> None:  # noqa: ARG001 - fixture required
@@ -105,3 +115,44 @@ def test_text_cache_invalidated_on_fallback_change(app) -> None:  # noqa: ARG001
 
     assert window._measure_stats.get("cache_reset", 0) == resets_before + 1
     assert window._text_cache_generation == generation_before + 1
+
+
+def test_invalidation_empties_lru_caches(app) -> None:  # noqa: ARG001 - fixture required
+    window = _DummyWindow()
+    for text in ("a", "bb", "a\nb"):
+        OverlayWindow._measure_text(window, text, 10.0, None)
+    window._text_block_cache[("a\nb", 10.0, "TestFont", (), 1.0, 0)] = (10, 10)
+    assert len(window._text_cache) == 3
+    window.set_ratio(1.5)
+
+    OverlayWindow._ensure_text_cache_context(window, "TestFont")
+
+    assert len(window._text_cache) == 0
+    assert len(window._text_block_cache) == 0
+
+
+def test_font_pool_reuses_fonts_until_text_cache_invalidated(app) -> None:  # noqa: ARG001 - fixture required
+    window = _DummyWindow()
+    first = OverlayWindow._measure_text(window, "hello", 10.0, None)
+    OverlayWindow._measure_text(window, "other", 10.0, None)
+    OverlayWindow._line_spacing(window, 10.0)
+    assert len(window._font_pool) == 1
+    assert window._font_pool.stats == {"hit": 2, "miss": 1}
+    pooled = window._font_pool.font("TestFont", (), 10.0, device_ratio=1.0)
+    assert window._font_pool.font("TestFont", (), 10.0, device_ratio=1.0) is pooled
+
+    window.set_ratio(2.0)
+    assert OverlayWindow._measure_text(window, "hello", 10.0, None) == first
+    assert len(window._font_pool) == 1
+    assert window._font_pool.font("TestFont", (), 10.0, device_ratio=2.0) is not pooled
+
+
+def test_font_pool_evicts_least_recently_used(app) -> None:  # noqa: ARG001 - fixture required
+    pool = FontPool(max_entries=2)
+    hot = pool.font("TestFont", (), 10.0)
+    pool.font("TestFont", (), 11.0)
+    assert pool.font("TestFont", (), 10.0) is hot
+    pool.font("TestFont", (), 12.0)
+    assert len(pool) == 2
+    assert pool.font("TestFont", (), 10.0) is hot
+    assert pool.stats == {"hit": 2, "miss": 3}
@@ -394,3 +394,37 @@ def test_compute_vector_transform_with_anchor_translation_and_bounds():
     assert raw_min_x == 1.0
     assert trace_cb is not None
     assert any(stage == "paint:raw_points" for stage, _ in calls)
+
+
+def test_compute_vector_transform_reads_packed_coordinates():
+    from array import array
+
+    fill = _fill(scale=1.0)
+    mapper = _mapper(scale=1.0, mode=ScaleMode.FIT)
+    # The packed ints win over the point dicts; the dicts only carry colour/marker/text.
+    vector_payload, screen_points, overlay_bounds, _base, _anchor, raw_min_x, _trace = compute_vector_transform(
+        "plugin",
+        "item",
+        fill,
+        transform_context=None,
+        transform_meta=None,
+        mapper=mapper,
+        group_transform=None,
+        item_data={"base_color": "#fff"},
+        raw_points=[{"x": "bad", "y": 0, "color": "red"}, {"x": 0, "y": 0}],
+        offset_x=0.0,
+        offset_y=0.0,
+        selected_anchor=None,
+        base_anchor_point=None,
+        anchor_for_transform=None,
+        base_translation_dx=0.0,
+        base_translation_dy=0.0,
+        trace_fn=None,
+        collect_only=False,
+        packed_xy=array("i", [4, 5, 10, 12]),
+    )
+    assert vector_payload is not None
+    assert vector_payload["points"][0] == {"x": 4.0, "y": 5.0, "color": "red"}
+    assert screen_points == [(4, 5), (10, 12)]
+    assert overlay_bounds == (4.0, 5.0, 10.0, 12.0)
+    assert raw_min_x == 4.0
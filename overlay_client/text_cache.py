@@ -0,0 +1,108 @@
+"""Bounded LRU caches for text measurements (Qt-free)."""
+from __future__ import annotations
+
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterator, List, MutableMapping, Optional, Tuple
+
+# Rough per-entry cost of the OrderedDict slot, key/value tuples and boxed numbers.
+_ENTRY_OVERHEAD_BYTES = 200
+
+
+def new_cache_stats() -> Dict[str, int]:
+    return {"hit": 0, "miss": 0, "evict": 0}
+
+
+def approximate_entry_bytes(key: Hashable, value: Any) -> int:
+    """Approximate memory held by one entry; only strings are sized exactly."""
+    size = _ENTRY_OVERHEAD_BYTES
+    for part in (key if isinstance(key, tuple) else (key,)):
+        if isinstance(part, str):
+            size += sys.getsizeof(part)
+        elif isinstance(part, tuple):
+            size += sum(sys.getsizeof(item) for item in part if isinstance(item, str))
+    return size
+
+
+class LRUTextCache(MutableMapping[Hashable, Any]):
+    """Least-recently-used mapping bounded by entry count and approximate bytes.
+
+    Lookups through ``get``/``[]`` refresh recency; ``in`` does not. ``get`` counts
+    hits and misses and evictions are counted as they happen, into ``stats``, which
+    several caches may share so one log line covers them all.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, stats: Optional[Dict[str, int]] = None) -> None:
+        self._max_entries = max(1, int(max_entries))
+        self._max_bytes = max(1, int(max_bytes))
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self.stats = stats if stats is not None else new_cache_stats()
+
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value, _size = self._entries[key]
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["miss"] = self.stats.get("miss", 0) + 1
+            return default
+        self._entries.move_to_end(key)
+        self.stats["hit"] = self.stats.get("hit", 0) + 1
+        return entry[0]
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[1]
+        size = approximate_entry_bytes(key, value)
+        self._entries[key] = (value, size)
+        self._bytes += size
+        self._evict()
+
+    def __delitem__(self, key: Hashable) -> None:
+        _value, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def items(self) -> List[Tuple[Hashable, Any]]:  # type: ignore[override]
+        # Snapshot without touching recency (Mapping.items would reorder while iterating).
+        return [(key, value) for key, (value, _size) in self._entries.items()]
+
+    def values(self) -> List[Any]:  # type: ignore[override]
+        return [value for value, _size in self._entries.values()]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (LRUTextCache, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"LRUTextCache(entries={len(self._entries)}, bytes={self._bytes})"
+
+    def _evict(self) -> None:
+        entries = self._entries
+        while entries and (len(entries) > self._max_entries or self._bytes > self._max_bytes):
+            _key, (_value, size) = entries.popitem(last=False)
+            self._bytes -= size
+            self.stats["evict"] = self.stats.get("evict", 0) + 1
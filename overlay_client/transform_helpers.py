@@ -262,6 +262,8 @@ def compute_vector_transform(
     base_translation_dy: float,
     trace_fn: Optional[TraceFn],
     collect_only: bool,
+    *,
+    packed_xy: Optional[Sequence[int]] = None,
 ) -> Tuple[
     Optional[Mapping[str, Any]],
     List[Tuple[int, int]],
@@ -271,16 +273,22 @@ def compute_vector_transform(
     Optional[float],
     Optional[TraceFn],
 ]:
+    if packed_xy is not None and len(packed_xy) != 2 * len(raw_points):
+        packed_xy = None
     raw_min_x: Optional[float] = None
-    for point in raw_points:
-        if not isinstance(point, Mapping):
-            continue
-        try:
-            px = float(point.get("x", 0.0))
-        except (TypeError, ValueError):
-            continue
-        if raw_min_x is None or px < raw_min_x:
-            raw_min_x = px
+    if packed_xy is not None:
+        if packed_xy:
+            raw_min_x = float(min(packed_xy[0::2]))
+    else:
+        for point in raw_points:
+            if not isinstance(point, Mapping):
+                continue
+            try:
+                px = float(point.get("x", 0.0))
+            except (TypeError, ValueError):
+                continue
+            if raw_min_x is None or px < raw_min_x:
+                raw_min_x = px
     translation_dx = base_translation_dx
     translation_dy = base_translation_dy
     justification_delta = 0.0
@@ -308,12 +316,19 @@ def compute_vector_transform(
                 "mode": mapper.transform.mode.value,
             },
         )
+        if packed_xy is not None:
+            traced_points: Sequence[Mapping[str, Any]] = [
+                {"x": packed_xy[2 * index], "y": packed_xy[2 * index + 1], **point}
+                for index, point in enumerate(raw_points)
+            ]
+        else:
+            traced_points = raw_points
         trace_fn(
             "paint:raw_points",
-            {"points": raw_points},
+            {"points": traced_points},
         )
     transformed_points: List[Mapping[str, Any]] = []
-    remapped = remap_vector_points(fill, transform_meta, raw_points, context=transform_context)
+    remapped = remap_vector_points(fill, transform_meta, raw_points, context=transform_context, packed_xy=packed_xy)
     if offset_x or offset_y:
         remapped = [
             (ox + offset_x, oy + offset_y, original_point)
@@ -0,0 +1,401 @@
+"""Shared watcher that flags config file changes without stat() on the hot path.
+
+Consumers register the files they read (``debug.json``, ``dev_settings.json``,
+the groupings files) and keep a :class:`ConfigWatch`. A single background thread
+learns about changes, via inotify on the parent directories on Linux and otherwise
+by comparing stat signatures at most once per ``poll_interval``, and bumps a
+counter on every affected watch. ``ConfigWatch.poll()`` only compares two ints,
+so payload paths can ask "did anything change?" without touching the filesystem.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_LOGGER = logging.getLogger("EDMC.ModernOverlay.ConfigWatcher")
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+_Signature = Optional[Tuple[int, int, int]]
+
+
+class _Inotify:
+    """Minimal ctypes binding for the Linux inotify API."""
+
+    def __init__(self) -> None:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._ctypes = ctypes
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._add_watch.restype = ctypes.c_int
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+        self._rm_watch.restype = ctypes.c_int
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.fd = fd
+
+    def add_watch(self, directory: str) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            errno = self._ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), directory)
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self) -> List[Tuple[int, int, str]]:
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events: List[Tuple[int, int, str]] = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+def _signature(path: str) -> _Signature:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class ConfigWatch:
+    """Change flag for a set of files; ``poll()`` never touches the filesystem."""
+
+    __slots__ = ("paths", "_watcher", "_events", "_seen")
+
+    def __init__(self, watcher: "ConfigWatcher", paths: Tuple[str, ...]) -> None:
+        self.paths = paths
+        self._watcher: Optional[ConfigWatcher] = watcher
+        # Only the watcher thread increments ``_events``; only the owner advances ``_seen``.
+        self._events = 0
+        self._seen = 0
+
+    def poll(self) -> bool:
+        """Return True once for every batch of changes since the previous call."""
+
+        events = self._events
+        if events == self._seen:
+            return False
+        self._seen = events
+        return True
+
+    def _notify(self) -> None:
+        self._events += 1
+
+    def close(self) -> None:
+        watcher = self._watcher
+        self._watcher = None
+        if watcher is not None:
+            watcher.unwatch(self)
+
+
+class ConfigWatcher:
+    """Background service that turns file changes into :class:`ConfigWatch` flags.
+
+    Directories are watched with inotify when it is available; files whose parent
+    cannot be watched (missing directory, other platforms, inotify limits) fall back
+    to a stat signature check once per ``poll_interval``. The thread runs only while
+    at least one watch is registered.
+    """
+
+    def __init__(self, poll_interval: float = DEFAULT_POLL_INTERVAL, *, use_inotify: bool = True) -> None:
+        self._poll_interval = max(0.05, float(poll_interval))
+        self._use_inotify = use_inotify and sys.platform.startswith("linux")
+        self._lock = threading.Lock()
+        self._watches: Dict[str, Set[ConfigWatch]] = {}
+        self._signatures: Dict[str, _Signature] = {}
+        self._dir_wds: Dict[str, int] = {}
+        self._wd_dirs: Dict[int, str] = {}
+        self._inotify: Optional[_Inotify] = None
+        self._wake_r: Optional[int] = None
+        self._wake_w: Optional[int] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._inotify is not None else "stat"
+
+    @property
+    def running(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def watch(self, paths: Iterable[Path | str]) -> ConfigWatch:
+        """Register ``paths`` and return a watch that flags changes to any of them."""
+
+        normalized = tuple(dict.fromkeys(os.path.abspath(os.fspath(path)) for path in paths if path))
+        watch = ConfigWatch(self, normalized)
+        with self._lock:
+            self._ensure_backend()
+            for path in normalized:
+                self._watches.setdefault(path, set()).add(watch)
+                self._track_locked(path)
+        self._ensure_thread()
+        return watch
+
+    def unwatch(self, watch: ConfigWatch) -> None:
+        with self._lock:
+            for path in watch.paths:
+                watchers = self._watches.get(path)
+                if watchers is None:
+                    continue
+                watchers.discard(watch)
+                if not watchers:
+                    del self._watches[path]
+                    self._signatures.pop(path, None)
+            self._drop_unused_dirs_locked()
+            idle = not self._watches
+        if idle:
+            self._shutdown_if_idle()
+
+    # Internal helpers ---------------------------------------------------
+
+    def _shutdown_if_idle(self, timeout: float = 1.0) -> None:
+        thread = self._thread
+        self._stop_event.set()
+        self._wake()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+        self._thread = None
+        with self._lock:
+            restart = bool(self._watches)
+            if not restart:
+                self._close_backend_locked()
+        if restart:
+            # A watch was registered while the thread was stopping.
+            self._ensure_thread()
+
+    def _close_backend_locked(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        self._dir_wds.clear()
+        self._wd_dirs.clear()
+        for fd in (self._wake_r, self._wake_w):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._wake_r = self._wake_w = None
+
+    def _ensure_backend(self) -> None:
+        if not self._use_inotify or self._inotify is not None:
+            return
+        try:
+            self._inotify = _Inotify()
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_r, False)
+        except (OSError, AttributeError) as exc:
+            _LOGGER.debug("inotify unavailable; config watcher falls back to stat polling: %s", exc)
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+            self._use_inotify = False
+
+    def _ensure_thread(self) -> None:
+        if self.running:
+            return
+        self._stop_event.clear()
+        thread = threading.Thread(target=self._run, name="ModernOverlayConfigWatcher", daemon=True)
+        self._thread = thread
+        thread.start()
+
+    def _track_locked(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if self._inotify is not None and directory not in self._dir_wds:
+            try:
+                wd = self._inotify.add_watch(directory)
+            except OSError as exc:
+                _LOGGER.debug("Cannot watch %s with inotify (%s); using stat polling", directory, exc)
+            else:
+                self._dir_wds[directory] = wd
+                self._wd_dirs[wd] = directory
+        if directory not in self._dir_wds:
+            self._signatures[path] = _signature(path)
+
+    def _drop_unused_dirs_locked(self) -> None:
+        if self._inotify is None:
+            return
+        used = {os.path.dirname(path) for path in self._watches}
+        for directory in [name for name in self._dir_wds if name not in used]:
+            wd = self._dir_wds.pop(directory)
+            self._wd_dirs.pop(wd, None)
+            self._inotify.rm_watch(wd)
+
+    def _wake(self) -> None:
+        if self._wake_w is not None:
+            try:
+                os.write(self._wake_w, b"\0")
+            except OSError:
+                pass
+
+    def _notify_paths_locked(self, paths: Iterable[str]) -> None:
+        notified: Set[ConfigWatch] = set()
+        for path in paths:
+            notified.update(self._watches.get(path, ()))
+        for watch in notified:
+            watch._notify()
+
+    def _handle_inotify_events(self) -> None:
+        inotify = self._inotify
+        if inotify is None:
+            return
+        events = inotify.read_events()
+        with self._lock:
+            changed: Set[str] = set()
+            for wd, mask, name in events:
+                if mask & _IN_Q_OVERFLOW:
+                    changed.update(self._watches)
+                    continue
+                directory = self._wd_dirs.get(wd)
+                if directory is None:
+                    continue
+                if mask & (_IN_IGNORED | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                    # The directory went away; fall back to stat polling for its files.
+                    self._wd_dirs.pop(wd, None)
+                    self._dir_wds.pop(directory, None)
+                    for path in self._watches:
+                        if os.path.dirname(path) == directory:
+                            changed.add(path)
+                            self._signatures[path] = _signature(path)
+                    continue
+                if name:
+                    changed.add(os.path.join(directory, name))
+            self._notify_paths_locked(changed)
+
+    def _check_signatures(self) -> None:
+        with self._lock:
+            pending = list(self._signatures.items())
+        if not pending:
+            return
+        changed = []
+        updates = {}
+        for path, previous in pending:
+            current = _signature(path)
+            if current != previous:
+                updates[path] = current
+                changed.append(path)
+        if not changed:
+            return
+        with self._lock:
+            for path, current in updates.items():
+                if path in self._signatures:
+                    self._signatures[path] = current
+            self._notify_paths_locked(changed)
+            if self._inotify is not None:
+                # A missing parent directory may exist now; try to upgrade to inotify.
+                for path in changed:
+                    if path in self._watches:
+                        self._track_locked(path)
+                        if os.path.dirname(path) in self._dir_wds:
+                            self._signatures.pop(path, None)
+
+    def _run(self) -> None:
+        stop_event = self._stop_event
+        while not stop_event.is_set():
+            try:
+                inotify = self._inotify
+                wake_r = self._wake_r
+                if inotify is not None and wake_r is not None:
+                    readable, _, _ = select.select([inotify.fd, wake_r], [], [], self._poll_interval)
+                    if wake_r in readable:
+                        try:
+                            os.read(wake_r, 512)
+                        except OSError:
+                            pass
+                    if inotify.fd in readable:
+                        self._handle_inotify_events()
+                elif stop_event.wait(self._poll_interval):
+                    break
+                if not stop_event.is_set():
+                    self._check_signatures()
+            except Exception as exc:  # pragma: no cover - defensive guard
+                _LOGGER.debug("Config watcher iteration failed: %s", exc)
+                if stop_event.wait(self._poll_interval):
+                    break
+
+
+_shared_lock = threading.Lock()
+_shared_watcher: Optional[ConfigWatcher] = None
+
+
+def config_watcher_mode() -> str:
+    """Return ``auto``, ``stat`` or ``off`` from ``EDMC_OVERLAY_CONFIG_WATCHER``."""
+
+    value = (os.getenv("EDMC_OVERLAY_CONFIG_WATCHER") or "1").strip().lower()
+    if value in {"0", "false", "no", "off"}:
+        return "off"
+    if value in {"stat", "poll"}:
+        return "stat"
+    return "auto"
+
+
+def shared_config_watcher() -> Optional[ConfigWatcher]:
+    """Return the process-wide watcher, or None when disabled via the environment."""
+
+    global _shared_watcher
+    mode = config_watcher_mode()
+    if mode == "off":
+        return None
+    with _shared_lock:
+        if _shared_watcher is None:
+            _shared_watcher = ConfigWatcher(use_inotify=mode == "auto")
+        return _shared_watcher
@@ -1,63 +1,55 @@
 """Compatibility TCP listener for legacy edmcoverlay payloads."""
 from __future__ import annotations
 
+import asyncio
 import json
-import socketserver
 import threading
-from typing import Any, Callable, Mapping, Optional
+import time
+from typing import Any, Callable, Dict, Mapping, Optional
 
 LogFunc = Callable[[str], None]
 LegacyPayloadHandler = Callable[[Mapping[str, Any]], bool]
 
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_RATE_LIMIT = 250.0  # payloads per second, per connection
+DEFAULT_RATE_BURST = 500
+DEFAULT_MAX_LINE_BYTES = 256 * 1024
+REJECT_LOG_INTERVAL = 30.0
 
-class _LegacyTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
-    allow_reuse_address = True
-    daemon_threads = True
 
-    def __init__(self, server_address, RequestHandlerClass) -> None:  # type: ignore[override]
-        super().__init__(server_address, RequestHandlerClass)
-        self.log: LogFunc = lambda _msg: None
-        self.payload_handler: Optional[LegacyPayloadHandler] = None
+class _RateLimiter:
+    """Token bucket: ``rate`` payloads per second with bursts of up to ``burst``."""
 
+    __slots__ = ("rate", "burst", "tokens", "stamp")
 
-class _LegacyTCPHandler(socketserver.StreamRequestHandler):
-    def handle(self) -> None:  # type: ignore[override]
-        server = self.server  # type: ignore[assignment]
-        log = getattr(server, "log", lambda _msg: None)
-        handler = getattr(server, "payload_handler", None)
-        if handler is None:
-            return
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = float(max(1, burst))
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
 
-        buffer = b""
-        while True:
-            try:
-                chunk = self.rfile.readline()
-            except Exception:
-                break
-            if not chunk:
-                break
-            buffer += chunk
-            while b"\n" in buffer:
-                line, buffer = buffer.split(b"\n", 1)
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    payload_obj = json.loads(line.decode("utf-8"))
-                except json.JSONDecodeError as exc:
-                    log(f"Legacy overlay payload rejected (parse error): {exc}")
-                    continue
-                if not isinstance(payload_obj, Mapping):
-                    log("Legacy overlay payload rejected (not a mapping)")
-                    continue
-                try:
-                    handler(dict(payload_obj))
-                except Exception as exc:
-                    log(f"Legacy overlay payload handler raised error: {exc}")
+    def allow(self) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
 
 
 class LegacyOverlayTCPServer:
-    """TCP server that ingests legacy edmcoverlay payloads."""
+    """TCP server that ingests legacy edmcoverlay payloads.
+
+    All connections are served by one asyncio loop on a single background thread,
+    so plugins that open a socket per message do not spawn a thread each. Lines are
+    split incrementally by the stream reader (capped at ``max_line_bytes``), at
+    most ``max_connections`` clients are served at once, and each connection may
+    deliver ``rate_limit`` payloads per second (bursts up to ``rate_burst``);
+    excess payloads are dropped and counted.
+    """
 
     def __init__(
         self,
@@ -65,42 +57,187 @@ class LegacyOverlayTCPServer:
         port: int,
         log: LogFunc,
         handler: LegacyPayloadHandler,
+        *,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        rate_limit: float = DEFAULT_RATE_LIMIT,
+        rate_burst: int = DEFAULT_RATE_BURST,
+        max_line_bytes: int = DEFAULT_MAX_LINE_BYTES,
     ) -> None:
         self._host = host
         self._port = port
         self._log = log
         self._handler = handler
-        self._server: Optional[_LegacyTCPServer] = None
+        self._max_connections = max(1, int(max_connections))
+        self._rate_limit = float(rate_limit)
+        self._rate_burst = int(rate_burst)
+        self._max_line_bytes = max(1024, int(max_line_bytes))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._thread: Optional[threading.Thread] = None
+        self._ready_event = threading.Event()
+        self._stop_requested: Optional[asyncio.Event] = None
+        self._start_error: Optional[BaseException] = None
+        self._connections: Dict[asyncio.StreamWriter, Optional[asyncio.Task]] = {}
+        self._rejected = 0
+        self._rejected_logged_at = 0.0
+
+    @property
+    def port(self) -> int:
+        return self._port
+
+    @property
+    def connection_count(self) -> int:
+        return len(self._connections)
 
     def start(self) -> bool:
-        if self._server is not None:
+        if self._thread is not None and self._thread.is_alive():
             return True
-        try:
-            server = _LegacyTCPServer((self._host, self._port), _LegacyTCPHandler)
-        except OSError as exc:
+        self._ready_event.clear()
+        self._start_error = None
+        thread = threading.Thread(target=self._run, name="EDMCOverlay-LegacyTCP", daemon=True)
+        self._thread = thread
+        thread.start()
+        if not self._ready_event.wait(timeout=5.0):
+            self._log("Legacy overlay compatibility server did not become ready within 5s")
+            self.stop()
+            return False
+        if self._start_error is not None:
             self._log(
-                f"Legacy overlay compatibility server unavailable on {self._host}:{self._port} ({exc})"
+                f"Legacy overlay compatibility server unavailable on {self._host}:{self._port} ({self._start_error})"
             )
+            thread.join(timeout=2.0)
+            self._thread = None
             return False
-        server.log = self._log
-        server.payload_handler = self._handler
-        thread = threading.Thread(target=server.serve_forever, name="EDMCOverlay-LegacyTCP", daemon=True)
-        thread.start()
-        self._server = server
-        self._thread = thread
         self._log(f"Legacy overlay compatibility server listening on {self._host}:{self._port}")
         return True
 
     def stop(self) -> None:
-        server = self._server
-        if not server:
-            return
-        server.shutdown()
-        server.server_close()
         thread = self._thread
-        if thread:
-            thread.join(timeout=2.0)
-        self._server = None
+        if thread is None:
+            return
+        loop = self._loop
+        stop_requested = self._stop_requested
+        if loop is not None and stop_requested is not None:
+            try:
+                loop.call_soon_threadsafe(stop_requested.set)
+            except RuntimeError:
+                pass
+        thread.join(timeout=2.0)
         self._thread = None
         self._log("Legacy overlay compatibility server stopped")
+
+    # Internal helpers -----------------------------------------------------
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._serve())
+        except Exception as exc:
+            self._start_error = exc
+        finally:
+            self._ready_event.set()
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+            self._loop = None
+            self._stop_requested = None
+
+    async def _serve(self) -> None:
+        self._stop_requested = asyncio.Event()
+        server = await asyncio.start_server(
+            self._handle_client,
+            self._host,
+            self._port,
+            limit=self._max_line_bytes,
+            reuse_address=True,
+        )
+        sockets = server.sockets or []
+        if sockets:
+            self._port = sockets[0].getsockname()[1]
+        self._ready_event.set()
+        async with server:
+            await self._stop_requested.wait()
+            # Tear connections down before leaving the context: on Python 3.12+
+            # Server.wait_closed() waits for every active connection to finish.
+            server.close()
+            await self._close_connections()
+
+    async def _close_connections(self) -> None:
+        # Closing the transport feeds EOF to the reader, so handlers finish on their
+        # own; cancelling them instead trips a noisy stream callback on 3.11/3.12.
+        tasks = []
+        for writer, task in list(self._connections.items()):
+            writer.close()
+            if task is not None:
+                tasks.append(task)
+        if not tasks:
+            return
+        _done, pending = await asyncio.wait(tasks, timeout=1.0)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if len(self._connections) >= self._max_connections:
+            self._note_rejected_connection(writer.get_extra_info("peername"))
+            writer.close()
+            return
+        self._connections[writer] = asyncio.current_task()
+        limiter = _RateLimiter(self._rate_limit, self._rate_burst)
+        dropped = 0
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The line outgrew the reader limit; the stream cannot be re-synchronised.
+                    self._log(f"Legacy overlay client sent a line over {self._max_line_bytes} bytes; disconnecting")
+                    break
+                except (ConnectionError, OSError):
+                    break
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                if not limiter.allow():
+                    dropped += 1
+                    continue
+                self._dispatch_line(line)
+        finally:
+            self._connections.pop(writer, None)
+            if dropped:
+                self._log(f"Legacy overlay client exceeded {self._rate_limit:.0f} payloads/s; dropped {dropped}")
+            writer.close()
+
+    def _dispatch_line(self, line: bytes) -> None:
+        try:
+            payload_obj = json.loads(line.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            self._log(f"Legacy overlay payload rejected (parse error): {exc}")
+            return
+        if not isinstance(payload_obj, Mapping):
+            self._log("Legacy overlay payload rejected (not a mapping)")
+            return
+        try:
+            self._handler(dict(payload_obj))
+        except Exception as exc:
+            self._log(f"Legacy overlay payload handler raised error: {exc}")
+
+    def _note_rejected_connection(self, peer: Any) -> None:
+        self._rejected += 1
+        now = time.monotonic()
+        if now - self._rejected_logged_at < REJECT_LOG_INTERVAL:
+            return
+        self._log(
+            f"Legacy overlay connection limit ({self._max_connections}) reached; "
+            f"rejected {self._rejected} connection(s), last from {peer}"
+        )
+        self._rejected = 0
+        self._rejected_logged_at = now
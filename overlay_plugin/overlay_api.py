@@ -13,8 +13,11 @@ from typing import Any, Callable, Dict, Mapping, MutableMapping, Optional, Seque
 
 from prefix_entries import PrefixEntry, parse_prefix_entries, serialise_prefix_entries
 
+from .payload_codec import EncodedPayload
+
 _LOGGER = logging.getLogger("EDMC.ModernOverlay.API")
 _MAX_MESSAGE_BYTES = 16_384
+_MAX_BATCH_MESSAGES = 64
 _ANCHOR_CHOICES = {"nw", "ne", "sw", "se", "center", "top", "bottom", "left", "right"}
 _JUSTIFICATION_CHOICES = {"left", "center", "right"}
 _MARKER_LABEL_POSITIONS = {"below", "above", "centered"}
@@ -22,6 +25,7 @@ _CONTROLLER_PREVIEW_BOX_MODES = {"last", "max"}
 _HEX_DIGITS = set("0123456789ABCDEF")
 
 _publisher: Optional[Callable[[Mapping[str, Any]], bool]] = None
+_batch_publisher: Optional[Callable[[Sequence[Mapping[str, Any]]], bool]] = None
 _grouping_store: Optional["_PluginGroupingStore"] = None
 _publisher_warn_at: float = 0.0
 _publisher_warn_suppressed: int = 0
@@ -32,22 +36,30 @@ class PluginGroupingError(ValueError):
     """Raised when callers provide invalid plugin grouping data."""
 
 
-def register_publisher(publisher: Callable[[Mapping[str, Any]], bool]) -> None:
+def register_publisher(
+    publisher: Callable[[Mapping[str, Any]], bool],
+    batch_publisher: Optional[Callable[[Sequence[Mapping[str, Any]]], bool]] = None,
+) -> None:
     """Register a callable that delivers overlay payloads.
 
     The EDMC Modern Overlay plugin calls this during startup so other plugins can
-    publish messages without depending on transport details.
+    publish messages without depending on transport details. Payloads are handed
+    over as :class:`EncodedPayload` mappings carrying their pre-computed JSON bytes.
+    ``batch_publisher`` receives the payloads of one :func:`send_overlay_messages`
+    call together so they can be delivered as a single batch.
     """
 
-    global _publisher
+    global _publisher, _batch_publisher
     _publisher = publisher
+    _batch_publisher = batch_publisher
 
 
 def unregister_publisher() -> None:
     """Clear the registered publisher (called when the plugin stops)."""
 
-    global _publisher
+    global _publisher, _batch_publisher
     _publisher = None
+    _batch_publisher = None
 
 
 def register_grouping_store(path: Union[str, Path]) -> None:
@@ -88,50 +100,112 @@ def send_overlay_message(message: Mapping[str, Any]) -> bool:
 
     publisher = _publisher
     if publisher is None:
-        # Avoid log spam when other plugins send messages before the overlay is ready.
-        global _publisher_warn_at, _publisher_warn_suppressed
-        now = time.monotonic()
-        if now - _publisher_warn_at >= _PUBLISHER_WARN_INTERVAL:
-            suppressed = _publisher_warn_suppressed
-            _publisher_warn_at = now
-            _publisher_warn_suppressed = 0
-            if suppressed:
-                _log_warning(
-                    "Overlay publisher unavailable (plugin not running?) [%d more messages suppressed]",
-                    suppressed,
-                )
-            else:
-                _log_warning("Overlay publisher unavailable (plugin not running?)")
-        else:
-            _publisher_warn_suppressed += 1
+        _warn_publisher_unavailable()
         return False
 
-    payload = _normalise_message(message)
-    if payload is None:
+    encoded = _encode_message(message)
+    if encoded is None:
         return False
 
     try:
-        serialised = json.dumps(payload, ensure_ascii=False)
-    except (TypeError, ValueError) as exc:
-        _log_warning(f"Overlay message is not JSON serialisable: {exc}")
+        return bool(publisher(encoded))
+    except Exception as exc:  # pragma: no cover - defensive guard
+        _log_warning(f"Overlay publisher raised error: {exc}")
         return False
 
-    payload_size = len(serialised.encode("utf-8"))
-    if payload_size > _MAX_MESSAGE_BYTES:
+
+def send_overlay_messages(messages: Sequence[Mapping[str, Any]]) -> bool:
+    """Publish several related payloads as one batch.
+
+    Use this for items that make up a single frame (for example the rect, title
+    and vector of a route panel): the overlay client applies the whole batch
+    before repainting, so it never shows half a frame. Each message is validated
+    like :func:`send_overlay_message`; if any is invalid nothing is sent.
+
+    Returns
+    -------
+    bool
+        ``True`` if the batch was handed to the broadcaster, ``False`` otherwise.
+    """
+
+    publisher = _publisher
+    if publisher is None:
+        _warn_publisher_unavailable()
+        return False
+
+    if isinstance(messages, (str, bytes, Mapping)) or not isinstance(messages, Sequence):
+        _log_warning("Overlay batch must be a sequence of messages")
+        return False
+    if not messages:
+        return False
+    if len(messages) > _MAX_BATCH_MESSAGES:
         _log_warning(
-            "Overlay message exceeds size limit (%d > %d bytes)",
-            payload_size,
-            _MAX_MESSAGE_BYTES,
+            "Overlay batch exceeds message limit (%d > %d)",
+            len(messages),
+            _MAX_BATCH_MESSAGES,
         )
         return False
 
+    batch = []
+    for message in messages:
+        encoded = _encode_message(message)
+        if encoded is None:
+            return False
+        batch.append(encoded)
+
+    batch_publisher = _batch_publisher
     try:
-        return bool(publisher(payload))
+        if batch_publisher is None:
+            # No batch support registered: fall back to one publish per message.
+            return all([bool(publisher(encoded)) for encoded in batch])
+        return bool(batch_publisher(batch))
     except Exception as exc:  # pragma: no cover - defensive guard
         _log_warning(f"Overlay publisher raised error: {exc}")
         return False
 
 
+def _warn_publisher_unavailable() -> None:
+    # Avoid log spam when other plugins send messages before the overlay is ready.
+    global _publisher_warn_at, _publisher_warn_suppressed
+    now = time.monotonic()
+    if now - _publisher_warn_at >= _PUBLISHER_WARN_INTERVAL:
+        suppressed = _publisher_warn_suppressed
+        _publisher_warn_at = now
+        _publisher_warn_suppressed = 0
+        if suppressed:
+            _log_warning(
+                "Overlay publisher unavailable (plugin not running?) [%d more messages suppressed]",
+                suppressed,
+            )
+        else:
+            _log_warning("Overlay publisher unavailable (plugin not running?)")
+    else:
+        _publisher_warn_suppressed += 1
+
+
+def _encode_message(message: Mapping[str, Any]) -> Optional[EncodedPayload]:
+    payload = _normalise_message(message)
+    if payload is None:
+        return None
+
+    # Encode once; the publisher reuses these bytes for logging and the broadcast.
+    encoded = EncodedPayload(payload)
+    try:
+        payload_size = encoded.size
+    except (TypeError, ValueError) as exc:
+        _log_warning(f"Overlay message is not JSON serialisable: {exc}")
+        return None
+
+    if payload_size > _MAX_MESSAGE_BYTES:
+        _log_warning(
+            "Overlay message exceeds size limit (%d > %d bytes)",
+            payload_size,
+            _MAX_MESSAGE_BYTES,
+        )
+        return None
+    return encoded
+
+
 def define_plugin_group(
     *,
     plugin_group: str,
@@ -2,20 +2,393 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import json
-import queue
+import math
 import threading
+import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, Optional, Set, Tuple
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Sequence, Tuple
 
+from .payload_codec import (
+    BATCH_EVENT,
+    FEATURE_VECTOR_DELTA,
+    FRAMING_ACK_EVENT,
+    FRAMING_LP1,
+    FRAMING_NDJSON,
+    SUPPORTED_FEATURES,
+    SUPPORTED_FRAMINGS,
+    VECTOR_DELTA_KEY,
+    VECTOR_GEN_KEY,
+    VECTOR_RESYNC_CLI,
+    as_encoded_payload,
+    diff_vector_points,
+    encode_batch,
+    encode_frame,
+    encode_payload,
+    vector_points,
+)
 
 LogFunc = Callable[[str], None]
 IngestFunc = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
 
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_COALESCE = "coalesce"
+OVERFLOW_DISCONNECT = "disconnect"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE, OVERFLOW_DISCONNECT)
+
+DEFAULT_CLIENT_QUEUE_LIMIT = 1024
+DEFAULT_MAX_PENDING = 8192
+CLIENT_CLOSE_TIMEOUT = 1.0
+# A vector delta is only sent while the client's copy has this long left to live,
+# and every VECTOR_DELTA_MAX_CHAIN deltas a full payload re-bases the client.
+VECTOR_DELTA_EXPIRY_MARGIN = 1.0
+VECTOR_DELTA_MAX_CHAIN = 32
+# Baseline generations are unique across clients and reconnects, so a stale item
+# left in a client's store can never match a newer chain by accident.
+_VECTOR_GENERATIONS = itertools.count(1)
+
+# Coalesce key marking a clear_all: entries on either side must never be merged.
+COALESCE_BARRIER = ""
+_COALESCABLE_LEGACY_TYPES = {"message", "shape", "clear", "legacy_clear"}
+
+
+def coalesce_key(payload: Mapping[str, Any]) -> Optional[str]:
+    """Return the key under which ``payload`` may replace an older queued payload.
+
+    Only LegacyOverlay item updates are keyed (by ``id``); the client keeps exactly
+    one item per id, so an older update for the same id is redundant. ``clear_all``
+    yields :data:`COALESCE_BARRIER` and everything else returns ``None``.
+    """
+    if payload.get("event") != "LegacyOverlay":
+        return None
+    item_type = payload.get("type")
+    if item_type == "clear_all":
+        return COALESCE_BARRIER
+    if item_type not in _COALESCABLE_LEGACY_TYPES:
+        return None
+    item_id = payload.get("id")
+    if isinstance(item_id, str) and item_id:
+        return item_id
+    return None
+
+
+class _Outbound:
+    """A published payload: coalesce key, JSON bytes and a lazily built ``lp1`` frame.
+
+    The frame is built on the broadcaster loop the first time a client that
+    negotiated ``lp1`` needs it and is then shared by every such client. Batch
+    envelopes keep their ``members`` so per-client vector deltas still apply.
+    """
+
+    __slots__ = ("key", "data", "payload", "members", "_frame")
+
+    def __init__(
+        self,
+        key: Optional[str],
+        data: bytes,
+        payload: Optional[Mapping[str, Any]] = None,
+        members: Optional[List["_Outbound"]] = None,
+    ) -> None:
+        self.key = key
+        self.data = data
+        self.payload = payload
+        self.members = members
+        self._frame: Optional[bytes] = None
+
+    @classmethod
+    def batch(cls, members: List["_Outbound"]) -> "_Outbound":
+        payload = {"event": BATCH_EVENT, "messages": [member.payload for member in members]}
+        return cls(None, encode_batch(member.data for member in members), payload, members)
+
+    def chunks(self, framing: str) -> Tuple[bytes, ...]:
+        if framing == FRAMING_LP1:
+            frame = self._frame
+            if frame is None:
+                frame = encode_frame(self.payload, self.data)
+                self._frame = frame
+            return (frame,)
+        return (self.data, b"\n")
+
+
+QueuedItem = Tuple[Optional[str], _Outbound, str]
+
+
+class _VectorBaseline:
+    """Points of the last ``vect`` sent to one client for one id.
+
+    ``source`` is the latest full update behind them, kept so a resync can re-send it.
+    """
+
+    __slots__ = ("points", "expires", "chain", "generation", "source")
+
+    def __init__(
+        self,
+        points: List[Dict[str, Any]],
+        expires: Optional[float],
+        generation: int,
+        source: _Outbound,
+    ) -> None:
+        self.points = points
+        self.expires = expires
+        self.chain = 0
+        self.generation = generation
+        self.source = source
+
+
+def _payload_ttl(payload: Mapping[str, Any]) -> int:
+    try:
+        return max(int(payload.get("ttl", 4)), 0)
+    except (TypeError, ValueError):
+        return 4
+
+
+def coalesce_pending(batch: List[_Outbound]) -> Tuple[List[_Outbound], int]:
+    """Keep only the newest entry per coalesce key, in the slot of the first one.
+
+    Replacing in place mirrors how the client's item store updates an existing id,
+    and barriers reset the index so nothing moves across a ``clear_all`` or a batch.
+    Returns the collapsed batch and the number of entries removed.
+    """
+    result: List[_Outbound] = []
+    latest: Dict[str, int] = {}
+    collapsed = 0
+    for entry in batch:
+        key = entry.key
+        if key == COALESCE_BARRIER or entry.members is not None:
+            latest.clear()
+        elif key:
+            index = latest.get(key)
+            if index is not None:
+                result[index] = entry
+                collapsed += 1
+                continue
+            latest[key] = len(result)
+        result.append(entry)
+    return result, collapsed
+
+
+class _ClientChannel:
+    """Bounded outbound queue plus writer task for a single connected client."""
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        peer: Any,
+        *,
+        limit: int,
+        policy: str,
+    ) -> None:
+        self.writer = writer
+        self.peer = peer
+        self.limit = max(1, int(limit))
+        self.policy = policy
+        self.pending: Deque[QueuedItem] = deque()
+        self.framing = FRAMING_NDJSON
+        self.features: frozenset = frozenset()
+        self.vector_baselines: Dict[str, _VectorBaseline] = {}
+        self.deltas = 0
+        self.resyncs = 0
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.dropped = 0
+        self.coalesced = 0
+        self.overflowed = False
+
+    def enqueue(self, items: List[_Outbound]) -> bool:
+        """Queue ``items`` for delivery; return ``False`` when the client must be dropped."""
+        pending = self.pending
+        framing = self.framing
+        for item in items:
+            if len(pending) >= self.limit and not self._make_room(item.key):
+                self.overflowed = True
+                return False
+            # Framing is fixed at enqueue time so a mid-stream switch stays ordered.
+            pending.append((item.key, item, framing))
+        if pending:
+            self.ready.set()
+        return True
+
+    def push_direct(self, data: bytes) -> None:
+        """Queue a reply that bypasses the overflow policy (CLI responses)."""
+        self.pending.append((None, _Outbound(None, data), self.framing))
+        self.ready.set()
+
+    def take_batch(self) -> List[bytes]:
+        """Render everything queued into wire chunks.
+
+        Vector deltas are worked out here rather than at enqueue time: whatever is
+        taken is written in order, so the baseline always matches what the client
+        received even when the overflow policy dropped queued entries.
+        """
+        pending = self.pending
+        batch: List[bytes] = []
+        deltas = FEATURE_VECTOR_DELTA in self.features
+        for _key, item, framing in pending:
+            if deltas and item.payload is not None:
+                item = self._delta_for(item)
+            batch.extend(item.chunks(framing))
+        pending.clear()
+        self.ready.clear()
+        return batch
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "peer": self.peer,
+            "queued": len(self.pending),
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "deltas": self.deltas,
+            "resyncs": self.resyncs,
+        }
+
+    def resync_vector(self, item_id: str, generation: Any, held: bool) -> bool:
+        """Drop the baseline behind a delta the client could not apply.
+
+        Only a baseline still on ``generation`` is dropped, so the deltas already in
+        flight when the first resync was sent do not reset it again. When the client
+        still holds the item (``held``) the latest update is queued again and goes
+        out in full; otherwise the next update for the id does.
+        """
+        baseline = self.vector_baselines.get(item_id)
+        if baseline is None or baseline.generation != generation:
+            return False
+        del self.vector_baselines[item_id]
+        self.resyncs += 1
+        if not held or self._has_pending(item_id):
+            return True
+        source = baseline.source
+        if baseline.expires is not None:
+            remaining = baseline.expires - time.monotonic()
+            if remaining <= VECTOR_DELTA_EXPIRY_MARGIN:
+                return True
+            # Re-sending must not extend the item past the expiry of the original update.
+            payload = dict(source.payload or {})
+            payload["ttl"] = math.ceil(remaining)
+            try:
+                source = _Outbound(item_id, encode_payload(payload), payload)
+            except (TypeError, ValueError):
+                return True
+        self.pending.append((item_id, source, self.framing))
+        self.ready.set()
+        return True
+
+    def _has_pending(self, key: str) -> bool:
+        for queued_key, item, _framing in self.pending:
+            if queued_key == key:
+                return True
+            if item.members is not None and any(member.key == key for member in item.members):
+                return True
+        return False
+
+    def _delta_for(self, item: _Outbound) -> _Outbound:
+        members = item.members
+        if members is not None:
+            rendered = [self._delta_for(member) for member in members]
+            if all(new is old for new, old in zip(rendered, members)):
+                return item
+            return _Outbound.batch(rendered)
+        payload = item.payload
+        baselines = self.vector_baselines
+        key = item.key
+        if key == COALESCE_BARRIER:
+            baselines.clear()
+            return item
+        if key is None:
+            item_id = payload.get("id") if payload.get("event") == "LegacyOverlay" else None
+            if isinstance(item_id, str):
+                baselines.pop(item_id, None)
+            return item
+        points = vector_points(payload)
+        if points is None:
+            baselines.pop(key, None)
+            return item
+        now = time.monotonic()
+        ttl = _payload_ttl(payload)
+        expires = None if ttl <= 0 else now + ttl
+        baseline = baselines.get(key)
+        patch = None
+        if (
+            baseline is not None
+            and baseline.chain < VECTOR_DELTA_MAX_CHAIN
+            and (baseline.expires is None or baseline.expires - now > VECTOR_DELTA_EXPIRY_MARGIN)
+        ):
+            patch = diff_vector_points(baseline.points, points)
+        if patch is None:
+            return self._rebase_vector(key, item, points, expires)
+        assert baseline is not None
+        patch["gen"] = baseline.generation
+        patch["seq"] = baseline.chain + 1
+        delta_payload = {name: value for name, value in payload.items() if name != "vector"}
+        delta_payload[VECTOR_DELTA_KEY] = patch
+        try:
+            data = encode_payload(delta_payload)
+        except (TypeError, ValueError):
+            return self._rebase_vector(key, item, points, expires)
+        baseline.points = points
+        baseline.expires = expires
+        baseline.chain += 1
+        baseline.source = item
+        self.deltas += 1
+        return _Outbound(key, data, delta_payload)
+
+    def _rebase_vector(
+        self,
+        key: str,
+        item: _Outbound,
+        points: List[Dict[str, Any]],
+        expires: Optional[float],
+    ) -> _Outbound:
+        """Send ``item`` in full, tagged with a new baseline generation."""
+        generation = next(_VECTOR_GENERATIONS)
+        payload = dict(item.payload or {})
+        payload[VECTOR_GEN_KEY] = generation
+        try:
+            data = encode_payload(payload)
+        except (TypeError, ValueError):
+            self.vector_baselines.pop(key, None)
+            return item
+        self.vector_baselines[key] = _VectorBaseline(points, expires, generation, item)
+        return _Outbound(key, data, payload)
+
+    def _make_room(self, payload_id: Optional[str]) -> bool:
+        pending = self.pending
+        if self.policy == OVERFLOW_DISCONNECT:
+            return False
+        if self.policy == OVERFLOW_COALESCE and payload_id:
+            for index, (queued_id, _item, _framing) in enumerate(pending):
+                if queued_id == payload_id:
+                    del pending[index]
+                    self.coalesced += 1
+                    return True
+        pending.popleft()
+        self.dropped += 1
+        return True
+
 
 @dataclass
 class SocketBroadcaster:
-    """Runs a background TCP server that streams JSON lines to clients."""
+    """Runs a background TCP server that streams JSON lines to clients.
+
+    ``publish`` appends encoded lines to a deque and wakes the event loop with
+    ``call_soon_threadsafe``; the loop drains everything pending in one pass and
+    fans the batch out to per-client queues. Each client has its own writer task
+    and bounded queue, so a stalled consumer only loses its own backlog according
+    to ``overflow_policy`` (``drop_oldest``, ``coalesce`` by payload id, or
+    ``disconnect``) instead of delaying the overlay client.
+
+    Clients start on newline-delimited JSON and may switch to the length-prefixed
+    ``lp1`` framing by sending ``{"cli": "framing", "framing": "lp1"}``; the
+    broadcaster advertises support via ``SUPPORTED_FRAMINGS`` in port.json. The
+    same handshake may list ``features``; ``vector_delta`` makes repeated ``vect``
+    updates for an id carry only the points that changed, and such clients send
+    ``{"cli": "vector_resync", ...}`` when a delta does not match what they hold.
+
+    With ``coalesce_window`` > 0 the loop waits that long after a wakeup before
+    draining, and only the newest LegacyOverlay update per id within the window
+    is sent (see :func:`coalesce_pending`).
+    """
 
     host: str = "127.0.0.1"
     port: int = 0
@@ -23,17 +396,31 @@ class SocketBroadcaster:
     ingest_callback: Optional[IngestFunc] = None
     log_debug: Optional[LogFunc] = None
     connection_log_interval: float = 0.0
+    client_queue_limit: int = DEFAULT_CLIENT_QUEUE_LIMIT
+    overflow_policy: str = OVERFLOW_DROP_OLDEST
+    max_pending: int = DEFAULT_MAX_PENDING
+    coalesce_window: float = 0.0
     _loop: Optional[asyncio.AbstractEventLoop] = field(default=None, init=False)
     _thread: Optional[threading.Thread] = field(default=None, init=False)
     _stop_event: threading.Event = field(default_factory=threading.Event, init=False)
     _ready_event: threading.Event = field(default_factory=threading.Event, init=False)
-    _queue: "queue.Queue[Optional[str]]" = field(default_factory=queue.Queue, init=False)
-    _clients: Set[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = field(default_factory=set, init=False)
+    _queue: Deque[_Outbound] = field(default_factory=deque, init=False)
+    _pending_dropped: int = field(default=0, init=False)
+    _published_total: int = field(default=0, init=False)
+    _coalesced_total: int = field(default=0, init=False)
+    _wake_event: Optional[asyncio.Event] = field(default=None, init=False)
+    _wake_pending: bool = field(default=False, init=False)
+    _clients: Dict[asyncio.StreamWriter, _ClientChannel] = field(default_factory=dict, init=False)
     _start_error: Optional[BaseException] = field(default=None, init=False)
     _connection_log_counts: Dict[str, int] = field(default_factory=dict, init=False)
     _connection_log_timer: Optional[asyncio.TimerHandle] = field(default=None, init=False)
     _last_connection_peer: Optional[Any] = field(default=None, init=False)
 
+    def __post_init__(self) -> None:
+        if self.overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {self.overflow_policy!r}; expected one of {OVERFLOW_POLICIES}")
+        self._queue = deque(maxlen=max(1, int(self.max_pending)))
+
     def start(self) -> bool:
         """Start the broadcast server on a background thread.
 
@@ -62,12 +449,12 @@ class SocketBroadcaster:
     def stop(self) -> None:
         """Stop the server and release resources."""
         self._stop_event.set()
-        try:
-            self._queue.put_nowait(None)
-        except queue.Full:
-            pass
-        if self._loop and self._loop.is_running():
-            self._loop.call_soon_threadsafe(lambda: None)
+        loop = self._loop
+        if loop and loop.is_running():
+            try:
+                loop.call_soon_threadsafe(self._wake)
+            except RuntimeError:
+                pass
         if self._thread:
             worker = self._thread
             worker.join(timeout=5.0)
@@ -76,23 +463,113 @@ class SocketBroadcaster:
                 worker.join(timeout=2.0)
                 if worker.is_alive():
                     self.log("Broadcast server thread failed to terminate cleanly; abandoning join")
+        if self._published_total:
+            stats = self.publish_stats()
+            log_fn = self.log_debug or self.log
+            log_fn(
+                f"Broadcast publish stats: published={stats['published']} "
+                f"coalesced={stats['coalesced']} dropped={stats['dropped']}"
+            )
         self._loop = None
         self._thread = None
+        self._wake_event = None
+        self._wake_pending = False
         self._clients.clear()
 
-    def publish(self, payload: Dict[str, Any]) -> None:
-        """Queue a payload to broadcast to all connected clients."""
+    def publish(self, payload: Mapping[str, Any]) -> None:
+        """Queue a payload to broadcast to all connected clients.
+
+        ``EncodedPayload`` instances are sent using their cached encoding.
+        """
         if self._stop_event.is_set():
             return
+        encoded = as_encoded_payload(payload)
         try:
-            message = json.dumps(payload)
+            data = encoded.data
         except (TypeError, ValueError) as exc:
             self.log(f"Failed to encode payload to JSON: {exc}")
             return
-        self._queue.put_nowait(message)
+        queue = self._queue
+        if len(queue) == queue.maxlen:
+            # The deque discards its oldest entry on append; count it so the loss is visible.
+            self._pending_dropped += 1
+        queue.append(_Outbound(coalesce_key(encoded), data, encoded.payload))
+        self._published_total += 1
+        self._schedule_wake()
+
+    def publish_batch(self, payloads: Sequence[Mapping[str, Any]]) -> None:
+        """Queue several payloads as one ``OverlayBatch`` envelope.
+
+        Clients apply a batch in one go, so related items appear in the same frame.
+        """
+        if self._stop_event.is_set() or not payloads:
+            return
+        members: List[_Outbound] = []
+        for payload in payloads:
+            encoded = as_encoded_payload(payload)
+            try:
+                data = encoded.data
+            except (TypeError, ValueError) as exc:
+                self.log(f"Failed to encode payload to JSON: {exc}")
+                return
+            members.append(_Outbound(coalesce_key(encoded), data, encoded.payload))
+        queue = self._queue
+        if len(queue) == queue.maxlen:
+            self._pending_dropped += 1
+        queue.append(_Outbound.batch(members))
+        self._published_total += len(members)
+        self._schedule_wake()
+
+    def client_stats(self) -> List[Dict[str, Any]]:
+        """Return per-client queue depth and drop/coalesce counters."""
+        return [channel.stats() for channel in list(self._clients.values())]
+
+    @property
+    def pending_dropped(self) -> int:
+        """Number of payloads discarded because the loop fell behind ``max_pending``."""
+        return self._pending_dropped
+
+    def publish_stats(self) -> Dict[str, int]:
+        """Return publish-side counters: queued, collapsed by coalescing, and dropped."""
+        return {
+            "published": self._published_total,
+            "coalesced": self._coalesced_total,
+            "dropped": self._pending_dropped,
+        }
 
     # Internal helpers -----------------------------------------------------
 
+    def _schedule_wake(self) -> None:
+        # Publishers may run on any thread. Only the first publish after a drain
+        # pays for call_soon_threadsafe; the rest ride on the pending wakeup.
+        if self._wake_pending:
+            return
+        loop = self._loop
+        if loop is None or self._wake_event is None:
+            return
+        self._wake_pending = True
+        try:
+            loop.call_soon_threadsafe(self._wake)
+        except RuntimeError:
+            self._wake_pending = False
+
+    def _wake(self) -> None:
+        if self._wake_event is not None:
+            self._wake_event.set()
+
+    def _drain_queue(self) -> List[_Outbound]:
+        # Clear the pending flag before draining so a publish racing with the
+        # drain either lands in this batch or schedules a fresh wakeup.
+        self._wake_pending = False
+        pending = self._queue
+        batch: List[_Outbound] = []
+        while pending:
+            try:
+                batch.append(pending.popleft())
+            except IndexError:
+                break
+        return batch
+
     def _run(self) -> None:
         if self._loop is not None:
             return
@@ -124,29 +601,38 @@ class SocketBroadcaster:
         self.log(f"Broadcast server listening on {self.host}:{self.port}")
         self._ready_event.set()
 
+        wake_event = asyncio.Event()
+        self._wake_event = wake_event
+        # Payloads published before the loop came up are waiting in the queue.
+        wake_event.set()
+
         async with server:
             while not self._stop_event.is_set():
-                try:
-                    message = await self._loop.run_in_executor(None, self._queue.get)
-                except Exception:  # pragma: no cover - defensive
-                    await asyncio.sleep(0.1)
-                    continue
-                if message is None:
-                    continue
-                await self._broadcast(message)
+                await wake_event.wait()
+                window = self.coalesce_window
+                if window > 0:
+                    # Let a frame's worth of updates accumulate before draining.
+                    await asyncio.sleep(window)
+                wake_event.clear()
+                if self._stop_event.is_set():
+                    break
+                batch = self._drain_queue()
+                if window > 0 and len(batch) > 1:
+                    batch, collapsed = coalesce_pending(batch)
+                    self._coalesced_total += collapsed
+                if batch:
+                    self._broadcast(batch)
 
-        for _reader, writer in list(self._clients):
-            try:
-                writer.close()
-                await writer.wait_closed()
-            except Exception:
-                pass
+        for channel in list(self._clients.values()):
+            await self._close_channel(channel)
         self._clients.clear()
         self._cancel_connection_log_timer()
 
     async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
         peer = writer.get_extra_info("peername")
-        self._clients.add((reader, writer))
+        channel = _ClientChannel(writer, peer, limit=self.client_queue_limit, policy=self.overflow_policy)
+        channel.task = asyncio.ensure_future(self._client_writer(channel))
+        self._clients[writer] = channel
         self._queue_connection_log("connected", peer)
         try:
             while not self._stop_event.is_set():
@@ -156,11 +642,19 @@ class SocketBroadcaster:
                     break
                 if not line:
                     break
-                if not self.ingest_callback:
-                    continue
                 try:
                     message = json.loads(line.decode("utf-8"))
-                except json.JSONDecodeError:
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    continue
+                if isinstance(message, dict) and message.get("cli") == "framing":
+                    self._negotiate_framing(channel, message)
+                    continue
+                if isinstance(message, dict) and message.get("cli") == VECTOR_RESYNC_CLI:
+                    item_id = message.get("id")
+                    if isinstance(item_id, str):
+                        channel.resync_vector(item_id, message.get("gen"), bool(message.get("held")))
+                    continue
+                if not self.ingest_callback:
                     continue
                 response: Optional[Dict[str, Any]] = None
                 try:
@@ -175,43 +669,84 @@ class SocketBroadcaster:
                     response = {"status": "error", "error": str(exc)}
                 if response is not None:
                     try:
-                        writer.write(json.dumps(response).encode("utf-8") + b"\n")
-                        await writer.drain()
-                    except Exception:
+                        channel.push_direct(json.dumps(response).encode("utf-8"))
+                    except (TypeError, ValueError):
                         pass
                     # Keep the connection alive so the client can continue receiving broadcasts.
                     continue
         except Exception:
             pass
         finally:
-            self._clients.discard((reader, writer))
-            try:
-                writer.close()
-                await writer.wait_closed()
-            except Exception:
-                pass
+            await self._close_channel(channel)
         self._queue_connection_log("disconnected", peer)
 
-    async def _broadcast(self, message: str) -> None:
+    def _negotiate_framing(self, channel: _ClientChannel, message: Mapping[str, Any]) -> None:
+        requested = message.get("framing")
+        framing = requested if requested in SUPPORTED_FRAMINGS else FRAMING_NDJSON
+        wanted = message.get("features")
+        features = [name for name in SUPPORTED_FEATURES if isinstance(wanted, list) and name in wanted]
+        # The acknowledgement still uses the old framing; everything queued after it uses the new one.
+        ack: Dict[str, Any] = {"event": FRAMING_ACK_EVENT, "framing": framing}
+        if features:
+            ack["features"] = features
+        channel.push_direct(json.dumps(ack).encode("utf-8"))
+        channel.framing = framing
+        channel.features = frozenset(features)
+        channel.vector_baselines.clear()
+        log_fn = self.log_debug or self.log
+        suffix = f" with {', '.join(features)}" if features else ""
+        log_fn(f"Client {channel.peer} negotiated {framing} framing{suffix}")
+
+    def _broadcast(self, batch: List[_Outbound]) -> None:
         if not self._clients:
             return
-        stale = []
-        payload = (message + "\n").encode("utf-8")
-        for reader_writer in list(self._clients):
-            _reader, writer = reader_writer
-            try:
-                writer.write(payload)
+        overflowed = [channel for channel in list(self._clients.values()) if not channel.enqueue(batch)]
+        for channel in overflowed:
+            self.log(
+                f"Disconnecting slow client {channel.peer}: send queue exceeded {channel.limit} payloads"
+            )
+            asyncio.ensure_future(self._close_channel(channel))
+
+    async def _client_writer(self, channel: _ClientChannel) -> None:
+        writer = channel.writer
+        try:
+            while True:
+                await channel.ready.wait()
+                batch = channel.take_batch()
+                if not batch:
+                    continue
+                writer.writelines(batch)
                 await writer.drain()
-            except Exception:
-                stale.append(reader_writer)
-        for reader_writer in stale:
-            self._clients.discard(reader_writer)
-            _reader, writer = reader_writer
-            try:
-                writer.close()
-                await writer.wait_closed()
-            except Exception:
-                pass
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Broken pipe or reset: drop the client without affecting the others.
+            asyncio.ensure_future(self._close_channel(channel))
+
+    async def _close_channel(self, channel: _ClientChannel) -> None:
+        if self._clients.get(channel.writer) is channel:
+            del self._clients[channel.writer]
+        task = channel.task
+        if task is not None and task is not asyncio.current_task() and not task.done():
+            task.cancel()
+        if channel.dropped or channel.coalesced or channel.deltas:
+            log_fn = self.log_debug or self.log
+            log_fn(
+                f"Client {channel.peer} send queue stats: dropped={channel.dropped} "
+                f"coalesced={channel.coalesced} deltas={channel.deltas} resyncs={channel.resyncs}"
+            )
+            channel.dropped = channel.coalesced = channel.deltas = channel.resyncs = 0
+        writer = channel.writer
+        if writer.is_closing():
+            return
+        try:
+            writer.close()
+            # A stalled consumer never acknowledges the close; abort rather than wait on it.
+            await asyncio.wait_for(writer.wait_closed(), timeout=CLIENT_CLOSE_TIMEOUT)
+        except asyncio.TimeoutError:
+            writer.transport.abort()
+        except Exception:
+            pass
 
     def _queue_connection_log(self, action: str, peer: Any) -> None:
         log_fn = self.log_debug or self.log
@@ -0,0 +1,399 @@
+"""Append-only binary payload capture with a sidecar index for replay tooling.
+
+A capture file (``overlay-payloads.capture``) starts with an 8-byte magic and then
+holds one record per payload::
+
+    <I payload_len> <d timestamp> <H plugin_len> <H id_len> plugin id payload
+
+``plugin`` and ``id`` are UTF-8; ``payload`` is the JSON text that the text payload
+log would show (including the spliced ``raw``/``legacy_raw`` forms). Timestamps
+never go backwards within a file.
+
+The sidecar index (``overlay-payloads.capture.idx``) holds one fixed-size entry per
+record: ``<d timestamp> <Q offset> <I crc32(plugin.casefold())> <I crc32(id)>``.
+Readers bisect the index for a time range and compare the hashes to pick plugin
+or id matches, and only then seek into the capture file. A missing or short index
+is rebuilt in memory from the capture file.
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+CAPTURE_FILE_NAME = "overlay-payloads.capture"
+INDEX_SUFFIX = ".idx"
+
+_CAPTURE_MAGIC = b"EDMCOPC1"
+_INDEX_MAGIC = b"EDMCOPI1"
+_RECORD_HEADER = struct.Struct("<IdHH")
+_INDEX_ENTRY = struct.Struct("<dQII")
+_MAX_FIELD_CHARS = 1024
+
+
+def index_path_for(path: Path) -> Path:
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def _key_hash(value: str) -> int:
+    return zlib.crc32(value.encode("utf-8"))
+
+
+def _encode_field(value: Optional[str]) -> bytes:
+    return (value or "")[:_MAX_FIELD_CHARS].encode("utf-8")
+
+
+@dataclass(frozen=True)
+class CaptureRecord:
+    timestamp: float
+    plugin: str
+    payload_id: str
+    data: bytes
+    offset: int
+
+    @property
+    def text(self) -> str:
+        return self.data.decode("utf-8")
+
+    def payload(self) -> Any:
+        return json.loads(self.data)
+
+
+class PayloadCaptureWriter:
+    """Append records to a capture file and its index, rotating like ``RotatingFileHandler``.
+
+    ``max_bytes`` of 0 disables rotation. Rotated files are renamed to ``.1``,
+    ``.2``... together with their index, keeping ``backup_count`` generations.
+    """
+
+    def __init__(self, path: Path, *, max_bytes: int = 0, backup_count: int = 0) -> None:
+        self._path = Path(path)
+        self._max_bytes = max(0, int(max_bytes))
+        self._backup_count = max(0, int(backup_count))
+        self._capture: Optional[BinaryIO] = None
+        self._index: Optional[BinaryIO] = None
+        self._size = 0
+        self._last_timestamp = 0.0
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def append(
+        self,
+        plugin: Optional[str],
+        payload_id: Optional[str],
+        data: bytes,
+        *,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        plugin_bytes = _encode_field(plugin)
+        id_bytes = _encode_field(payload_id)
+        record_size = _RECORD_HEADER.size + len(plugin_bytes) + len(id_bytes) + len(data)
+        if self._capture is None:
+            self._open()
+        elif self._max_bytes and self._size + record_size > self._max_bytes and self._size > len(_CAPTURE_MAGIC):
+            self._rollover()
+        assert self._capture is not None and self._index is not None
+        stamp = max(time.time() if timestamp is None else float(timestamp), self._last_timestamp)
+        offset = self._size
+        self._capture.write(_RECORD_HEADER.pack(len(data), stamp, len(plugin_bytes), len(id_bytes)))
+        self._capture.write(plugin_bytes)
+        self._capture.write(id_bytes)
+        self._capture.write(data)
+        self._capture.flush()
+        # The index entry follows the record, so an indexed record is always complete.
+        plugin_text = plugin_bytes.decode("utf-8", "ignore")
+        id_text = id_bytes.decode("utf-8", "ignore")
+        self._index.write(
+            _INDEX_ENTRY.pack(stamp, offset, _key_hash(plugin_text.casefold()), _key_hash(id_text))
+        )
+        self._index.flush()
+        self._size += record_size
+        self._last_timestamp = stamp
+
+    def close(self) -> None:
+        for handle in (self._capture, self._index):
+            if handle is not None:
+                try:
+                    handle.close()
+                except OSError:
+                    pass
+        self._capture = None
+        self._index = None
+
+    def _open(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        entries = _load_index(self._path)
+        valid_end = len(_CAPTURE_MAGIC)
+        if entries:
+            last_offset = entries[-1][1]
+            header = _read_header(self._path, last_offset)
+            if header is not None:
+                payload_len, _stamp, plugin_len, id_len = header
+                valid_end = last_offset + _RECORD_HEADER.size + plugin_len + id_len + payload_len
+                self._last_timestamp = entries[-1][0]
+        capture = open(self._path, "r+b" if self._path.exists() else "w+b")
+        capture.seek(0)
+        if capture.read(len(_CAPTURE_MAGIC)) != _CAPTURE_MAGIC:
+            capture.seek(0)
+            capture.truncate()
+            capture.write(_CAPTURE_MAGIC)
+            entries = []
+            valid_end = len(_CAPTURE_MAGIC)
+            self._last_timestamp = 0.0
+        # Drop a record torn by a crash (written but never indexed) and rewrite the index.
+        capture.truncate(valid_end)
+        capture.seek(valid_end)
+        index = open(index_path_for(self._path), "wb")
+        index.write(_INDEX_MAGIC)
+        for entry in entries:
+            index.write(_INDEX_ENTRY.pack(*entry))
+        index.flush()
+        self._capture = capture
+        self._index = index
+        self._size = valid_end
+
+    def _rollover(self) -> None:
+        self.close()
+        if self._backup_count > 0:
+            for number in range(self._backup_count - 1, 0, -1):
+                source = self._path.with_name(f"{self._path.name}.{number}")
+                target = self._path.with_name(f"{self._path.name}.{number + 1}")
+                for src, dst in ((source, target), (index_path_for(source), index_path_for(target))):
+                    if src.exists():
+                        os.replace(src, dst)
+            first = self._path.with_name(f"{self._path.name}.1")
+            os.replace(self._path, first)
+            index = index_path_for(self._path)
+            if index.exists():
+                os.replace(index, index_path_for(first))
+        else:
+            self._path.unlink(missing_ok=True)
+            index_path_for(self._path).unlink(missing_ok=True)
+        self._last_timestamp = 0.0
+        self._open()
+
+
+_IndexEntry = Tuple[float, int, int, int]
+
+
+def _read_header(path: Path, offset: int) -> Optional[Tuple[int, float, int, int]]:
+    try:
+        with open(path, "rb") as handle:
+            handle.seek(offset)
+            raw = handle.read(_RECORD_HEADER.size)
+            if len(raw) < _RECORD_HEADER.size:
+                return None
+            header = _RECORD_HEADER.unpack(raw)
+            end = offset + _RECORD_HEADER.size + header[2] + header[3] + header[0]
+            if os.fstat(handle.fileno()).st_size < end:
+                return None
+            return header
+    except OSError:
+        return None
+
+
+def _load_index(path: Path) -> List[_IndexEntry]:
+    """Return index entries for ``path``, rebuilding them when the index is missing or stale."""
+    try:
+        with open(path, "rb") as handle:
+            if handle.read(len(_CAPTURE_MAGIC)) != _CAPTURE_MAGIC:
+                return []
+    except OSError:
+        return []
+    try:
+        raw = index_path_for(path).read_bytes()
+    except OSError:
+        raw = b""
+    entries: List[_IndexEntry] = []
+    if raw.startswith(_INDEX_MAGIC):
+        usable = (len(raw) - len(_INDEX_MAGIC)) // _INDEX_ENTRY.size * _INDEX_ENTRY.size
+        entries = list(_INDEX_ENTRY.iter_unpack(raw[len(_INDEX_MAGIC) : len(_INDEX_MAGIC) + usable]))
+    start = len(_CAPTURE_MAGIC)
+    if entries:
+        header = _read_header(path, entries[-1][1])
+        if header is None:
+            entries = []
+        else:
+            payload_len, _stamp, plugin_len, id_len = header
+            start = entries[-1][1] + _RECORD_HEADER.size + plugin_len + id_len + payload_len
+    return entries + _scan_records(path, start)
+
+
+def _scan_records(path: Path, start: int) -> List[_IndexEntry]:
+    entries: List[_IndexEntry] = []
+    try:
+        handle = open(path, "rb")
+    except OSError:
+        return entries
+    with handle:
+        if handle.read(len(_CAPTURE_MAGIC)) != _CAPTURE_MAGIC:
+            return entries
+        offset = start
+        handle.seek(offset)
+        while True:
+            raw = handle.read(_RECORD_HEADER.size)
+            if len(raw) < _RECORD_HEADER.size:
+                break
+            payload_len, stamp, plugin_len, id_len = _RECORD_HEADER.unpack(raw)
+            keys = handle.read(plugin_len + id_len)
+            if len(keys) < plugin_len + id_len:
+                break
+            handle.seek(payload_len, os.SEEK_CUR)
+            end = offset + _RECORD_HEADER.size + plugin_len + id_len + payload_len
+            if handle.tell() != end or os.fstat(handle.fileno()).st_size < end:
+                break
+            plugin = keys[:plugin_len].decode("utf-8", "ignore")
+            payload_id = keys[plugin_len:].decode("utf-8", "ignore")
+            entries.append((stamp, offset, _key_hash(plugin.casefold()), _key_hash(payload_id)))
+            offset = end
+    return entries
+
+
+class _Timestamps(Sequence[float]):
+    __slots__ = ("_entries",)
+
+    def __init__(self, entries: List[_IndexEntry]) -> None:
+        self._entries = entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, index):  # type: ignore[override]
+        return self._entries[index][0]
+
+
+class PayloadCaptureReader:
+    """Query a capture file through its index without scanning the payloads."""
+
+    def __init__(self, path: Path) -> None:
+        self._path = Path(path)
+        self._entries = _load_index(self._path)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def records(
+        self,
+        *,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        plugin: Optional[str] = None,
+        payload_id: Optional[str] = None,
+        last: Optional[int] = None,
+        distinct: bool = False,
+    ) -> Iterator[CaptureRecord]:
+        """Yield records in capture order.
+
+        ``start``/``end`` bound the timestamp (inclusive), ``plugin`` matches
+        case-insensitively, ``payload_id`` exactly. ``last`` keeps only the final N
+        matches; ``distinct`` yields only the first record for each (plugin, id).
+        """
+        entries = self._entries
+        timestamps = _Timestamps(entries)
+        low = 0 if start is None else bisect.bisect_left(timestamps, float(start))
+        high = len(entries) if end is None else bisect.bisect_right(timestamps, float(end))
+        plugin_cf = plugin.casefold() if plugin is not None else None
+        plugin_hash = _key_hash(plugin_cf) if plugin_cf is not None else None
+        id_hash = _key_hash(payload_id) if payload_id is not None else None
+        selected: List[_IndexEntry] = []
+        for entry in entries[low:high]:
+            if plugin_hash is not None and entry[2] != plugin_hash:
+                continue
+            if id_hash is not None and entry[3] != id_hash:
+                continue
+            selected.append(entry)
+        if not selected:
+            return
+        with open(self._path, "rb") as handle:
+            if distinct:
+                selected = self._distinct_entries(handle, selected)
+            if last is not None:
+                selected = selected[-last:] if last > 0 else []
+            for _stamp, offset, _plugin_hash, _id_hash in selected:
+                record = self._read_record(handle, offset)
+                if record is None:
+                    continue
+                if plugin_cf is not None and record.plugin.casefold() != plugin_cf:
+                    continue
+                if payload_id is not None and record.payload_id != payload_id:
+                    continue
+                yield record
+
+    def _distinct_entries(self, handle: BinaryIO, entries: Sequence[_IndexEntry]) -> List[_IndexEntry]:
+        """Keep the first entry for each (plugin, id) in ``entries``.
+
+        The index hashes only prefilter: an entry whose hash pair is new is kept
+        unread, and records are read to compare the real plugin and id only when
+        hash pairs repeat, so colliding pairs are never merged.
+        """
+        kept: List[_IndexEntry] = []
+        first: Dict[Tuple[int, int], _IndexEntry] = {}
+        seen: Dict[Tuple[int, int], Set[Optional[Tuple[str, str]]]] = {}
+        for entry in entries:
+            hashes = (entry[2], entry[3])
+            if hashes not in first:
+                first[hashes] = entry
+                kept.append(entry)
+                continue
+            keys = seen.get(hashes)
+            if keys is None:
+                keys = seen[hashes] = {self._record_key(handle, first[hashes][1])}
+            key = self._record_key(handle, entry[1])
+            if key in keys:
+                continue
+            keys.add(key)
+            kept.append(entry)
+        return kept
+
+    def _record_key(self, handle: BinaryIO, offset: int) -> Optional[Tuple[str, str]]:
+        record = self._read_record(handle, offset)
+        if record is None:
+            return None
+        return record.plugin.casefold(), record.payload_id
+
+    @staticmethod
+    def _read_record(handle: BinaryIO, offset: int) -> Optional[CaptureRecord]:
+        handle.seek(offset)
+        raw = handle.read(_RECORD_HEADER.size)
+        if len(raw) < _RECORD_HEADER.size:
+            return None
+        payload_len, stamp, plugin_len, id_len = _RECORD_HEADER.unpack(raw)
+        body = handle.read(plugin_len + id_len + payload_len)
+        if len(body) < plugin_len + id_len + payload_len:
+            return None
+        return CaptureRecord(
+            timestamp=stamp,
+            plugin=body[:plugin_len].decode("utf-8", "replace"),
+            payload_id=body[plugin_len : plugin_len + id_len].decode("utf-8", "replace"),
+            data=body[plugin_len + id_len :],
+            offset=offset,
+        )
+
+
+def capture_files(log_dir: Path, name: str = CAPTURE_FILE_NAME) -> List[Path]:
+    """Return the capture file and its rotated generations in ``log_dir``, oldest first."""
+    found = []
+    for path in log_dir.glob(f"{name}*"):
+        if path.name.endswith(INDEX_SUFFIX) or not path.is_file():
+            continue
+        suffix = path.name[len(name) :]
+        if suffix == "":
+            generation = 0
+        elif suffix.startswith(".") and suffix[1:].isdigit():
+            generation = int(suffix[1:])
+        else:
+            continue
+        found.append((generation, path))
+    return [path for _generation, path in sorted(found, reverse=True)]
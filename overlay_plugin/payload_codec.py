@@ -0,0 +1,375 @@
+"""Encode-once payload wrapper and wire framing shared by the overlay publish path."""
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+
+def encode_payload(payload: Mapping[str, Any]) -> bytes:
+    """Serialise a payload mapping into the UTF-8 JSON wire form (no trailing newline).
+
+    Keys are sorted so the same bytes double as the payload log text, which has
+    always been key-sorted.
+    """
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+
+
+def as_encoded_payload(payload: Mapping[str, Any]) -> "EncodedPayload":
+    """Wrap ``payload`` in an :class:`EncodedPayload`, reusing any cached encoding.
+
+    The plugin can be imported both as a package and from the checkout root, so an
+    ``EncodedPayload`` may come from a second copy of this module; those are
+    recognised by shape rather than by ``isinstance`` alone.
+    """
+    if isinstance(payload, EncodedPayload):
+        return payload
+    if type(payload).__name__ == "EncodedPayload" and hasattr(payload, "payload"):
+        return EncodedPayload(
+            payload.payload,  # type: ignore[attr-defined]
+            getattr(payload, "_data", None),
+            raw=getattr(payload, "raw", None),
+            key_sorted=bool(getattr(payload, "_key_sorted", False)),
+        )
+    return EncodedPayload(payload)
+
+
+class EncodedPayload(Mapping[str, Any]):
+    """Read-only payload mapping that caches its JSON encoding.
+
+    The overlay API serialises each payload once for its size check; wrapping the
+    result lets the runtime reuse the same bytes for payload logging and for the
+    socket broadcast instead of calling ``json.dumps`` at every hop.
+
+    ``raw`` holds the pre-normalisation forms of the payload (``raw``,
+    ``legacy_raw``). They are never broadcast; :meth:`log_text` adds them back so
+    payload logs keep the full provenance.
+
+    ``key_sorted`` says whether a supplied ``data`` is in :func:`encode_payload`
+    form. Spliced encodings are not, and the log text is then re-encoded so log
+    lines stay key-sorted whichever path a payload took.
+    """
+
+    __slots__ = ("_payload", "_data", "_raw", "_key_sorted")
+
+    def __init__(
+        self,
+        payload: Mapping[str, Any],
+        data: Optional[bytes] = None,
+        *,
+        raw: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        key_sorted: bool = False,
+    ) -> None:
+        self._payload: Dict[str, Any] = dict(payload)
+        self._data = data
+        self._raw: Dict[str, Mapping[str, Any]] = dict(raw) if raw else {}
+        self._key_sorted = data is None or key_sorted
+
+    # Mapping protocol -----------------------------------------------------
+
+    def __getitem__(self, key: str) -> Any:
+        return self._payload[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._payload)
+
+    def __len__(self) -> int:
+        return len(self._payload)
+
+    def __repr__(self) -> str:
+        return f"EncodedPayload({self._payload!r})"
+
+    # Encoding -------------------------------------------------------------
+
+    @property
+    def payload(self) -> Dict[str, Any]:
+        return self._payload
+
+    @property
+    def data(self) -> bytes:
+        """Return the cached JSON bytes, encoding on first access.
+
+        Raises ``TypeError``/``ValueError`` when the payload is not JSON serialisable.
+        """
+        data = self._data
+        if data is None:
+            data = encode_payload(self._payload)
+            self._data = data
+        return data
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def text(self) -> str:
+        return self.data.decode("utf-8")
+
+    @property
+    def raw(self) -> Dict[str, Mapping[str, Any]]:
+        return self._raw
+
+    def merged(self, defaults: Mapping[str, Any]) -> "EncodedPayload":
+        """Return a copy with ``defaults`` applied like ``dict.setdefault``.
+
+        The existing encoding is spliced rather than re-serialised, so only the
+        added default values are passed through ``json.dumps``.
+        """
+        additions: Dict[str, Any] = {key: value for key, value in defaults.items() if key not in self._payload}
+        if not additions:
+            return self
+        merged_payload = dict(self._payload)
+        merged_payload.update(additions)
+        return EncodedPayload(merged_payload, _splice(self.data, additions.keys(), additions.values()), raw=self._raw)
+
+    def without(self, *keys: str) -> "EncodedPayload":
+        """Return a copy without ``keys`` (re-encoded lazily when anything was removed)."""
+        if not any(key in self._payload for key in keys):
+            return self
+        return EncodedPayload(
+            {key: value for key, value in self._payload.items() if key not in keys},
+            raw=self._raw,
+        )
+
+    def with_raw(self, raw: Mapping[str, Mapping[str, Any]]) -> "EncodedPayload":
+        """Return a copy sharing this encoding with ``raw`` forms attached for logging."""
+        return EncodedPayload(self._payload, self._data, raw={**self._raw, **raw}, key_sorted=self._key_sorted)
+
+    def log_text(self) -> str:
+        """Return the key-sorted JSON text with the ``raw`` forms included, for payload logs.
+
+        This is the cached encoding unless the payload carries ``raw`` forms or was
+        spliced by :meth:`merged`; it matches ``json.dumps(..., sort_keys=True)`` of
+        the same mapping either way.
+        """
+        forms = {name: form for name, form in self._raw.items() if name not in self._payload}
+        if not forms and self._key_sorted:
+            return self.text
+        return json.dumps({**self._payload, **forms}, ensure_ascii=False, sort_keys=True, default=_mapping_as_dict)
+
+
+def _mapping_as_dict(value: Any) -> Dict[str, Any]:
+    # ``raw`` forms are often EncodedPayload instances, which json cannot encode directly.
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _splice(base: bytes, keys: Iterable[str], values: Iterable[Any]) -> bytes:
+    """Append ``keys``/``values`` to the encoded JSON object ``base`` without re-encoding it."""
+    parts = [base[:-1]]
+    separator = b", " if base != b"{}" else b""
+    for key, value in zip(keys, values):
+        parts.append(separator)
+        parts.append(json.dumps(key, ensure_ascii=False).encode("utf-8"))
+        parts.append(b": ")
+        parts.append(json.dumps(value, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        separator = b", "
+    parts.append(b"}")
+    return b"".join(parts)
+
+
+# Batches ----------------------------------------------------------------------
+#
+# ``send_overlay_messages`` payloads travel as one envelope so the client can apply
+# them together: {"event": "OverlayBatch", "messages": [<payload>, ...]}.
+
+BATCH_EVENT = "OverlayBatch"
+
+
+def encode_batch(members: Iterable[bytes]) -> bytes:
+    """Wrap already-encoded member payloads in a batch envelope without re-encoding them."""
+    return b''.join((b'{"event": "', BATCH_EVENT.encode("ascii"), b'", "messages": [', b", ".join(members), b"]}"))
+
+
+# Length-prefixed framing ------------------------------------------------------
+#
+# NDJSON (one JSON document per line) stays the default wire format. Clients that
+# see ``lp1`` in the ``framing`` list of port.json may ask for it during the
+# handshake; every frame is then ``!I`` body length followed by the body:
+#
+#   b"J" + JSON                      plain payload
+#   b"V" + !II(json_len, count)      vector payload: JSON of [payload-without-vector,
+#        + JSON + count*2 int32 x/y  style table], packed little-endian coordinates,
+#        + count uint16 style index  and one style-table index per point
+#
+# Packing the point coordinates skips JSON parsing for the bulk of large ``vect``
+# payloads; the per-point colour/marker/text dicts are shared through the table.
+
+FRAMING_NDJSON = "ndjson"
+FRAMING_LP1 = "lp1"
+SUPPORTED_FRAMINGS = (FRAMING_NDJSON, FRAMING_LP1)
+FRAMING_ACK_EVENT = "OverlayFraming"
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+FRAME_LENGTH = struct.Struct("!I")
+_VECTOR_HEADER = struct.Struct("!II")
+_FRAME_KIND_JSON = b"J"
+_FRAME_KIND_VECTOR = b"V"
+_MAX_STYLE_ENTRIES = 0xFFFF
+_SWAP_BYTES = sys.byteorder != "little"
+
+
+def encode_frame(payload: Optional[Mapping[str, Any]], data: bytes) -> bytes:
+    """Return a length-prefixed ``lp1`` frame for ``payload`` (already encoded as ``data``)."""
+    body = _encode_vector_body(payload) if payload is not None else None
+    if body is None:
+        body = _FRAME_KIND_JSON + data
+    return FRAME_LENGTH.pack(len(body)) + body
+
+
+def decode_frame_body(body: bytes) -> Any:
+    """Decode the body of an ``lp1`` frame (without its length prefix).
+
+    Raises ``ValueError`` for malformed frames.
+    """
+    kind = body[:1]
+    if kind == _FRAME_KIND_JSON:
+        return json.loads(body[1:])
+    if kind != _FRAME_KIND_VECTOR:
+        raise ValueError(f"Unknown frame kind {kind!r}")
+    try:
+        return _decode_vector_body(body)
+    except (struct.error, IndexError, TypeError, AttributeError) as exc:
+        raise ValueError(f"Malformed vector frame: {exc}") from exc
+
+
+def _decode_vector_body(body: bytes) -> Dict[str, Any]:
+    json_len, count = _VECTOR_HEADER.unpack_from(body, 1)
+    offset = 1 + _VECTOR_HEADER.size
+    payload, styles = json.loads(body[offset : offset + json_len])
+    offset += json_len
+    coords = array("i")
+    coords.frombytes(body[offset : offset + count * 8])
+    offset += count * 8
+    indexes = array("H")
+    indexes.frombytes(body[offset : offset + count * 2])
+    if len(coords) != count * 2 or len(indexes) != count:
+        raise ValueError("Truncated vector frame")
+    if _SWAP_BYTES:
+        coords.byteswap()
+        indexes.byteswap()
+    coord_iter = iter(coords.tolist())
+    vector = []
+    append = vector.append
+    for x_val, y_val, index in zip(coord_iter, coord_iter, indexes.tolist()):
+        point = styles[index].copy()
+        point["x"] = x_val
+        point["y"] = y_val
+        append(point)
+    payload["vector"] = vector
+    return payload
+
+
+def _encode_vector_body(payload: Mapping[str, Any]) -> Optional[bytes]:
+    vector = payload.get("vector")
+    if not isinstance(vector, list) or not vector:
+        return None
+    coords = array("i")
+    indexes = array("H")
+    styles: List[Dict[str, Any]] = []
+    style_lookup: Dict[Tuple[Tuple[str, Any], ...], int] = {}
+    try:
+        for point in vector:
+            if not isinstance(point, Mapping):
+                return None
+            x_val = point.get("x")
+            y_val = point.get("y")
+            # Only exact ints round-trip through the packed layout; anything else stays JSON.
+            if type(x_val) is not int or type(y_val) is not int:
+                return None
+            coords.append(x_val)
+            coords.append(y_val)
+            style = tuple(sorted((key, value) for key, value in point.items() if key not in ("x", "y")))
+            index = style_lookup.get(style)
+            if index is None:
+                if len(styles) >= _MAX_STYLE_ENTRIES:
+                    return None
+                index = len(styles)
+                style_lookup[style] = index
+                styles.append(dict(style))
+            indexes.append(index)
+        header = json.dumps(
+            [{key: value for key, value in payload.items() if key != "vector"}, styles],
+            ensure_ascii=False,
+        ).encode("utf-8")
+    except (OverflowError, TypeError, ValueError):
+        # Coordinates outside int32, unhashable point values or non-JSON data: fall back.
+        return None
+    if _SWAP_BYTES:
+        coords.byteswap()
+        indexes.byteswap()
+    return b"".join(
+        (
+            _FRAME_KIND_VECTOR,
+            _VECTOR_HEADER.pack(len(header), len(vector)),
+            header,
+            coords.tobytes(),
+            indexes.tobytes(),
+        )
+    )
+
+
+# Vector deltas ----------------------------------------------------------------
+#
+# Clients may also opt into ``features`` during the framing handshake. With
+# ``vector_delta`` the broadcaster remembers the last ``vect`` point list it sent
+# to that client per id and, when only a few points changed, replaces ``vector``
+# with ``vector_delta``:
+#
+#   {"base": <points the client holds>, "count": <new length>, "set": [[index, point], ...],
+#    "gen": <generation>, "seq": <position in the chain>}
+#
+# The client truncates to ``count`` and overwrites/appends the listed points.
+# Every other payload field (colour, TTL, plugin) is still sent in full.
+#
+# Each full ``vect`` sent to such a client carries ``vector_gen``, a number that is
+# unique per baseline. A delta applies only when its ``gen`` matches the stored
+# item and its ``seq`` follows the last one applied (the full send counts as 0).
+# Otherwise the client drops it and sends ``{"cli": "vector_resync", "id": ...,
+# "gen": ..., "held": ...}``; the broadcaster then forgets that baseline and, when
+# the client still holds the item, re-sends it in full straight away.
+
+FEATURE_VECTOR_DELTA = "vector_delta"
+SUPPORTED_FEATURES = (FEATURE_VECTOR_DELTA,)
+VECTOR_DELTA_KEY = "vector_delta"
+VECTOR_GEN_KEY = "vector_gen"
+VECTOR_RESYNC_CLI = "vector_resync"
+
+
+def vector_points(payload: Mapping[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Return shallow copies of the points of a delta-eligible ``vect`` payload.
+
+    Only LegacyOverlay ``vect`` shapes with an id, at least two points and integer
+    coordinates qualify, which guarantees the client keeps every point and the
+    indexes of a later delta line up with what it stores.
+    """
+    if payload.get("event") != "LegacyOverlay" or payload.get("type") != "shape":
+        return None
+    if str(payload.get("shape") or "").lower() != "vect" or not isinstance(payload.get("id"), str):
+        return None
+    vector = payload.get("vector")
+    if not isinstance(vector, list) or len(vector) < 2:
+        return None
+    points: List[Dict[str, Any]] = []
+    for point in vector:
+        if not isinstance(point, Mapping) or type(point.get("x")) is not int or type(point.get("y")) is not int:
+            return None
+        points.append(dict(point))
+    return points
+
+
+def diff_vector_points(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return a ``vector_delta`` turning ``previous`` into ``current``.
+
+    Returns ``None`` when more than half the points changed; a full send is then
+    about as small and resets the client's base.
+    """
+    count = len(current)
+    changed = [[index, point] for index, point in enumerate(current[: len(previous)]) if point != previous[index]]
+    changed.extend([index, current[index]] for index in range(len(previous), count))
+    if len(changed) * 2 > count:
+        return None
+    return {"base": len(previous), "count": count, "set": changed}
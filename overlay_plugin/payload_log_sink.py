@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Optional
+
+DEFAULT_MAX_PENDING = 4096
+DROP_LOG_INTERVAL = 30.0
+
+_FLUSH = object()
+
+
+class PayloadLogSink:
+    """Background writer for payload logs.
+
+    Publishing threads only enqueue the payload; the worker thread calls ``write``,
+    which serialises it and emits the log records through the rotating payload
+    handler. The worker starts on the first submitted payload. When more than
+    ``max_pending`` payloads are waiting, new ones are dropped and counted rather
+    than blocking the caller. After ``stop()`` the sink drops every payload until
+    ``reopen()`` is called, so a late publisher cannot restart the worker and write
+    through handlers that shutdown has already closed.
+
+    ``on_stop`` runs on the worker thread once it has written the last payload
+    before the stop sentinel, so resources owned by ``write`` are released by the
+    thread that uses them even when ``stop()`` gives up waiting for it.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[Any], None],
+        lifecycle,
+        logger,
+        *,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        on_stop: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._write = write
+        self._on_stop = on_stop
+        self._lifecycle = lifecycle
+        self._logger = logger
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, int(max_pending)))
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+        self._dropped = 0
+        self._last_drop_log = 0.0
+
+    @property
+    def running(self) -> bool:
+        worker = self._worker
+        return worker is not None and worker.is_alive()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def submit(self, payload: Any) -> bool:
+        """Queue ``payload`` for the writer; returns False when it was dropped."""
+        if self._closed:
+            return False
+        if not self.running and not self._start():
+            return False
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            self._record_drop()
+            return False
+        return True
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Block until every payload queued so far has been written."""
+        if not self.running:
+            return self._queue.empty()
+        done = threading.Event()
+        try:
+            self._queue.put((_FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Write out the queued payloads, then stop the worker and close the sink.
+
+        When the writer is too far behind to take the stop sentinel within
+        ``timeout``, the backlog is discarded so the worker always ends. The worker
+        is forgotten only once it has exited, so a later ``reopen()`` never runs a
+        second writer next to one still finishing a write.
+        """
+        with self._lock:
+            self._closed = True
+            worker = self._worker
+        if worker is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            dropped = self._discard_pending()
+            self._logger.warning("Payload log writer still behind at shutdown; dropped %d pending payload(s)", dropped)
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:  # pragma: no cover - only racing submits can refill it, and they are closed out
+                pass
+        self._lifecycle.join_thread(worker, worker.name, timeout=timeout)
+        with self._lock:
+            if self._worker is worker and not worker.is_alive():
+                self._worker = None
+
+    def reopen(self) -> None:
+        """Accept payloads again after ``stop()``; the worker restarts lazily."""
+        with self._lock:
+            self._closed = False
+
+    def _start(self) -> bool:
+        with self._lock:
+            if self._closed:
+                return False
+            if self._worker is not None and self._worker.is_alive():
+                return True
+            worker = threading.Thread(target=self._loop, name="ModernOverlayPayloadLog", daemon=True)
+            self._worker = worker
+            self._lifecycle.track_thread(worker)
+            worker.start()
+            return True
+
+    def _discard_pending(self) -> int:
+        dropped = 0
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return dropped
+            if isinstance(item, tuple) and len(item) == 2 and item[0] is _FLUSH:
+                item[1].set()
+            elif item is not None:
+                dropped += 1
+
+    def _record_drop(self) -> None:
+        with self._lock:
+            self._dropped += 1
+            now = time.monotonic()
+            if now - self._last_drop_log < DROP_LOG_INTERVAL:
+                return
+            dropped = self._dropped
+            self._dropped = 0
+            self._last_drop_log = now
+        self._logger.warning("Payload log writer is behind; dropped %d payload(s)", dropped)
+
+    def _loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                if self._closed:
+                    if self._on_stop is not None:
+                        try:
+                            self._on_stop()
+                        except Exception as exc:
+                            self._logger.debug("Payload log stop hook failed: %s", exc, exc_info=exc)
+                    return
+                # Reopened before this worker reached the stop sentinel: keep writing.
+                continue
+            if isinstance(item, tuple) and len(item) == 2 and item[0] is _FLUSH:
+                item[1].set()
+                continue
+            try:
+                self._write(item)
+            except Exception as exc:
+                self._logger.debug("Payload log write failed: %s", exc, exc_info=exc)
@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
-"""Replay overlay payloads stored in a logfile through the ModernOverlay CLI."""
+"""Replay overlay payloads stored in a logfile through the ModernOverlay CLI.
+
+Accepts either a text payload log (``overlay-payloads.log``) or a binary capture
+(``overlay-payloads.capture``); captures can be filtered by plugin, id and time.
+"""
 from __future__ import annotations
 
 import argparse
@@ -9,6 +13,7 @@ import socket
 import subprocess
 import sys
 import time
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
@@ -187,6 +192,15 @@ def _extract_payload(
     record = _extract_json_segment(raw_line, line_no)
     if record is None:
         return None
+    return _payload_from_record(record, line_no, ttl_override=ttl_override)
+
+
+def _payload_from_record(
+    record: Dict[str, Any],
+    line_no: int,
+    *,
+    ttl_override: Optional[int],
+) -> Optional[Tuple[str, Dict[str, Any]]]:
     payload_obj = record.get("raw")
     if not isinstance(payload_obj, dict):
         payload_obj = record.get("payload")
@@ -266,24 +280,81 @@ def _build_cli_message(
     return message
 
 
-def _iter_cli_messages(log_path: Path, ttl_override: Optional[int]) -> Iterable[Dict[str, Any]]:
+def _iter_extracted_from_log(
+    log_path: Path, ttl_override: Optional[int]
+) -> Iterable[Tuple[int, Tuple[str, Dict[str, Any]]]]:
     with log_path.open("r", encoding="utf-8") as handle:
         for line_no, raw_line in enumerate(handle, start=1):
             if not raw_line.strip():
                 continue
             extracted = _extract_payload(raw_line, line_no, ttl_override=ttl_override)
-            if not extracted:
-                continue
-            event, payload = extracted
-            command = _command_for_event(event)
-            if not command:
-                _print_step(f"Skipping line {line_no}: unsupported event '{event}'.")
-                continue
-            try:
-                yield _build_cli_message(command, payload, log_path=log_path, line_no=line_no)
-            except Exception as exc:
-                _print_step(f"Skipping line {line_no}: unable to build CLI payload ({exc}).")
-                continue
+            if extracted:
+                yield line_no, extracted
+
+
+def _iter_extracted_from_capture(
+    capture_path: Path,
+    ttl_override: Optional[int],
+    filters: Dict[str, Any],
+) -> Iterable[Tuple[int, Tuple[str, Dict[str, Any]]]]:
+    """Read payloads from a binary capture, using its index to apply the filters."""
+    if str(PLUGIN_ROOT) not in sys.path:
+        sys.path.insert(0, str(PLUGIN_ROOT))
+    from overlay_plugin.payload_capture import PayloadCaptureReader
+
+    reader = PayloadCaptureReader(capture_path)
+    for record_no, record in enumerate(reader.records(**filters), start=1):
+        try:
+            record_obj = record.payload()
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            _print_step(f"Skipping record {record_no}: JSON decode failed.")
+            continue
+        if not isinstance(record_obj, dict):
+            continue
+        extracted = _payload_from_record(record_obj, record_no, ttl_override=ttl_override)
+        if extracted:
+            yield record_no, extracted
+
+
+def _iter_cli_messages(
+    log_path: Path,
+    ttl_override: Optional[int],
+    capture_filters: Optional[Dict[str, Any]] = None,
+) -> Iterable[Dict[str, Any]]:
+    if _is_capture_file(log_path):
+        source = _iter_extracted_from_capture(log_path, ttl_override, capture_filters or {})
+    else:
+        source = _iter_extracted_from_log(log_path, ttl_override)
+    for line_no, (event, payload) in source:
+        command = _command_for_event(event)
+        if not command:
+            _print_step(f"Skipping line {line_no}: unsupported event '{event}'.")
+            continue
+        try:
+            yield _build_cli_message(command, payload, log_path=log_path, line_no=line_no)
+        except Exception as exc:
+            _print_step(f"Skipping line {line_no}: unable to build CLI payload ({exc}).")
+            continue
+
+
+def _is_capture_file(path: Path) -> bool:
+    name = path.name
+    if name.endswith(".idx"):
+        return False
+    return name.endswith(".capture") or ".capture." in name
+
+
+def _parse_time(value: Optional[str], option: str) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        _fail(f"{option} must be epoch seconds or an ISO date/time, got {value!r}.")
 
 
 def main(argv: List[str] | None = None) -> None:
@@ -307,6 +378,10 @@ def main(argv: List[str] | None = None) -> None:
         type=int,
         help="Override TTL value applied to LegacyOverlay payloads.",
     )
+    parser.add_argument("--plugin", help="Capture files only: replay payloads from this plugin.")
+    parser.add_argument("--payload-id", help="Capture files only: replay payloads with this id.")
+    parser.add_argument("--since", help="Capture files only: start time (epoch seconds or ISO date/time).")
+    parser.add_argument("--until", help="Capture files only: end time (epoch seconds or ISO date/time).")
     args = parser.parse_args(argv)
 
     log_path = _resolve_logfile(args.logfile)
@@ -330,8 +405,17 @@ def main(argv: List[str] | None = None) -> None:
     if ttl_override is not None and ttl_override <= 0:
         _fail("--ttl must be positive when provided.")
 
+    capture_filters: Dict[str, Any] = {
+        "plugin": args.plugin,
+        "payload_id": args.payload_id,
+        "start": _parse_time(args.since, "--since"),
+        "end": _parse_time(args.until, "--until"),
+    }
+    if not _is_capture_file(log_path) and any(value is not None for value in capture_filters.values()):
+        _fail("--plugin, --payload-id, --since and --until require a .capture file.")
+
     messages: List[Dict[str, Any]] = []
-    for message in _iter_cli_messages(log_path, ttl_override):
+    for message in _iter_cli_messages(log_path, ttl_override, capture_filters):
         messages.append(message)
         if args.max_payloads and len(messages) >= args.max_payloads:
             break
@@ -370,7 +454,8 @@ if __name__ == "__main__":
         )
         print(f"[overlay-cli] DETAILS: {exc}", file=sys.stderr)
         print(
-            "[overlay-cli] usage: PYTHONPATH=. python3 tests/send_overlay_from_log.py --logfile PATH [--max-payloads N] [--ttl SECONDS]",
+            "[overlay-cli] usage: PYTHONPATH=. python3 tests/send_overlay_from_log.py --logfile PATH [--max-payloads N] [--ttl SECONDS]"
+            " [--plugin NAME] [--payload-id ID] [--since TIME] [--until TIME]",
             file=sys.stderr,
         )
         raise SystemExit(1)
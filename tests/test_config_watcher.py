@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+
+import pytest
+
+from overlay_client.plugin_overrides import PluginOverrideManager
+from overlay_plugin.config_watcher import ConfigWatcher, shared_config_watcher
+from overlay_plugin.groupings_loader import GroupingsLoader
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def _bump(path, text: str) -> None:
+    path.write_text(text, encoding="utf-8")
+    # Coarse mtime filesystems still see a new signature through the size change.
+    stamp = time.time() + 5
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_watch_flags_changes_once(tmp_path, use_inotify):
+    watcher = ConfigWatcher(poll_interval=0.05, use_inotify=use_inotify)
+    target = tmp_path / "debug.json"
+    target.write_text("{}", encoding="utf-8")
+    watch = watcher.watch([target])
+    try:
+        if use_inotify and watcher.backend != "inotify":
+            pytest.skip("inotify unavailable")
+        assert watcher.backend == ("inotify" if use_inotify else "stat")
+        assert watch.poll() is False
+        _bump(target, '{"a": 1}')
+        assert _wait_for(watch.poll)
+        assert watch.poll() is False
+    finally:
+        watch.close()
+    assert watcher.running is False
+
+
+def test_watch_sees_files_created_later_and_ignores_siblings(tmp_path):
+    watcher = ConfigWatcher(poll_interval=0.05)
+    target = tmp_path / "dev_settings.json"
+    watch = watcher.watch([target])
+    try:
+        (tmp_path / "other.json").write_text("{}", encoding="utf-8")
+        time.sleep(0.2)
+        assert watch.poll() is False
+        target.write_text("{}", encoding="utf-8")
+        assert _wait_for(watch.poll)
+    finally:
+        watch.close()
+
+
+def test_closed_watch_is_not_notified(tmp_path):
+    watcher = ConfigWatcher(poll_interval=0.05, use_inotify=False)
+    target = tmp_path / "debug.json"
+    target.write_text("{}", encoding="utf-8")
+    first = watcher.watch([target])
+    second = watcher.watch([target])
+    first.close()
+    try:
+        _bump(target, '{"b": 2}')
+        assert _wait_for(second.poll)
+        assert first.poll() is False
+    finally:
+        second.close()
+
+
+def test_shared_watcher_respects_env(monkeypatch):
+    monkeypatch.setenv("EDMC_OVERLAY_CONFIG_WATCHER", "off")
+    assert shared_config_watcher() is None
+    monkeypatch.setenv("EDMC_OVERLAY_CONFIG_WATCHER", "1")
+    assert shared_config_watcher() is shared_config_watcher()
+
+
+def test_override_manager_reloads_only_after_watch_fires(tmp_path):
+    shipped = tmp_path / "overlay_groupings.json"
+    user = tmp_path / "overlay_groupings.user.json"
+    shipped.write_text(json.dumps({"PluginA": {"matchingPrefixes": ["foo-"]}}), encoding="utf-8")
+    watcher = ConfigWatcher(poll_interval=0.05)
+    loader = GroupingsLoader(shipped, user)
+    manager = PluginOverrideManager(shipped, logging.getLogger("test"), groupings_loader=loader, config_watcher=watcher)
+    try:
+        assert manager.infer_plugin_name({"id": "foo-1"}) == "PluginA"
+        generation = manager.generation
+
+        calls = []
+        original = loader.reload_if_changed
+        loader.reload_if_changed = lambda: calls.append(1) or original()
+        for _ in range(5):
+            manager.infer_plugin_name({"id": "foo-1"})
+        assert calls == []
+
+        _bump(user, json.dumps({"PluginB": {"matchingPrefixes": ["bar-"]}}))
+        assert _wait_for(lambda: manager.infer_plugin_name({"id": "bar-1"}) == "PluginB")
+        assert manager.generation > generation
+    finally:
+        manager.close()
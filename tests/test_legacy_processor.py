@@ -16,8 +16,9 @@ if "-h" in sys.argv or "--help" in sys.argv:
     print("Usage: PYTHONPATH=. python3 -m pytest tests/test_legacy_processor.py")
     raise SystemExit(0)
 
-from legacy_store import LegacyItemStore
+from legacy_store import LegacyItem, LegacyItemStore, parse_color_rgba
 from legacy_processor import process_legacy_payload
+from overlay_client.legacy_store import vector_points
 
 
 def test_process_message_payload():
@@ -40,8 +41,11 @@ def test_process_message_payload():
     assert item.kind == "message"
     assert item.data["text"] == "Hello"
     assert item.data["color"] == "green"
-    assert item.data["x"] == 10
-    assert item.data["y"] == 20
+    # Coordinates and size are stored only on the typed fields.
+    assert not {"x", "y", "size"} & item.data.keys()
+    # Named colours are left for QColor to resolve.
+    assert item.fields.color_rgba is None
+    assert (item.fields.x, item.fields.y, item.fields.size) == (10, 20, "normal")
 
 
 def test_process_rect_payload():
@@ -66,8 +70,10 @@ def test_process_rect_payload():
     assert item is not None
     assert item.kind == "rect"
     assert item.data["fill"] == "#112233"
-    assert item.data["w"] == 40
-    assert item.data["h"] == 20
+    assert not {"x", "y", "w", "h"} & item.data.keys()
+    assert item.fields.border_rgba == 0xFFABCDEF
+    assert item.fields.fill_rgba == 0xFF112233
+    assert (item.fields.x, item.fields.y, item.fields.w, item.fields.h) == (5, 6, 40, 20)
 
 
 def test_process_vector_payload():
@@ -93,10 +99,13 @@ def test_process_vector_payload():
     assert item.kind == "vector"
     data = item.data
     assert data["base_color"] == "red"
-    assert len(data["points"]) == 3
-    assert data["points"][1]["color"] == "green"
-    assert data["points"][2]["marker"] == "circle"
-    assert data["points"][2]["text"] == "Target"
+    assert "points" not in data
+    assert item.fields.xy.tolist() == [0, 0, 10, 0, 10, 10]
+    points = vector_points(item)
+    assert len(points) == 3
+    assert points[1]["color"] == "green"
+    assert points[2]["marker"] == "circle"
+    assert points[2]["text"] == "Target"
 
 
 def test_process_vector_single_point_marker_is_kept():
@@ -116,11 +125,21 @@ def test_process_vector_single_point_marker_is_kept():
     item = store.get("vect-single-marker")
     assert item is not None
     assert item.kind == "vector"
-    data = item.data
-    assert data["base_color"] == "white"
-    assert len(data["points"]) == 1
-    assert data["points"][0]["marker"] == "cross"
-    assert data["points"][0]["text"] == "Here"
+    assert item.data["base_color"] == "white"
+    points = vector_points(item)
+    assert len(points) == 1
+    assert points[0]["marker"] == "cross"
+    assert points[0]["text"] == "Here"
+
+
+def test_process_vector_beyond_c_int_keeps_point_dicts():
+    store = LegacyItemStore()
+    vector = [{"x": 0, "y": 0}, {"x": 2**40, "y": 1}]
+    assert process_legacy_payload(store, {"type": "shape", "shape": "vect", "id": "far", "vector": vector, "ttl": 6})
+    item = store.get("far")
+    assert item.fields is None
+    assert item.data["points"] == vector
+    assert vector_points(item) == vector
 
 
 def test_process_vector_single_point_without_marker_is_dropped():
@@ -162,3 +181,125 @@ def test_ttl_purge(monkeypatch: pytest.MonkeyPatch):
     # Advance beyond expiry and purge
     assert store.purge_expired(base_time + 2.0) is True
     assert store.get("msg-ttl") is None
+
+
+def _route_payload(vector, **extra):
+    payload = {"type": "shape", "shape": "vect", "id": "route", "color": "#abcdef", "ttl": 5, "vector": vector}
+    payload.update(extra)
+    return payload
+
+
+def test_vector_delta_patches_points_in_place():
+    store = LegacyItemStore()
+    assert process_legacy_payload(store, _route_payload([{"x": idx, "y": 0} for idx in range(4)], vector_gen=7))
+    fields = store.get("route").fields
+    updates = [[1, {"x": 1, "y": 7, "marker": "Circle"}], [4, {"x": 4, "y": 0}]]
+    delta = {"base": 4, "count": 5, "set": updates, "gen": 7, "seq": 1}
+    payload = _route_payload(None, color="red", vector_delta=delta)
+    del payload["vector"]
+    assert process_legacy_payload(store, payload) is True
+    item = store.get("route")
+    assert item.fields is fields
+    assert "points" not in item.data
+    points = vector_points(item)
+    assert points[1] == {"x": 1, "y": 7, "marker": "circle"}
+    assert len(points) == 5
+    assert item.fields.xy.tolist() == [0, 0, 1, 7, 2, 0, 3, 0, 4, 0]
+    assert item.data["base_color"] == "red"
+    assert item.data["__mo_vector_seq__"] == 1
+
+
+def test_vector_delta_without_matching_base_is_dropped():
+    store = LegacyItemStore()
+    resyncs = []
+
+    def resync(item_id, generation, held):
+        resyncs.append((item_id, generation, held))
+
+    payload = _route_payload(None, vector_delta={"base": 4, "count": 4, "set": [], "gen": 3, "seq": 1})
+    assert process_legacy_payload(store, payload, resync_fn=resync) is False
+    assert store.get("route") is None
+    process_legacy_payload(store, _route_payload([{"x": 0, "y": 0}, {"x": 1, "y": 1}], vector_gen=3))
+    gap = _route_payload(None, vector_delta={"base": 2, "count": 4, "set": [[3, {"x": 3, "y": 3}]], "gen": 3, "seq": 1})
+    assert process_legacy_payload(store, gap, resync_fn=resync) is False
+    assert len(vector_points(store.get("route"))) == 2
+    assert resyncs == [("route", 3, False), ("route", 3, True)]
+
+
+def test_vector_delta_must_match_generation_and_sequence():
+    store = LegacyItemStore()
+    resyncs = []
+
+    def resync(item_id, generation, held):
+        resyncs.append((item_id, generation, held))
+
+    def delta(gen, seq, y):
+        patch = {"base": 2, "count": 2, "set": [[1, {"x": 1, "y": y}]], "gen": gen, "seq": seq}
+        return _route_payload(None, vector_delta=patch)
+
+    process_legacy_payload(store, _route_payload([{"x": 0, "y": 0}, {"x": 1, "y": 1}], vector_gen=5))
+    # Same point count, but from another baseline or out of order: applying it would corrupt the shape.
+    assert process_legacy_payload(store, delta(4, 1, 9), resync_fn=resync) is False
+    assert process_legacy_payload(store, delta(5, 2, 9), resync_fn=resync) is False
+    assert process_legacy_payload(store, delta(5, 1, 2), resync_fn=resync) is True
+    assert process_legacy_payload(store, delta(5, 1, 3), resync_fn=resync) is False
+    assert vector_points(store.get("route"))[1] == {"x": 1, "y": 2}
+    assert resyncs == [("route", 4, True), ("route", 5, True), ("route", 5, True)]
+
+    # A full send without a generation (plain client path) never accepts deltas.
+    process_legacy_payload(store, _route_payload([{"x": 0, "y": 0}, {"x": 1, "y": 1}]))
+    assert process_legacy_payload(store, delta(5, 2, 4)) is False
+
+
+def test_store_revision_tracks_content_changes():
+    store = LegacyItemStore()
+    assert store.revision == 0
+    process_legacy_payload(store, {"type": "message", "id": "a", "text": "A", "ttl": 0})
+    process_legacy_payload(store, {"type": "message", "id": "b", "text": "B", "ttl": 1})
+    a_revision = store.item_revision("a")
+    revision = store.revision
+    assert store.item_revision("b") == revision > a_revision
+
+    delta = {"base": 2, "count": 3, "set": [[2, {"x": 2, "y": 2}]], "gen": 1, "seq": 1}
+    process_legacy_payload(store, _route_payload([{"x": 0, "y": 0}, {"x": 1, "y": 1}], vector_gen=1))
+    payload = _route_payload(None, vector_delta=delta)
+    del payload["vector"]
+    process_legacy_payload(store, payload)
+    assert store.item_revision("route") == store.revision > revision
+    assert store.item_revision("a") == a_revision
+
+    revision = store.revision
+    store.remove("missing")
+    assert store.revision == revision
+    store.refresh_expiry("b", 0.0)
+    assert store.purge_expired(1.0) is True
+    assert store.revision == revision + 1
+    assert store.item_revision("b") == 0
+    store.clear()
+    assert store.revision == revision + 2
+    store.clear()
+    assert store.revision == revision + 2
+
+
+def test_store_expiry_heap_tracks_refreshes_and_overwrites():
+    store = LegacyItemStore()
+    for item_id, expiry in (("a", 5.0), ("b", 3.0), ("c", None)):
+        store.set(item_id, LegacyItem(item_id=item_id, kind="message", data={}, expiry=expiry))
+    assert store.next_expiry() == 3.0
+    revision = store.revision
+    store.refresh_expiry("b", 10.0)
+    assert store.revision == revision
+    assert store.next_expiry() == 5.0
+    assert store.pop_expired(6.0) == ["a"]
+    store.set("b", LegacyItem(item_id="b", kind="message", data={}, expiry=None))
+    assert store.next_expiry() is None
+    assert store.pop_expired(100.0) == []
+    assert store.get("c") is not None
+
+
+def test_parse_color_rgba_matches_qcolor_hex_forms():
+    assert parse_color_rgba("#fa0") == 0xFFFFAA00
+    assert parse_color_rgba("#FF7100") == 0xFFFF7100
+    assert parse_color_rgba("#80ff0000") == 0x80FF0000
+    for spec in ("red", "none", "#12345", "#gg0000", "", None, 7):
+        assert parse_color_rgba(spec) is None
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from overlay_plugin.legacy_tcp_server import LegacyOverlayTCPServer
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def legacy_server():
+    received = []
+    logs = []
+    lock = threading.Lock()
+
+    def handler(payload):
+        with lock:
+            received.append(payload)
+        return True
+
+    servers = []
+
+    def start(**kwargs):
+        server = LegacyOverlayTCPServer("127.0.0.1", 0, logs.append, handler, **kwargs)
+        assert server.start() is True
+        servers.append(server)
+        return server
+
+    yield start, received, logs
+    for server in servers:
+        server.stop()
+
+
+def test_lines_split_across_chunks_are_reassembled(legacy_server):
+    start, received, logs = legacy_server
+    server = start()
+    data = (json.dumps({"id": "a", "text": "hello"}) + "\n" + json.dumps({"id": "b"}) + "\nnot json\n").encode()
+    with socket.create_connection(("127.0.0.1", server.port)) as sock:
+        for index in range(0, len(data), 7):
+            sock.sendall(data[index : index + 7])
+            time.sleep(0.001)
+    assert _wait_for(lambda: len(received) == 2)
+    assert [payload["id"] for payload in received] == ["a", "b"]
+    assert _wait_for(lambda: any("parse error" in line for line in logs))
+
+
+def test_socket_per_message_clients_share_one_thread(legacy_server):
+    start, received, _logs = legacy_server
+    server = start()
+    threads_before = threading.active_count()
+    for index in range(20):
+        with socket.create_connection(("127.0.0.1", server.port)) as sock:
+            sock.sendall((json.dumps({"id": f"m{index}"}) + "\n").encode())
+    assert _wait_for(lambda: len(received) == 20)
+    assert threading.active_count() <= threads_before
+
+
+def test_connections_over_the_cap_are_rejected(legacy_server):
+    start, received, logs = legacy_server
+    server = start(max_connections=1)
+    first = socket.create_connection(("127.0.0.1", server.port))
+    try:
+        assert _wait_for(lambda: server.connection_count == 1)
+        with socket.create_connection(("127.0.0.1", server.port)) as second:
+            second.settimeout(2.0)
+            assert second.recv(1) == b""
+        first.sendall(b'{"id": "kept"}\n')
+        assert _wait_for(lambda: len(received) == 1)
+    finally:
+        first.close()
+    assert any("connection limit (1) reached" in line for line in logs)
+
+
+def test_rate_limit_drops_excess_payloads(legacy_server):
+    start, received, logs = legacy_server
+    server = start(rate_limit=1.0, rate_burst=3)
+    burst = b"".join((json.dumps({"id": f"r{index}"}) + "\n").encode() for index in range(10))
+    with socket.create_connection(("127.0.0.1", server.port)) as sock:
+        sock.sendall(burst)
+    assert _wait_for(lambda: any("dropped" in line for line in logs))
+    assert [payload["id"] for payload in received] == ["r0", "r1", "r2"]
+    assert any("dropped 7" in line for line in logs)
+
+
+def test_start_reports_unavailable_port():
+    logs = []
+    blocker = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    blocker.bind(("127.0.0.1", 0))
+    blocker.listen(1)
+    try:
+        server = LegacyOverlayTCPServer("127.0.0.1", blocker.getsockname()[1], logs.append, lambda payload: True)
+        assert server.start() is False
+    finally:
+        blocker.close()
+    assert any("unavailable" in line for line in logs)
+
+
+def test_stop_with_connected_client_closes_socket_and_thread(legacy_server):
+    start, _received, _logs = legacy_server
+    server = start()
+    thread = server._thread
+    client = socket.create_connection(("127.0.0.1", server.port))
+    try:
+        assert _wait_for(lambda: server.connection_count == 1)
+        started = time.monotonic()
+        server.stop()
+        assert time.monotonic() - started < 1.0
+        assert thread is not None and not thread.is_alive()
+        client.settimeout(2.0)
+        assert client.recv(1) == b""
+    finally:
+        client.close()
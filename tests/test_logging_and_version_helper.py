@@ -12,6 +12,11 @@ import pytest
 
 import load
 from overlay_plugin import version_helper
+from overlay_plugin.config_watcher import ConfigWatcher
+from overlay_plugin.lifecycle import LifecycleTracker
+from overlay_plugin.payload_capture import CAPTURE_FILE_NAME, PayloadCaptureReader
+from overlay_plugin.payload_codec import EncodedPayload
+from overlay_plugin.payload_log_sink import PayloadLogSink
 
 
 def test_logger_uses_plugin_folder_name():
@@ -145,6 +150,8 @@ def _runtime_for_debug_json(tmp_path: Path):
     runtime._payload_filter_excludes = set()
     runtime._payload_logging_enabled = False
     runtime._payload_filter_mtime = None
+    runtime._config_watch = None
+    runtime._debug_config_pref_logging = None
     runtime._trace_enabled = False
     runtime._trace_payload_prefixes = ()
     runtime._capture_client_stderrout = False
@@ -162,6 +169,16 @@ def _runtime_for_debug_json(tmp_path: Path):
     runtime._dev_settings_mtime = None
     runtime._dev_settings = deepcopy(load.DEFAULT_DEV_SETTINGS)
     runtime._prefs_lock = threading.Lock()
+    runtime._payload_capture_enabled = False
+    runtime._payload_logs_dir = None
+    runtime._payload_capture = None
+    runtime._payload_capture_target = None
+    runtime._payload_log_sink = PayloadLogSink(
+        runtime._write_payload_log,
+        LifecycleTracker(logging.getLogger("test")),
+        logging.getLogger("test"),
+        on_stop=runtime._close_payload_capture,
+    )
     return runtime
 
 
@@ -211,6 +228,23 @@ def test_dev_settings_not_created_without_dev_mode(monkeypatch, tmp_path):
     assert runtime._dev_settings_path.exists() is False
 
 
+def test_config_watch_reopened_after_stop(monkeypatch, tmp_path):
+    runtime = _runtime_for_debug_json(tmp_path)
+    watcher = ConfigWatcher(poll_interval=0.05, use_inotify=False)
+    monkeypatch.setattr(load, "shared_config_watcher", lambda: watcher)
+    assert runtime._open_config_watch() is True
+    first = runtime._config_watch
+    assert runtime._open_config_watch() is False
+    first.close()
+    runtime._config_watch = None
+    try:
+        assert runtime._open_config_watch() is True
+        assert runtime._config_watch is not None and runtime._config_watch is not first
+        assert runtime._config_watch.paths == first.paths
+    finally:
+        runtime._config_watch.close()
+
+
 def test_dev_settings_migrated_from_debug(monkeypatch, tmp_path):
     runtime = _runtime_for_debug_json(tmp_path)
     monkeypatch.setattr(load, "DEV_BUILD", True)
@@ -347,6 +381,7 @@ def test_log_payload_skips_when_not_diagnostic(monkeypatch, tmp_path):
     monkeypatch.setattr(load, "_diagnostic_logging_enabled", lambda: False)
     runtime._payload_logging_enabled = True
     runtime._log_payload({"event": "TestEvent"})
+    assert runtime._payload_log_sink.running is False
     assert handler.records == []
     test_logger.removeHandler(handler)
 
@@ -365,5 +400,66 @@ def test_log_payload_uses_debug_level(monkeypatch, tmp_path):
     monkeypatch.setattr(load, "_diagnostic_logging_enabled", lambda: True)
     runtime._payload_logging_enabled = True
     runtime._log_payload({"event": "TestEvent"})
+    assert runtime._payload_log_sink.flush()
+    runtime._payload_log_sink.stop()
     assert any("Overlay payload" in rec.getMessage() and rec.levelno == logging.DEBUG for rec in handler.records)
     test_logger.removeHandler(handler)
+
+
+def test_log_payload_writes_capture_when_enabled(monkeypatch, tmp_path):
+    runtime = _runtime_for_debug_json(tmp_path)
+    runtime._preferences = SimpleNamespace(log_payloads=True, client_log_retention=5)
+    log_dir = tmp_path / "logs"
+    monkeypatch.setattr(load._PluginRuntime, "_resolve_payload_logs_dir", lambda self: log_dir)
+    monkeypatch.setattr(load._PluginRuntime, "_configure_payload_logger", lambda self: None)
+    monkeypatch.setattr(load, "_diagnostic_logging_enabled", lambda: True)
+    runtime._payload_filter_path.write_text(
+        json.dumps({"payload_logging": {"overlay_payload_capture_enabled": True}}), encoding="utf-8"
+    )
+    runtime._load_payload_debug_config(force=True)
+    assert runtime._payload_capture_enabled is True
+
+    runtime._log_payload(EncodedPayload({"event": "LegacyOverlay", "id": "edr-1", "plugin": "EDR", "text": "hi"}))
+    runtime._log_payload(EncodedPayload({"event": "LegacyOverlay", "id": "bgs-1", "plugin": "BGS", "text": "yo"}))
+    # Preferences read after a payload was queued do not change where it is captured.
+    runtime._preferences.client_log_retention = 2
+    assert runtime._payload_log_sink.flush()
+    assert runtime._payload_capture_target == (log_dir / CAPTURE_FILE_NAME, 5)
+    runtime._payload_log_sink.stop()
+    assert runtime._payload_capture is None
+
+    reader = PayloadCaptureReader(log_dir / CAPTURE_FILE_NAME)
+    assert len(reader) == 2
+    (record,) = reader.records(plugin="edr")
+    assert record.payload_id == "edr-1"
+    assert record.payload()["text"] == "hi"
+
+
+
+def test_log_payload_filters_on_publishing_thread(monkeypatch, tmp_path):
+    runtime = _runtime_for_debug_json(tmp_path)
+    runtime._preferences = SimpleNamespace(log_payloads=True)
+    test_logger = logging.getLogger("EDMCModernOverlay.payloads.test.filter")
+    test_logger.handlers.clear()
+    test_logger.setLevel(logging.DEBUG)
+    handler = _ListHandler()
+    test_logger.addHandler(handler)
+    runtime._payload_log_handler = handler
+    runtime._payload_logger = test_logger
+    monkeypatch.setattr(load._PluginRuntime, "_configure_payload_logger", lambda self: None)
+    monkeypatch.setattr(load._PluginRuntime, "_load_payload_debug_config", lambda self, force=False: None)
+    monkeypatch.setattr(load, "_diagnostic_logging_enabled", lambda: True)
+    runtime._payload_logging_enabled = True
+    runtime._payload_filter_excludes = {"edr"}
+
+    runtime._log_payload({"event": "LegacyOverlay", "id": "edr-1", "plugin": "EDR"})
+    assert runtime._payload_log_sink.running is False
+
+    runtime._log_payload({"event": "LegacyOverlay", "id": "bgs-1", "plugin": "BGS"})
+    # An exclusion added after a payload was queued does not apply to it.
+    runtime._payload_filter_excludes = {"edr", "bgs"}
+    assert runtime._payload_log_sink.flush()
+    runtime._payload_log_sink.stop()
+    messages = [record.getMessage() for record in handler.records]
+    assert len(messages) == 1 and "plugin=BGS" in messages[0]
+    test_logger.removeHandler(handler)
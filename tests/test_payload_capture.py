@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+
+from overlay_plugin.payload_capture import (
+    CAPTURE_FILE_NAME,
+    PayloadCaptureReader,
+    PayloadCaptureWriter,
+    capture_files,
+    index_path_for,
+)
+
+
+def _write(path, rows, **kwargs):
+    writer = PayloadCaptureWriter(path, **kwargs)
+    try:
+        for stamp, plugin, payload_id in rows:
+            writer.append(plugin, payload_id, json.dumps({"id": payload_id, "t": stamp}).encode(), timestamp=stamp)
+    finally:
+        writer.close()
+
+
+def test_reader_filters_by_time_plugin_and_id(tmp_path):
+    path = tmp_path / CAPTURE_FILE_NAME
+    _write(path, [(10.0, "EDR", "a"), (20.0, "BGS", "b"), (30.0, "EDR", "c"), (40.0, "EDR", "a")])
+    reader = PayloadCaptureReader(path)
+
+    assert len(reader) == 4
+    assert [r.payload_id for r in reader.records(start=15, end=30)] == ["b", "c"]
+    assert [r.payload_id for r in reader.records(plugin="edr")] == ["a", "c", "a"]
+    assert [r.timestamp for r in reader.records(payload_id="a")] == [10.0, 40.0]
+    assert [r.payload_id for r in reader.records(last=2)] == ["c", "a"]
+    distinct = [(r.plugin, r.payload_id) for r in reader.records(distinct=True)]
+    assert distinct == [("EDR", "a"), ("BGS", "b"), ("EDR", "c")]
+    assert next(reader.records(plugin="BGS")).payload() == {"id": "b", "t": 20.0}
+
+
+def test_timestamps_never_go_backwards(tmp_path):
+    path = tmp_path / CAPTURE_FILE_NAME
+    _write(path, [(50.0, "EDR", "a"), (40.0, "EDR", "b")])
+    assert [r.timestamp for r in PayloadCaptureReader(path).records()] == [50.0, 50.0]
+
+
+def test_missing_index_and_torn_tail_are_recovered(tmp_path):
+    path = tmp_path / CAPTURE_FILE_NAME
+    _write(path, [(1.0, "EDR", "a"), (2.0, "EDR", "b")])
+    index_path_for(path).unlink()
+    with path.open("ab") as handle:
+        handle.write(b"\x40\x00\x00")  # partial record header from an interrupted write
+
+    assert [r.payload_id for r in PayloadCaptureReader(path).records()] == ["a", "b"]
+
+    _write(path, [(3.0, "EDR", "c")])
+    reader = PayloadCaptureReader(path)
+    assert [r.payload_id for r in reader.records()] == ["a", "b", "c"]
+    assert index_path_for(path).exists()
+
+
+def test_rollover_keeps_index_with_each_generation(tmp_path):
+    path = tmp_path / CAPTURE_FILE_NAME
+    _write(path, [(float(i), "EDR", f"id-{i}") for i in range(12)], max_bytes=200, backup_count=2)
+
+    files = capture_files(tmp_path)
+    assert [p.name for p in files] == [f"{CAPTURE_FILE_NAME}.2", f"{CAPTURE_FILE_NAME}.1", CAPTURE_FILE_NAME]
+    stamps = [r.timestamp for p in files for r in PayloadCaptureReader(p).records()]
+    assert stamps == sorted(stamps)
+    assert stamps[-1] == 11.0
+    assert all(index_path_for(p).exists() for p in files)
+
+
+def test_distinct_reads_real_keys_when_index_hashes_collide(tmp_path, monkeypatch):
+    monkeypatch.setattr("overlay_plugin.payload_capture._key_hash", lambda value: 7)
+    path = tmp_path / CAPTURE_FILE_NAME
+    _write(path, [(10.0, "EDR", "a"), (20.0, "BGS", "b"), (30.0, "edr", "a"), (40.0, "EDR", "c")])
+    reader = PayloadCaptureReader(path)
+
+    distinct = [(r.plugin, r.payload_id) for r in reader.records(distinct=True)]
+    assert distinct == [("EDR", "a"), ("BGS", "b"), ("EDR", "c")]
+    assert [r.payload_id for r in reader.records(plugin="edr", distinct=True)] == ["a", "c"]
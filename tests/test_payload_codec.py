@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+import load
+from overlay_plugin import overlay_api
+from overlay_plugin.overlay_socket_server import SocketBroadcaster
+from overlay_plugin.payload_codec import (
+    FRAME_LENGTH,
+    EncodedPayload,
+    as_encoded_payload,
+    decode_frame_body,
+    diff_vector_points,
+    encode_frame,
+    vector_points,
+)
+
+
+def test_encoded_payload_behaves_like_mapping():
+    encoded = EncodedPayload({"event": "TestEvent", "id": "abc"})
+    assert encoded["id"] == "abc"
+    assert dict(encoded) == {"event": "TestEvent", "id": "abc"}
+    assert json.loads(encoded.data) == {"event": "TestEvent", "id": "abc"}
+    assert encoded.size == len(encoded.data)
+
+
+def test_encoded_payload_caches_bytes(monkeypatch):
+    encoded = EncodedPayload({"event": "TestEvent", "text": "héllo"})
+    first = encoded.data
+    monkeypatch.setattr("overlay_plugin.payload_codec.encode_payload", lambda _payload: pytest.fail("re-encoded"))
+    assert encoded.data is first
+    assert encoded.text == first.decode("utf-8")
+
+
+def test_merged_splices_defaults():
+    original = EncodedPayload({"event": "LegacyOverlay", "id": "edr-1", "cmdr": "Jameson"})
+    merged = original.merged({"cmdr": "ignored", "system": "Sol", "docked": False})
+    decoded = json.loads(merged.data)
+    assert decoded == {"event": "LegacyOverlay", "id": "edr-1", "cmdr": "Jameson", "system": "Sol", "docked": False}
+    assert dict(merged) == decoded
+
+
+def test_merged_returns_self_when_nothing_added():
+    original = EncodedPayload({"event": "TestEvent", "cmdr": ""})
+    assert original.merged({"event": "other", "cmdr": "x"}) is original
+
+
+def test_raw_forms_are_logged_but_not_encoded():
+    original = EncodedPayload({"event": "LegacyOverlay", "id": "edr-1", "legacy_raw": {"msg": "hi"}})
+    slim = original.without("legacy_raw").merged({"via": "api"}).with_raw({"raw": original})
+    assert json.loads(slim.data) == {"event": "LegacyOverlay", "id": "edr-1", "via": "api"}
+    assert json.loads(slim.log_text()) == {
+        "event": "LegacyOverlay",
+        "id": "edr-1",
+        "via": "api",
+        "raw": {"event": "LegacyOverlay", "id": "edr-1", "legacy_raw": {"msg": "hi"}},
+    }
+    assert as_encoded_payload(slim).raw["raw"] is original
+
+
+def test_log_text_matches_sorted_plain_log_for_every_path():
+    plain = {"id": "edr-1", "event": "LegacyOverlay", "via": "api", "nested": {"b": 1, "a": 2}}
+    expected = json.dumps(plain, ensure_ascii=False, sort_keys=True)
+    assert EncodedPayload(plain).log_text() == expected
+    base = EncodedPayload({"id": "edr-1", "event": "LegacyOverlay", "nested": {"b": 1, "a": 2}})
+    spliced = base.merged({"via": "api"})
+    assert spliced.log_text() == expected
+    assert as_encoded_payload(spliced.with_raw({})).log_text() == expected
+
+    raw = EncodedPayload({"z": 1, "legacy_raw": {"y": 2, "x": 1}})
+    with_raw = EncodedPayload(plain).with_raw({"raw": raw})
+    assert with_raw.log_text() == json.dumps({**plain, "raw": dict(raw)}, ensure_ascii=False, sort_keys=True)
+
+
+def test_as_encoded_payload_wraps_plain_mappings_once():
+    encoded = EncodedPayload({"event": "TestEvent"})
+    assert as_encoded_payload(encoded) is encoded
+    wrapped = as_encoded_payload({"event": "TestEvent"})
+    assert isinstance(wrapped, EncodedPayload)
+    assert json.loads(wrapped.data) == {"event": "TestEvent"}
+
+
+def test_merged_raises_for_unserialisable_payload():
+    original = EncodedPayload({"event": "TestEvent", "bad": object()})
+    with pytest.raises(TypeError):
+        original.merged({"cmdr": ""})
+
+
+def _external_runtime(published):
+    runtime = object.__new__(load._PluginRuntime)
+    runtime._running = True
+    runtime._trace_enabled = False
+    runtime._state = {"cmdr": "Jameson", "system": "Sol", "station": "", "docked": False}
+    runtime._publish_payload = published.append
+    return runtime
+
+
+def test_publish_external_broadcasts_slim_payload():
+    published = []
+    runtime = _external_runtime(published)
+    payload = {"event": "LegacyOverlay", "type": "message", "id": "edr-1", "text": "hi", "legacy_raw": {"id": "edr-1"}}
+    assert runtime._publish_external(payload) is True
+    message = published[0]
+    wire = json.loads(message.data)
+    assert "raw" not in wire and "legacy_raw" not in wire
+    assert wire["via"] == load.PAYLOAD_VIA_API
+    assert wire["cmdr"] == "Jameson"
+    assert message.raw["legacy_raw"] == {"id": "edr-1"}
+    assert json.loads(message.log_text())["raw"] == payload
+
+
+def test_legacy_tcp_payload_keeps_legacy_raw_for_logging_only():
+    published = []
+    runtime = _external_runtime(published)
+    raw = {"id": "legacy-1", "text": "hello", "color": "red", "x": 1, "y": 2, "ttl": 3}
+    assert runtime._handle_legacy_tcp_payload(raw) is True
+    message = published[0]
+    wire = json.loads(message.data)
+    assert "legacy_raw" not in wire
+    assert wire["via"] == load.PAYLOAD_VIA_LEGACY_TCP
+    assert message.raw["legacy_raw"] == raw
+
+
+def test_send_overlay_message_hands_encoded_payload_to_publisher():
+    received = []
+    overlay_api.register_publisher(lambda payload: received.append(payload) or True)
+    try:
+        assert overlay_api.send_overlay_message({"event": "TestEvent", "id": "x", "timestamp": "t"}) is True
+    finally:
+        overlay_api.unregister_publisher()
+    assert len(received) == 1
+    payload = received[0]
+    assert type(payload).__name__ == "EncodedPayload"
+    assert json.loads(payload.data) == {"event": "TestEvent", "id": "x", "timestamp": "t"}
+
+
+def test_send_overlay_messages_hands_batch_to_batch_publisher():
+    batches = []
+    overlay_api.register_publisher(
+        lambda payload: pytest.fail("single publisher should not be called"),
+        lambda payloads: batches.append(payloads) or True,
+    )
+    try:
+        messages = [{"event": "LegacyOverlay", "id": f"edr-{idx}", "timestamp": "t"} for idx in range(3)]
+        assert overlay_api.send_overlay_messages(messages) is True
+    finally:
+        overlay_api.unregister_publisher()
+    assert len(batches) == 1
+    assert [json.loads(payload.data)["id"] for payload in batches[0]] == ["edr-0", "edr-1", "edr-2"]
+
+
+def test_send_overlay_messages_rejects_whole_batch_on_invalid_member():
+    overlay_api.register_publisher(
+        lambda payload: pytest.fail("publisher should not be called"),
+        lambda payloads: pytest.fail("publisher should not be called"),
+    )
+    try:
+        assert overlay_api.send_overlay_messages([{"event": "LegacyOverlay", "id": "a"}, {"id": "no-event"}]) is False
+        assert overlay_api.send_overlay_messages({"event": "LegacyOverlay"}) is False
+        too_many = [{"event": "LegacyOverlay", "id": str(idx)} for idx in range(overlay_api._MAX_BATCH_MESSAGES + 1)]
+        assert overlay_api.send_overlay_messages(too_many) is False
+    finally:
+        overlay_api.unregister_publisher()
+
+
+def test_send_overlay_messages_falls_back_to_single_publishes():
+    received = []
+    overlay_api.register_publisher(lambda payload: received.append(payload) or True)
+    try:
+        assert overlay_api.send_overlay_messages([{"event": "A"}, {"event": "B"}]) is True
+    finally:
+        overlay_api.unregister_publisher()
+    assert [payload["event"] for payload in received] == ["A", "B"]
+
+
+def test_send_overlay_message_rejects_oversized_payload():
+    overlay_api.register_publisher(lambda payload: pytest.fail("publisher should not be called"))
+    try:
+        message = {"event": "TestEvent", "text": "x" * (overlay_api._MAX_MESSAGE_BYTES + 1)}
+        assert overlay_api.send_overlay_message(message) is False
+    finally:
+        overlay_api.unregister_publisher()
+
+
+def test_broadcaster_publish_reuses_cached_encoding():
+    broadcaster = SocketBroadcaster()
+    encoded = EncodedPayload({"event": "TestEvent"}, data=b'{"event": "Cached"}')
+    broadcaster.publish(encoded)
+    broadcaster.publish({"event": "Plain"})
+    assert broadcaster._queue.popleft().data == b'{"event": "Cached"}'
+    assert json.loads(broadcaster._queue.popleft().data) == {"event": "Plain"}
+
+
+def _vector_payload(points):
+    return {"event": "LegacyOverlay", "type": "shape", "shape": "vect", "id": "edr-route", "color": "#d8793e", "vector": points}
+
+
+def _frame_body(payload):
+    frame = encode_frame(payload, json.dumps(payload).encode("utf-8"))
+    (length,) = FRAME_LENGTH.unpack(frame[: FRAME_LENGTH.size])
+    body = frame[FRAME_LENGTH.size :]
+    assert length == len(body)
+    return body
+
+
+def test_vector_frame_round_trips_points_and_styles():
+    points = [
+        {"x": 5, "y": 6, "color": "#00B3F7", "marker": "circle", "text": "Col 285 Sector"},
+        {"x": 116, "y": 6, "color": "#E9332A", "marker": "circle"},
+        {"x": -40, "y": 2_000_000, "color": "#E9332A", "marker": "circle"},
+    ]
+    payload = _vector_payload(points)
+    body = _frame_body(payload)
+    assert body[:1] == b"V"
+    assert decode_frame_body(body) == payload
+
+
+def test_vector_frame_falls_back_to_json_for_non_int_points():
+    payload = _vector_payload([{"x": 1.5, "y": 2}, {"x": 3, "y": 4}])
+    body = _frame_body(payload)
+    assert body[:1] == b"J"
+    assert decode_frame_body(body) == payload
+
+
+def test_plain_frame_for_non_vector_payload():
+    body = _frame_body({"event": "OverlayConfig", "opacity": 1.0})
+    assert body[:1] == b"J"
+    assert decode_frame_body(body) == {"event": "OverlayConfig", "opacity": 1.0}
+
+
+def test_decode_rejects_malformed_frames():
+    body = _frame_body(_vector_payload([{"x": 1, "y": 2}, {"x": 3, "y": 4}]))
+    with pytest.raises(ValueError):
+        decode_frame_body(body[:-3])
+    with pytest.raises(ValueError):
+        decode_frame_body(b"Z{}")
+
+
+def test_vector_points_only_accepts_integer_vect_payloads():
+    points = [{"x": 1, "y": 2}, {"x": 3, "y": 4}]
+    copied = vector_points(_vector_payload(points))
+    assert copied == points and copied[0] is not points[0]
+    assert vector_points(_vector_payload([{"x": 1.5, "y": 2}, {"x": 3, "y": 4}])) is None
+    assert vector_points(_vector_payload(points[:1])) is None
+    assert vector_points({"event": "LegacyOverlay", "type": "shape", "shape": "rect", "id": "r"}) is None
+
+
+def test_diff_vector_points_reports_changes_growth_and_truncation():
+    previous = [{"x": idx, "y": 0} for idx in range(6)]
+    grown = [dict(point) for point in previous] + [{"x": 6, "y": 0}]
+    grown[1] = {"x": 1, "y": 5}
+    assert diff_vector_points(previous, grown) == {"base": 6, "count": 7, "set": [[1, {"x": 1, "y": 5}], [6, {"x": 6, "y": 0}]]}
+    assert diff_vector_points(previous, previous[:4]) == {"base": 6, "count": 4, "set": []}
+    assert diff_vector_points(previous, [{"x": 0, "y": 1}] * 6) is None
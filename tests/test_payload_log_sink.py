@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import logging
+import threading
+
+from overlay_plugin.lifecycle import LifecycleTracker
+from overlay_plugin.payload_log_sink import PayloadLogSink
+
+LOGGER = logging.getLogger("test.payload_log_sink")
+
+
+def _sink(write, **kwargs):
+    lifecycle = LifecycleTracker(LOGGER)
+    return PayloadLogSink(write, lifecycle, LOGGER, **kwargs), lifecycle
+
+
+def test_sink_starts_lazily_and_writes_on_worker_thread():
+    written = []
+    sink, lifecycle = _sink(lambda payload: written.append((payload, threading.current_thread().name)))
+    assert sink.running is False
+    assert sink.submit({"id": "a"}) is True
+    assert sink.running is True
+    assert sink.flush()
+    assert written == [({"id": "a"}, "ModernOverlayPayloadLog")]
+    sink.stop()
+    assert sink.running is False
+    assert not lifecycle._threads
+
+
+def test_stop_drains_pending_payloads_and_survives_write_errors():
+    release = threading.Event()
+    written = []
+
+    def write(payload):
+        release.wait(2.0)
+        if payload == "boom":
+            raise ValueError("bad payload")
+        written.append(payload)
+
+    sink, _lifecycle = _sink(write)
+    for payload in ("a", "boom", "b"):
+        sink.submit(payload)
+    release.set()
+    sink.stop()
+    assert written == ["a", "b"]
+
+
+def test_full_queue_drops_instead_of_blocking(caplog):
+    release = threading.Event()
+    started = threading.Event()
+
+    def write(payload):
+        started.set()
+        release.wait(2.0)
+
+    sink, _lifecycle = _sink(write, max_pending=1)
+    try:
+        sink.submit("first")
+        assert started.wait(2.0)
+        assert sink.submit("queued") is True
+        with caplog.at_level(logging.WARNING, logger=LOGGER.name):
+            assert sink.submit("dropped") is False
+        assert any("dropped 1 payload" in record.getMessage() for record in caplog.records)
+    finally:
+        release.set()
+        sink.stop()
+
+
+def test_submit_after_stop_is_dropped_until_reopened():
+    written = []
+    sink, lifecycle = _sink(written.append)
+    sink.submit("before")
+    sink.stop()
+    assert sink.closed is True
+
+    assert sink.submit("late") is False
+    assert sink.running is False
+    assert not lifecycle._threads
+    assert written == ["before"]
+
+    sink.reopen()
+    assert sink.submit("after") is True
+    sink.stop()
+    assert written == ["before", "after"]
+
+
+def test_stop_with_full_queue_still_ends_the_worker(caplog):
+    release = threading.Event()
+    started = threading.Event()
+    written = []
+
+    def write(payload):
+        started.set()
+        release.wait(2.0)
+        written.append(payload)
+
+    sink, _lifecycle = _sink(write, max_pending=1)
+    sink.submit("first")
+    assert started.wait(2.0)
+    assert sink.submit("queued") is True
+    with caplog.at_level(logging.WARNING, logger=LOGGER.name):
+        sink.stop(timeout=0.1)
+    assert any("dropped 1 pending payload" in record.getMessage() for record in caplog.records)
+    # Still inside write(): the worker is kept so reopening cannot start a second one.
+    worker = sink._worker
+    assert worker is not None and worker.is_alive()
+    sink.reopen()
+    release.set()
+    assert sink.flush()
+    assert sink.submit("after") is True
+    assert sink._worker is worker
+    sink.stop()
+    assert not worker.is_alive()
+    assert written == ["first", "after"]
+    assert [thread.name for thread in threading.enumerate()].count("ModernOverlayPayloadLog") == 0
+
+
+def test_stop_hook_runs_on_worker_after_last_write_even_when_join_times_out():
+    release = threading.Event()
+    started = threading.Event()
+    events = []
+    stopped = threading.Event()
+
+    def write(payload):
+        started.set()
+        release.wait(2.0)
+        events.append(("write", payload))
+
+    def on_stop():
+        events.append(("stop", threading.current_thread().name))
+        stopped.set()
+
+    sink, _lifecycle = _sink(write, on_stop=on_stop)
+    sink.submit("slow")
+    assert started.wait(2.0)
+    sink.stop(timeout=0.05)
+    assert events == []
+    release.set()
+    assert stopped.wait(2.0)
+    assert events == [("write", "slow"), ("stop", "ModernOverlayPayloadLog")]
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import socket
+import time
+
+import pytest
+
+from overlay_plugin.payload_codec import FRAME_LENGTH, VECTOR_DELTA_KEY, VECTOR_GEN_KEY, decode_frame_body
+from overlay_plugin.overlay_socket_server import (
+    COALESCE_BARRIER,
+    SocketBroadcaster,
+    _ClientChannel,
+    _Outbound,
+    coalesce_key,
+    coalesce_pending,
+)
+
+
+class _RecordingWriter:
+    def __init__(self) -> None:
+        self.batches: list[list[bytes]] = []
+        self.drains = 0
+        self.closed = False
+
+    def writelines(self, lines) -> None:
+        self.batches.append(list(lines))
+
+    async def drain(self) -> None:
+        self.drains += 1
+
+    def is_closing(self) -> bool:
+        return self.closed
+
+    def close(self) -> None:
+        self.closed = True
+
+    async def wait_closed(self) -> None:
+        return None
+
+
+class _StalledWriter(_RecordingWriter):
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def drain(self) -> None:
+        await self.release.wait()
+
+
+def _line(payload_id, seq):
+    payload = {"id": payload_id, "seq": seq}
+    return _Outbound(payload_id, json.dumps(payload).encode("utf-8"), payload)
+
+
+def _seqs(chunks) -> list[int]:
+    return [json.loads(line)["seq"] for line in b"".join(chunks).splitlines()]
+
+
+def _read_lines(sock: socket.socket, count: int, timeout: float = 5.0) -> list[dict]:
+    sock.settimeout(timeout)
+    buffer = b""
+    lines: list[dict] = []
+    while len(lines) < count:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            lines.append(json.loads(line))
+    return lines
+
+
+def _channel(policy: str, limit: int = 3) -> _ClientChannel:
+    async def _build():
+        return _ClientChannel(_RecordingWriter(), "peer", limit=limit, policy=policy)
+
+    return asyncio.run(_build())
+
+
+def test_drain_queue_collects_all_pending_messages():
+    broadcaster = SocketBroadcaster()
+    for idx in range(5):
+        broadcaster.publish({"event": "LegacyOverlay", "type": "message", "id": f"item-{idx}"})
+    broadcaster._wake_pending = True
+    batch = broadcaster._drain_queue()
+    assert [entry.key for entry in batch] == [f"item-{idx}" for idx in range(5)]
+    assert broadcaster._wake_pending is False
+    assert not broadcaster._queue
+
+
+def test_pending_queue_is_bounded_and_counts_drops():
+    broadcaster = SocketBroadcaster(max_pending=2)
+    for idx in range(5):
+        broadcaster.publish({"event": "LegacyOverlay", "type": "message", "id": f"item-{idx}"})
+    assert [entry.key for entry in broadcaster._queue] == ["item-3", "item-4"]
+    assert broadcaster.pending_dropped == 3
+    assert broadcaster.publish_stats() == {"published": 5, "coalesced": 0, "dropped": 3}
+
+
+def test_coalesce_key_only_targets_legacy_item_updates():
+    assert coalesce_key({"event": "LegacyOverlay", "type": "shape", "id": "edr-route"}) == "edr-route"
+    assert coalesce_key({"event": "LegacyOverlay", "type": "clear", "id": "edr-route"}) == "edr-route"
+    assert coalesce_key({"event": "LegacyOverlay", "type": "clear_all"}) == COALESCE_BARRIER
+    assert coalesce_key({"event": "LegacyOverlay", "type": "raw", "id": "edr-route"}) is None
+    assert coalesce_key({"event": "OverlayConfig", "id": "edr-route"}) is None
+
+
+def test_coalesce_pending_keeps_latest_per_id_in_first_slot():
+    config = _Outbound(None, b"config")
+    batch = [_line("a", 0), _line("b", 1), _line("a", 2), config, _line("b", 3)]
+    collapsed, removed = coalesce_pending(batch)
+    assert removed == 2
+    assert collapsed == [batch[2], batch[4], config]
+
+
+def test_coalesce_pending_never_crosses_clear_all():
+    clear_all = _Outbound(COALESCE_BARRIER, b"clear_all")
+    batch = [_line("a", 0), clear_all, _line("a", 1), _line("a", 2), clear_all]
+    collapsed, removed = coalesce_pending(batch)
+    assert removed == 1
+    assert collapsed == [batch[0], clear_all, batch[3], clear_all]
+
+
+def test_unknown_overflow_policy_rejected():
+    with pytest.raises(ValueError):
+        SocketBroadcaster(overflow_policy="block")
+
+
+def test_channel_drop_oldest_policy():
+    channel = _channel("drop_oldest")
+    assert channel.enqueue([_line(f"id-{idx}", idx) for idx in range(5)]) is True
+    assert _seqs(channel.take_batch()) == [2, 3, 4]
+    assert channel.dropped == 2
+
+
+def test_channel_coalesce_policy_replaces_same_id():
+    channel = _channel("coalesce")
+    assert channel.enqueue([_line("a", 0), _line("b", 1), _line("c", 2), _line("a", 3), _line("d", 4)]) is True
+    assert _seqs(channel.take_batch()) == [2, 3, 4]
+    assert channel.coalesced == 1
+    assert channel.dropped == 1
+
+
+def test_channel_disconnect_policy_flags_overflow():
+    channel = _channel("disconnect", limit=2)
+    assert channel.enqueue([_line("a", 0), _line("b", 1), _line("c", 2)]) is False
+    assert channel.overflowed is True
+
+
+def test_stalled_client_does_not_delay_others():
+    async def _scenario():
+        broadcaster = SocketBroadcaster(client_queue_limit=4)
+        stalled = _StalledWriter()
+        healthy = _RecordingWriter()
+        for writer in (stalled, healthy):
+            channel = _ClientChannel(writer, repr(writer), limit=4, policy="drop_oldest")
+            channel.task = asyncio.ensure_future(broadcaster._client_writer(channel))
+            broadcaster._clients[writer] = channel
+        for seq in range(10):
+            broadcaster._broadcast([_line(f"id-{seq}", seq)])
+            await asyncio.sleep(0)
+        delivered = [seq for batch in healthy.batches for seq in _seqs(batch)]
+        stats = {entry["peer"]: entry for entry in broadcaster.client_stats()}
+        for channel in list(broadcaster._clients.values()):
+            channel.task.cancel()
+        return delivered, stats[repr(stalled)]
+
+    delivered, stalled_stats = asyncio.run(_scenario())
+    assert delivered == list(range(10))
+    assert stalled_stats["queued"] == 4
+    assert stalled_stats["dropped"] == 5
+
+
+def test_published_burst_reaches_client_in_order():
+    broadcaster = SocketBroadcaster()
+    assert broadcaster.start() is True
+    try:
+        with socket.create_connection((broadcaster.host, broadcaster.port), timeout=5.0) as sock:
+            # Wait until the server has registered the connection before publishing.
+            for _ in range(100):
+                if broadcaster._clients:
+                    break
+                time.sleep(0.01)
+            for idx in range(250):
+                broadcaster.publish({"event": "TestEvent", "id": idx})
+            received = _read_lines(sock, 250)
+    finally:
+        broadcaster.stop()
+    assert [entry["id"] for entry in received] == list(range(250))
+
+
+def test_coalesce_window_collapses_burst_for_same_id():
+    broadcaster = SocketBroadcaster(coalesce_window=0.05)
+    assert broadcaster.start() is True
+    try:
+        with socket.create_connection((broadcaster.host, broadcaster.port), timeout=5.0) as sock:
+            for _ in range(100):
+                if broadcaster._clients:
+                    break
+                time.sleep(0.01)
+            for idx in range(50):
+                broadcaster.publish({"event": "LegacyOverlay", "type": "message", "id": "tick", "text": str(idx)})
+            broadcaster.publish({"event": "LegacyOverlay", "type": "clear_all"})
+            received = _read_lines(sock, 2)
+    finally:
+        broadcaster.stop()
+    assert [entry.get("text") for entry in received] == ["49", None]
+    assert broadcaster.publish_stats()["coalesced"] == 49
+
+
+def _connect(broadcaster: SocketBroadcaster) -> socket.socket:
+    sock = socket.create_connection((broadcaster.host, broadcaster.port), timeout=5.0)
+    for _ in range(100):
+        if broadcaster._clients:
+            break
+        time.sleep(0.01)
+    return sock
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("closed")
+        data += chunk
+    return data
+
+
+def test_channel_framing_is_fixed_at_enqueue_time():
+    channel = _channel("drop_oldest", limit=10)
+    channel.enqueue([_line("a", 0)])
+    channel.framing = "lp1"
+    channel.enqueue([_line("b", 1)])
+    chunks = channel.take_batch()
+    assert chunks[:2] == [b'{"id": "a", "seq": 0}', b"\n"]
+    (length,) = FRAME_LENGTH.unpack(chunks[2][: FRAME_LENGTH.size])
+    assert decode_frame_body(chunks[2][FRAME_LENGTH.size :]) == {"id": "b", "seq": 1}
+    assert length == len(chunks[2]) - FRAME_LENGTH.size
+
+
+def test_client_can_negotiate_length_prefixed_frames():
+    broadcaster = SocketBroadcaster()
+    assert broadcaster.start() is True
+    vector = [{"x": idx, "y": idx * 2, "color": "#ffffff"} for idx in range(200)]
+    try:
+        with _connect(broadcaster) as sock:
+            sock.sendall(b'{"cli": "framing", "framing": "lp1"}\n')
+            sock.settimeout(5.0)
+            ack = b""
+            while not ack.endswith(b"\n"):
+                ack += sock.recv(1)
+            assert json.loads(ack) == {"event": "OverlayFraming", "framing": "lp1"}
+            broadcaster.publish({"event": "LegacyOverlay", "type": "shape", "shape": "vect", "id": "v", "vector": vector})
+            broadcaster.publish({"event": "OverlayConfig", "opacity": 0.5})
+            decoded = []
+            for _ in range(2):
+                (length,) = FRAME_LENGTH.unpack(_recv_exact(sock, FRAME_LENGTH.size))
+                decoded.append(decode_frame_body(_recv_exact(sock, length)))
+    finally:
+        broadcaster.stop()
+    assert decoded[0]["vector"] == vector
+    assert decoded[1] == {"event": "OverlayConfig", "opacity": 0.5}
+
+
+def test_unknown_framing_request_falls_back_to_ndjson():
+    broadcaster = SocketBroadcaster()
+    assert broadcaster.start() is True
+    try:
+        with _connect(broadcaster) as sock:
+            sock.sendall(b'{"cli": "framing", "framing": "carrier-pigeon"}\n')
+            received = _read_lines(sock, 1)
+            broadcaster.publish({"event": "TestEvent"})
+            received += _read_lines(sock, 1)
+    finally:
+        broadcaster.stop()
+    assert received == [{"event": "OverlayFraming", "framing": "ndjson"}, {"event": "TestEvent"}]
+
+
+def _vect(payload_id, points, **extra):
+    payload = {"event": "LegacyOverlay", "type": "shape", "shape": "vect", "id": payload_id, "ttl": 10, "vector": points}
+    payload.update(extra)
+    return _Outbound(payload_id, json.dumps(payload).encode("utf-8"), payload)
+
+
+def _sent(channel: _ClientChannel) -> list[dict]:
+    return [json.loads(line) for line in b"".join(channel.take_batch()).splitlines()]
+
+
+def test_vector_delta_sends_only_changed_points_after_first_send():
+    channel = _channel("drop_oldest", limit=10)
+    channel.features = frozenset({"vector_delta"})
+    route = [{"x": idx, "y": idx, "color": "#fff"} for idx in range(10)]
+    moved = [dict(point) for point in route]
+    moved[3]["y"] = 99
+    channel.enqueue([_vect("route", route), _vect("route", moved, color="#f00")])
+    first, second = _sent(channel)
+    assert first["vector"] == route
+    generation = first[VECTOR_GEN_KEY]
+    assert "vector" not in second
+    assert second["color"] == "#f00"
+    assert second[VECTOR_DELTA_KEY] == {"base": 10, "count": 10, "set": [[3, moved[3]]], "gen": generation, "seq": 1}
+    assert channel.stats()["deltas"] == 1
+
+
+def test_vector_delta_rebased_after_clear_and_for_other_clients():
+    route = [{"x": idx, "y": idx} for idx in range(4)]
+    clear_all = _Outbound(COALESCE_BARRIER, b'{"event": "LegacyOverlay", "type": "clear_all"}', {"event": "LegacyOverlay"})
+    delta_client = _channel("drop_oldest", limit=10)
+    delta_client.features = frozenset({"vector_delta"})
+    plain_client = _channel("drop_oldest", limit=10)
+    batch = [_vect("route", route), clear_all, _vect("route", route), _vect("route", route)]
+    delta_client.enqueue(batch)
+    plain_client.enqueue(batch)
+    sent = _sent(delta_client)
+    assert "vector" in sent[2] and VECTOR_DELTA_KEY in sent[3]
+    assert sent[3][VECTOR_DELTA_KEY]["set"] == []
+    assert sent[2][VECTOR_GEN_KEY] > sent[0][VECTOR_GEN_KEY]
+    assert sent[3][VECTOR_DELTA_KEY]["gen"] == sent[2][VECTOR_GEN_KEY]
+    plain = _sent(plain_client)
+    assert all(VECTOR_DELTA_KEY not in payload and VECTOR_GEN_KEY not in payload for payload in plain)
+
+
+def test_vector_resync_resends_full_payload_once():
+    channel = _channel("drop_oldest", limit=10)
+    channel.features = frozenset({"vector_delta"})
+    route = [{"x": idx, "y": idx} for idx in range(4)]
+    moved = [dict(point) for point in route]
+    moved[1]["y"] = 50
+    channel.enqueue([_vect("route", route), _vect("route", moved)])
+    full, delta = _sent(channel)
+    generation = delta[VECTOR_DELTA_KEY]["gen"]
+
+    assert channel.resync_vector("route", generation, held=True) is True
+    # Further reports for the same chain (deltas that were already in flight) are ignored.
+    assert channel.resync_vector("route", generation, held=True) is False
+    (resent,) = _sent(channel)
+    assert resent["vector"] == moved
+    assert resent[VECTOR_GEN_KEY] > generation
+    assert 9 <= resent["ttl"] <= 10
+    assert channel.stats()["resyncs"] == 1
+
+    channel.enqueue([_vect("route", route)])
+    (next_delta,) = _sent(channel)
+    assert next_delta[VECTOR_DELTA_KEY]["gen"] == resent[VECTOR_GEN_KEY]
+    assert next_delta[VECTOR_DELTA_KEY]["seq"] == 1
+
+
+def test_vector_resync_for_dropped_item_waits_for_next_update():
+    channel = _channel("drop_oldest", limit=10)
+    channel.features = frozenset({"vector_delta"})
+    route = [{"x": idx, "y": idx} for idx in range(4)]
+    channel.enqueue([_vect("route", route)])
+    (full,) = _sent(channel)
+    assert channel.resync_vector("route", full[VECTOR_GEN_KEY], held=False) is True
+    assert channel.take_batch() == []
+    channel.enqueue([_vect("route", route)])
+    (next_full,) = _sent(channel)
+    assert next_full["vector"] == route
+
+
+def test_publish_batch_queues_single_envelope():
+    broadcaster = SocketBroadcaster()
+    broadcaster.publish_batch([{"event": "LegacyOverlay", "type": "message", "id": "a"}, {"event": "Other"}])
+    (entry,) = broadcaster._queue
+    assert json.loads(entry.data) == {
+        "event": "OverlayBatch",
+        "messages": [{"event": "LegacyOverlay", "type": "message", "id": "a"}, {"event": "Other"}],
+    }
+    assert broadcaster.publish_stats()["published"] == 2
+
+
+def test_coalesce_pending_does_not_move_updates_across_a_batch():
+    batch = _Outbound.batch([_line("a", 1)])
+    entries = [_line("a", 0), batch, _line("a", 2)]
+    collapsed, removed = coalesce_pending(entries)
+    assert removed == 0
+    assert collapsed == entries
+
+
+def test_vector_delta_applies_inside_batches():
+    channel = _channel("drop_oldest", limit=10)
+    channel.features = frozenset({"vector_delta"})
+    route = [{"x": idx, "y": idx} for idx in range(6)]
+    channel.enqueue([_Outbound.batch([_vect("route", route)]), _Outbound.batch([_vect("route", route)])])
+    first, second = _sent(channel)
+    assert first["messages"][0]["vector"] == route
+    generation = first["messages"][0][VECTOR_GEN_KEY]
+    assert second["messages"][0][VECTOR_DELTA_KEY] == {"base": 6, "count": 6, "set": [], "gen": generation, "seq": 1}
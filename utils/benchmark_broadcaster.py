@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Measure SocketBroadcaster throughput and publish-to-socket latency under a burst."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from overlay_plugin.overlay_socket_server import SocketBroadcaster  # noqa: E402
+
+DEFAULT_BURST = 1000
+DEFAULT_POINTS = 40
+
+
+def _build_payload(index: int, points: int) -> Dict[str, object]:
+    return {
+        "event": "LegacyOverlay",
+        "type": "shape",
+        "shape": "vect",
+        "id": f"bench-vect-{index % 25}",
+        "seq": index,
+        "color": "#ff7f00",
+        "ttl": 4,
+        "vector": [{"x": 100 + i * 5, "y": 200 + (i % 7) * 3, "color": "#ffffff"} for i in range(points)],
+    }
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class _Receiver(threading.Thread):
+    def __init__(self, host: str, port: int, expected: int) -> None:
+        super().__init__(name="bench-receiver", daemon=True)
+        self._sock = socket.create_connection((host, port), timeout=10.0)
+        self._expected = expected
+        self.arrivals: Dict[int, float] = {}
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        buffer = b""
+        try:
+            while len(self.arrivals) < self._expected:
+                chunk = self._sock.recv(1 << 16)
+                if not chunk:
+                    break
+                now = time.perf_counter()
+                buffer += chunk
+                while True:
+                    newline = buffer.find(b"\n")
+                    if newline < 0:
+                        break
+                    line = buffer[:newline]
+                    buffer = buffer[newline + 1 :]
+                    payload = json.loads(line)
+                    seq = payload.get("seq")
+                    if isinstance(seq, int):
+                        self.arrivals[seq] = now
+        except BaseException as exc:  # pragma: no cover - diagnostic path
+            self.error = exc
+        finally:
+            self._sock.close()
+
+
+def run_benchmark(burst: int, points: int) -> Dict[str, float]:
+    broadcaster = SocketBroadcaster()
+    if not broadcaster.start():
+        raise SystemExit("Broadcast server failed to start")
+    try:
+        receiver = _Receiver(broadcaster.host, broadcaster.port, burst)
+        receiver.start()
+        deadline = time.monotonic() + 5.0
+        while not broadcaster._clients and time.monotonic() < deadline:
+            time.sleep(0.005)
+        payloads = [_build_payload(index, points) for index in range(burst)]
+        published: List[float] = []
+        started = time.perf_counter()
+        for payload in payloads:
+            published.append(time.perf_counter())
+            broadcaster.publish(payload)
+        publish_done = time.perf_counter()
+        receiver.join(timeout=30.0)
+        finished = max(receiver.arrivals.values()) if receiver.arrivals else time.perf_counter()
+    finally:
+        broadcaster.stop()
+    if receiver.error is not None:
+        raise SystemExit(f"Receiver failed: {receiver.error}")
+    latencies = [(receiver.arrivals[seq] - published[seq]) * 1000.0 for seq in receiver.arrivals]
+    elapsed = max(finished - started, 1e-9)
+    return {
+        "burst": float(burst),
+        "received": float(len(receiver.arrivals)),
+        "publish_seconds": publish_done - started,
+        "total_seconds": elapsed,
+        "messages_per_second": len(receiver.arrivals) / elapsed,
+        "latency_p50_ms": _percentile(latencies, 0.50),
+        "latency_p99_ms": _percentile(latencies, 0.99),
+        "latency_max_ms": max(latencies) if latencies else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--burst", type=int, default=DEFAULT_BURST, help="Payloads per burst (default: %(default)s)")
+    parser.add_argument("--points", type=int, default=DEFAULT_POINTS, help="Vector points per payload (default: %(default)s)")
+    parser.add_argument("--runs", type=int, default=3, help="Number of bursts to measure (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args(argv)
+
+    results = [run_benchmark(max(1, args.burst), max(0, args.points)) for _ in range(max(1, args.runs))]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for index, result in enumerate(results, start=1):
+        print(
+            f"run {index}: {int(result['received'])}/{int(result['burst'])} msgs "
+            f"{result['messages_per_second']:.0f} msg/s "
+            f"p50={result['latency_p50_ms']:.2f}ms p99={result['latency_p99_ms']:.2f}ms "
+            f"max={result['latency_max_ms']:.2f}ms publish={result['publish_seconds'] * 1000.0:.1f}ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
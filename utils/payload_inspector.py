@@ -10,6 +10,7 @@ import os
 import queue
 import sys
 import threading
+import time
 import tkinter as tk
 from collections import deque
 from dataclasses import dataclass
@@ -25,8 +26,9 @@ if str(ROOT_DIR) not in sys.path:
 
 try:
     from overlay_client.plugin_overrides import PluginOverrideManager
+    from overlay_plugin.payload_capture import CAPTURE_FILE_NAME, CaptureRecord, PayloadCaptureReader
 except Exception as exc:  # pragma: no cover - required at runtime
-    raise SystemExit(f"Failed to import overlay_client.plugin_overrides: {exc}")
+    raise SystemExit(f"Failed to import overlay modules: {exc}")
 
 
 LOG = logging.getLogger("payload-inspector")
@@ -36,6 +38,8 @@ GROUPINGS_PATH = ROOT_DIR / "overlay_groupings.json"
 PAYLOAD_LOG_DIR_NAME = "EDMCModernOverlay"
 PAYLOAD_LOG_BASENAMES = ("overlay-payloads.log", "overlay_payloads.log")
 MAX_ROWS = 500
+# A capture written alongside the text log is at most this much older than it.
+CAPTURE_STALE_SECONDS = 2.0
 CONFIG_DIR = Path.home() / ".config" / "edmc_modern_overlay"
 CONFIG_FILE = CONFIG_DIR / "payload_inspector.json"
 
@@ -129,6 +133,18 @@ class LogLocator:
                     files[str(candidate)] = candidate
         return tuple(sorted(files.values()))
 
+    def capture_for(self, log_path: Path) -> Optional[Path]:
+        """Return the binary capture written alongside ``log_path``, if it is current."""
+        if self._override_file:
+            return None
+        capture = self._log_dir / CAPTURE_FILE_NAME
+        try:
+            if capture.stat().st_mtime >= log_path.stat().st_mtime - CAPTURE_STALE_SECONDS:
+                return capture
+        except OSError:
+            pass
+        return None
+
 
 class PayloadParser:
     """Extract payload metadata (timestamp, plugin, JSON body) from raw log lines."""
@@ -159,6 +175,20 @@ class PayloadParser:
         plugin = (match.group("plugin") or "").strip() or None
         return ParsedPayload(timestamp=timestamp, plugin=plugin, payload_id=payload_id, payload=payload)
 
+    def parse_capture(self, record: CaptureRecord) -> Optional[ParsedPayload]:
+        try:
+            payload = record.payload()
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            LOG.debug("Skipping unparsable captured payload at offset %d", record.offset)
+            return None
+        if not isinstance(payload, Mapping):
+            return None
+        payload_id = record.payload_id or self._extract_payload_id(payload)
+        if not payload_id:
+            return None
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.timestamp))
+        return ParsedPayload(timestamp=timestamp, plugin=record.plugin or None, payload_id=payload_id, payload=payload)
+
     @staticmethod
     def _extract_timestamp(line: str) -> str:
         prefix = line.split("[", 1)[0].strip()
@@ -225,7 +255,7 @@ class PayloadTailer(threading.Thread):
                 with log_path.open("r", encoding="utf-8") as stream:
                     self._queue.put(("status", f"Tailing {log_path.name}"))
                     self._queue.put(("log_path", str(log_path)))
-                    history_count = self._emit_history(stream)
+                    history_count = self._emit_history(stream, log_path)
                     if history_count:
                         self._queue.put(("history_complete", history_count))
                     stream.seek(0, os.SEEK_END)
@@ -262,9 +292,26 @@ class PayloadTailer(threading.Thread):
         except OSError:
             return -1
 
-    def _emit_history(self, stream) -> int:
+    def _emit_history(self, stream, log_path: Path) -> int:
         if not self._history_limit:
             return 0
+        capture = self._locator.capture_for(log_path)
+        if capture is not None:
+            # The capture index finds the last N payloads without reading the whole log.
+            count = 0
+            try:
+                for capture_record in PayloadCaptureReader(capture).records(last=self._history_limit):
+                    if self._stop_event.is_set():
+                        break
+                    record = self._parser.parse_capture(capture_record)
+                    if record is not None:
+                        self._emit_parsed(record, history=True)
+                        count += 1
+                return count
+            except OSError as exc:
+                if count:
+                    return count
+                LOG.debug("Falling back to the text log for history: %s", exc)
         stream.seek(0)
         buffer = deque(maxlen=self._history_limit)
         for line in stream:
@@ -283,6 +330,10 @@ class PayloadTailer(threading.Thread):
         record = self._parser.parse(line)
         if not record:
             return False
+        self._emit_parsed(record, history)
+        return True
+
+    def _emit_parsed(self, record: ParsedPayload, history: bool) -> None:
         plugin_group, prefix_group = self._resolver.resolve(record.plugin, record.payload_id)
         payload_json = json.dumps(record.payload, indent=2, ensure_ascii=False)
         entry: Dict[str, object] = {
@@ -294,7 +345,6 @@ class PayloadTailer(threading.Thread):
             "payload_json": payload_json,
         }
         self._queue.put(("payload_history" if history else "payload", entry))
-        return True
 
 
 class PayloadInspectorApp:
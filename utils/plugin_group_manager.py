@@ -43,6 +43,7 @@ from overlay_plugin.overlay_api import (
     define_plugin_group,
     register_grouping_store,
 )
+from overlay_plugin.payload_capture import CaptureRecord, PayloadCaptureReader, capture_files
 
 try:
     from overlay_client.plugin_overrides import PluginOverrideManager
@@ -341,6 +342,10 @@ class LogLocator:
                     files[str(path)] = path
         return sorted(files.values())
 
+    def capture_files(self) -> List[Path]:
+        """Binary payload captures (``overlay-payloads.capture``), oldest first."""
+        return capture_files(self._log_dir)
+
 
 class PayloadParser:
     """Extract payload metadata from log lines."""
@@ -367,6 +372,19 @@ class PayloadParser:
             return None
         return PayloadRecord(payload_id=payload_id, plugin=plugin, payload=payload)
 
+    @classmethod
+    def parse_capture(cls, record: CaptureRecord) -> Optional[PayloadRecord]:
+        try:
+            payload = record.payload()
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return None
+        if not isinstance(payload, Mapping):
+            return None
+        payload_id = record.payload_id or cls._extract_payload_id(payload)
+        if not payload_id:
+            return None
+        return PayloadRecord(payload_id=payload_id, plugin=record.plugin or None, payload=payload)
+
     @staticmethod
     def _extract_payload_id(payload: Mapping[str, object]) -> Optional[str]:
         primary = payload.get("id")
@@ -452,7 +470,7 @@ class PayloadWatcher(threading.Thread):
 
 
 class LogGatherer(threading.Thread):
-    """Offline gatherer that scrapes every overlay payload log."""
+    """Offline gatherer that scrapes every overlay payload log (or the binary captures when present)."""
 
     def __init__(
         self,
@@ -468,6 +486,10 @@ class LogGatherer(threading.Thread):
         self._queue = outbox
 
     def run(self) -> None:
+        captures = self._locator.capture_files()
+        if captures:
+            self._gather_captures(captures)
+            return
         files = self._locator.all_log_files()
         added = 0
         for path in files:
@@ -475,17 +497,32 @@ class LogGatherer(threading.Thread):
                 with path.open("r", encoding="utf-8") as stream:
                     for line in stream:
                         record = PayloadParser.parse_line(line)
-                        if not record:
-                            continue
-                        unmatched_group = self._matcher.unmatched_group_for(record.plugin, record.payload_id)
-                        if not self._matcher.is_payload_grouped(record.plugin, record.payload_id):
-                            enriched = record if unmatched_group is None else record.with_group(unmatched_group)
-                            if self._store.add(enriched):
-                                added += 1
+                        if record and self._add_if_unmatched(record):
+                            added += 1
             except OSError as exc:
                 self._queue.put(("error", f"Failed to read {path}: {exc}"))
         self._queue.put(("gather_complete", {"added": added, "files": len(files)}))
 
+    def _gather_captures(self, captures: List[Path]) -> None:
+        # The capture index lists every (plugin, id) pair, so only one record per pair is read.
+        added = 0
+        for path in captures:
+            try:
+                for capture_record in PayloadCaptureReader(path).records(distinct=True):
+                    record = PayloadParser.parse_capture(capture_record)
+                    if record and self._add_if_unmatched(record):
+                        added += 1
+            except OSError as exc:
+                self._queue.put(("error", f"Failed to read {path}: {exc}"))
+        self._queue.put(("gather_complete", {"added": added, "files": len(captures)}))
+
+    def _add_if_unmatched(self, record: PayloadRecord) -> bool:
+        if self._matcher.is_payload_grouped(record.plugin, record.payload_id):
+            return False
+        unmatched_group = self._matcher.unmatched_group_for(record.plugin, record.payload_id)
+        enriched = record if unmatched_group is None else record.with_group(unmatched_group)
+        return self._store.add(enriched)
+
 
 def _normalise_notes(raw_notes: Optional[str]) -> List[str]:
     if not raw_notes: